@@ -1,86 +1,188 @@
+import importlib
+from typing import TYPE_CHECKING
+
 from .config import apply_import_time_memory_reclaim_policy, set_params
 
 # Apply startup memory policy before importing submodules that import Polars.
 # This has to stay at the very top of the package import chain to be useful.
 apply_import_time_memory_reclaim_policy()
 
-from .spatial.study_area import StudyArea
-from .spatial.transport_zones import TransportZones
-from .spatial.local_admin_units import LocalAdminUnits
-
-from .transport.costs.path import PathTravelCosts
-from .transport.graphs.core import PathGraph
-from .transport.costs.parameters import (
-    CostOfTimeParameters,
-    GeneralizedCostParameters,
-    PathRoutingParameters,
-)
-
-from .population import Population
-from .surveys.france import EMPMobilitySurvey
-from .activities import (
-    Activity,
-    ActivityParameters,
-    HomeActivity,
-    HomeParameters,
-    LeisureActivity,
-    LeisureParameters,
-    OtherActivity,
-    OtherParameters,
-    ShopActivity,
-    ShopParameters,
-    StudyActivity,
-    StudyParameters,
-    WorkActivity,
-    WorkParameters
-)
-from .impacts import carbon_computation
-
-from .trips.individual_year_trips import IndividualYearTrips
-from .trips.group_day_trips import (
-    BehaviorChangePhase,
-    BehaviorChangeScope,
-    GroupDayTripsActivitySequenceParameters,
-    GroupDayTripsBehaviorChangeParameters,
-    GroupDayTripsDestinationSequenceParameters,
-    GroupDayTripsModeSequenceParameters,
-    GroupDayTripsOutputParameters,
-    GroupDayTripsParameters,
-    GroupDayTripsPeriodParameters,
-    GroupDayTripsPlanUpdateParameters,
-    GroupDayTripsRunParameters,
-    PopulationGroupDayTrips,
-)
-
-from .transport.modes.bicycle import BicycleMode, BicycleParameters
-from .transport.modes.car import CarMode, CarParameters
-from .transport.modes.walk import WalkMode, WalkParameters
-from .transport.modes.carpool import (
-    CarpoolMode,
-    CarpoolParameters,
-    DetailedCarpoolRoutingParameters,
-    DetailedCarpoolGeneralizedCostParameters,
-)
-from .transport.modes.public_transport import (
-    build_project_gtfs_zip,
-    build_gtfs_zip,
-    GTFSBuilder,
-    GTFSFeedSpec,
-    GTFSLineSpec,
-    GTFSStopSpec,
-    PublicTransportMode,
-    PublicTransportParameters,
-    PublicTransportRoutingParameters,
-    GTFSSources,
-)
-from .transport.modes.core import IntermodalTransfer, ModeRegistry
-from .runtime.parameter_values import DEFAULT_SCENARIO, ParameterValue, SensitivityValue
-from .runtime.project_cache import ProjectCache
-from .runtime.scenarios import Scenario, Scenarios
-
-from .transport.graphs.modified.modifiers import (
-    BorderCrossingSpeedModifier,
-    LimitedSpeedZonesModifier,
-    NewRoadModifier,
-    RoadLaneNumberModifier,
-)
+# The public API is resolved lazily: ``import mobility`` only loads the
+# configuration helpers, and each name below imports its subpackage (and the
+# geopandas / polars / plotly stack behind it) the first time it is accessed.
+# Keys are public names, values are ``(module, attribute)`` pairs. An attribute
+# of None exposes the module itself.
+_LAZY_ATTRIBUTES = {
+    "StudyArea": ("mobility.spatial.study_area", "StudyArea"),
+    "TransportZones": ("mobility.spatial.transport_zones", "TransportZones"),
+    "LocalAdminUnits": ("mobility.spatial.local_admin_units", "LocalAdminUnits"),
+
+    "PathTravelCosts": ("mobility.transport.costs.path", "PathTravelCosts"),
+    "PathGraph": ("mobility.transport.graphs.core", "PathGraph"),
+    "CostOfTimeParameters": ("mobility.transport.costs.parameters", "CostOfTimeParameters"),
+    "GeneralizedCostParameters": ("mobility.transport.costs.parameters", "GeneralizedCostParameters"),
+    "PathRoutingParameters": ("mobility.transport.costs.parameters", "PathRoutingParameters"),
+
+    "Population": ("mobility.population", "Population"),
+    "EMPMobilitySurvey": ("mobility.surveys.france", "EMPMobilitySurvey"),
+    "Activity": ("mobility.activities", "Activity"),
+    "ActivityParameters": ("mobility.activities", "ActivityParameters"),
+    "HomeActivity": ("mobility.activities", "HomeActivity"),
+    "HomeParameters": ("mobility.activities", "HomeParameters"),
+    "LeisureActivity": ("mobility.activities", "LeisureActivity"),
+    "LeisureParameters": ("mobility.activities", "LeisureParameters"),
+    "OtherActivity": ("mobility.activities", "OtherActivity"),
+    "OtherParameters": ("mobility.activities", "OtherParameters"),
+    "ShopActivity": ("mobility.activities", "ShopActivity"),
+    "ShopParameters": ("mobility.activities", "ShopParameters"),
+    "StudyActivity": ("mobility.activities", "StudyActivity"),
+    "StudyParameters": ("mobility.activities", "StudyParameters"),
+    "WorkActivity": ("mobility.activities", "WorkActivity"),
+    "WorkParameters": ("mobility.activities", "WorkParameters"),
+    "carbon_computation": ("mobility.impacts.carbon_computation", None),
+
+    "IndividualYearTrips": ("mobility.trips.individual_year_trips", "IndividualYearTrips"),
+    "BehaviorChangePhase": ("mobility.trips.group_day_trips", "BehaviorChangePhase"),
+    "BehaviorChangeScope": ("mobility.trips.group_day_trips", "BehaviorChangeScope"),
+    "GroupDayTripsActivitySequenceParameters": ("mobility.trips.group_day_trips", "GroupDayTripsActivitySequenceParameters"),
+    "GroupDayTripsBehaviorChangeParameters": ("mobility.trips.group_day_trips", "GroupDayTripsBehaviorChangeParameters"),
+    "GroupDayTripsDestinationSequenceParameters": ("mobility.trips.group_day_trips", "GroupDayTripsDestinationSequenceParameters"),
+    "GroupDayTripsModeSequenceParameters": ("mobility.trips.group_day_trips", "GroupDayTripsModeSequenceParameters"),
+    "GroupDayTripsOutputParameters": ("mobility.trips.group_day_trips", "GroupDayTripsOutputParameters"),
+    "GroupDayTripsParameters": ("mobility.trips.group_day_trips", "GroupDayTripsParameters"),
+    "GroupDayTripsPeriodParameters": ("mobility.trips.group_day_trips", "GroupDayTripsPeriodParameters"),
+    "GroupDayTripsPlanUpdateParameters": ("mobility.trips.group_day_trips", "GroupDayTripsPlanUpdateParameters"),
+    "GroupDayTripsRunParameters": ("mobility.trips.group_day_trips", "GroupDayTripsRunParameters"),
+    "PopulationGroupDayTrips": ("mobility.trips.group_day_trips", "PopulationGroupDayTrips"),
+
+    "BicycleMode": ("mobility.transport.modes.bicycle", "BicycleMode"),
+    "BicycleParameters": ("mobility.transport.modes.bicycle", "BicycleParameters"),
+    "CarMode": ("mobility.transport.modes.car", "CarMode"),
+    "CarParameters": ("mobility.transport.modes.car", "CarParameters"),
+    "WalkMode": ("mobility.transport.modes.walk", "WalkMode"),
+    "WalkParameters": ("mobility.transport.modes.walk", "WalkParameters"),
+    "CarpoolMode": ("mobility.transport.modes.carpool", "CarpoolMode"),
+    "CarpoolParameters": ("mobility.transport.modes.carpool", "CarpoolParameters"),
+    "DetailedCarpoolRoutingParameters": ("mobility.transport.modes.carpool", "DetailedCarpoolRoutingParameters"),
+    "DetailedCarpoolGeneralizedCostParameters": ("mobility.transport.modes.carpool", "DetailedCarpoolGeneralizedCostParameters"),
+    "build_project_gtfs_zip": ("mobility.transport.modes.public_transport", "build_project_gtfs_zip"),
+    "build_gtfs_zip": ("mobility.transport.modes.public_transport", "build_gtfs_zip"),
+    "GTFSBuilder": ("mobility.transport.modes.public_transport", "GTFSBuilder"),
+    "GTFSFeedSpec": ("mobility.transport.modes.public_transport", "GTFSFeedSpec"),
+    "GTFSLineSpec": ("mobility.transport.modes.public_transport", "GTFSLineSpec"),
+    "GTFSStopSpec": ("mobility.transport.modes.public_transport", "GTFSStopSpec"),
+    "PublicTransportMode": ("mobility.transport.modes.public_transport", "PublicTransportMode"),
+    "PublicTransportParameters": ("mobility.transport.modes.public_transport", "PublicTransportParameters"),
+    "PublicTransportRoutingParameters": ("mobility.transport.modes.public_transport", "PublicTransportRoutingParameters"),
+    "GTFSSources": ("mobility.transport.modes.public_transport", "GTFSSources"),
+    "IntermodalTransfer": ("mobility.transport.modes.core", "IntermodalTransfer"),
+    "ModeRegistry": ("mobility.transport.modes.core", "ModeRegistry"),
+    "DEFAULT_SCENARIO": ("mobility.runtime.parameter_values", "DEFAULT_SCENARIO"),
+    "ParameterValue": ("mobility.runtime.parameter_values", "ParameterValue"),
+    "SensitivityValue": ("mobility.runtime.parameter_values", "SensitivityValue"),
+    "ProjectCache": ("mobility.runtime.project_cache", "ProjectCache"),
+    "Scenario": ("mobility.runtime.scenarios", "Scenario"),
+    "Scenarios": ("mobility.runtime.scenarios", "Scenarios"),
+
+    "BorderCrossingSpeedModifier": ("mobility.transport.graphs.modified.modifiers", "BorderCrossingSpeedModifier"),
+    "LimitedSpeedZonesModifier": ("mobility.transport.graphs.modified.modifiers", "LimitedSpeedZonesModifier"),
+    "NewRoadModifier": ("mobility.transport.graphs.modified.modifiers", "NewRoadModifier"),
+    "RoadLaneNumberModifier": ("mobility.transport.graphs.modified.modifiers", "RoadLaneNumberModifier"),
+}
+
+__all__ = ["set_params", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name):
+    """Import a public Mobility name on first access and cache it on the package."""
+    try:
+        module_name, attribute_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    module = importlib.import_module(module_name)
+    value = module if attribute_name is None else getattr(module, attribute_name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if TYPE_CHECKING:
+    from .spatial.study_area import StudyArea
+    from .spatial.transport_zones import TransportZones
+    from .spatial.local_admin_units import LocalAdminUnits
+    from .transport.costs.path import PathTravelCosts
+    from .transport.graphs.core import PathGraph
+    from .transport.costs.parameters import (
+        CostOfTimeParameters,
+        GeneralizedCostParameters,
+        PathRoutingParameters,
+    )
+    from .population import Population
+    from .surveys.france import EMPMobilitySurvey
+    from .activities import (
+        Activity,
+        ActivityParameters,
+        HomeActivity,
+        HomeParameters,
+        LeisureActivity,
+        LeisureParameters,
+        OtherActivity,
+        OtherParameters,
+        ShopActivity,
+        ShopParameters,
+        StudyActivity,
+        StudyParameters,
+        WorkActivity,
+        WorkParameters
+    )
+    from .impacts import carbon_computation
+    from .trips.individual_year_trips import IndividualYearTrips
+    from .trips.group_day_trips import (
+        BehaviorChangePhase,
+        BehaviorChangeScope,
+        GroupDayTripsActivitySequenceParameters,
+        GroupDayTripsBehaviorChangeParameters,
+        GroupDayTripsDestinationSequenceParameters,
+        GroupDayTripsModeSequenceParameters,
+        GroupDayTripsOutputParameters,
+        GroupDayTripsParameters,
+        GroupDayTripsPeriodParameters,
+        GroupDayTripsPlanUpdateParameters,
+        GroupDayTripsRunParameters,
+        PopulationGroupDayTrips,
+    )
+    from .transport.modes.bicycle import BicycleMode, BicycleParameters
+    from .transport.modes.car import CarMode, CarParameters
+    from .transport.modes.walk import WalkMode, WalkParameters
+    from .transport.modes.carpool import (
+        CarpoolMode,
+        CarpoolParameters,
+        DetailedCarpoolRoutingParameters,
+        DetailedCarpoolGeneralizedCostParameters,
+    )
+    from .transport.modes.public_transport import (
+        build_project_gtfs_zip,
+        build_gtfs_zip,
+        GTFSBuilder,
+        GTFSFeedSpec,
+        GTFSLineSpec,
+        GTFSStopSpec,
+        PublicTransportMode,
+        PublicTransportParameters,
+        PublicTransportRoutingParameters,
+        GTFSSources,
+    )
+    from .transport.modes.core import IntermodalTransfer, ModeRegistry
+    from .runtime.parameter_values import DEFAULT_SCENARIO, ParameterValue, SensitivityValue
+    from .runtime.project_cache import ProjectCache
+    from .runtime.scenarios import Scenario, Scenarios
+    from .transport.graphs.modified.modifiers import (
+        BorderCrossingSpeedModifier,
+        LimitedSpeedZonesModifier,
+        NewRoadModifier,
+        RoadLaneNumberModifier,
+    )
@@ -8,7 +8,8 @@ import warnings
 
 from importlib import resources
 from mobility.runtime.logging_levels import TRACE_LEVEL, register_trace_level
-from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+from mobility.runtime.parallelism import apply_thread_budget
+from mobility.runtime.r_integration.r_packages import request_r_packages
 from mobility.runtime.project_cache import register_current_script_if_available
 
 # This is a workaround for retained native memory after heavy Polars workloads.
@@ -41,7 +42,13 @@ def set_params(
     r_idle_cpu_percent=1.0,
     r_idle_memory_change_mb=1.0,
     r_cpu_check_interval_seconds=5,
+    r_exchange_folder_path=None,
+    r_max_cores=None,
+    r_max_memory_mb=None,
+    r_max_concurrent_scripts=None,
+    max_threads=None,
     track_project_cache=True,
+    gtfs_mirror_folder_path=None,
 ):
     """
     Sets up the necessary environment for the Mobility package.
@@ -56,8 +63,10 @@ def set_params(
     http_proxy_url (str, optional): The URL for the HTTP proxy.
     https_proxy_url (str, optional): The URL for the HTTPS proxy.
     inject_into_ssl (bool, optional): Whether to inject the truststore package into Python's SSL handling.
-    r_packages (boolean, optional): whether to install R packages or not by running RScriptRunner (does not work for github actions so is handled by a separate r-lib github action)
-    r_packages_force_reinstall (bool, optional)
+    r_packages (boolean, optional): whether to install R packages or not by running RScriptRunner (does not work for github actions so is handled by a separate r-lib github action).
+        The installed packages are fingerprinted in ``~/.mobility/r_packages_fingerprint.json``: when the fingerprint
+        still matches, no R process is started, otherwise the check runs just before the first R script.
+    r_packages_force_reinstall (bool, optional): reinstall all R packages now, without checking the fingerprint.
     r_packages_download_method (str, optional): set this parameter to "wininet" to be able to install packages on some proxies. See the installation.md page for details.
     debug (bool, optional): set debug to True to see the R logs, including error messages
     logging_level (str|int, optional): root logging level, e.g. "INFO" or "DEBUG"
@@ -75,8 +84,22 @@ def set_params(
     r_idle_cpu_percent (float, optional): CPU threshold used by the R idle monitor.
     r_idle_memory_change_mb (float, optional): RAM-change threshold used by the R idle monitor.
     r_cpu_check_interval_seconds (int, optional): frequency of the R idle monitor checks.
+    r_exchange_folder_path (str, optional): folder for the temporary Arrow tables exchanged with R scripts.
+        Defaults to the system temporary folder. Use a RAM-backed folder like /dev/shm to avoid disk writes.
+    r_max_cores (int, optional): number of cores shared by the R scripts. Defaults to max_threads.
+    r_max_memory_mb (float, optional): memory shared by the R scripts, in MiB. Defaults to 80% of the RAM.
+    r_max_concurrent_scripts (int, optional): number of independent R scripts that can run at the same time.
+        Defaults to 1. With a higher value, independent assets (for example the graphs of several modes) are
+        built in parallel and each R script gets r_max_cores / r_max_concurrent_scripts workers.
+    max_threads (int, optional): number of threads Mobility may use in total. Defaults to the number of CPUs.
+        Polars, BLAS, the Python worker pools and the R scripts are sized from this budget, so that nested
+        parallel steps do not oversubscribe shared machines. Call set_params before importing polars, as the
+        polars thread pool cannot be resized afterwards.
     track_project_cache (bool, optional): Whether Mobility should track cache
         files used by the running script for later project-data cleanup.
+    gtfs_mirror_folder_path (str, optional): local folder from which GTFS files are read instead of being downloaded,
+        for machines without network access. It should be a copy of the ``gtfs/downloads`` folder of the package
+        data folder of a machine that downloaded the files.
     """
 
     feedback = _normalize_feedback_setting(
@@ -103,6 +126,14 @@ def set_params(
     set_env_variable("MOBILITY_R_IDLE_CPU_PERCENT", r_idle_cpu_percent)
     set_env_variable("MOBILITY_R_IDLE_MEMORY_CHANGE_MB", r_idle_memory_change_mb)
     set_env_variable("MOBILITY_R_CPU_CHECK_INTERVAL_SECONDS", r_cpu_check_interval_seconds)
+    set_env_variable("MOBILITY_R_EXCHANGE_FOLDER", r_exchange_folder_path)
+    set_env_variable("MOBILITY_R_MAX_CORES", r_max_cores)
+    set_env_variable("MOBILITY_R_MAX_MEMORY_MB", r_max_memory_mb)
+    set_env_variable("MOBILITY_R_MAX_CONCURRENT_SCRIPTS", r_max_concurrent_scripts)
+    set_env_variable("MOBILITY_MAX_THREADS", max_threads)
+    set_env_variable("MOBILITY_GTFS_MIRROR_FOLDER", gtfs_mirror_folder_path)
+    if max_threads is not None:
+        apply_thread_budget(int(max_threads))
 
     os.environ["MOBILITY_DEBUG"] = "1" if debug else "0"
     os.environ["MOBILITY_FEEDBACK"] = feedback
@@ -444,11 +475,4 @@ def install_r_packages(r_packages, r_packages_force_reinstall, r_packages_downlo
         else:
             packages.append({'source': 'CRAN', 'name': 'osmdata'})
 
-        args = [
-            json.dumps(packages),
-            str(r_packages_force_reinstall),
-            r_packages_download_method
-        ]
-
-        script = RScriptRunner(resources.files('mobility.runtime.r_integration').joinpath('install_packages.R'))
-        script.run(args)
+        request_r_packages(packages, r_packages_force_reinstall, r_packages_download_method)
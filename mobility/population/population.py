@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import pathlib
 
 import numpy as np
 import pandas as pd
-import shortuuid
 from pydantic import BaseModel, ConfigDict, Field
 from typing import Annotated
 
@@ -92,21 +92,16 @@ class Population(FileAsset):
             pop_groups=pop_groups,
             sample_size=self.inputs["parameters"].sample_size,
         )
-        sample_sizes = sample_sizes.set_index("transport_zone_id")["n_persons"].to_dict()
-
-        individuals = (
-            pop_groups.groupby("transport_zone_id", group_keys=False)
-            .apply(
-                lambda g: (
-                    g.assign(transport_zone_id=g.name)
-                    .sample(n=sample_sizes[g.name], weights="weight")
-                ),
-                include_groups=False,
-            )
-            .reset_index(drop=True)
+        sample_sizes = sample_sizes.set_index("transport_zone_id")["n_persons"]
+
+        individuals = self.sample_individuals(
+            pop_groups,
+            sample_sizes,
+            seed=self.inputs["parameters"].seed,
         )
 
-        individuals["individual_id"] = [shortuuid.uuid() for _ in range(individuals.shape[0])]
+        # Compact integer ids : downstream tables join on them
+        individuals["individual_id"] = np.arange(individuals.shape[0], dtype=np.int64)
         individuals = individuals[
             [
                 "individual_id",
@@ -124,6 +119,70 @@ class Population(FileAsset):
         pop_groups.to_parquet(self.cache_path["population_groups"])
         return self.cache_path
 
+    @staticmethod
+    def sample_individuals(
+        pop_groups: pd.DataFrame,
+        sample_sizes: pd.Series,
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Sample population groups without replacement, weighted by their weight, in every transport zone.
+
+        Each group gets the key E / weight, E being drawn from an exponential
+        distribution, and the groups with the n smallest keys of each zone
+        are kept, which is the same as drawing n groups one after the other
+        with probabilities proportional to their weights (Efraimidis and
+        Spirakis, 2006). Keys are drawn for all the groups of a zone at once,
+        with one random generator per zone seeded from the seed and the zone
+        id : the sample of a zone does not depend on the other zones.
+
+        Args:
+            pop_groups (pd.DataFrame): population groups with a
+                transport_zone_id and a weight column.
+            sample_sizes (pd.Series): number of individuals to sample, by
+                transport_zone_id.
+            seed (int): seed of the random generators.
+
+        Returns:
+            pd.DataFrame: the sampled groups, zone by zone, in sampling order.
+            Zones with fewer groups with a positive weight than individuals
+            to sample keep all these groups.
+        """
+        logging.info("Sampling individuals in each transport zone...")
+
+        pop_groups = pop_groups.reset_index(drop=True)
+        zone_codes, zones = pd.factorize(pop_groups["transport_zone_id"], sort=True)
+        weights = pop_groups["weight"].to_numpy(dtype=float)
+
+        n_persons = sample_sizes.reindex(zones).fillna(0).to_numpy(dtype=np.int64)
+        n_groups = np.bincount(zone_codes, minlength=len(zones))
+        n_positive_groups = np.bincount(zone_codes, weights=(weights > 0), minlength=len(zones))
+
+        too_small = n_persons > n_positive_groups
+        if too_small.any():
+            logging.warning(
+                "Transport zones %s have fewer population groups than individuals to sample, "
+                "all their groups are kept.",
+                list(zones[too_small])
+            )
+            n_persons = np.minimum(n_persons, n_positive_groups.astype(np.int64))
+
+        rows = np.argsort(zone_codes, kind="stable")
+        zone_starts = np.concatenate([[0], np.cumsum(n_groups)])
+
+        keys = np.empty(len(pop_groups))
+        with np.errstate(divide="ignore"):
+            for zone_code, zone in enumerate(zones):
+                zone_rows = rows[zone_starts[zone_code]:zone_starts[zone_code + 1]]
+                generator = zone_random_generator(seed, zone)
+                keys[zone_rows] = generator.exponential(size=len(zone_rows)) / weights[zone_rows]
+
+        sampled = np.lexsort((keys, zone_codes))
+        rank_in_zone = np.arange(len(sampled)) - zone_starts[zone_codes[sampled]]
+        sampled = sampled[rank_in_zone < n_persons[zone_codes[sampled]]]
+
+        return pop_groups.iloc[sampled].reset_index(drop=True)
+
     def get_sample_sizes(
         self,
         pop_groups: pd.DataFrame | None = None,
@@ -176,6 +235,12 @@ class Population(FileAsset):
         logging.info("Global sampling rate : " + str(round(10000 * sampling_rate) / 10000) + " %.")
         return population
 
+def zone_random_generator(seed: int, transport_zone_id) -> np.random.Generator:
+    """Return the random generator of a transport zone, the same whatever the other zones."""
+    zone_key = int(hashlib.md5(str(transport_zone_id).encode("utf-8")).hexdigest()[:16], 16)
+    return np.random.default_rng(np.random.SeedSequence([seed, zone_key]))
+
+
 class PopulationParameters(BaseModel):
     """Parameters controlling population sampling."""
 
@@ -189,3 +254,12 @@ class PopulationParameters(BaseModel):
             description="Number of inhabitants to sample within the selected transport zones.",
         ),
     ]
+    seed: Annotated[
+        int,
+        Field(
+            default=0,
+            ge=0,
+            title="Population sampling seed",
+            description="Seed of the random generators used to sample the inhabitants of each transport zone.",
+        ),
+    ]
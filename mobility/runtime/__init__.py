@@ -1,21 +1,25 @@
 """Core package infrastructure."""
 
-from .parameter_values import (
-    DEFAULT_SCENARIO,
-    DEFAULT_SENSITIVITY_CASE,
-    ParameterValue,
-    SensitivityCase,
-    SensitivityValue,
-    collect_parameter_value_scenarios,
-    collect_sensitivity_values,
-    resolve_parameter_values,
-)
-from .scenarios import (
-    Scenario,
-    ScenarioParameterChange,
-    Scenarios,
-    collect_parameter_value_changes,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolved lazily so that ``mobility.config`` (and therefore ``import mobility``)
+# can use the lightweight runtime helpers without importing numpy, pandas and
+# the asset machinery behind the parameter values and scenarios.
+_LAZY_ATTRIBUTES = {
+    "DEFAULT_SCENARIO": "mobility.runtime.parameter_values",
+    "DEFAULT_SENSITIVITY_CASE": "mobility.runtime.parameter_values",
+    "ParameterValue": "mobility.runtime.parameter_values",
+    "SensitivityCase": "mobility.runtime.parameter_values",
+    "SensitivityValue": "mobility.runtime.parameter_values",
+    "collect_parameter_value_scenarios": "mobility.runtime.parameter_values",
+    "collect_sensitivity_values": "mobility.runtime.parameter_values",
+    "resolve_parameter_values": "mobility.runtime.parameter_values",
+    "Scenario": "mobility.runtime.scenarios",
+    "ScenarioParameterChange": "mobility.runtime.scenarios",
+    "Scenarios": "mobility.runtime.scenarios",
+    "collect_parameter_value_changes": "mobility.runtime.scenarios",
+}
 
 __all__ = [
     "DEFAULT_SCENARIO",
@@ -31,3 +35,38 @@ __all__ = [
     "collect_sensitivity_values",
     "resolve_parameter_values",
 ]
+
+
+def __getattr__(name):
+    """Import a runtime name on first access and cache it on the package."""
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if TYPE_CHECKING:
+    from .parameter_values import (
+        DEFAULT_SCENARIO,
+        DEFAULT_SENSITIVITY_CASE,
+        ParameterValue,
+        SensitivityCase,
+        SensitivityValue,
+        collect_parameter_value_scenarios,
+        collect_sensitivity_values,
+        resolve_parameter_values,
+    )
+    from .scenarios import (
+        Scenario,
+        ScenarioParameterChange,
+        Scenarios,
+        collect_parameter_value_changes,
+    )
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import contextvars
 import logging
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from contextvars import ContextVar
 from typing import Any, Iterator
@@ -10,6 +12,7 @@ import networkx as nx
 from mobility.runtime.assets.asset import Asset
 from mobility.runtime.assets.graph import asset_graph_key, build_asset_graph
 from mobility.runtime.project_cache import record_file_asset_use
+from mobility.runtime.r_integration.r_job_scheduler import get_r_job_scheduler
 
 
 _current_asset_resolver: ContextVar["AssetResolver | None"] = ContextVar(
@@ -151,6 +154,18 @@ class AssetResolver:
         except nx.NetworkXUnfeasible:
             raise RuntimeError("Dependency cycle detected among FileAssets")
 
+        max_concurrent_builds = get_r_job_scheduler().max_concurrent_scripts
+        if max_concurrent_builds > 1 and len(asset_keys_to_rebuild) > 1:
+            return self._rebuild_assets_concurrently(
+                dependency_graph,
+                assets_in_dependency_order,
+                asset_keys_to_rebuild,
+                max_concurrent_builds,
+                requested_asset_key=requested_asset_key,
+                requested_asset_args=requested_asset_args,
+                requested_asset_kwargs=requested_asset_kwargs,
+            )
+
         for dependency_asset in assets_in_dependency_order:
             dependency_asset_key = asset_graph_key(dependency_asset)
             if dependency_asset_key in asset_keys_to_rebuild:
@@ -170,6 +185,78 @@ class AssetResolver:
 
         return rebuilt_requested_asset_value
 
+    def _rebuild_assets_concurrently(
+        self,
+        dependency_graph: nx.DiGraph,
+        assets_in_dependency_order: list[Asset],
+        asset_keys_to_rebuild: set,
+        max_concurrent_builds: int,
+        *,
+        requested_asset_key,
+        requested_asset_args: tuple,
+        requested_asset_kwargs: dict,
+    ) -> Any:
+        """Rebuild stale assets as soon as their upstream assets are ready.
+
+        Independent branches of the graph, for example the walk, bicycle and
+        car path graphs, are rebuilt in parallel threads. Most of their time is
+        spent waiting for R scripts, which share the R core and memory budget
+        through the `RJobScheduler`. Assets that do not need a rebuild are
+        marked as prepared right away, in dependency order.
+        """
+        rebuilt_requested_asset_value = _REQUESTED_ASSET_WAS_NOT_REBUILT
+        remaining_upstream = {
+            asset: sum(
+                1
+                for upstream_asset in dependency_graph.predecessors(asset)
+                if asset_graph_key(upstream_asset) in asset_keys_to_rebuild
+            )
+            for asset in assets_in_dependency_order
+            if asset_graph_key(asset) in asset_keys_to_rebuild
+        }
+
+        for dependency_asset in assets_in_dependency_order:
+            if dependency_asset not in remaining_upstream:
+                self.prepared_asset_keys.add(asset_graph_key(dependency_asset))
+                record_file_asset_use(dependency_asset)
+
+        def rebuild(asset: Asset) -> Any:
+            if asset_graph_key(asset) == requested_asset_key:
+                return self._rebuild_asset(asset, *requested_asset_args, **requested_asset_kwargs)
+            return self._rebuild_asset(asset)
+
+        with ThreadPoolExecutor(max_workers=max_concurrent_builds) as executor:
+            running = {}
+
+            def submit_ready_assets() -> None:
+                for asset, count in list(remaining_upstream.items()):
+                    if count == 0:
+                        del remaining_upstream[asset]
+                        # Each thread gets its own copy of the context so nested
+                        # `.get()` calls still find this resolver.
+                        future = executor.submit(contextvars.copy_context().run, rebuild, asset)
+                        running[future] = asset
+
+            submit_ready_assets()
+            while running:
+                done, _ = wait(running, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    asset = running.pop(future)
+                    value = future.result()
+                    asset_key = asset_graph_key(asset)
+                    if asset_key == requested_asset_key:
+                        rebuilt_requested_asset_value = value
+
+                    self.prepared_asset_keys.add(asset_key)
+                    record_file_asset_use(asset)
+                    for downstream_asset in dependency_graph.successors(asset):
+                        if downstream_asset in remaining_upstream:
+                            remaining_upstream[downstream_asset] -= 1
+
+                submit_ready_assets()
+
+        return rebuilt_requested_asset_value
+
     def _get_dependency_graph(
         self,
         requested_asset: Asset,
@@ -16,6 +16,7 @@ from tenacity import (
 )
 
 from mobility.runtime.io.http import request_url
+from mobility.runtime.parallelism import get_worker_count
 
 
 def download_file(url, path, max_retries=3, timeout=(10, 120), raise_on_error=True):
@@ -150,7 +151,7 @@ def download_files(url_path_pairs, max_workers=4, max_retries=3, timeout=(10, 12
     if len(url_path_pairs) == 0:
         return paths
 
-    worker_count = min(max_workers, len(url_path_pairs))
+    worker_count = get_worker_count(len(url_path_pairs), max_workers=max_workers)
     with ThreadPoolExecutor(max_workers=worker_count) as executor:
         futures = {
             executor.submit(
@@ -12,6 +12,8 @@ from tenacity import (
     wait_exponential,
 )
 
+from mobility.runtime.parallelism import get_worker_count
+
 
 def request_url(
     url,
@@ -19,6 +21,7 @@ def request_url(
     timeout=(10, 120),
     stream=False,
     allowed_status_codes=None,
+    headers=None,
 ):
     """
     Call a URL with Mobility proxy, certificate, timeout, and retry settings.
@@ -29,6 +32,8 @@ def request_url(
         timeout (int or tuple): the timeout setting for requests.
         stream (bool): whether to stream the response body.
         allowed_status_codes (set): status codes returned without raising.
+        headers (dict): additional request headers (conditional or range
+            requests for example).
 
     Returns:
         requests.Response: the HTTP response. The caller should close it after
@@ -52,6 +57,7 @@ def request_url(
     def _request_once():
         response = requests.get(
             url,
+            headers=headers,
             stream=stream,
             proxies=proxies,
             verify=verify,
@@ -91,7 +97,7 @@ def request_urls(
 
     request_error = None
     futures = {}
-    worker_count = min(max_workers, len(urls))
+    worker_count = get_worker_count(len(urls), max_workers=max_workers)
     with ThreadPoolExecutor(max_workers=worker_count) as executor:
         futures = {
             executor.submit(
@@ -0,0 +1,159 @@
+import contextlib
+import logging
+import os
+import sys
+from typing import Iterator
+
+
+# Environment variables read by the native thread pools used in Mobility
+# (polars, NumPy/SciPy BLAS, scikit-learn OpenMP). They are only read when the
+# library is first imported or when a new process starts.
+THREAD_ENV_VARS = [
+    "POLARS_MAX_THREADS",
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+def get_max_threads() -> int:
+    """
+    Return the number of threads Mobility may use in total.
+
+    It is set with ``set_params(max_threads=...)`` (the ``MOBILITY_MAX_THREADS``
+    environment variable) and defaults to the number of CPUs. Thread pools,
+    process pools and R workers are all sized from this budget, so that
+    nested parallel stages do not oversubscribe the machine.
+    """
+    max_threads = os.environ.get("MOBILITY_MAX_THREADS")
+    if max_threads:
+        return max(1, int(max_threads))
+    return os.cpu_count() or 1
+
+
+def get_worker_count(
+    task_count: int | None = None,
+    max_workers: int | None = None,
+    threads_per_worker: int = 1,
+) -> int:
+    """
+    Return the number of workers a parallel stage may start.
+
+    Args:
+        task_count: Number of tasks of the stage, no more workers are started.
+        max_workers: Stage-specific limit, for example for I/O bound pools.
+        threads_per_worker: Threads used by each worker (a process running
+            polars with 2 threads counts as 2).
+
+    Returns:
+        int: Worker count, at least 1, such that the workers use at most
+        ``get_max_threads()`` threads.
+    """
+    worker_count = max(1, get_max_threads() // max(1, threads_per_worker))
+    if max_workers is not None:
+        worker_count = min(worker_count, max(1, int(max_workers)))
+    if task_count is not None:
+        worker_count = min(worker_count, max(1, int(task_count)))
+    return worker_count
+
+
+def apply_thread_budget(max_threads: int | None = None) -> None:
+    """
+    Size the polars, BLAS and OpenMP thread pools of this process.
+
+    The environment variables in ``THREAD_ENV_VARS`` are set so libraries
+    imported later, and the processes started by Mobility, use the budget.
+    BLAS and OpenMP pools already loaded are resized with ``threadpoolctl``
+    when it is installed. The polars pool cannot be resized after polars is
+    imported, a warning is logged in that case.
+
+    Args:
+        max_threads: Thread budget, defaults to ``get_max_threads()``.
+    """
+    if max_threads is None:
+        max_threads = get_max_threads()
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(max_threads)
+
+    if "polars" in sys.modules:
+        polars_threads = sys.modules["polars"].thread_pool_size()
+        if polars_threads != max_threads:
+            logging.warning(
+                "Polars was imported before set_params and uses %s threads instead of %s. "
+                "Call set_params before importing polars to apply the thread budget.",
+                polars_threads,
+                max_threads,
+            )
+
+    _limit_loaded_native_threads(max_threads)
+
+
+@contextlib.contextmanager
+def limit_native_threads(threads: int) -> Iterator[None]:
+    """
+    Limit the BLAS and OpenMP pools while a block runs.
+
+    Used around Python thread pools whose tasks call NumPy or scikit-learn,
+    so that each worker thread gets its share of the budget instead of the
+    whole machine. Does nothing when ``threadpoolctl`` is not installed.
+    """
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        yield
+        return
+
+    with threadpool_limits(limits=max(1, int(threads))):
+        yield
+
+
+def worker_process_env(threads_per_worker: int = 1) -> dict[str, str]:
+    """
+    Return the environment of a worker process limited to ``threads_per_worker`` threads.
+
+    The environment of this process is copied, with the variables in
+    ``THREAD_ENV_VARS`` set to the worker share, and can be passed to
+    ``subprocess`` as ``env``. ``os.environ`` is not modified, so processes
+    started at the same time from other threads (R scripts for example)
+    keep the full budget.
+    """
+    threads = str(max(1, int(threads_per_worker)))
+    return {**os.environ, **{name: threads for name in THREAD_ENV_VARS}}
+
+
+def init_worker_process(threads_per_worker: int = 1, initializer=None, initargs: tuple = ()) -> None:
+    """
+    Initialize a process pool worker with its share of the thread budget.
+
+    Used as the ``initializer`` of process pools : the environment of the
+    worker process is set with ``worker_process_env``, its BLAS and OpenMP
+    pools are resized, then the pool specific ``initializer`` is called with
+    ``initargs``.
+
+    The polars pool of the worker cannot be resized here : forked workers
+    inherit it from the parent, and spawned workers import polars while
+    unpickling the pool initializer. Start the process creating the pool with
+    ``worker_process_env`` instead, so that polars is imported with the worker
+    share.
+    """
+    os.environ.update(worker_process_env(threads_per_worker))
+    _limit_loaded_native_threads(max(1, int(threads_per_worker)))
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _limit_loaded_native_threads(max_threads: int) -> None:
+    if "numpy" not in sys.modules and "sklearn" not in sys.modules:
+        return
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+
+    # Applied for the rest of the process, not as a context manager.
+    threadpool_limits(limits=max_threads)
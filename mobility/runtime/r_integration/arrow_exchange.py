@@ -0,0 +1,105 @@
+import os
+import pathlib
+import shutil
+import tempfile
+import uuid
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+EXCHANGE_FILE_SUFFIX = ".arrow"
+
+
+class RExchangeFolder:
+    """
+    Temporary folder for the tables exchanged with one R script run.
+
+    Tables that only live for the duration of an R call (script inputs built
+    in Python, or results that Python re-reads and persists itself) do not
+    need the compressed formats used for cache assets. They are written as
+    uncompressed Arrow IPC (Feather v2) files, which both pyarrow and R arrow
+    can memory-map without decoding. The folder is removed when the context
+    exits.
+
+    The root folder defaults to the system temporary folder and can be changed
+    with the ``MOBILITY_R_EXCHANGE_FOLDER`` environment variable, for instance
+    to ``/dev/shm`` to keep the exchanges in shared memory.
+
+    Example:
+        with RExchangeFolder() as exchange:
+            output_path = exchange.path("travel_costs")
+            script.run([..., str(output_path)])
+            costs = read_exchange_table(output_path).to_pandas()
+    """
+
+    def __init__(self, prefix: str = "exchange"):
+        self.prefix = prefix
+        self.folder: pathlib.Path | None = None
+
+    def __enter__(self) -> "RExchangeFolder":
+        root = get_r_exchange_root()
+        root.mkdir(parents=True, exist_ok=True)
+        self.folder = root / f"{self.prefix}-{uuid.uuid4().hex}"
+        self.folder.mkdir()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.folder is not None:
+            # Memory-mapped files can still be open on Windows, the OS will
+            # clean the temporary folder later in that case.
+            shutil.rmtree(self.folder, ignore_errors=True)
+            self.folder = None
+
+    def path(self, name: str) -> pathlib.Path:
+        """Return the path of an exchange table in this folder."""
+        if self.folder is None:
+            raise RuntimeError("RExchangeFolder.path() can only be used inside a `with` block.")
+        return self.folder / (name + EXCHANGE_FILE_SUFFIX)
+
+
+def get_r_exchange_root() -> pathlib.Path:
+    """Return the root folder for Python/R exchange tables."""
+    folder = os.environ.get("MOBILITY_R_EXCHANGE_FOLDER")
+    if folder:
+        return pathlib.Path(folder)
+    return pathlib.Path(tempfile.gettempdir()) / "mobility-r-exchange"
+
+
+def write_exchange_table(df, path: pathlib.Path | str) -> pathlib.Path:
+    """
+    Write a table as an uncompressed Arrow IPC file readable by R arrow.
+
+    Args:
+        df: pandas DataFrame, polars DataFrame or pyarrow Table.
+        path: destination file.
+
+    Returns:
+        pathlib.Path: The written file path.
+    """
+    path = pathlib.Path(path)
+    feather.write_feather(_to_arrow_table(df), path, compression="uncompressed")
+    return path
+
+
+def read_exchange_table(path: pathlib.Path | str, memory_map: bool = True) -> pa.Table:
+    """
+    Read an Arrow IPC exchange table, memory-mapped by default.
+
+    The returned table references the mapped file, so convert it (for example
+    with ``to_pandas()``) before the exchange folder is removed if the data
+    must outlive it.
+    """
+    return feather.read_table(pathlib.Path(path), memory_map=memory_map)
+
+
+def _to_arrow_table(df) -> pa.Table:
+    if isinstance(df, pa.Table):
+        return df
+
+    if hasattr(df, "to_arrow"):
+        # Polars defaults to string views, which older R arrow builds cannot read.
+        import polars as pl
+
+        return df.to_arrow(compat_level=pl.CompatLevel.oldest())
+
+    return pa.Table.from_pandas(df, preserve_index=False)
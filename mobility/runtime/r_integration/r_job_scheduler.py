@@ -0,0 +1,190 @@
+import contextlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterator
+
+import psutil
+
+from mobility.runtime.parallelism import get_max_threads
+
+
+# Environment variables read by the thread pools of the R packages used in the
+# scripts (RcppParallel for cppRouting and dodgr, data.table, arrow through
+# OpenMP, parallel and parallelly through MC_CORES).
+R_WORKER_ENV_VARS = [
+    "RCPP_PARALLEL_NUM_THREADS",
+    "R_DATATABLE_NUM_THREADS",
+    "OMP_NUM_THREADS",
+    "MC_CORES",
+]
+
+
+@dataclass(frozen=True)
+class RJobReservation:
+    """Cores and memory granted to one running R script."""
+
+    cores: int
+    memory_mb: float
+
+    def worker_env(self) -> dict[str, str]:
+        """Return the environment variables telling the script its worker count."""
+        return {name: str(self.cores) for name in R_WORKER_ENV_VARS}
+
+
+class RJobScheduler:
+    """
+    Share a core and memory budget between the R scripts started by Mobility.
+
+    Every ``RScriptRunner.run`` reserves a number of cores and an amount of
+    memory before starting ``Rscript``, and waits while the budget is used by
+    other scripts. Each script gets ``max_cores // max_concurrent_scripts``
+    cores by default, so with the default of one script at a time it keeps
+    the full core budget, as before. When several scripts can run at the same
+    time (the asset resolver builds independent assets in parallel), the
+    cores are split between them. The worker count is passed to each script
+    through the environment variables in ``R_WORKER_ENV_VARS``.
+
+    The memory budget is checked against the reservations of the running
+    scripts and against the memory actually available on the machine, so a
+    new script does not start next to a large one that is still growing. A
+    script is always allowed to start when nothing else is running.
+
+    The budget is read from these environment variables, set by
+    ``set_params``: ``MOBILITY_R_MAX_CORES`` (defaults to the Mobility thread
+    budget, see ``get_max_threads``),
+    ``MOBILITY_R_MAX_MEMORY_MB`` (defaults to 80% of the RAM) and
+    ``MOBILITY_R_MAX_CONCURRENT_SCRIPTS`` (defaults to 1).
+    """
+
+    def __init__(
+        self,
+        max_cores: int | None = None,
+        max_memory_mb: float | None = None,
+        max_concurrent_scripts: int | None = None,
+    ):
+        if max_cores is None:
+            max_cores = get_max_threads()
+        if max_memory_mb is None:
+            max_memory_mb = psutil.virtual_memory().total / 1024 / 1024 * 0.8
+        if max_concurrent_scripts is None:
+            max_concurrent_scripts = 1
+
+        if max_cores <= 0:
+            raise ValueError("max_cores should be a positive integer")
+        if max_memory_mb <= 0:
+            raise ValueError("max_memory_mb should be a positive number")
+        if max_concurrent_scripts <= 0:
+            raise ValueError("max_concurrent_scripts should be a positive integer")
+
+        self.max_cores = int(max_cores)
+        self.max_memory_mb = float(max_memory_mb)
+        self.max_concurrent_scripts = int(max_concurrent_scripts)
+
+        self._condition = threading.Condition()
+        self._used_cores = 0
+        self._used_memory_mb = 0.0
+        self._running_scripts = 0
+
+    @property
+    def default_cores(self) -> int:
+        """Cores given to a script when several scripts can run at once."""
+        return max(1, self.max_cores // self.max_concurrent_scripts)
+
+    @property
+    def default_memory_mb(self) -> float:
+        """Memory reserved for a script that does not give an estimate."""
+        return self.max_memory_mb / self.max_concurrent_scripts
+
+    @contextlib.contextmanager
+    def reserve(
+        self,
+        cores: int | None = None,
+        memory_mb: float | None = None,
+    ) -> Iterator[RJobReservation]:
+        """
+        Wait for the requested resources and hold them while the block runs.
+
+        Args:
+            cores: Number of cores requested by the script. Defaults to
+                ``default_cores``, capped to the core budget.
+            memory_mb: Memory estimate of the script in MiB. Defaults to
+                ``default_memory_mb``, capped to the memory budget.
+
+        Yields:
+            RJobReservation: the granted cores and memory.
+        """
+        if cores is None:
+            cores = self.default_cores
+        if memory_mb is None:
+            memory_mb = self.default_memory_mb
+
+        reservation = RJobReservation(
+            cores=max(1, min(int(cores), self.max_cores)),
+            memory_mb=max(0.0, min(float(memory_mb), self.max_memory_mb)),
+        )
+
+        with self._condition:
+            while not self._can_start(reservation):
+                # Timed wait so the available memory is polled again even if
+                # no other script finishes.
+                self._condition.wait(timeout=5)
+
+            self._used_cores += reservation.cores
+            self._used_memory_mb += reservation.memory_mb
+            self._running_scripts += 1
+
+        try:
+            yield reservation
+        finally:
+            with self._condition:
+                self._used_cores -= reservation.cores
+                self._used_memory_mb -= reservation.memory_mb
+                self._running_scripts -= 1
+                self._condition.notify_all()
+
+    def _can_start(self, reservation: RJobReservation) -> bool:
+        if self._running_scripts == 0:
+            return True
+        if self._running_scripts >= self.max_concurrent_scripts:
+            return False
+        if self._used_cores + reservation.cores > self.max_cores:
+            return False
+        if self._used_memory_mb + reservation.memory_mb > self.max_memory_mb:
+            return False
+        available_memory_mb = psutil.virtual_memory().available / 1024 / 1024
+        return reservation.memory_mb <= available_memory_mb
+
+
+_scheduler: RJobScheduler | None = None
+_scheduler_settings: tuple | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_r_job_scheduler() -> RJobScheduler:
+    """
+    Return the scheduler shared by all R scripts of this Python process.
+
+    The scheduler is created again when the budget environment variables
+    change, for instance after a new call to ``set_params``.
+    """
+    global _scheduler, _scheduler_settings
+
+    settings = (
+        os.environ.get("MOBILITY_MAX_THREADS"),
+        os.environ.get("MOBILITY_R_MAX_CORES"),
+        os.environ.get("MOBILITY_R_MAX_MEMORY_MB"),
+        os.environ.get("MOBILITY_R_MAX_CONCURRENT_SCRIPTS"),
+    )
+
+    with _scheduler_lock:
+        if _scheduler is None or settings != _scheduler_settings:
+            _max_threads, max_cores, max_memory_mb, max_concurrent_scripts = settings
+            _scheduler = RJobScheduler(
+                max_cores=int(max_cores) if max_cores else None,
+                max_memory_mb=float(max_memory_mb) if max_memory_mb else None,
+                max_concurrent_scripts=int(max_concurrent_scripts) if max_concurrent_scripts else None,
+            )
+            _scheduler_settings = settings
+        return _scheduler
+
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+from dataclasses import dataclass
+from importlib import resources
+
+from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+
+# Packages installed by install_packages.R itself before the requested ones.
+INSTALLER_R_PACKAGES = ["pak", "log4r", "jsonlite"]
+
+
+@dataclass(frozen=True)
+class RPackagesRequest:
+    """R packages requested by ``set_params`` and the installer options."""
+
+    packages: tuple[tuple[tuple[str, str], ...], ...]
+    force_reinstall: bool
+    download_method: str
+
+    @classmethod
+    def from_specs(cls, packages: list[dict], force_reinstall: bool, download_method: str) -> "RPackagesRequest":
+        return cls(
+            packages=tuple(tuple(sorted(spec.items())) for spec in packages),
+            force_reinstall=bool(force_reinstall),
+            download_method=str(download_method),
+        )
+
+    @property
+    def package_specs(self) -> list[dict]:
+        return [dict(spec) for spec in self.packages]
+
+    @property
+    def package_names(self) -> list[str]:
+        """Names under which the requested packages appear in an R library."""
+        names = list(INSTALLER_R_PACKAGES)
+        for spec in self.package_specs:
+            if spec["source"] == "local":
+                names.append(pathlib.Path(spec["path"]).name.split("_")[0])
+            else:
+                names.append(spec["name"].split("/")[-1])
+        return names
+
+
+_pending_request: RPackagesRequest | None = None
+_pending_lock = threading.Lock()
+
+
+def request_r_packages(packages: list[dict], force_reinstall: bool = False, download_method: str = "auto") -> bool:
+    """
+    Register the R packages needed by Mobility without starting R.
+
+    The installed package set is compared with the fingerprint saved after the
+    last successful ``install_packages.R`` run. When nothing changed, no R
+    process is started at all. Otherwise the check is deferred until the first
+    R script actually runs, so sessions that only read cached results never pay
+    for it. A forced reinstall runs immediately.
+
+    Parameters:
+    packages (list[dict]): package specs, as passed to install_packages.R.
+    force_reinstall (bool): reinstall every package now.
+    download_method (str): download method forwarded to install.packages.
+
+    Returns:
+    bool: True if the installer still has to run, False if the fingerprint matched.
+    """
+    global _pending_request
+
+    request = RPackagesRequest.from_specs(packages, force_reinstall, download_method)
+
+    if request.force_reinstall:
+        with _pending_lock:
+            _pending_request = None
+        run_install_packages_script(request)
+        return False
+
+    if is_r_packages_fingerprint_current(request):
+        logging.debug("R packages fingerprint is up to date, skipping install_packages.R.")
+        with _pending_lock:
+            _pending_request = None
+        return False
+
+    logging.debug("R packages fingerprint is missing or outdated, install_packages.R will run before the first R script.")
+    with _pending_lock:
+        _pending_request = request
+    return True
+
+
+def ensure_r_packages() -> None:
+    """Run the deferred R package check, if ``set_params`` registered one."""
+    global _pending_request
+
+    with _pending_lock:
+        request = _pending_request
+        if request is None:
+            return
+        run_install_packages_script(request)
+        _pending_request = None
+
+
+def run_install_packages_script(request: RPackagesRequest) -> None:
+    """Run install_packages.R and save the fingerprint of the resulting package set."""
+    fingerprint_path = get_r_packages_fingerprint_path()
+    fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+    lib_paths_path = fingerprint_path.with_name(fingerprint_path.stem + "-lib-paths.json")
+
+    args = [
+        json.dumps(request.package_specs),
+        str(request.force_reinstall),
+        request.download_method,
+        str(lib_paths_path),
+    ]
+
+    script = RScriptRunner(resources.files('mobility.runtime.r_integration').joinpath('install_packages.R'))
+    script.run(args)
+
+    if not lib_paths_path.exists():
+        logging.debug("install_packages.R did not report its library paths, the R packages fingerprint was not saved.")
+        return
+
+    with lib_paths_path.open("r", encoding="utf-8") as handle:
+        lib_paths = json.load(handle)
+    lib_paths_path.unlink()
+
+    save_r_packages_fingerprint(request, lib_paths)
+
+
+def get_r_packages_fingerprint_path() -> pathlib.Path:
+    """Return the local cache file that stores the R packages fingerprints."""
+    return pathlib.Path.home() / ".mobility" / "r_packages_fingerprint.json"
+
+
+def compute_r_packages_fingerprint(request: RPackagesRequest, lib_paths: list[str]) -> str | None:
+    """
+    Hash the requested packages, their installed versions and the R library paths.
+
+    The versions are read from the ``DESCRIPTION`` files of the R libraries,
+    which takes a few milliseconds and does not need R. The ``Built`` field is
+    included so that an R upgrade also invalidates the fingerprint.
+
+    Returns:
+    str | None: The fingerprint, or None if a requested package is not installed.
+    """
+    installed = {}
+    for package_name in request.package_names:
+        description = _find_package_description(package_name, lib_paths)
+        if description is None:
+            return None
+        installed[package_name] = description
+
+    content = {
+        "rscript": _get_rscript_executable(),
+        "r_libs": os.environ.get("R_LIBS"),
+        "r_libs_user": os.environ.get("R_LIBS_USER"),
+        "lib_paths": list(lib_paths),
+        "packages": request.package_specs,
+        "installed": installed,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def is_r_packages_fingerprint_current(request: RPackagesRequest) -> bool:
+    """Return True if the saved fingerprint matches the currently installed packages."""
+    entry = _read_fingerprint_file().get(_get_rscript_executable())
+    if not isinstance(entry, dict):
+        return False
+
+    fingerprint = compute_r_packages_fingerprint(request, entry.get("lib_paths", []))
+    return fingerprint is not None and fingerprint == entry.get("fingerprint")
+
+
+def save_r_packages_fingerprint(request: RPackagesRequest, lib_paths: list[str]) -> None:
+    """Save the fingerprint of the installed packages for the current Rscript executable."""
+    fingerprint = compute_r_packages_fingerprint(request, lib_paths)
+    if fingerprint is None:
+        logging.debug("Some R packages are still missing after install_packages.R, the fingerprint was not saved.")
+        return
+
+    fingerprints = _read_fingerprint_file()
+    fingerprints[_get_rscript_executable()] = {
+        "lib_paths": list(lib_paths),
+        "fingerprint": fingerprint,
+    }
+
+    fingerprint_path = get_r_packages_fingerprint_path()
+    fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+    with fingerprint_path.open("w", encoding="utf-8") as handle:
+        json.dump(fingerprints, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def _read_fingerprint_file() -> dict:
+    fingerprint_path = get_r_packages_fingerprint_path()
+    if not fingerprint_path.exists():
+        return {}
+
+    try:
+        with fingerprint_path.open("r", encoding="utf-8") as handle:
+            fingerprints = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+    return fingerprints if isinstance(fingerprints, dict) else {}
+
+
+def _get_rscript_executable() -> str:
+    return RScriptRunner.get_rscript_executable()
+
+
+def _find_package_description(package_name: str, lib_paths: list[str]) -> dict | None:
+    """Return the version fields of the first installed copy of a package, like R's library()."""
+    for lib_path in lib_paths:
+        description_path = pathlib.Path(lib_path) / package_name / "DESCRIPTION"
+        if not description_path.is_file():
+            continue
+
+        fields = {"lib_path": str(lib_path)}
+        with description_path.open("r", encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                key, _, value = line.partition(":")
+                if key in {"Version", "Built"}:
+                    fields[key] = value.strip()
+        return fields
+
+    return None
@@ -12,6 +12,8 @@ from typing import BinaryIO, Sequence
 
 import psutil
 
+from mobility.runtime.r_integration.r_job_scheduler import get_r_job_scheduler
+
 
 @dataclass
 class RScriptRunState:
@@ -139,12 +141,18 @@ class RScriptRunner:
         self.idle_cpu_percent = idle_cpu_percent
         self.idle_memory_change_bytes = idle_memory_change_mb * 1024 * 1024
         self.cpu_check_interval_seconds = cpu_check_interval_seconds
-        self.rscript_executable = shutil.which("Rscript") or "Rscript"
+        self.rscript_executable = self.get_rscript_executable()
 
         self._output_lock = threading.Lock()
         self._last_output_line: str | None = None
         self._last_output_time: float | None = None
         self._last_output_stream: str | None = None
+        self._process_env: dict[str, str] | None = None
+
+    @staticmethod
+    def get_rscript_executable() -> str:
+        """Return the Rscript executable found on the PATH."""
+        return shutil.which("Rscript") or "Rscript"
 
     def _get_int_setting(
         self,
@@ -179,28 +187,66 @@ class RScriptRunner:
 
         return float(env_value)
 
-    def run(self, args: Sequence[str]) -> None:
-        """Run the R script with the given arguments."""
+    def run(
+        self,
+        args: Sequence[str],
+        cores: int | None = None,
+        memory_mb: float | None = None,
+    ) -> None:
+        """
+        Run the R script with the given arguments.
+
+        The run waits for its share of the R core and memory budget (see
+        ``RJobScheduler``), and the granted core count is passed to the script
+        through the R thread-pool environment variables (see
+        ``R_WORKER_ENV_VARS``).
+
+        Args:
+            args: Script arguments, after the package path.
+            cores: Number of cores requested by the script. Defaults to the
+                scheduler share.
+            memory_mb: Memory estimate of the script in MiB. Defaults to the
+                scheduler share.
+        """
+        if not self._is_install_packages_script():
+            # Deferred from set_params: check the R packages before the first
+            # script that actually needs them.
+            from mobility.runtime.r_integration.r_packages import ensure_r_packages
+
+            ensure_r_packages()
+
         args = [str(resources.files("mobility"))] + [str(arg) for arg in args]
         cmd = [self.rscript_executable, self.script_path] + args
         total_attempts = self.max_retries + 1
 
-        for attempt_number in range(1, total_attempts + 1):
-            try:
-                self._run_once(cmd, args, attempt_number, total_attempts)
-                return
-            except RScriptRunnerError:
-                if attempt_number == total_attempts:
-                    raise
-
-                logging.warning(
-                    "Retrying R script %s after attempt %s/%s failed. Waiting %ss before retry.",
-                    self.script_path,
-                    attempt_number,
-                    total_attempts,
-                    self.retry_delay_seconds,
-                )
-                time.sleep(self.retry_delay_seconds)
+        with get_r_job_scheduler().reserve(cores=cores, memory_mb=memory_mb) as reservation:
+            logging.debug(
+                "R script %s granted %s cores and %.0fMiB.",
+                self.script_path,
+                reservation.cores,
+                reservation.memory_mb,
+            )
+            self._process_env = {**os.environ, **reservation.worker_env()}
+
+            for attempt_number in range(1, total_attempts + 1):
+                try:
+                    self._run_once(cmd, args, attempt_number, total_attempts)
+                    return
+                except RScriptRunnerError:
+                    if attempt_number == total_attempts:
+                        raise
+
+                    logging.warning(
+                        "Retrying R script %s after attempt %s/%s failed. Waiting %ss before retry.",
+                        self.script_path,
+                        attempt_number,
+                        total_attempts,
+                        self.retry_delay_seconds,
+                    )
+                    time.sleep(self.retry_delay_seconds)
+
+    def _is_install_packages_script(self) -> bool:
+        return pathlib.Path(self.script_path).name == "install_packages.R"
 
     def _run_once(self, cmd: list[str], args: list[str], attempt_number: int, total_attempts: int) -> None:
         """Run one attempt of the R script."""
@@ -233,7 +279,7 @@ class RScriptRunner:
         logging.debug("Rscript command: %s", cmd)
         logging.debug("Rscript working directory: %s", os.getcwd())
 
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self._process_env)
         logging.debug("Started Rscript PID %s for %s", process.pid, self.script_path)
 
         stdout_thread = threading.Thread(target=self.log_process_output, args=(process.stdout,))
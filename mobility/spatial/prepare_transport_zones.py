@@ -20,6 +20,8 @@ from shapely.geometry import GeometryCollection
 from scipy.spatial import cKDTree
 from sklearn.cluster import KMeans, MiniBatchKMeans
 
+from mobility.runtime.parallelism import get_max_threads, get_worker_count, limit_native_threads
+
 
 BUILDINGS_AREA_THRESHOLD = 2e5
 MIN_BUILDING_AREA = 20
@@ -121,7 +123,8 @@ def _run_lau_tasks(tasks: list[tuple], max_workers: int | None) -> list[dict]:
                 progress.advance(progress_task)
             return results
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # KMeans uses OpenMP/BLAS threads, share the budget between the workers.
+        with limit_native_threads(get_max_threads() // max_workers), ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = [executor.submit(_create_lau_transport_zones_worker, task) for task in tasks]
             for future in as_completed(futures):
                 results.append(future.result())
@@ -136,7 +139,7 @@ def _resolve_max_workers(task_count: int, max_workers: int | None) -> int:
     if max_workers is not None:
         return max(1, min(int(max_workers), task_count))
 
-    return max(1, min(DEFAULT_MAX_WORKERS, task_count))
+    return get_worker_count(task_count, max_workers=DEFAULT_MAX_WORKERS)
 
 
 def _create_lau_transport_zones_worker(task: tuple) -> dict:
@@ -1,11 +1,18 @@
-from .od_flows_asset import VehicleODFlowsAsset
-from .transport_costs import TransportCosts
-from .parameters import (
-    CostOfTimeParameters,
-    GeneralizedCostParameters,
-    PathRoutingParameters,
-)
-from .path import PathGeneralizedCost, PathTravelCosts
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolved lazily: the graph assets import ``mobility.transport.costs.od_flows_asset``
+# and the path travel costs import the graph assets, so loading every name here
+# would make the import order of the two packages matter.
+_LAZY_ATTRIBUTES = {
+    "VehicleODFlowsAsset": "mobility.transport.costs.od_flows_asset",
+    "TransportCosts": "mobility.transport.costs.transport_costs",
+    "CostOfTimeParameters": "mobility.transport.costs.parameters",
+    "GeneralizedCostParameters": "mobility.transport.costs.parameters",
+    "PathRoutingParameters": "mobility.transport.costs.parameters",
+    "PathGeneralizedCost": "mobility.transport.costs.path",
+    "PathTravelCosts": "mobility.transport.costs.path",
+}
 
 __all__ = [
     "CostOfTimeParameters",
@@ -16,3 +23,30 @@ __all__ = [
     "TransportCosts",
     "VehicleODFlowsAsset",
 ]
+
+
+def __getattr__(name):
+    """Import a travel cost name on first access and cache it on the package."""
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if TYPE_CHECKING:
+    from .od_flows_asset import VehicleODFlowsAsset
+    from .transport_costs import TransportCosts
+    from .parameters import (
+        CostOfTimeParameters,
+        GeneralizedCostParameters,
+        PathRoutingParameters,
+    )
+    from .path import PathGeneralizedCost, PathTravelCosts
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import pathlib
+
+import polars as pl
+
+OD_KEY_COLUMNS = ["from", "to"]
+
+
+def od_pairs_frame(od_pairs) -> pl.DataFrame:
+    """Return distinct (from, to) pairs as an Int32 polars frame."""
+    if not isinstance(od_pairs, pl.DataFrame):
+        od_pairs = pl.from_pandas(od_pairs[OD_KEY_COLUMNS])
+    return (
+        od_pairs
+        .select(
+            pl.col("from").cast(pl.Int32),
+            pl.col("to").cast(pl.Int32),
+        )
+        .unique()
+    )
+
+
+class ODSupport:
+    """OD pairs that lazy transport costs cover.
+
+    Pairs are only added when a consumer asks for them (see
+    ``TransportCosts.request_od_pairs``), for example destination sampling
+    asking for the pairs between the origins it meets and the zones with
+    opportunities. The same instance is shared by all the variants of a
+    transport-cost asset (iterations, congestion states), so that a new
+    variant computes the costs of every pair requested before. The pairs are
+    kept in a parquet file, so that runs resumed from cached iterations see
+    them too. Pairs can only be added.
+
+    Args:
+        path: Parquet file of the pairs.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.od_pairs = (
+            pl.read_parquet(self.path)
+            if self.path.exists()
+            else pl.DataFrame(schema={"from": pl.Int32, "to": pl.Int32})
+        )
+
+    def add(self, od_pairs) -> pl.DataFrame:
+        """Add pairs to the support and return the ones that were not in it."""
+        new_pairs = od_pairs_frame(od_pairs).join(self.od_pairs, on=OD_KEY_COLUMNS, how="anti")
+        if new_pairs.height > 0:
+            self.od_pairs = pl.concat([self.od_pairs, new_pairs])
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.od_pairs.write_parquet(self.path)
+        return new_pairs
+
+    def get(self) -> pl.DataFrame:
+        """Return the pairs of the support."""
+        return self.od_pairs
+
+
+class ODCostStore:
+    """Growing store of OD cost rows, keyed by (from, to).
+
+    Rows are kept in one parquet file. The pairs that were requested are
+    recorded in a second file, including the ones that produced no row
+    (unreachable or beyond the routing distance), so they are not computed
+    again on the next request.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.requested_path = path.with_name(path.stem + "-requested-pairs.parquet")
+
+    def read(self) -> pl.DataFrame | None:
+        """Return all the stored rows, or None if nothing was stored yet."""
+        if not self.path.exists():
+            return None
+        return pl.read_parquet(self.path)
+
+    def requested_pairs(self) -> pl.DataFrame:
+        """Return the pairs already computed."""
+        if not self.requested_path.exists():
+            return pl.DataFrame(schema={"from": pl.Int32, "to": pl.Int32})
+        return pl.read_parquet(self.requested_path)
+
+    def missing(self, od_pairs) -> pl.DataFrame:
+        """Return the pairs that were never computed."""
+        return od_pairs_frame(od_pairs).join(self.requested_pairs(), on=OD_KEY_COLUMNS, how="anti")
+
+    def add(self, rows: pl.DataFrame, od_pairs) -> None:
+        """Store the rows computed for a set of pairs."""
+        od_pairs = od_pairs_frame(od_pairs)
+        rows = rows.with_columns(pl.col("from").cast(pl.Int32), pl.col("to").cast(pl.Int32))
+
+        stored = self.read()
+        if stored is not None:
+            rows = pl.concat([stored, rows], how="diagonal_relaxed")
+        requested = pl.concat([self.requested_pairs(), od_pairs]).unique()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rows.write_parquet(self.path)
+        requested.write_parquet(self.requested_path)
+
+        logging.debug("OD cost store %s now covers %s pairs.", self.path.name, requested.height)
+
+    def get(self, od_pairs) -> pl.DataFrame | None:
+        """Return the stored rows of the given pairs, or None if nothing was stored yet."""
+        stored = self.read()
+        if stored is None:
+            return None
+        return stored.join(od_pairs_frame(od_pairs), on=OD_KEY_COLUMNS, how="semi")
+
+    def remove(self) -> None:
+        """Delete the store files."""
+        self.path.unlink(missing_ok=True)
+        self.requested_path.unlink(missing_ok=True)
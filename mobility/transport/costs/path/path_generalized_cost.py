@@ -7,6 +7,10 @@ from mobility.transport.costs.od_flows_asset import VehicleODFlowsAsset
 
 class PathGeneralizedCost(InMemoryAsset):
     
+    # The travel costs can be computed for a subset of OD pairs only, see
+    # TransportCosts lazy OD costs.
+    supports_od_pairs = True
+    
     def __init__(self, travel_costs, parameters, mode_name):
         inputs = {
             "travel_costs": travel_costs,
@@ -22,12 +26,14 @@ class PathGeneralizedCost(InMemoryAsset):
         congestion: bool = False,
         detail_distances: bool = False,
         road_flow_asset: VehicleODFlowsAsset | None = None,
+        od_pairs=None,
     ) -> pd.DataFrame:
         
         metrics = list(metrics)
         costs = self.inputs["travel_costs"].get(
             congestion=congestion,
             road_flow_asset=road_flow_asset,
+            od_pairs=od_pairs,
         )
         
         transport_zones_df = self.inputs["travel_costs"].inputs["transport_zones"].get().drop(columns="geometry")
@@ -4,12 +4,14 @@ import os
 import pathlib
 import logging
 import pandas as pd
+import polars as pl
 
 from importlib import resources
 from mobility.transport.graphs.core.path_graph import PathGraph
 from mobility.transport.costs.travel_costs_asset import TravelCostsBase
 from mobility.runtime.assets.file_asset import FileAsset
 from mobility.runtime.assets.in_memory_asset import InMemoryAsset
+from mobility.runtime.r_integration.arrow_exchange import RExchangeFolder, read_exchange_table, write_exchange_table
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.spatial.transport_zones import TransportZones
 from mobility.transport.costs.parameters.path_routing_parameters import PathRoutingParameters
@@ -18,12 +20,24 @@ from mobility.transport.graphs.modified.modifiers.speed_modifier import SpeedMod
 from mobility.transport.graphs.congested.congested_path_graph import CongestedPathGraph
 from mobility.transport.graphs.contracted.contracted_path_graph import ContractedPathGraph
 from mobility.transport.costs.od_flows_asset import VehicleODFlowsAsset
+from mobility.transport.costs.od_cost_store import ODCostStore, od_pairs_frame
 
 from typing import List
 
 
 class PathTravelCostsTable(TravelCostsBase, FileAsset):
-    """Single path travel-cost table for one routing graph."""
+    """
+    Single path travel-cost table for one routing graph.
+
+    When the routing graph is a speed-modified version of ``base_routing_graph``
+    and the vertex pair costs of the base graph are already cached, only the
+    vertex pairs whose shortest path can go through a modified edge are routed
+    again (see ``vertex_pair_costs.R``). The base graph is not an input : the
+    costs are the same with or without it.
+
+    ``get_for_od_pairs`` computes the costs of some OD pairs only, and keeps
+    them in a store next to the full table that grows with each request.
+    """
 
     def __init__(
         self,
@@ -33,10 +47,12 @@ class PathTravelCostsTable(TravelCostsBase, FileAsset):
         routing_graph,
         routing_parameters: PathRoutingParameters,
         cost_kind: str,
+        base_routing_graph: ContractedPathGraph | None = None,
     ) -> None:
         self.mode_name = mode_name
         self.transport_zones = transport_zones
         self.routing_graph = routing_graph
+        self.base_routing_graph = base_routing_graph
         self.routing_parameters = routing_parameters
         self.cost_kind = cost_kind
         inputs = {
@@ -53,6 +69,8 @@ class PathTravelCostsTable(TravelCostsBase, FileAsset):
         )
         super().__init__(inputs, cache_path)
 
+        self.lazy_store_path = self.cache_path.with_name(self.cache_path.stem + "-lazy.parquet")
+
     def get_cached_asset(self) -> pd.DataFrame:
         """Return the cached OD travel-cost table."""
         logging.debug("Travel costs already prepared. Reusing the file : %s", str(self.cache_path))
@@ -64,23 +82,79 @@ class PathTravelCostsTable(TravelCostsBase, FileAsset):
         self.transport_zones.get()
         return self._compute_costs_by_od()
 
-    def _compute_costs_by_od(self) -> pd.DataFrame:
-        """Compute path travel times and distances by OD."""
+    def get_for_od_pairs(self, od_pairs) -> pd.DataFrame:
+        """Return the travel costs of some OD pairs.
+
+        Only the pairs that were never requested are routed. Pairs beyond the
+        maximum beeline distance or without a path have no row.
+
+        Args:
+            od_pairs: pandas or polars frame with from and to columns.
+
+        Returns:
+            pd.DataFrame: The from, to, distance and time of the pairs.
+        """
+        if not self.is_update_needed():
+            costs = self.get()
+            pairs = od_pairs_frame(od_pairs).to_pandas()
+            return pd.merge(costs, pairs.astype(costs[["from", "to"]].dtypes.to_dict()), on=["from", "to"])
+
+        store = ODCostStore(self.lazy_store_path)
+        missing = store.missing(od_pairs)
+
+        if missing.height > 0:
+            logging.info("Preparing travel costs of %s OD pairs for mode %s", missing.height, self.mode_name)
+            self.transport_zones.get()
+            costs = self._compute_costs_by_od(missing)
+            store.add(pl.from_pandas(costs), missing)
+
+        costs = store.get(od_pairs)
+        if costs is None:
+            return pd.DataFrame({"from": [], "to": [], "distance": [], "time": []})
+        return costs.to_pandas()
+
+    def remove(self):
+        super().remove()
+        ODCostStore(self.lazy_store_path).remove()
+
+    def _compute_costs_by_od(self, od_pairs: pl.DataFrame | None = None) -> pd.DataFrame:
+        """Compute path travel times and distances by OD, for all pairs or the given ones."""
         logging.info("Computing travel times and distances by OD...")
         script = RScriptRunner(
             resources.files('mobility.transport.costs.path').joinpath(
                 'prepare_dodgr_costs.R'
             )
         )
-        script.run(
-            args=[
-                str(self.transport_zones.cache_path),
-                str(self.routing_graph.get()),
-                str(self.routing_parameters.max_beeline_distance),
-                str(self.cache_path),
-            ]
-        )
-        return pd.read_parquet(self.cache_path)
+        with RExchangeFolder("path-travel-costs") as exchange:
+            output_path = exchange.path("travel_costs")
+            od_pairs_path = ""
+            if od_pairs is not None:
+                od_pairs_path = str(write_exchange_table(od_pairs, exchange.path("od_pairs")))
+            script.run(
+                args=[
+                    str(self.transport_zones.cache_path),
+                    str(self.routing_graph.get()),
+                    str(self.routing_parameters.max_beeline_distance),
+                    self._reusable_base_graph_path(),
+                    od_pairs_path,
+                    str(output_path),
+                ]
+            )
+            costs = read_exchange_table(output_path).to_pandas()
+
+        if od_pairs is None:
+            costs.to_parquet(self.cache_path, index=False)
+        return costs
+
+    def _reusable_base_graph_path(self) -> str:
+        """Return the base graph path if its vertex pair costs can be reused, else an empty string."""
+        base_graph = self.base_routing_graph
+        if base_graph is None:
+            return ""
+        if not base_graph.cache_path.exists() or not base_graph.vertex_pair_costs_path.exists():
+            return ""
+        logging.info("Reusing the vertex pair costs of the graph without speed modifiers.")
+        return str(base_graph.cache_path)
 
 
 class PathTravelCosts(TravelCostsBase, InMemoryAsset):
@@ -115,6 +189,9 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             congestion_assignment_max_iterations: int = 10,
             congestion_assignment_max_gap: float = 0.05,
             congestion_assignment_retained_volume_share: float = 0.95,
+            congestion_assignment_algorithm: str = "cfw",
+            congestion_assignment_trace: bool = False,
+            customizable_contraction: bool = False,
             speed_modifiers: List[SpeedModifier] = [],
             contracted_graph: ContractedPathGraph | None = None,
             default_congestion: bool = False,
@@ -138,18 +215,22 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
                 congestion_assignment_max_iterations,
                 congestion_assignment_max_gap,
                 congestion_assignment_retained_volume_share,
+                congestion_assignment_algorithm,
+                congestion_assignment_trace,
                 speed_modifiers
             )
             simplified_path_graph = path_graph.simplified
             modified_path_graph = path_graph.modified
             congested_path_graph = path_graph.congested
             contracted_path_graph = path_graph.contracted
+            base_contracted_path_graph = path_graph.base_contracted
         else:
             path_graph = None
             contracted_path_graph = contracted_graph
             congested_path_graph = contracted_graph.inputs["congested_graph"]
             modified_path_graph = congested_path_graph.inputs["modified_graph"]
             simplified_path_graph = None
+            base_contracted_path_graph = None
 
         self.mode_name = mode_name
         self.transport_zones = transport_zones
@@ -163,6 +244,7 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             routing_graph=contracted_path_graph,
             routing_parameters=routing_parameters,
             cost_kind="free_flow",
+            base_routing_graph=base_contracted_path_graph,
         )
         self.congested_costs = PathTravelCostsTable(
             mode_name=mode_name,
@@ -170,6 +252,7 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             routing_graph=contracted_path_graph,
             routing_parameters=routing_parameters,
             cost_kind="congested",
+            base_routing_graph=base_contracted_path_graph,
         )
         self.default_congestion = bool(default_congestion)
         
@@ -186,24 +269,39 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             "congestion_assignment_max_iterations": congestion_assignment_max_iterations,
             "congestion_assignment_max_gap": congestion_assignment_max_gap,
             "congestion_assignment_retained_volume_share": congestion_assignment_retained_volume_share,
+            "congestion_assignment_algorithm": congestion_assignment_algorithm,
+            "congestion_assignment_trace": congestion_assignment_trace,
+            "customizable_contraction": customizable_contraction,
             "default_congestion": self.default_congestion,
         }
         super().__init__(inputs)
 
-    def get(self, congestion: bool = False, road_flow_asset: VehicleODFlowsAsset | None = None) -> pd.DataFrame:
+    def get(
+        self,
+        congestion: bool = False,
+        road_flow_asset: VehicleODFlowsAsset | None = None,
+        od_pairs=None,
+    ) -> pd.DataFrame:
+        """Return the OD travel costs, of all pairs or only of ``od_pairs``."""
         if congestion and self._handles_congestion() is False:
-            return self.freeflow_costs.get()
+            return self._get_table(self.freeflow_costs, od_pairs)
 
         if congestion and road_flow_asset is not None:
             asset = self.asset_for_road_flows(road_flow_asset)
             if asset is not None:
-                return asset.get()
+                return self._get_table(asset, od_pairs)
 
         # A congested cost table only differs from free-flow costs when it is
         # tied to an explicit road-flow asset.
         if self.default_congestion:
-            return self.congested_costs.get()
-        return self.freeflow_costs.get()
+            return self._get_table(self.congested_costs, od_pairs)
+        return self._get_table(self.freeflow_costs, od_pairs)
+
+    @staticmethod
+    def _get_table(table: PathTravelCostsTable, od_pairs) -> pd.DataFrame:
+        if od_pairs is None:
+            return table.get()
+        return table.get_for_od_pairs(od_pairs)
     
     def get_congested_graph_path(self, flow_asset=None) -> pathlib.Path:
         """Return the graph path backing the current congested cost view."""
@@ -236,9 +334,14 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             congestion_assignment_max_iterations=self.inputs["congested_path_graph"].inputs["congestion_assignment_max_iterations"],
             congestion_assignment_max_gap=self.inputs["congested_path_graph"].inputs["congestion_assignment_max_gap"],
             congestion_assignment_retained_volume_share=self.inputs["congested_path_graph"].inputs["congestion_assignment_retained_volume_share"],
+            congestion_assignment_algorithm=self.inputs["congested_path_graph"].inputs["congestion_assignment_algorithm"],
+            congestion_assignment_trace=self.inputs["congested_path_graph"].inputs["congestion_assignment_trace"],
             vehicle_flows=flow_asset,
         )
-        contracted_graph = ContractedPathGraph(congested_graph)
+        contracted_graph = ContractedPathGraph(
+            congested_graph,
+            customizable_contraction=self.inputs["customizable_contraction"]
+        )
 
         variant = PathTravelCosts(
             mode_name=self.inputs["mode_name"],
@@ -249,6 +352,9 @@ class PathTravelCosts(TravelCostsBase, InMemoryAsset):
             congestion_assignment_max_iterations=self.inputs["congestion_assignment_max_iterations"],
             congestion_assignment_max_gap=self.inputs["congestion_assignment_max_gap"],
             congestion_assignment_retained_volume_share=self.inputs["congestion_assignment_retained_volume_share"],
+            congestion_assignment_algorithm=self.inputs["congestion_assignment_algorithm"],
+            congestion_assignment_trace=self.inputs["congestion_assignment_trace"],
+            customizable_contraction=self.inputs["customizable_contraction"],
             contracted_graph=contracted_graph,
             default_congestion=True,
         )
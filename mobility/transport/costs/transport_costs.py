@@ -8,13 +8,21 @@ import polars as pl
 
 from mobility.runtime.parameter_values import SensitivityCase
 from mobility.runtime.assets.file_asset import FileAsset
+from mobility.transport.costs.od_cost_store import ODCostStore, ODSupport, od_pairs_frame
 from mobility.transport.costs.od_flows_asset import VehicleODFlowsAsset
 from mobility.transport.costs.road_flow_manager import RoadFlowManager
 from mobility.transport.costs.travel_costs_asset import TravelCostsBase
 
 
 class TransportCosts(FileAsset):
-    """Canonical multimodal transport-cost asset for one run state."""
+    """Canonical multimodal transport-cost asset for one run state.
+
+    With an ``od_support``, costs are computed lazily : only for the OD pairs
+    of the support, which grows with the pairs consumers ask for
+    (``request_od_pairs``). The rows are kept in an ``ODCostStore`` next to
+    the full table path, and the pairs already computed are never computed
+    again for the same asset variant.
+    """
 
     def __init__(
         self,
@@ -22,6 +30,7 @@ class TransportCosts(FileAsset):
         *,
         congestion: bool = False,
         road_flow_asset: VehicleODFlowsAsset | None = None,
+        od_support: ODSupport | None = None,
     ):
         """Initialize the transport-cost asset.
 
@@ -29,15 +38,20 @@ class TransportCosts(FileAsset):
             modes: Transport modes contributing generalized costs.
             congestion: Whether this asset should build congested costs.
             road_flow_asset: Road vehicle flows applied to congested modes.
+            od_support: OD pairs to compute costs for, shared by all the
+                variants of this asset. All pairs are computed if None.
         """
         self.modes = modes
         self.road_flows = RoadFlowManager(self)
+        self.od_support = od_support
         inputs = {
             mode.inputs["parameters"].name: mode.inputs["generalized_cost"] for mode in modes
         }
         inputs["version"] = 1
         inputs["congestion"] = bool(congestion)
         inputs["road_flow_asset"] = road_flow_asset
+        if od_support is not None:
+            inputs["lazy_od_costs"] = True
 
         cache_path = (
             pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"])
@@ -46,6 +60,15 @@ class TransportCosts(FileAsset):
         )
         super().__init__(inputs, cache_path)
 
+    @staticmethod
+    def project_od_support() -> ODSupport:
+        """Return the OD support of the lazy transport costs of the project."""
+        return ODSupport(
+            pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"])
+            / "transport_costs"
+            / "od-support.parquet"
+        )
+
     def for_iteration(
         self,
         iteration: int,
@@ -76,6 +99,7 @@ class TransportCosts(FileAsset):
             resolved_modes,
             congestion=self.inputs["congestion"],
             road_flow_asset=self.inputs["road_flow_asset"],
+            od_support=self.od_support,
         )
 
     def asset_for_congestion(self, congestion: bool) -> "TransportCosts":
@@ -91,6 +115,7 @@ class TransportCosts(FileAsset):
             self.modes,
             congestion=bool(congestion),
             road_flow_asset=None,
+            od_support=self.od_support,
         )
 
     def asset_for_road_flows(
@@ -102,6 +127,7 @@ class TransportCosts(FileAsset):
             self.modes,
             congestion=(road_flow_asset is not None),
             road_flow_asset=road_flow_asset,
+            od_support=self.od_support,
         )
 
     def get_cached_asset(self) -> pl.DataFrame:
@@ -110,6 +136,8 @@ class TransportCosts(FileAsset):
         Returns:
             The cached multimodal cost table for this asset variant.
         """
+        if self.od_support is not None:
+            return self.get_costs_for_od_pairs(self.od_support.get())
         logging.debug("Transport costs already prepared. Reusing the file : %s", str(self.cache_path))
         return pl.read_parquet(self.cache_path)
 
@@ -119,13 +147,65 @@ class TransportCosts(FileAsset):
         Returns:
             The newly built multimodal cost table for this asset variant.
         """
+        if self.od_support is not None:
+            return self.get_costs_for_od_pairs(self.od_support.get())
         costs = self._build_full_detail_costs()
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
         costs.write_parquet(self.cache_path)
         return costs
 
-    def _build_full_detail_costs(self) -> pl.DataFrame:
-        """Build the canonical OD-by-mode cost table."""
+    def get_costs_for_od_pairs(self, od_pairs) -> pl.DataFrame:
+        """Return the full-detail costs of some OD pairs.
+
+        Only the pairs that were never requested for this asset variant are
+        computed, then added to the store.
+
+        Args:
+            od_pairs: Frame with ``from`` and ``to`` columns.
+
+        Returns:
+            The multimodal cost rows of the pairs. Pairs without any available
+            mode have no row.
+        """
+        store = ODCostStore(self.lazy_store_path)
+        missing = store.missing(od_pairs)
+
+        if missing.height > 0:
+            logging.info("Computing transport costs for %s new OD pairs...", missing.height)
+            store.add(self._build_full_detail_costs(od_pairs=missing), missing)
+
+        costs = store.get(od_pairs)
+        if costs is None:
+            return pl.DataFrame(
+                schema={"from": pl.Int32, "to": pl.Int32, "mode": pl.String, "cost": pl.Float64}
+            )
+        return costs
+
+    def request_od_pairs(self, od_pairs) -> None:
+        """Add pairs to the OD support and compute their costs.
+
+        Used by the consumers that know which pairs they are going to read,
+        like destination sampling. Does nothing when all pairs are computed.
+
+        Args:
+            od_pairs: Frame with ``from`` and ``to`` columns.
+        """
+        if self.od_support is None:
+            return
+        self.od_support.add(od_pairs)
+        self.get_costs_for_od_pairs(od_pairs)
+
+    @property
+    def lazy_store_path(self) -> pathlib.Path:
+        """Path of the store of lazily computed cost rows."""
+        return self.cache_path.with_name(self.cache_path.stem + "-lazy.parquet")
+
+    def remove(self):
+        super().remove()
+        ODCostStore(self.lazy_store_path).remove()
+
+    def _build_full_detail_costs(self, od_pairs: pl.DataFrame | None = None) -> pl.DataFrame:
+        """Build the canonical OD-by-mode cost table, for all pairs or the given ones."""
         costs = []
 
         # Put the car first so that road congestion is computed first.
@@ -133,14 +213,27 @@ class TransportCosts(FileAsset):
 
         for mode in modes:
             generalized_cost = mode.inputs["generalized_cost"]
+            kwargs = {}
+            if od_pairs is not None and getattr(generalized_cost, "supports_od_pairs", False):
+                kwargs["od_pairs"] = od_pairs
             gc = pl.DataFrame(
                 generalized_cost.get(
                     ["cost", "distance", "time"],
                     congestion=self.inputs["congestion"],
                     detail_distances=True,
                     road_flow_asset=self.inputs["road_flow_asset"],
+                    **kwargs,
                 )
             )
+            if od_pairs is not None:
+                # Modes that cannot be restricted to some pairs are computed
+                # for all pairs, then filtered.
+                gc = gc.join(
+                    od_pairs_frame(od_pairs),
+                    left_on=[pl.col("from").cast(pl.Int32), pl.col("to").cast(pl.Int32)],
+                    right_on=["from", "to"],
+                    how="semi",
+                )
             costs.append(gc)
 
         costs = pl.concat(costs, how="diagonal")
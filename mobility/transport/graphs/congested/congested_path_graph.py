@@ -2,14 +2,31 @@ import os
 import pathlib
 import logging
 
+import pandas as pd
+
 from importlib import resources
 from mobility.runtime.assets.file_asset import FileAsset
+from mobility.runtime.r_integration.arrow_exchange import RExchangeFolder, write_exchange_table
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.transport.costs.od_flows_asset import VehicleODFlowsAsset
 from mobility.transport.graphs.modified.modified_path_graph import ModifiedPathGraph
 from mobility.spatial.transport_zones import TransportZones
 
 class CongestedPathGraph(FileAsset):
+    """
+    Path graph with travel times updated by a static traffic assignment.
+
+    When vehicle flows are given, they are assigned on the modified graph
+    with the Frank-Wolfe variant selected by ``congestion_assignment_algorithm``
+    ("msa", "fw", "cfw" for conjugate or "bfw" for bi-conjugate Frank-Wolfe),
+    solved by cppRouting ``assign_traffic``. With
+    ``congestion_assignment_trace``, the same variants are solved by the
+    mobility loop of ``assign_traffic.R`` instead, which records the relative
+    gap, objective, step size and timings of each iteration. The trace is
+    saved next to the graph, see ``get_assignment_trace``. Without
+    ``congestion_assignment_trace``, it only has the relative gap of each
+    iteration, read from the verbose output of cppRouting.
+    """
 
     def __init__(
             self,
@@ -21,6 +38,8 @@ class CongestedPathGraph(FileAsset):
             congestion_assignment_max_iterations: int = 10,
             congestion_assignment_max_gap: float = 0.05,
             congestion_assignment_retained_volume_share: float = 0.95,
+            congestion_assignment_algorithm: str = "cfw",
+            congestion_assignment_trace: bool = False,
             vehicle_flows: VehicleODFlowsAsset | None = None,
         ):
         
@@ -36,6 +55,8 @@ class CongestedPathGraph(FileAsset):
             "congestion_assignment_max_iterations": congestion_assignment_max_iterations,
             "congestion_assignment_max_gap": congestion_assignment_max_gap,
             "congestion_assignment_retained_volume_share": congestion_assignment_retained_volume_share,
+            "congestion_assignment_algorithm": congestion_assignment_algorithm,
+            "congestion_assignment_trace": congestion_assignment_trace,
         }
         
         mode_name = modified_graph.mode_name
@@ -47,6 +68,8 @@ class CongestedPathGraph(FileAsset):
 
         super().__init__(inputs, cache_path)
 
+        self.assignment_trace_path = self.cache_path.parent / (self.inputs_hash + "-assignment-trace.parquet")
+
     def get_cached_asset(self) -> pathlib.Path:
         
         logging.debug("Congested graph already prepared. Reusing the files in : " + str(self.cache_path.parent))
@@ -57,28 +80,79 @@ class CongestedPathGraph(FileAsset):
         
         logging.info("Loading graph with traffic...")
         vehicle_flows = self.inputs["vehicle_flows"]
-        if vehicle_flows is None:
-            flows_file_path = self.flows_file_path
-            enable_congestion = False
-        else:
-            vehicle_flows.get()
-            flows_file_path = vehicle_flows.cache_path
-            enable_congestion = True
-
-        self.load_graph(
-            self.inputs["modified_graph"].get(),
-            self.inputs["transport_zones"].cache_path,
-            enable_congestion,
-            flows_file_path,
-            self.inputs["congestion_flows_scaling_factor"],
-            self.inputs["target_max_vehicles_per_od_endpoint"],
-            self.inputs["congestion_assignment_max_iterations"],
-            self.inputs["congestion_assignment_max_gap"],
-            self.inputs["congestion_assignment_retained_volume_share"],
-        )
+
+        with RExchangeFolder("congested-path-graph") as exchange:
+            if vehicle_flows is None:
+                flows_file_path = self.flows_file_path
+                enable_congestion = False
+            else:
+                # Hand the flows already loaded by the asset to R as an
+                # uncompressed Arrow file instead of the persisted parquet.
+                flows_file_path = write_exchange_table(vehicle_flows.get(), exchange.path("vehicle_flows"))
+                enable_congestion = True
+
+            self.load_graph(
+                self.inputs["modified_graph"].get(),
+                self.inputs["transport_zones"].cache_path,
+                enable_congestion,
+                flows_file_path,
+                self.inputs["congestion_flows_scaling_factor"],
+                self.inputs["target_max_vehicles_per_od_endpoint"],
+                self.inputs["congestion_assignment_max_iterations"],
+                self.inputs["congestion_assignment_max_gap"],
+                self.inputs["congestion_assignment_retained_volume_share"],
+                self.inputs["congestion_assignment_algorithm"],
+                self.inputs["congestion_assignment_trace"],
+            )
+
+        if vehicle_flows is not None:
+            self.log_assignment_trace()
 
         return self.cache_path
 
+    def get_assignment_trace(self) -> pd.DataFrame | None:
+        """
+        Return the convergence trace of the traffic assignment.
+
+        Returns:
+            pd.DataFrame | None: one row per assignment iteration, with the
+            relative gap and Beckmann objective of the flows at the start of
+            the iteration, the step size taken, the kind of direction ("aon",
+            "conjugate" or "biconjugate") and the AON, iteration and total
+            elapsed times in seconds. With the cppRouting solver (without
+            congestion_assignment_trace), only the relative gap of each
+            iteration is known : the objective and total time are only given
+            on the last row, and the trace is this single row when the
+            solver output could not be read. None for free-flow graphs.
+        """
+        if not self.assignment_trace_path.exists():
+            return None
+        return pd.read_parquet(self.assignment_trace_path)
+
+    def log_assignment_trace(self) -> None:
+        """Log a summary of the assignment convergence."""
+        trace = self.get_assignment_trace()
+        if trace is None or trace.empty:
+            return None
+
+        last = trace.iloc[-1]
+        message = "Traffic assignment (%s) : %s iterations, relative gap %.4f, %.1f s"
+        args = [
+            self.inputs["congestion_assignment_algorithm"],
+            int(last["iteration"]),
+            last["relative_gap"],
+            last["elapsed_seconds"],
+        ]
+
+        # AON timings are only known for the traced assignment
+        if trace["aon_seconds"].notna().any():
+            message += " (%.1f s in AON assignments)"
+            args.append(trace["aon_seconds"].sum())
+
+        logging.info(message + ".", *args)
+
+        return None
+
     def load_graph(
             self,
             simplified_graph_path: pathlib.Path,
@@ -90,6 +164,8 @@ class CongestedPathGraph(FileAsset):
             congestion_assignment_max_iterations: int,
             congestion_assignment_max_gap: float,
             congestion_assignment_retained_volume_share: float,
+            congestion_assignment_algorithm: str,
+            congestion_assignment_trace: bool,
         ) -> None:
          
         script = RScriptRunner(resources.files('mobility.transport.graphs.congested').joinpath('load_path_graph.R'))
@@ -105,6 +181,8 @@ class CongestedPathGraph(FileAsset):
                 str(congestion_assignment_max_iterations),
                 str(congestion_assignment_max_gap),
                 str(congestion_assignment_retained_volume_share),
+                congestion_assignment_algorithm,
+                str(congestion_assignment_trace),
                 str(self.cache_path)
             ]
         )
@@ -1,22 +1,55 @@
 import os
 import pathlib
 import logging
+import shutil
+
+import pandas as pd
 
 from importlib import resources
 from mobility.runtime.assets.file_asset import FileAsset
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.transport.graphs.congested.congested_path_graph import CongestedPathGraph
+from mobility.transport.graphs.core.cpprouting_graph_files import read_cppr_graph_tables
+from mobility.transport.graphs.core.csr_graph_store import remove_csr_graph
+from mobility.transport.graphs.contracted.contraction_structure import ContractionStructureAsset
+from mobility.transport.graphs.contracted.customizable_contraction import (
+    ContractionStructure,
+    contracted_graph_tables,
+    customize_contraction,
+)
+
 
 class ContractedPathGraph(FileAsset):
+    """
+    Contraction hierarchy of a congested path graph, queried by cppRouting.
+
+    Graphs are contracted with ``cppRouting::cpp_contract``.
+
+    With ``customizable_contraction`` (experimental), the congested variants,
+    one per vehicle flows asset, reuse the contraction structure of the
+    modified graph (see ``ContractionStructureAsset``) and only customize its
+    weights with the congested travel times, instead of contracting the graph
+    again. This is a partial implementation, limited to graphs of up to
+    ``MAX_CUSTOMIZABLE_CONTRACTION_VERTICES`` vertices : larger graphs get no
+    contraction structure and are still contracted with ``cpp_contract``.
+
+    The travel costs computed on the graph keep the vertex pairs they route in
+    a cache named after the graph hash (see ``vertex_pair_costs.R``), which
+    is cleared when the graph is built again or removed.
+    """
 
     def __init__(
             self,
-            congested_graph: CongestedPathGraph
+            congested_graph: CongestedPathGraph,
+            customizable_contraction: bool = False
         ):
         
         inputs = {
             "congested_graph": congested_graph
         }
+
+        if customizable_contraction and congested_graph.inputs["vehicle_flows"] is not None:
+            inputs["contraction_structure"] = ContractionStructureAsset(congested_graph.inputs["modified_graph"])
         
         mode_name = congested_graph.mode_name
         folder_path = pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"])
@@ -25,6 +58,8 @@ class ContractedPathGraph(FileAsset):
 
         super().__init__(inputs, cache_path)
 
+        self.vertex_pair_costs_path = self.cache_path.parent / (self.inputs_hash + "-vertex-pair-costs.parquet")
+
     def get_cached_asset(self) -> pathlib.Path:
         
         logging.debug("Contracted graph already prepared. Reusing the files in : " + str(self.cache_path.parent))
@@ -32,16 +67,43 @@ class ContractedPathGraph(FileAsset):
         return self.cache_path
 
     def create_and_get_asset(self) -> pathlib.Path:
-        
-        logging.info("Contracting graph...")
 
-        self.contract_graph(
-            self.congested_graph.get(),
-            self.cache_path
-        )
+        self.vertex_pair_costs_path.unlink(missing_ok=True)
+
+        congested_graph_path = self.congested_graph.get()
+        structure = self.get_contraction_structure()
+
+        if structure is not None:
+
+            logging.info("Customizing the contracted graph with the congested travel times...")
+
+            self.customize_graph(
+                congested_graph_path,
+                structure,
+                self.cache_path
+            )
+
+        else:
+
+            logging.info("Contracting graph...")
+
+            self.contract_graph(
+                congested_graph_path,
+                self.cache_path
+            )
 
         return self.cache_path
 
+    def get_contraction_structure(self) -> ContractionStructure | None:
+        """Return the shared contraction structure to customize, None to contract the graph."""
+        if "contraction_structure" not in self.inputs:
+            return None
+        return self.inputs["contraction_structure"].get()
+
+    def remove(self):
+        super().remove()
+        self.vertex_pair_costs_path.unlink(missing_ok=True)
+
     def contract_graph(
             self,
             congested_graph_path: pathlib.Path,
@@ -59,4 +121,50 @@ class ContractedPathGraph(FileAsset):
 
         return None
 
+    @staticmethod
+    def customize_graph(
+            congested_graph_path: pathlib.Path,
+            structure: ContractionStructure,
+            output_file_path: pathlib.Path
+        ) -> None:
+        """
+        Write the contracted graph files expected by ``read_cppr_contracted_graph``.
+
+        The tables match the output of ``cpp_contract``: the contracted edges,
+        the vertex ranks, the shortcuts and the original graph used to
+        unpack paths and sum the auxiliary edge weights.
+        """
+
+        input_folder = congested_graph_path.parent
+        input_hash = congested_graph_path.name.split("-")[0]
+        output_folder = output_file_path.parent
+        output_hash = output_file_path.name.split("-")[0]
+
+        data, graph_dict, attrib = read_cppr_graph_tables(congested_graph_path)
 
+        customized = customize_contraction(
+            structure,
+            data["from"].to_numpy(),
+            data["to"].to_numpy(),
+            data["dist"].to_numpy()
+        )
+        contracted_data, rank, shortcuts = contracted_graph_tables(structure, customized)
+
+        output_folder.mkdir(parents=True, exist_ok=True)
+        remove_csr_graph(output_folder, output_hash + "original_")
+
+        contracted_data.to_parquet(output_folder / (output_hash + "data.parquet"))
+        pd.DataFrame({"rank": rank}).to_parquet(output_folder / (output_hash + "rank.parquet"))
+        shortcuts.to_parquet(output_folder / (output_hash + "shortcuts.parquet"))
+        graph_dict.to_parquet(output_folder / (output_hash + "dict.parquet"))
+        data.to_parquet(output_folder / (output_hash + "original_data.parquet"))
+        pd.DataFrame({"aux": attrib["aux"]}).to_parquet(output_folder / (output_hash + "original_data_attrib_aux.parquet"))
+
+        for suffix in ["-vertices.parquet", "-od-vertex-map.parquet"]:
+            input_path = input_folder.parent / (input_hash + suffix)
+            if input_path.exists():
+                shutil.copyfile(input_path, output_folder.parent / (output_hash + suffix))
+
+        output_file_path.touch()
+
+        return None
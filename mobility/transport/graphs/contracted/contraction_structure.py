@@ -0,0 +1,163 @@
+import os
+import pathlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from mobility.runtime.assets.file_asset import FileAsset
+from mobility.transport.graphs.core.cpprouting_graph_files import (
+    graph_file_hash,
+    read_cppr_graph_tables,
+    read_cppr_graph_vertex_count,
+)
+from mobility.transport.graphs.contracted.customizable_contraction import (
+    ContractionStructure,
+    build_contraction_structure,
+)
+from mobility.transport.graphs.modified.modified_path_graph import ModifiedPathGraph
+
+# The contraction structure is computed in Python, its time and memory grow
+# quickly with the size of the graph.
+MAX_CUSTOMIZABLE_CONTRACTION_VERTICES = 10_000
+
+
+class ContractionStructureAsset(FileAsset):
+    """
+    Metric-independent contraction structure of a modified path graph.
+
+    The vertex order and the shortcut structure only depend on the topology
+    of the graph, which congestion does not change. They are computed once
+    per ``ModifiedPathGraph`` and reused by every congested
+    ``ContractedPathGraph`` built on it, which only customizes the weights.
+
+    Graphs with more than ``MAX_CUSTOMIZABLE_CONTRACTION_VERTICES`` vertices
+    are not supported : the vertex count is checked before any work, empty
+    tables are written and the asset returns None, so the contracted graphs
+    fall back to ``cpp_contract``.
+    """
+
+    def __init__(self, modified_graph: ModifiedPathGraph):
+
+        inputs = {
+            "version": "2",
+            "mode_name": modified_graph.mode_name,
+            "modified_graph": modified_graph,
+        }
+
+        mode_name = modified_graph.mode_name
+        folder_path = pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"]) / ("path_graph_" + mode_name) / "contracted"
+
+        cache_path = {
+            "rank": folder_path / (mode_name + "-contraction-rank.parquet"),
+            "arcs": folder_path / (mode_name + "-contraction-arcs.parquet"),
+            "triangles": folder_path / (mode_name + "-contraction-triangles.parquet"),
+        }
+
+        super().__init__(inputs, cache_path)
+
+    def get_cached_asset(self) -> ContractionStructure | None:
+
+        logging.debug("Contraction structure already prepared. Reusing the files in : " + str(self.cache_path["rank"].parent))
+
+        rank = pd.read_parquet(self.cache_path["rank"])
+        if len(rank) == 0:
+            return None
+
+        arcs = pd.read_parquet(self.cache_path["arcs"])
+        triangles = pd.read_parquet(self.cache_path["triangles"])
+
+        return ContractionStructure(
+            rank=rank["rank"].to_numpy(),
+            arc_low=arcs["low"].to_numpy(),
+            arc_high=arcs["high"].to_numpy(),
+            triangle_first=triangles["first"].to_numpy(),
+            triangle_second=triangles["second"].to_numpy(),
+            triangle_target=triangles["target"].to_numpy(),
+            triangle_level=triangles["level"].to_numpy(),
+        )
+
+    def create_and_get_asset(self) -> ContractionStructure | None:
+
+        graph_path = self.inputs["modified_graph"].get()
+        n_vertices = read_cppr_graph_vertex_count(graph_path)
+
+        if n_vertices > MAX_CUSTOMIZABLE_CONTRACTION_VERTICES:
+            logging.warning(
+                "The graph has %s vertices, more than the %s supported by the customizable contraction : contracting it with cppRouting instead.",
+                n_vertices,
+                MAX_CUSTOMIZABLE_CONTRACTION_VERTICES,
+            )
+            self.write_structure(None)
+            return None
+
+        logging.info("Computing the contraction structure of the graph...")
+
+        hash = graph_file_hash(graph_path)
+
+        data, graph_dict, _ = read_cppr_graph_tables(graph_path)
+        vertices = pd.read_parquet(graph_path.parent.parent / (hash + "-vertices.parquet"))
+
+        x, y = self.get_vertex_coordinates(graph_dict, vertices)
+
+        structure = build_contraction_structure(
+            len(graph_dict),
+            data["from"].to_numpy(),
+            data["to"].to_numpy(),
+            x,
+            y,
+        )
+
+        logging.info(
+            "Contraction structure computed : %s vertices, %s arcs, %s triangles.",
+            structure.n_vertices,
+            len(structure.arc_low),
+            len(structure.triangle_first),
+        )
+
+        self.write_structure(structure)
+
+        return structure
+
+    def write_structure(self, structure: ContractionStructure | None) -> None:
+        """Write the structure tables, empty when the graph is not supported."""
+
+        if structure is None:
+            empty = np.empty(0, dtype=np.int32)
+            structure = ContractionStructure(empty, empty, empty, empty, empty, empty, empty)
+
+        self.cache_path["rank"].parent.mkdir(parents=True, exist_ok=True)
+
+        pd.DataFrame({"rank": structure.rank}).to_parquet(self.cache_path["rank"])
+        pd.DataFrame({"low": structure.arc_low, "high": structure.arc_high}).to_parquet(self.cache_path["arcs"])
+        pd.DataFrame(
+            {
+                "first": structure.triangle_first,
+                "second": structure.triangle_second,
+                "target": structure.triangle_target,
+                "level": structure.triangle_level,
+            }
+        ).to_parquet(self.cache_path["triangles"])
+
+    @staticmethod
+    def get_vertex_coordinates(graph_dict: pd.DataFrame, vertices: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Return the x and y coordinates of the graph vertices, indexed by cppRouting id."""
+
+        coordinates = pd.DataFrame(
+            {
+                "ref": vertices["vertex_id"].astype(str),
+                "x": vertices["x"],
+                "y": vertices["y"],
+            }
+        ).drop_duplicates("ref")
+
+        graph_dict = graph_dict[["ref", "id"]].assign(ref=graph_dict["ref"].astype(str))
+        graph_dict = graph_dict.merge(coordinates, on="ref", how="left").sort_values("id")
+
+        # Vertices without coordinates are filled by the nested dissection.
+        x = np.full(len(graph_dict), np.nan)
+        y = np.full(len(graph_dict), np.nan)
+        x[graph_dict["id"].to_numpy()] = graph_dict["x"].to_numpy(dtype=float)
+        y[graph_dict["id"].to_numpy()] = graph_dict["y"].to_numpy(dtype=float)
+
+        return x, y
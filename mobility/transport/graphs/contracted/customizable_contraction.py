@@ -0,0 +1,470 @@
+"""Metric-independent contraction of path graphs, customized for each set of edge weights.
+
+A contraction hierarchy computed by ``cppRouting::cpp_contract`` depends on
+the edge weights: shortcuts are only added when no witness path exists, so
+the whole graph has to be contracted again when the congested travel times
+change. A customizable contraction hierarchy (CCH) splits the work in two:
+
+1. A metric-independent step, computed once per graph topology: a nested
+   dissection vertex order, and the shortcut structure obtained by
+   eliminating the vertices in this order without witness searches (a
+   chordal supergraph of the graph).
+2. A customization step, run for each set of edge weights: the arc weights
+   of the structure are computed bottom-up with lower triangle relaxations.
+
+The customized hierarchy is a valid contraction hierarchy: bidirectional
+upward searches return exact shortest paths. It is written in the
+``cppRouting`` contracted graph format, so the R scripts querying contracted
+graphs do not change.
+
+This is an experimental and partial implementation. The nested dissection
+is a simple geometric bisection and the chordal completion runs in Python,
+so the structure is only computed for graphs of up to
+``MAX_CUSTOMIZABLE_CONTRACTION_VERTICES`` vertices (see
+``ContractionStructureAsset``). Larger graphs are contracted again with
+``cpp_contract`` for each set of weights.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Parts of the graph smaller than this are not dissected further.
+LEAF_SIZE = 16
+
+
+@dataclass
+class ContractionStructure:
+    """
+    Metric-independent part of a customizable contraction hierarchy.
+
+    Vertices are identified by their rank in the contraction order. Each arc
+    of the chordal supergraph is stored once, from its lower-ranked endpoint
+    to its higher-ranked endpoint, sorted by (low, high). Each lower triangle
+    (v, u, w) with rank(v) < rank(u) < rank(w) is stored as the indices of
+    its arcs v-u (``triangle_first``), v-w (``triangle_second``) and u-w
+    (``triangle_target``), sorted by the elimination tree level of v.
+
+    Attributes:
+        rank: Rank of each graph vertex, indexed by cppRouting vertex id.
+        arc_low: Lower-ranked endpoint of each arc.
+        arc_high: Higher-ranked endpoint of each arc.
+        triangle_first: Arc v-u of each lower triangle.
+        triangle_second: Arc v-w of each lower triangle.
+        triangle_target: Arc u-w of each lower triangle.
+        triangle_level: Elimination tree level of v. Triangles of the same
+            level can be relaxed at the same time.
+    """
+
+    rank: np.ndarray
+    arc_low: np.ndarray
+    arc_high: np.ndarray
+    triangle_first: np.ndarray
+    triangle_second: np.ndarray
+    triangle_target: np.ndarray
+    triangle_level: np.ndarray
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.rank)
+
+    @property
+    def order(self) -> np.ndarray:
+        """Vertex id of each rank."""
+        order = np.empty_like(self.rank)
+        order[self.rank] = np.arange(len(self.rank), dtype=self.rank.dtype)
+        return order
+
+    def arc_index(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """Return the index of the arcs between the given ranks (low < high)."""
+        n = self.n_vertices
+        arc_keys = self.arc_low.astype(np.int64) * n + self.arc_high
+        keys = np.asarray(low, dtype=np.int64) * n + high
+        index = np.searchsorted(arc_keys, keys)
+        index = np.minimum(index, len(arc_keys) - 1)
+        if not np.array_equal(arc_keys[index], keys):
+            raise ValueError("Some edges are not part of the contraction structure.")
+        return index
+
+
+@dataclass
+class CustomizedContraction:
+    """
+    Arc weights of a contraction structure for one set of edge weights.
+
+    Attributes:
+        up: Weight of each arc from its low to its high endpoint.
+        down: Weight of each arc from its high to its low endpoint.
+        up_via: Rank of the middle vertex when the upward weight comes from a
+            shortcut, -1 when it is an original edge.
+        down_via: Same for the downward weight.
+    """
+
+    up: np.ndarray
+    down: np.ndarray
+    up_via: np.ndarray
+    down_via: np.ndarray
+
+
+def build_contraction_structure(
+    n_vertices: int,
+    edge_from: np.ndarray,
+    edge_to: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    leaf_size: int = LEAF_SIZE,
+) -> ContractionStructure:
+    """
+    Compute the metric-independent contraction structure of a graph.
+
+    Args:
+        n_vertices: Number of vertices, cppRouting ids run from 0 to n - 1.
+        edge_from: Origin vertex id of each edge.
+        edge_to: Destination vertex id of each edge.
+        x: Projected x coordinate of each vertex.
+        y: Projected y coordinate of each vertex.
+        leaf_size: Size under which parts are not dissected further.
+
+    Returns:
+        ContractionStructure: the vertex order, arcs and lower triangles.
+    """
+    low, high = _undirected_edges(edge_from, edge_to)
+    order = nested_dissection_order(n_vertices, low, high, x, y, leaf_size)
+
+    rank = np.empty(n_vertices, dtype=np.int64)
+    rank[order] = np.arange(n_vertices, dtype=np.int64)
+
+    rank_low = np.minimum(rank[low], rank[high])
+    rank_high = np.maximum(rank[low], rank[high])
+    arc_low, arc_high, level = _chordal_completion(n_vertices, rank_low, rank_high)
+    first, second, target = _lower_triangles(n_vertices, arc_low, arc_high)
+    triangle_level = level[arc_low[first]]
+
+    by_level = np.argsort(triangle_level, kind="stable")
+
+    return ContractionStructure(
+        rank=rank.astype(np.int32),
+        arc_low=arc_low.astype(np.int32),
+        arc_high=arc_high.astype(np.int32),
+        triangle_first=first[by_level].astype(np.int32),
+        triangle_second=second[by_level].astype(np.int32),
+        triangle_target=target[by_level].astype(np.int32),
+        triangle_level=triangle_level[by_level].astype(np.int32),
+    )
+
+
+def nested_dissection_order(
+    n_vertices: int,
+    low: np.ndarray,
+    high: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    leaf_size: int = LEAF_SIZE,
+) -> np.ndarray:
+    """
+    Order the vertices by recursive geometric bisection.
+
+    Each part is split in two halves of equal size along the coordinate axes
+    or the diagonals, whichever cuts the fewest vertices. The endpoints of the
+    edges crossing the split, taken on the side with fewer of them, form a
+    separator that is ordered after both halves. Road
+    networks have small separators, which keeps the number of shortcuts low.
+
+    Args:
+        n_vertices: Number of vertices.
+        low: First vertex of each undirected edge.
+        high: Second vertex of each undirected edge.
+        x: Projected x coordinate of each vertex.
+        y: Projected y coordinate of each vertex.
+        leaf_size: Size under which parts are not dissected further.
+
+    Returns:
+        np.ndarray: vertex ids in contraction order.
+    """
+    x = _fill_missing_coordinates(x)
+    y = _fill_missing_coordinates(y)
+    on_left = np.zeros(n_vertices, dtype=bool)
+    in_separator = np.zeros(n_vertices, dtype=bool)
+    parts = []
+
+    # Split directions tried for each part: both axes and both diagonals.
+    directions = [(1.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, -1.0)]
+
+    def split(sorted_nodes: np.ndarray, part_low: np.ndarray, part_high: np.ndarray) -> np.ndarray:
+        half = len(sorted_nodes) // 2
+        on_left[sorted_nodes[:half]] = True
+        on_left[sorted_nodes[half:]] = False
+
+        cut = on_left[part_low] != on_left[part_high]
+        cut_low = part_low[cut]
+        cut_high = part_high[cut]
+        left_ends = np.unique(np.where(on_left[cut_low], cut_low, cut_high))
+        right_ends = np.unique(np.where(on_left[cut_low], cut_high, cut_low))
+        return left_ends if len(left_ends) <= len(right_ends) else right_ends
+
+    def dissect(nodes: np.ndarray, part_low: np.ndarray, part_high: np.ndarray) -> None:
+        if len(nodes) <= leaf_size or len(part_low) == 0:
+            parts.append(nodes)
+            return
+
+        best = None
+        for direction in directions:
+            coordinates = direction[0] * x[nodes] + direction[1] * y[nodes]
+            sorted_nodes = nodes[np.argsort(coordinates, kind="stable")]
+            separator = split(sorted_nodes, part_low, part_high)
+            if best is None or len(separator) < len(best[1]):
+                best = (sorted_nodes, separator)
+
+        sorted_nodes, separator = best
+        split(sorted_nodes, part_low, part_high)
+        cut = on_left[part_low] != on_left[part_high]
+        half = len(nodes) // 2
+        in_separator[separator] = True
+
+        left_nodes = sorted_nodes[:half]
+        right_nodes = sorted_nodes[half:]
+        left_nodes = left_nodes[~in_separator[left_nodes]]
+        right_nodes = right_nodes[~in_separator[right_nodes]]
+
+        keep = ~cut & ~in_separator[part_low] & ~in_separator[part_high]
+        edge_on_left = on_left[part_low]
+        left_edges = keep & edge_on_left
+        right_edges = keep & ~edge_on_left
+
+        dissect(left_nodes, part_low[left_edges], part_high[left_edges])
+        dissect(right_nodes, part_low[right_edges], part_high[right_edges])
+        parts.append(separator)
+
+    dissect(np.arange(n_vertices, dtype=np.int64), low, high)
+
+    return np.concatenate(parts)
+
+
+def customize_contraction(
+    structure: ContractionStructure,
+    edge_from: np.ndarray,
+    edge_to: np.ndarray,
+    edge_weight: np.ndarray,
+) -> CustomizedContraction:
+    """
+    Compute the arc weights of a contraction structure.
+
+    Args:
+        structure: Metric-independent structure of the graph.
+        edge_from: Origin vertex id of each edge.
+        edge_to: Destination vertex id of each edge.
+        edge_weight: Weight of each edge (travel time for instance).
+
+    Returns:
+        CustomizedContraction: upward and downward arc weights, and the middle
+        vertex of the arcs that are shortcuts.
+    """
+    n_arcs = len(structure.arc_low)
+    up = np.full(n_arcs, np.inf)
+    down = np.full(n_arcs, np.inf)
+    up_via = np.full(n_arcs, -1, dtype=np.int32)
+    down_via = np.full(n_arcs, -1, dtype=np.int32)
+
+    rank_from = structure.rank[np.asarray(edge_from, dtype=np.int64)].astype(np.int64)
+    rank_to = structure.rank[np.asarray(edge_to, dtype=np.int64)].astype(np.int64)
+    edge_weight = np.asarray(edge_weight, dtype=float)
+    not_loop = rank_from != rank_to
+    rank_from = rank_from[not_loop]
+    rank_to = rank_to[not_loop]
+    edge_weight = edge_weight[not_loop]
+
+    arcs = structure.arc_index(np.minimum(rank_from, rank_to), np.maximum(rank_from, rank_to))
+    is_up = rank_from < rank_to
+    np.minimum.at(up, arcs[is_up], edge_weight[is_up])
+    np.minimum.at(down, arcs[~is_up], edge_weight[~is_up])
+
+    # Triangles are sorted by level: the arcs read at one level were all
+    # finalized at lower levels, and the arcs written are only read later.
+    level_bounds = np.flatnonzero(np.diff(structure.triangle_level)) + 1
+    level_bounds = np.concatenate([[0], level_bounds, [len(structure.triangle_level)]])
+
+    for start, end in zip(level_bounds[:-1], level_bounds[1:]):
+        first = structure.triangle_first[start:end]
+        second = structure.triangle_second[start:end]
+        target = structure.triangle_target[start:end]
+        via = structure.arc_low[first]
+
+        # u -> v -> w and w -> v -> u, with v the lowest vertex of the triangle.
+        _relax(up, up_via, target, down[first] + up[second], via)
+        _relax(down, down_via, target, down[second] + up[first], via)
+
+    return CustomizedContraction(up=up, down=down, up_via=up_via, down_via=down_via)
+
+
+def contracted_graph_tables(
+    structure: ContractionStructure,
+    customized: CustomizedContraction,
+) -> tuple[pd.DataFrame, np.ndarray, pd.DataFrame]:
+    """
+    Convert a customized contraction to the cppRouting contracted graph tables.
+
+    Returns:
+        tuple: the ``data`` table (from, to, dist) of the contracted graph, the
+        ``rank`` of each vertex, and the ``shortcuts`` table (shortf, shortt,
+        shortc) used by cppRouting to unpack the shortcut arcs into edges.
+    """
+    order = structure.order
+    low = order[structure.arc_low]
+    high = order[structure.arc_high]
+
+    has_up = np.isfinite(customized.up)
+    has_down = np.isfinite(customized.down)
+    data = pd.DataFrame(
+        {
+            "from": np.concatenate([low[has_up], high[has_down]]).astype(np.int32),
+            "to": np.concatenate([high[has_up], low[has_down]]).astype(np.int32),
+            "dist": np.concatenate([customized.up[has_up], customized.down[has_down]]),
+        }
+    )
+
+    up_shortcut = has_up & (customized.up_via >= 0)
+    down_shortcut = has_down & (customized.down_via >= 0)
+    shortcuts = pd.DataFrame(
+        {
+            "shortf": np.concatenate([low[up_shortcut], high[down_shortcut]]).astype(np.int32),
+            "shortt": np.concatenate([high[up_shortcut], low[down_shortcut]]).astype(np.int32),
+            "shortc": np.concatenate(
+                [
+                    order[customized.up_via[up_shortcut]],
+                    order[customized.down_via[down_shortcut]],
+                ]
+            ).astype(np.int32),
+        }
+    )
+
+    return data, structure.rank, shortcuts
+
+
+def _undirected_edges(edge_from: np.ndarray, edge_to: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    edge_from = np.asarray(edge_from, dtype=np.int64)
+    edge_to = np.asarray(edge_to, dtype=np.int64)
+    low = np.minimum(edge_from, edge_to)
+    high = np.maximum(edge_from, edge_to)
+    not_loop = low != high
+    pairs = np.unique(np.stack([low[not_loop], high[not_loop]], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _fill_missing_coordinates(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    missing = ~np.isfinite(values)
+    if missing.any():
+        values = values.copy()
+        values[missing] = np.mean(values[~missing]) if (~missing).any() else 0.0
+    return values
+
+
+def _chordal_completion(
+    n_vertices: int,
+    low: np.ndarray,
+    high: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Eliminate the vertices in rank order and return the resulting arcs.
+
+    When a vertex is eliminated, its upper neighbours must form a clique. It
+    is enough to add them to the neighbours of the lowest of them (its parent
+    in the elimination tree), which is eliminated next among them.
+
+    Returns:
+        tuple: arc low and high ranks sorted by (low, high), and the level of
+        each vertex in the elimination tree (0 for leaves).
+    """
+    upper_neighbours = [set() for _ in range(n_vertices)]
+    for lower, upper in zip(low.tolist(), high.tolist()):
+        upper_neighbours[lower].add(upper)
+
+    level = np.zeros(n_vertices, dtype=np.int64)
+    level_list = level.tolist()
+
+    for vertex in range(n_vertices):
+        neighbours = upper_neighbours[vertex]
+        if not neighbours:
+            continue
+        parent = min(neighbours)
+        parent_neighbours = upper_neighbours[parent]
+        parent_neighbours.update(neighbours)
+        parent_neighbours.discard(parent)
+        level_list[parent] = max(level_list[parent], level_list[vertex] + 1)
+
+    counts = np.fromiter((len(s) for s in upper_neighbours), dtype=np.int64, count=n_vertices)
+    arc_low = np.repeat(np.arange(n_vertices, dtype=np.int64), counts)
+    arc_high = np.fromiter(
+        (upper for neighbours in upper_neighbours for upper in sorted(neighbours)),
+        dtype=np.int64,
+        count=int(counts.sum()),
+    )
+
+    return arc_low, arc_high, np.asarray(level_list, dtype=np.int64)
+
+
+def _lower_triangles(
+    n_vertices: int,
+    arc_low: np.ndarray,
+    arc_high: np.ndarray,
+    chunk_size: int = 10_000_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    List the lower triangles (v, u, w) of a chordal structure.
+
+    Every pair of arcs v-u and v-w leaving the same vertex v towards higher
+    ranks closes a triangle with the arc u-w. Arcs are sorted by (low, high)
+    so the pairs of each v are found without a Python loop. The triangles
+    are generated by chunks of about ``chunk_size`` to bound the memory used
+    by the intermediate arrays.
+    """
+    counts = np.bincount(arc_low, minlength=n_vertices)
+    group_end = np.repeat(np.cumsum(counts), counts)
+    arc_keys = arc_low * n_vertices + arc_high
+
+    arc_ids = np.arange(len(arc_low), dtype=np.int64)
+    pairs_per_arc = group_end - arc_ids - 1
+    pair_offsets = np.cumsum(pairs_per_arc)
+    chunk_bounds = np.searchsorted(pair_offsets, np.arange(chunk_size, pair_offsets[-1] if len(pair_offsets) else 0, chunk_size))
+    chunk_bounds = np.unique(np.concatenate([[0], chunk_bounds, [len(arc_low)]]))
+
+    firsts, seconds, targets = [], [], []
+
+    for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+        chunk_pairs = pairs_per_arc[start:end]
+        first = np.repeat(arc_ids[start:end], chunk_pairs)
+        offsets = np.arange(len(first), dtype=np.int64) - np.repeat(np.cumsum(chunk_pairs) - chunk_pairs, chunk_pairs)
+        second = first + 1 + offsets
+        target = np.searchsorted(arc_keys, arc_high[first] * n_vertices + arc_high[second])
+
+        firsts.append(first.astype(np.int32))
+        seconds.append(second.astype(np.int32))
+        targets.append(target.astype(np.int32))
+
+    if not firsts:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty.copy(), empty.copy()
+
+    return np.concatenate(firsts), np.concatenate(seconds), np.concatenate(targets)
+
+
+def _relax(
+    weights: np.ndarray,
+    vias: np.ndarray,
+    targets: np.ndarray,
+    candidates: np.ndarray,
+    candidate_vias: np.ndarray,
+) -> None:
+    """Keep the smallest candidate weight of each target arc, if it is an improvement."""
+    by_target = np.lexsort((candidates, targets))
+    sorted_targets = targets[by_target]
+    is_best = np.ones(len(sorted_targets), dtype=bool)
+    is_best[1:] = sorted_targets[1:] != sorted_targets[:-1]
+
+    best = by_target[is_best]
+    best_targets = targets[best]
+    improves = candidates[best] < weights[best_targets]
+
+    weights[best_targets[improves]] = candidates[best][improves]
+    vias[best_targets[improves]] = candidate_vias[best][improves]
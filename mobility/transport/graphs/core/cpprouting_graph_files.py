@@ -0,0 +1,98 @@
+import json
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+def graph_file_hash(graph_path: pathlib.Path) -> str:
+    """Return the hash prefix of a cppRouting graph marker file."""
+    return graph_path.name.split("-")[0]
+
+
+def read_cppr_graph_vertex_count(graph_path: pathlib.Path) -> int:
+    """Return the number of vertices of a cppRouting graph, without reading its edges."""
+    return read_cppr_graph_vertex_count_by_hash(graph_path.parent, graph_file_hash(graph_path))
+
+
+def read_cppr_graph_vertex_count_by_hash(folder: pathlib.Path, hash: str) -> int:
+    """Same as ``read_cppr_graph_vertex_count``, for the graph files of a given hash in a folder."""
+    delta_path = folder / (hash + "delta.json")
+
+    # Vertices cannot be added through an edge delta : the base graph has the
+    # same dictionary
+    if delta_path.exists():
+        with open(delta_path) as f:
+            meta = json.load(f)
+        return read_cppr_graph_vertex_count_by_hash(folder / meta["base_folder"], meta["base_hash"])
+
+    return pq.read_metadata(folder / (hash + "dict.parquet")).num_rows
+
+
+def read_cppr_graph_tables(graph_path: pathlib.Path) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Read the edges, vertex dictionary and edge attributes of a cppRouting graph.
+
+    Mirrors ``read_cppr_graph`` in ``cpprouting_io.R``: the memory-mapped CSR
+    copy of the graph is used when it exists (see ``csr_graph_store.py``),
+    and graphs saved as an edge delta on a base graph (``<hash>delta.json``)
+    are rebuilt from the base graph tables otherwise.
+
+    Args:
+        graph_path (pathlib.Path): marker file of the graph
+            ("<hash>-<mode>-...-path-graph").
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: the edges (from, to,
+        dist), the dictionary (ref, id) and the edge attributes (aux, cap,
+        alpha, beta...), with one attribute row per edge.
+    """
+    return read_cppr_graph_tables_by_hash(graph_path.parent, graph_file_hash(graph_path))
+
+
+def read_cppr_graph_tables_by_hash(folder: pathlib.Path, hash: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Same as ``read_cppr_graph_tables``, for the graph files of a given hash in a folder."""
+
+    from mobility.transport.graphs.core.csr_graph_store import CSRGraph, csr_graph_exists, csr_graph_path
+
+    if csr_graph_exists(folder, hash):
+        return CSRGraph(csr_graph_path(folder, hash)).to_tables()
+
+    delta_path = folder / (hash + "delta.json")
+
+    if not delta_path.exists():
+        data = pd.read_parquet(folder / (hash + "data.parquet"), columns=["from", "to", "dist"])
+        graph_dict = pd.read_parquet(folder / (hash + "dict.parquet"))
+        attrib = pd.read_parquet(folder / (hash + "attrib.parquet"))
+        attrib = attrib.drop(columns=["i"], errors="ignore")
+        return data, graph_dict, attrib
+
+    with open(delta_path) as f:
+        meta = json.load(f)
+
+    # The base folder is relative to the folder of the delta (absolute for
+    # deltas saved on another drive)
+    base_folder = folder / meta["base_folder"]
+    data, graph_dict, attrib = read_cppr_graph_tables_by_hash(base_folder, meta["base_hash"])
+    delta = pd.read_parquet(folder / (hash + "delta-edges.parquet"))
+
+    attrib = attrib.astype({col: "float64" for col in attrib.columns if attrib[col].isna().all()})
+
+    updated = delta[~delta["removed"] & delta["edge_index"].notna()]
+    rows = updated["edge_index"].to_numpy(dtype=np.int64)
+    data.loc[rows, "dist"] = updated["dist"].to_numpy()
+    for col in attrib.columns:
+        attrib.loc[rows, col] = pd.to_numeric(updated[col]).to_numpy()
+
+    removed = delta.loc[delta["removed"], "edge_index"].to_numpy(dtype=np.int64)
+    keep = np.setdiff1d(np.arange(len(data)), removed)
+    added = delta[~delta["removed"] & delta["edge_index"].isna()]
+
+    data = pd.concat([data.iloc[keep], added[["from", "to", "dist"]]], ignore_index=True)
+    attrib = pd.concat([attrib.iloc[keep], added[list(attrib.columns)]], ignore_index=True)
+
+    if len(data) != meta["n_edges"]:
+        raise ValueError(f"Applying the edge delta of graph {hash} gave an unexpected number of edges.")
+
+    return data, graph_dict, attrib
@@ -0,0 +1,239 @@
+import os
+import pathlib
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from mobility.runtime.r_integration.arrow_exchange import read_exchange_table, write_exchange_table
+from mobility.transport.graphs.core.cpprouting_graph_files import graph_file_hash, read_cppr_graph_tables_by_hash
+
+CSR_GRAPH_FILES = ["edges.arrow", "vertices.arrow", "offsets.arrow", "adjacency.arrow"]
+
+
+def csr_graph_path(folder: pathlib.Path, hash: str) -> pathlib.Path:
+    """
+    Return the folder of the CSR copy of a graph.
+
+    Copies are cached in a ``csr`` folder next to the graph variant folders
+    (``path_graph_<mode>/csr``), so that they are not part of the edge delta
+    storage of the variants.
+    """
+    return folder.parent / "csr" / (hash + "csr")
+
+
+def csr_graph_exists(folder: pathlib.Path, hash: str) -> bool:
+    """Return whether a complete CSR copy of a graph exists."""
+    path = csr_graph_path(folder, hash)
+    return all((path / file_name).exists() for file_name in CSR_GRAPH_FILES)
+
+
+def remove_csr_graph(folder: pathlib.Path, hash: str) -> None:
+    """Remove the CSR copy of a graph, which is stale once the graph is saved again."""
+    shutil.rmtree(csr_graph_path(folder, hash), ignore_errors=True)
+
+
+class CSRGraph:
+    """
+    Memory-mapped, language-neutral copy of a cppRouting graph.
+
+    Graphs routed from Python get a copy on demand (``prepare_csr_graph``),
+    written in the ``csr/<hash>csr`` folder (see ``csr_graph_path``) as
+    uncompressed Arrow IPC files that pyarrow and R arrow can both map without
+    decoding :
+
+    - ``edges.arrow`` : from, to, dist and the edge attributes, in cppRouting
+      edge order (the edge ids used by paths and flows),
+    - ``vertices.arrow`` : the vertex dictionary (ref, id),
+    - ``offsets.arrow`` and ``adjacency.arrow`` : the CSR index, the edges
+      leaving vertex ``v`` being ``adjacency[offsets[v]:offsets[v + 1]]``.
+
+    The copy of a graph variant saved as an edge delta is a full copy, so
+    reading it does not require the base graph. ``read_cppr_graph``
+    (``cpprouting_io.R``) uses it when it exists, and the R and Python graph
+    writers remove it when they save the graph again.
+
+    Args:
+        path (pathlib.Path): the ``<hash>csr`` folder.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.edges = read_exchange_table(path / "edges.arrow")
+        self.vertices = read_exchange_table(path / "vertices.arrow")
+        self.offsets = _column_to_numpy(read_exchange_table(path / "offsets.arrow"), "offset")
+        self.adjacency = _column_to_numpy(read_exchange_table(path / "adjacency.arrow"), "edge")
+
+    @property
+    def n_vertices(self) -> int:
+        return self.vertices.num_rows
+
+    @property
+    def n_edges(self) -> int:
+        return self.edges.num_rows
+
+    @property
+    def attribute_names(self) -> list[str]:
+        return [name for name in self.edges.column_names if name not in ("from", "to", "dist")]
+
+    def column(self, name: str) -> np.ndarray:
+        """Return an edge column, without copy when it has no missing value."""
+        return _column_to_numpy(self.edges, name)
+
+    def out_edges(self, vertex: int) -> np.ndarray:
+        """Return the ids of the edges leaving a vertex."""
+        return self.adjacency[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def to_tables(self) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Return the graph as the (data, dict, attrib) tables of ``read_cppr_graph_tables``."""
+        data = self.edges.select(["from", "to", "dist"]).to_pandas()
+        graph_dict = self.vertices.to_pandas()
+        attrib = self.edges.select(self.attribute_names).to_pandas()
+        return data, graph_dict, attrib
+
+
+def prepare_csr_graph(graph_path: pathlib.Path) -> pathlib.Path:
+    """
+    Write the CSR copy of a cppRouting graph, if it does not exist yet.
+
+    Args:
+        graph_path (pathlib.Path): marker file of the graph
+            ("<hash>-<mode>-...-path-graph").
+
+    Returns:
+        pathlib.Path: the ``<hash>csr`` folder.
+    """
+    return prepare_csr_graph_by_hash(graph_path.parent, graph_file_hash(graph_path))
+
+
+def prepare_csr_graph_by_hash(folder: pathlib.Path, hash: str) -> pathlib.Path:
+    """Same as ``prepare_csr_graph``, for the graph files of a given hash in a folder."""
+    if not csr_graph_exists(folder, hash):
+        data, graph_dict, attrib = read_cppr_graph_tables_by_hash(folder, hash)
+        write_csr_graph(csr_graph_path(folder, hash), data, graph_dict, attrib)
+
+    return csr_graph_path(folder, hash)
+
+
+def read_csr_graph(graph_path: pathlib.Path) -> CSRGraph:
+    """
+    Return the CSR copy of a cppRouting graph, written by ``prepare_csr_graph``.
+
+    Args:
+        graph_path (pathlib.Path): marker file of the graph
+            ("<hash>-<mode>-...-path-graph").
+    """
+    return read_csr_graph_by_hash(graph_path.parent, graph_file_hash(graph_path))
+
+
+def read_csr_graph_by_hash(folder: pathlib.Path, hash: str) -> CSRGraph:
+    """Same as ``read_csr_graph``, for the graph files of a given hash in a folder."""
+    if not csr_graph_exists(folder, hash):
+        raise FileNotFoundError(
+            f"The graph {hash} in {folder} has no CSR copy, prepare_csr_graph has to be called first."
+        )
+
+    return CSRGraph(csr_graph_path(folder, hash))
+
+
+def prepare_contracted_csr_graph(graph_path: pathlib.Path) -> pathlib.Path:
+    """
+    Write a CSR copy of the original graph of a contracted graph, if it does
+    not exist yet.
+
+    Contracted graphs keep the graph they were built from (the
+    ``original_data`` and ``original_data_attrib_aux`` tables), which is the
+    one to route on when paths must respect a time limit or be unpacked edge
+    by edge. The copy is written in the ``csr/<hash>original_csr`` folder.
+
+    Args:
+        graph_path (pathlib.Path): marker file of the contracted graph
+            ("<hash>-<mode>-contracted-path-graph").
+
+    Returns:
+        pathlib.Path: the ``<hash>original_csr`` folder.
+    """
+    folder = graph_path.parent
+    hash = graph_file_hash(graph_path) + "original_"
+
+    if not csr_graph_exists(folder, hash):
+        data = pd.read_parquet(folder / (hash + "data.parquet"), columns=["from", "to", "dist"])
+        graph_dict = pd.read_parquet(folder / (graph_file_hash(graph_path) + "dict.parquet"))
+        # The aux column is named v when the graph was saved from R
+        aux = pd.read_parquet(folder / (hash + "data_attrib_aux.parquet"))
+        attrib = pd.DataFrame({"aux": aux.iloc[:, 0].to_numpy()})
+        write_csr_graph(csr_graph_path(folder, hash), data, graph_dict, attrib)
+
+    return csr_graph_path(folder, hash)
+
+
+def read_contracted_csr_graph(graph_path: pathlib.Path) -> CSRGraph:
+    """Return the CSR copy of the original graph of a contracted graph, written by ``prepare_contracted_csr_graph``."""
+    return read_csr_graph_by_hash(graph_path.parent, graph_file_hash(graph_path) + "original_")
+
+
+def write_csr_graph(
+        path: pathlib.Path,
+        data: pd.DataFrame,
+        graph_dict: pd.DataFrame,
+        attrib: pd.DataFrame
+    ) -> pathlib.Path:
+    """
+    Write the CSR copy of a graph.
+
+    Args:
+        path (pathlib.Path): the ``<hash>csr`` folder.
+        data (pd.DataFrame): the edges (from, to, dist).
+        graph_dict (pd.DataFrame): the vertex dictionary (ref, id).
+        attrib (pd.DataFrame): the edge attributes, one row per edge.
+
+    Returns:
+        pathlib.Path: the written folder.
+    """
+    from_ids = data["from"].to_numpy(dtype=np.int32)
+
+    edges = pd.DataFrame(
+        {
+            "from": from_ids,
+            "to": data["to"].to_numpy(dtype=np.int32),
+            "dist": data["dist"].to_numpy(dtype=np.float64),
+        }
+    )
+    for col in attrib.columns.drop("i", errors="ignore"):
+        edges[col] = pd.to_numeric(attrib[col]).to_numpy(dtype=np.float64)
+
+    vertices = pd.DataFrame(
+        {
+            "ref": graph_dict["ref"].astype(str).to_numpy(),
+            "id": graph_dict["id"].to_numpy(dtype=np.int32),
+        }
+    )
+
+    counts = np.bincount(from_ids, minlength=len(vertices))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    adjacency = np.argsort(from_ids, kind="stable").astype(np.int32)
+
+    # Written in a temporary folder then renamed, so that readers never see a
+    # partial copy (one temporary folder per process and thread)
+    tmp_path = path.with_name(path.name + "." + str(os.getpid()) + "-" + str(threading.get_ident()) + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    write_exchange_table(edges, tmp_path / "edges.arrow")
+    write_exchange_table(vertices, tmp_path / "vertices.arrow")
+    write_exchange_table(pa.table({"offset": offsets}), tmp_path / "offsets.arrow")
+    write_exchange_table(pa.table({"edge": adjacency}), tmp_path / "adjacency.arrow")
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp_path.rename(path)
+
+    return path
+
+
+def _column_to_numpy(table: pa.Table, name: str) -> np.ndarray:
+    column = table.column(name)
+    if column.num_chunks == 1 and column.null_count == 0:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
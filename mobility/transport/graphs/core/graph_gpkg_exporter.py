@@ -1,40 +1,58 @@
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import LineString
+import shapely
+
+from mobility.transport.graphs.core.cpprouting_graph_files import read_cppr_graph_tables
 
 class GraphGPKGExporter:
 
     def export(self, graph):
 
-        gpkg_fp = dict_fp = graph.cache_path.parent / (graph.inputs_hash + "-graph.gpkg")
-        
+        gpkg_fp = graph.cache_path.parent / (graph.inputs_hash + "-graph.gpkg")
+
         data_fp = graph.cache_path.parent / (graph.inputs_hash + "data.parquet")
-        dict_fp = graph.cache_path.parent / (graph.inputs_hash + "dict.parquet")
+        delta_fp = graph.cache_path.parent / (graph.inputs_hash + "delta.json")
         vertices_fp = graph.cache_path.parents[1] / (graph.inputs_hash + "-vertices.parquet")
 
-        if data_fp.exists() and dict_fp.exists() and vertices_fp.exists():
+        if (data_fp.exists() or delta_fp.exists()) and vertices_fp.exists():
 
-            graph_data = pd.read_parquet(data_fp)
-            graph_dict = pd.read_parquet(dict_fp)
-            graph_vertices = pd.read_parquet(vertices_fp)
+            graph_data, graph_dict, attrib = read_cppr_graph_tables(graph.cache_path)
+            graph_vertices = pd.read_parquet(vertices_fp, columns=["vertex_id", "x", "y"])
+            graph_dict = graph_dict.assign(ref=graph_dict["ref"].astype(str))
+
+            # Coordinates of the graph vertices, indexed by cppRouting id
+            coordinates = graph_dict.merge(
+                graph_vertices.assign(vertex_id=graph_vertices["vertex_id"].astype(str)).drop_duplicates("vertex_id"),
+                left_on="ref",
+                right_on="vertex_id",
+                how="left"
+            )
+            x = np.full(len(graph_dict), np.nan)
+            y = np.full(len(graph_dict), np.nan)
+            x[coordinates["id"].to_numpy()] = coordinates["x"].to_numpy(dtype=float)
+            y[coordinates["id"].to_numpy()] = coordinates["y"].to_numpy(dtype=float)
+            ref = graph_dict.set_index("id")["ref"].sort_index().to_numpy()
 
-            graph_data = pd.merge(graph_data, graph_dict, left_on="from", right_on="id")
-            graph_data = pd.merge(graph_data, graph_dict, left_on="to", right_on="id", suffixes=["_from", "_to"])
+            from_ids = graph_data["from"].to_numpy()
+            to_ids = graph_data["to"].to_numpy()
 
-            graph_data = pd.merge(graph_data, graph_vertices, left_on="ref_from", right_on="vertex_id")
-            graph_data = pd.merge(graph_data, graph_vertices, left_on="ref_to", right_on="vertex_id", suffixes=["_from", "_to"])
+            graph_data = pd.concat([graph_data, attrib.reset_index(drop=True)], axis=1)
+            graph_data["ref_from"] = ref[from_ids]
+            graph_data["ref_to"] = ref[to_ids]
+            graph_data["x_from"] = x[from_ids]
+            graph_data["y_from"] = y[from_ids]
+            graph_data["x_to"] = x[to_ids]
+            graph_data["y_to"] = y[to_ids]
+
+            # Edges with a vertex without coordinates cannot be drawn
+            graph_data = graph_data.dropna(subset=["x_from", "y_from", "x_to", "y_to"])
+
+            points = graph_data[["x_from", "y_from", "x_to", "y_to"]].to_numpy().reshape(-1, 2, 2)
 
             gdf = gpd.GeoDataFrame(
-                graph_data, 
-                geometry=[
-                    LineString([(x1, y1), (x2, y2)]) 
-                    for x1, y1, x2, y2 in zip(
-                        graph_data['x_from'],
-                        graph_data['y_from'],
-                        graph_data['x_to'],
-                        graph_data['y_to']
-                    )
-                ],
+                graph_data,
+                geometry=shapely.linestrings(points),
                 crs="EPSG:3035"
             )
 
@@ -44,9 +62,9 @@ class GraphGPKGExporter:
 
             raise ValueError(
                 """
-                Cannot convert the graph, at least one of the data / dict / 
+                Cannot convert the graph, at least one of the data / dict /
                 vertices parquet files is missing"
                 """
             )
-        
-        return gpkg_fp
\ No newline at end of file
+
+        return gpkg_fp
@@ -0,0 +1,205 @@
+import logging
+import pathlib
+
+import numpy as np
+import polars as pl
+
+from scipy import sparse
+
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph
+from mobility.transport.graphs.core.shortest_path_trees import shortest_path_edges
+
+
+class ODLinkIncidence:
+    """
+    Sparse incidence between transport zone OD pairs and graph edges.
+
+    Entry (e, k) of the matrix is the share of the flow of OD pair k that uses
+    edge e. Each zone pair is split between the graph vertices of the
+    representative buildings of its zones, like the OD flows of the traffic
+    assignment (``tz_pairs_to_vertex_pairs.R``), and each vertex pair follows
+    its shortest path on the graph. Loading an OD flow table on the links is
+    then a sparse matrix-vector product, so any number of flow tables can be
+    evaluated on the same graph without routing again.
+
+    Unlike the assignment, flows are loaded all-or-nothing on the paths of
+    the given graph (typically the congested graph of an iteration), and the
+    number of representative buildings per zone does not depend on the flows.
+
+    Args:
+        od_pairs (pl.DataFrame): the zone pairs (from, to), in matrix column order.
+        matrix (sparse.csr_matrix): the (n_edges, n_od_pairs) incidence matrix.
+    """
+
+    def __init__(self, od_pairs: pl.DataFrame, matrix: sparse.csr_matrix):
+        self.od_pairs = od_pairs
+        self.matrix = matrix
+
+    @classmethod
+    def build(
+            cls,
+            csr_graph: CSRGraph,
+            od_pairs: pl.DataFrame,
+            buildings: pl.DataFrame,
+            od_vertex_map: pl.DataFrame,
+            n_clusters: int | None = None
+        ) -> "ODLinkIncidence":
+        """
+        Route the vertex pairs of the zone pairs and build the incidence matrix.
+
+        Args:
+            csr_graph (CSRGraph): the graph, weighted by its dist column.
+            od_pairs (pl.DataFrame): the zone pairs (from, to).
+            buildings (pl.DataFrame): the representative buildings of the
+                transport zones (transport_zone_id, n_clusters, weight), in
+                the order of the transport zones buildings file.
+            od_vertex_map (pl.DataFrame): the graph vertex of each building
+                (building_id, from 1, and vertex_id).
+            n_clusters (int | None): number of representative buildings to
+                use per zone, capped by the number available. The finest
+                level available in each zone is used if None.
+
+        Returns:
+            ODLinkIncidence: the incidence of the zone pairs.
+        """
+        od_pairs = (
+            od_pairs
+            .select(pl.col("from").cast(pl.Int64), pl.col("to").cast(pl.Int64))
+            .unique(maintain_order=True)
+            .with_row_index("od_index")
+        )
+
+        zone_vertices = cls._zone_vertices(csr_graph, buildings, od_vertex_map, n_clusters)
+
+        vertex_pairs = (
+            od_pairs
+            .join(zone_vertices, left_on="from", right_on="transport_zone_id")
+            .join(zone_vertices, left_on="to", right_on="transport_zone_id", suffix="_to")
+            .filter(pl.col("vertex") != pl.col("vertex_to"))
+            .with_columns(weight=pl.col("weight") * pl.col("weight_to"))
+            .with_columns(weight=pl.col("weight") / pl.col("weight").sum().over("od_index"))
+            .group_by(["od_index", "vertex", "vertex_to"])
+            .agg(pl.col("weight").sum())
+        )
+
+        routed_pairs = vertex_pairs.select(["vertex", "vertex_to"]).unique().with_row_index("pair_index")
+
+        logging.info(
+            "Routing %s vertex pairs for %s OD pairs...",
+            routed_pairs.height,
+            od_pairs.height
+        )
+
+        paths = shortest_path_edges(
+            csr_graph,
+            routed_pairs["vertex"].to_numpy(),
+            routed_pairs["vertex_to"].to_numpy()
+        )
+
+        entries = (
+            vertex_pairs
+            .join(routed_pairs, on=["vertex", "vertex_to"])
+            .join(paths.with_columns(pl.col("pair_index").cast(pl.UInt32)), on="pair_index")
+            .group_by(["edge_id", "od_index"])
+            .agg(pl.col("weight").sum())
+        )
+
+        matrix = sparse.csr_matrix(
+            (
+                entries["weight"].to_numpy(),
+                (entries["edge_id"].to_numpy(), entries["od_index"].to_numpy())
+            ),
+            shape=(csr_graph.n_edges, od_pairs.height)
+        )
+
+        return cls(od_pairs.drop("od_index"), matrix)
+
+    @staticmethod
+    def _zone_vertices(
+            csr_graph: CSRGraph,
+            buildings: pl.DataFrame,
+            od_vertex_map: pl.DataFrame,
+            n_clusters: int | None
+        ) -> pl.DataFrame:
+        """Return the graph vertices of each zone, with their normalized weight."""
+
+        graph_dict = pl.from_arrow(csr_graph.vertices).select(
+            pl.col("ref"),
+            pl.col("id").cast(pl.Int64).alias("vertex")
+        )
+
+        buildings = (
+            buildings
+            .with_row_index("building_id", offset=1)
+            .with_columns(
+                n_clusters_max=pl.col("n_clusters").max().over("transport_zone_id")
+            )
+        )
+
+        if n_clusters is None:
+            level = pl.col("n_clusters_max")
+        else:
+            level = pl.min_horizontal(pl.lit(n_clusters), pl.col("n_clusters_max"))
+
+        return (
+            buildings
+            .filter(pl.col("n_clusters") == level)
+            .join(
+                od_vertex_map.select(
+                    pl.col("building_id").cast(pl.UInt32),
+                    pl.col("vertex_id").cast(pl.String).alias("ref")
+                ),
+                on="building_id"
+            )
+            .join(graph_dict, on="ref")
+            .group_by(["transport_zone_id", "vertex"])
+            .agg(pl.col("weight").sum())
+            .with_columns(
+                pl.col("transport_zone_id").cast(pl.Int64),
+                weight=pl.col("weight") / pl.col("weight").sum().over("transport_zone_id")
+            )
+        )
+
+    def load(self, od_flows: pl.DataFrame, volume_column: str = "vehicle_volume") -> np.ndarray:
+        """
+        Load an OD flow table on the graph edges.
+
+        Args:
+            od_flows (pl.DataFrame): flows with from, to and volume columns.
+                Pairs that are not in the incidence are ignored.
+            volume_column (str): name of the volume column.
+
+        Returns:
+            np.ndarray: the flow on each edge, in cppRouting edge order.
+        """
+        volumes = (
+            self.od_pairs
+            .join(
+                od_flows
+                .select(
+                    pl.col("from").cast(pl.Int64),
+                    pl.col("to").cast(pl.Int64),
+                    pl.col(volume_column).cast(pl.Float64)
+                )
+                .group_by(["from", "to"])
+                .agg(pl.col(volume_column).sum()),
+                on=["from", "to"],
+                how="left",
+                maintain_order="left"
+            )
+            [volume_column]
+            .fill_null(0.0)
+            .to_numpy()
+        )
+        return self.matrix @ volumes
+
+    def save(self, path: pathlib.Path) -> None:
+        """Save the incidence in a folder (od-pairs.parquet, matrix.npz)."""
+        path.mkdir(parents=True, exist_ok=True)
+        self.od_pairs.write_parquet(path / "od-pairs.parquet")
+        sparse.save_npz(path / "matrix.npz", self.matrix)
+
+    @classmethod
+    def read(cls, path: pathlib.Path) -> "ODLinkIncidence":
+        """Read an incidence saved with ``save``."""
+        return cls(pl.read_parquet(path / "od-pairs.parquet"), sparse.load_npz(path / "matrix.npz").tocsr())
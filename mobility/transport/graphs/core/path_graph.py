@@ -24,6 +24,8 @@ class PathGraph:
         congestion_assignment_max_iterations: int = 10,
         congestion_assignment_max_gap: float = 0.05,
         congestion_assignment_retained_volume_share: float = 0.95,
+        congestion_assignment_algorithm: str = "cfw",
+        congestion_assignment_trace: bool = False,
         speed_modifiers: List[SpeedModifier] = []
     ):
         
@@ -46,12 +48,36 @@ class PathGraph:
             target_max_vehicles_per_od_endpoint,
             congestion_assignment_max_iterations,
             congestion_assignment_max_gap,
-            congestion_assignment_retained_volume_share
+            congestion_assignment_retained_volume_share,
+            congestion_assignment_algorithm,
+            congestion_assignment_trace
         )
         
         self.contracted = ContractedPathGraph(
             self.congested
         )
+
+        # Same graph without the speed modifiers : the travel costs of the
+        # modified graph reuse its vertex pair costs when they are available,
+        # and only route again the pairs that the modifiers can affect.
+        self.base_contracted = None
+
+        if len(speed_modifiers) > 0:
+
+            base_congested = CongestedPathGraph(
+                ModifiedPathGraph(self.simplified, []),
+                transport_zones,
+                congestion,
+                congestion_flows_scaling_factor,
+                target_max_vehicles_per_od_endpoint,
+                congestion_assignment_max_iterations,
+                congestion_assignment_max_gap,
+                congestion_assignment_retained_volume_share,
+                congestion_assignment_algorithm,
+                congestion_assignment_trace
+            )
+
+            self.base_contracted = ContractedPathGraph(base_congested)
         
 
         
@@ -0,0 +1,140 @@
+import logging
+
+import numpy as np
+import polars as pl
+
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph
+
+# Maximum number of predecessor entries (origins x vertices) kept in memory
+# for one batch of shortest path trees.
+MAX_PREDECESSORS_PER_BATCH = 50_000_000
+
+
+def shortest_path_edges(
+        csr_graph: CSRGraph,
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        weight: str = "dist",
+        limit: float = np.inf,
+        max_predecessors_per_batch: int = MAX_PREDECESSORS_PER_BATCH
+    ) -> pl.DataFrame:
+    """
+    Return the edges of the shortest paths between pairs of vertices.
+
+    One shortest path tree is computed per distinct origin (Dijkstra), for
+    batches of origins, and every pair with this origin is read from the
+    tree. Paths are unpacked for all the pairs of a batch at once, by walking
+    the predecessors back from the destinations. Among parallel edges, the
+    one with the lowest weight is used.
+
+    Args:
+        csr_graph (CSRGraph): the graph.
+        origins (np.ndarray): cppRouting id of the origin of each pair.
+        destinations (np.ndarray): cppRouting id of the destination of each pair.
+        weight (str): edge column used as the path cost.
+        limit (float): paths costing more than this are not searched, their
+            pairs have no row.
+        max_predecessors_per_batch (int): memory bound of a batch, in number
+            of (origin, vertex) predecessor entries.
+
+    Returns:
+        pl.DataFrame: one row per path edge, with the pair index (position in
+        ``origins``), the edge rank in the path (path_section_id, from 1) and
+        the cppRouting edge id (edge_id). Pairs without a path, or with the
+        same origin and destination, have no row.
+    """
+    origins = np.asarray(origins, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+
+    n = csr_graph.n_vertices
+    edge_keys, edge_ids, graph = _lightest_edges_matrix(csr_graph, weight)
+
+    unique_origins, origin_index = np.unique(origins, return_inverse=True)
+    batch_size = max(1, max_predecessors_per_batch // max(n, 1))
+
+    logging.info(
+        "Computing %s shortest path trees for %s vertex pairs...",
+        len(unique_origins),
+        len(origins)
+    )
+
+    pair_indices = []
+    sections = []
+    path_edges = []
+
+    for start in range(0, len(unique_origins), batch_size):
+
+        batch_origins = unique_origins[start:start + batch_size]
+        _, predecessors = dijkstra(graph, indices=batch_origins, return_predecessors=True, limit=limit)
+
+        pairs = np.flatnonzero((origin_index >= start) & (origin_index < start + len(batch_origins)))
+        rows = origin_index[pairs] - start
+
+        # Walk back from the destinations, one edge per step for all the pairs
+        current = destinations[pairs]
+        reached = current == origins[pairs]
+        reachable = reached | (predecessors[rows, current] >= 0)
+        pairs, rows, current = pairs[reachable & ~reached], rows[reachable & ~reached], current[reachable & ~reached]
+
+        steps = []
+        while len(pairs) > 0:
+            previous = predecessors[rows, current].astype(np.int64)
+            edge_index = np.searchsorted(edge_keys, previous * n + current)
+            steps.append((pairs, edge_ids[edge_index]))
+            arrived = previous == origins[pairs]
+            pairs, rows, current = pairs[~arrived], rows[~arrived], previous[~arrived]
+
+        if not steps:
+            continue
+
+        step_pairs = np.concatenate([step[0] for step in steps])
+        step_edges = np.concatenate([step[1] for step in steps])
+        step_rank = np.concatenate([np.full(len(step[0]), k) for k, step in enumerate(steps)])
+
+        # Steps go from the destination to the origin : reverse them
+        path_length = np.bincount(step_pairs, minlength=len(origins))
+        pair_indices.append(step_pairs)
+        sections.append(path_length[step_pairs] - step_rank)
+        path_edges.append(step_edges)
+
+    if not pair_indices:
+        return pl.DataFrame(schema={"pair_index": pl.Int64, "path_section_id": pl.Int64, "edge_id": pl.Int64})
+
+    return (
+        pl.DataFrame(
+            {
+                "pair_index": np.concatenate(pair_indices),
+                "path_section_id": np.concatenate(sections),
+                "edge_id": np.concatenate(path_edges),
+            },
+            schema={"pair_index": pl.Int64, "path_section_id": pl.Int64, "edge_id": pl.Int64}
+        )
+        .sort(["pair_index", "path_section_id"])
+    )
+
+
+def _lightest_edges_matrix(csr_graph: CSRGraph, weight: str) -> tuple[np.ndarray, np.ndarray, csr_matrix]:
+    """Keep the lightest of parallel edges, return their sorted keys, ids and the sparse adjacency matrix."""
+
+    n = csr_graph.n_vertices
+    from_ids = csr_graph.column("from").astype(np.int64)
+    to_ids = csr_graph.column("to").astype(np.int64)
+    weights = csr_graph.column(weight).astype(np.float64)
+
+    order = np.lexsort((weights, to_ids, from_ids))
+    keys = from_ids[order] * n + to_ids[order]
+    first = np.concatenate([[True], keys[1:] != keys[:-1]])
+
+    edge_ids = order[first]
+    edge_keys = keys[first]
+
+    # Explicit zeros of a sparse matrix are edges for scipy csgraph
+    graph = csr_matrix(
+        (weights[edge_ids], (from_ids[edge_ids], to_ids[edge_ids])),
+        shape=(n, n)
+    )
+
+    return edge_keys, edge_ids, graph
@@ -0,0 +1,107 @@
+import os
+import pathlib
+import logging
+
+from importlib import resources
+from typing import List
+
+from mobility.spatial.osm import OSMData
+from mobility.runtime.assets.file_asset import FileAsset
+from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+from mobility.spatial.transport_zones import TransportZones
+from mobility.transport.modes.core.osm_capacity_parameters import (
+    BaseOSMCapacityParameters,
+    BicycleOSMCapacityParameters,
+    CarOSMCapacityParameters,
+    WalkOSMCapacityParameters,
+)
+
+# dodgr's traffic-light logic for cars needs more than just drivable road
+# ways : it also inspects signal and crossing objects, plus highway=footway
+# ways tagged as crossings.
+TRAFFIC_SIGNAL_HIGHWAY_TAGS = ["traffic_signals", "crossing", "footway"]
+
+# Highway values of the street network extract shared by the path modes : the
+# default ways of every mode, each mode keeping its own ways when it is
+# weighted with dodgr.
+STREET_NETWORK_HIGHWAY_TAGS = sorted(
+    set(CarOSMCapacityParameters().get_highway_tags())
+    .union(WalkOSMCapacityParameters().get_highway_tags())
+    .union(BicycleOSMCapacityParameters().get_highway_tags())
+    .union(TRAFFIC_SIGNAL_HIGHWAY_TAGS)
+)
+
+
+def street_network_highway_tags(osm_capacity_parameters: BaseOSMCapacityParameters) -> List[str]:
+    """
+    Return the highway values to extract for a path mode.
+
+    Modes using the default ways all get the same list, so they share the
+    same extract and parsed street network. Custom ways are added to it.
+    """
+    return sorted(set(STREET_NETWORK_HIGHWAY_TAGS).union(osm_capacity_parameters.get_highway_tags()))
+
+
+class OSMStreetNetwork(FileAsset):
+    """
+    OSM street network parsed once for all the path modes of a project.
+
+    The cropped OSM extract is parsed with ``osmdata_sc`` and its oneway tags
+    are normalized for dodgr, then the silicate (SC) object is saved as an RDS
+    file. ``prepare_path_graph.R`` reads it and derives the weighted graph of
+    each mode (car, walk, bicycle) from it, instead of parsing the same
+    extract once per mode.
+    """
+
+    def __init__(
+            self,
+            transport_zones: TransportZones,
+            highway_tags: List[str] = STREET_NETWORK_HIGHWAY_TAGS
+        ):
+
+        # Nodes are kept so that osmdata_sc preserves the traffic signals
+        # context used by the car weighting profile.
+        osm = OSMData(
+            transport_zones.study_area,
+            object_type="nw",
+            key="highway",
+            tags=sorted(highway_tags),
+            geofabrik_extract_date="260101",
+            file_format="osm",
+            boundary_buffer=10000.0
+        )
+
+        inputs = {
+            "version": "1",
+            "transport_zones": transport_zones,
+            "osm": osm
+        }
+
+        file_name = pathlib.Path("osm_street_network") / "osm-street-network.rds"
+        cache_path = pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"]) / file_name
+
+        super().__init__(inputs, cache_path)
+
+    def get_cached_asset(self) -> pathlib.Path:
+
+        logging.debug("OSM street network already parsed. Reusing the file : " + str(self.cache_path))
+
+        return self.cache_path
+
+    def create_and_get_asset(self) -> pathlib.Path:
+
+        logging.info("Parsing the OSM street network...")
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        script = RScriptRunner(resources.files('mobility.transport.graphs.simplified').joinpath('parse_osm_streetnet.R'))
+
+        script.run(
+            args=[
+                str(self.inputs["transport_zones"].cache_path),
+                str(self.inputs["osm"].get()),
+                str(self.cache_path)
+            ]
+        )
+
+        return self.cache_path
@@ -5,14 +5,21 @@ import json
 import geopandas as gpd
 
 from importlib import resources
-from mobility.spatial.osm import OSMData
 from mobility.runtime.assets.file_asset import FileAsset
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.transport.modes.core.osm_capacity_parameters import OSMCapacityParameters
 from mobility.spatial.transport_zones import TransportZones
 from mobility.transport.graphs.core.graph_gpkg_exporter import GraphGPKGExporter
+from mobility.transport.graphs.simplified.osm_street_network import OSMStreetNetwork, street_network_highway_tags
 
 class SimplifiedPathGraph(FileAsset):
+    """
+    Simplified cppRouting graph of a path mode (car, walk or bicycle).
+
+    The modes share the same parsed OSM street network (see
+    ``OSMStreetNetwork``) and only differ by the dodgr weighting profile
+    restricted to their highway classes.
+    """
 
     def __init__(
             self,
@@ -28,35 +35,15 @@ class SimplifiedPathGraph(FileAsset):
                 + ", ".join(available_modes) + "."
             )
 
-        osm_object_type = "w"
-        osm_highway_tags = osm_capacity_parameters.get_highway_tags()
-
-        if mode_name == "car":
-            # dodgr's traffic-light logic needs more than just drivable road
-            # ways. It also inspects signal and crossing objects, plus
-            # highway=footway ways tagged as crossings. Keep those extra highway
-            # values in the extract and include nodes so osmdata_sc preserves
-            # the traffic-signal context before the car weighting profile drops
-            # non-drivable ways.
-            osm_object_type = "nw"
-            osm_highway_tags = sorted(
-                set(osm_highway_tags).union({"traffic_signals", "crossing", "footway"})
-            )
-
-        osm = OSMData(
-            transport_zones.study_area,
-            object_type=osm_object_type,
-            key="highway",
-            tags=osm_highway_tags,
-            geofabrik_extract_date="260101",
-            file_format="osm",
-            boundary_buffer=10000.0
+        street_network = OSMStreetNetwork(
+            transport_zones,
+            street_network_highway_tags(osm_capacity_parameters)
         )
         
         inputs = {
-            "version": "4.9.2",
+            "version": "4.10.0",
             "transport_zones": transport_zones,
-            "osm": osm,
+            "street_network": street_network,
             "osm_capacity_parameters": osm_capacity_parameters,
             "mode_name": mode_name
         }
@@ -78,7 +65,7 @@ class SimplifiedPathGraph(FileAsset):
 
         self.prepare_path_graph(
             self.inputs["transport_zones"],
-            self.inputs["osm"].get(),
+            self.inputs["street_network"].get(),
             self.inputs["mode_name"],
             self.inputs["osm_capacity_parameters"],
             self.cache_path
@@ -89,7 +76,7 @@ class SimplifiedPathGraph(FileAsset):
     def prepare_path_graph(
             self,
             transport_zones: gpd.GeoDataFrame,
-            osm_data_path: pathlib.Path,
+            street_network_path: pathlib.Path,
             mode: str,
             osm_capacity_parameters: OSMCapacityParameters,
             output_file_path: pathlib.Path
@@ -103,7 +90,7 @@ class SimplifiedPathGraph(FileAsset):
         script.run(
             args=[
                 str(transport_zones.cache_path),
-                str(osm_data_path),
+                str(street_network_path),
                 mode,
                 json.dumps(osm_capacity_parameters.model_dump(mode="json")),
                 str(output_file_path)
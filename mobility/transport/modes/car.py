@@ -12,6 +12,7 @@ from mobility.transport.costs.parameters.cost_of_time_parameters import CostOfTi
 from mobility.transport.costs.path.path_generalized_cost import PathGeneralizedCost
 from mobility.transport.modes.core.osm_capacity_parameters import OSMCapacityParameters
 from mobility.transport.graphs.modified.modifiers.speed_modifier import SpeedModifier
+from mobility.transport.graphs.contracted.contraction_structure import MAX_CUSTOMIZABLE_CONTRACTION_VERTICES
 import polars as pl
 from pydantic import Field
 
@@ -36,6 +37,9 @@ class CarMode(TransportMode):
         congestion_assignment_max_iterations: int | None = None,
         congestion_assignment_max_gap: float | None = None,
         congestion_assignment_retained_volume_share: float | None = None,
+        congestion_assignment_algorithm: str | None = None,
+        congestion_assignment_trace: bool | None = None,
+        customizable_contraction: bool | None = None,
         speed_modifiers: List[SpeedModifier] = [],
         survey_ids: List[str] | None = None,
         ghg_intensity: float | None = None,
@@ -58,6 +62,9 @@ class CarMode(TransportMode):
                 "congestion_assignment_max_iterations": congestion_assignment_max_iterations,
                 "congestion_assignment_max_gap": congestion_assignment_max_gap,
                 "congestion_assignment_retained_volume_share": congestion_assignment_retained_volume_share,
+                "congestion_assignment_algorithm": congestion_assignment_algorithm,
+                "congestion_assignment_trace": congestion_assignment_trace,
+                "customizable_contraction": customizable_contraction,
             },
             owner_name="CarMode",
         )
@@ -91,6 +98,9 @@ class CarMode(TransportMode):
             congestion_assignment_max_iterations=mode_parameters.congestion_assignment_max_iterations,
             congestion_assignment_max_gap=mode_parameters.congestion_assignment_max_gap,
             congestion_assignment_retained_volume_share=mode_parameters.congestion_assignment_retained_volume_share,
+            congestion_assignment_algorithm=mode_parameters.congestion_assignment_algorithm,
+            congestion_assignment_trace=mode_parameters.congestion_assignment_trace,
+            customizable_contraction=mode_parameters.customizable_contraction,
             speed_modifiers=speed_modifiers,
         )
         
@@ -142,6 +152,39 @@ class CarParameters(TransportModeParameters):
         ),
         json_schema_extra={"unit": "veh"},
     )
+    congestion_assignment_algorithm: Literal["msa", "fw", "cfw", "bfw"] = Field(
+        default="cfw",
+        title="Traffic assignment algorithm",
+        description=(
+            "Equilibrium algorithm used when loading car traffic on the road "
+            "graph: method of successive averages, Frank-Wolfe, conjugate or "
+            "bi-conjugate Frank-Wolfe. The conjugate variants reach low gaps "
+            "in far fewer iterations."
+        ),
+    )
+    congestion_assignment_trace: bool = Field(
+        default=False,
+        title="Traffic assignment trace",
+        description=(
+            "Run the traffic assignment with the mobility Frank-Wolfe loop, "
+            "which records the relative gap, objective, step size and timings "
+            "of every iteration, instead of the cppRouting solver. The trace "
+            "of the cppRouting solver only has the relative gap of each "
+            "iteration, and the objective and total time of the last one."
+        ),
+    )
+    customizable_contraction: bool = Field(
+        default=False,
+        title="Customizable contraction of congested graphs",
+        description=(
+            "Experimental, partial implementation. Contract the congested road "
+            "graphs by customizing one contraction structure shared by all of "
+            "them with the congested travel times, instead of contracting each "
+            "of them with cppRouting. Only used for graphs of at most "
+            f"{MAX_CUSTOMIZABLE_CONTRACTION_VERTICES:,} vertices, larger graphs "
+            "are contracted with cppRouting."
+        ),
+    )
     congestion_assignment_max_iterations: int = Field(
         default=10,
         ge=1,
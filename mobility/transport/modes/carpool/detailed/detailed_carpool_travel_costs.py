@@ -13,6 +13,7 @@ from pydantic import BaseModel, ConfigDict, Field
 from mobility.transport.costs.travel_costs_asset import TravelCostsBase
 from mobility.runtime.assets.file_asset import FileAsset
 from mobility.runtime.assets.in_memory_asset import InMemoryAsset
+from mobility.runtime.r_integration.arrow_exchange import RExchangeFolder, read_exchange_table
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.transport.costs.od_flows_asset import VehicleODFlowsAsset
 from mobility.transport.modes.core.modal_transfer import IntermodalTransfer
@@ -74,17 +75,22 @@ class DetailedCarpoolTravelCostsTable(TravelCostsBase, FileAsset):
         else:
             graph = self.car_travel_costs.modified_path_graph.get()
 
-        script.run(
-            args=[
-                str(self.car_travel_costs.transport_zones.cache_path),
-                str(self.car_travel_costs.transport_zones.study_area.cache_path["polygons"]),
-                str(graph),
-                str(graph),
-                json.dumps(self.modal_transfer.model_dump(mode="json")),
-                self.cache_path,
-            ]
-        )
-        return pd.read_parquet(self.cache_path)
+        with RExchangeFolder("carpool-travel-costs") as exchange:
+            output_path = exchange.path("travel_costs")
+            script.run(
+                args=[
+                    str(self.car_travel_costs.transport_zones.cache_path),
+                    str(self.car_travel_costs.transport_zones.study_area.cache_path["polygons"]),
+                    str(graph),
+                    str(graph),
+                    json.dumps(self.modal_transfer.model_dump(mode="json")),
+                    output_path,
+                ]
+            )
+            costs = read_exchange_table(output_path).to_pandas()
+
+        costs.to_parquet(self.cache_path, index=False)
+        return costs
 
 
 class DetailedCarpoolTravelCosts(TravelCostsBase, InMemoryAsset):
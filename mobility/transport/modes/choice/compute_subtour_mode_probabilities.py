@@ -1,8 +1,8 @@
 import argparse
-import os
 import polars as pl
 
 from concurrent.futures import ProcessPoolExecutor
+from mobility.runtime.parallelism import get_max_threads, get_worker_count, init_worker_process
 from mobility.transport.modes.choice.compute_subtour_mode_probs_parallel_utilities import process_batch_parallel, process_batch_serial, worker_init, chunked
 
 def compute_subtour_mode_probabilities_parallel(
@@ -26,7 +26,8 @@ def compute_subtour_mode_probabilities_parallel(
     
     batch_size = 50000
     batches = list(chunked(location_chains, batch_size))
-    n_workers = max(1, int(os.cpu_count()/2))
+    # Half of the thread budget, each worker process running single-threaded.
+    n_workers = get_worker_count(len(batches), max_workers=max(1, get_max_threads() // 2))
     
     # To debug without parallel processing that masks errors
     # worker_init(
@@ -41,13 +42,17 @@ def compute_subtour_mode_probabilities_parallel(
     
     ppe = ProcessPoolExecutor(
         max_workers=n_workers,
-        initializer=worker_init,
+        initializer=init_worker_process,
         initargs=(
-            k_sequences,
-            costs_path,
-            leg_modes_path,
-            modes_path,
-            tmp_path
+            1,
+            worker_init,
+            (
+                k_sequences,
+                costs_path,
+                leg_modes_path,
+                modes_path,
+                tmp_path
+            )
         )
     )
     
@@ -1,17 +1,23 @@
 import os
 import pathlib
 import logging
-import zipfile
 import hashlib
 
 from mobility.runtime.assets.file_asset import FileAsset
-from mobility.runtime.io.download_file import clean_path, download_file, download_files
+from mobility.runtime.io.download_file import clean_path
+from mobility.transport.modes.public_transport.gtfs.gtfs_downloads import fetch_gtfs_files
+from mobility.transport.modes.public_transport.gtfs.gtfs_feed_index import index_gtfs_file, index_gtfs_files
 
 class GTFSData(FileAsset):
     """
     Simple FileAsset to store GTFS files.
     
-    Checks that the GTFS zip is >1ko and contains an agency.txt file.
+    Files are fetched through the shared GTFS downloads folder (conditional
+    and resumable requests, one stored copy per content, optional local
+    mirror, see gtfs_downloads.py).
+    
+    Checks that the GTFS zip is >1ko and contains the tables required by the
+    router, using the cached GTFSFeedIndex of the file.
     """
     
     def __init__(
@@ -70,11 +76,7 @@ class GTFSData(FileAsset):
     
     def create_and_get_asset(self):
         
-        download_file(
-            self.download_url,
-            self.cache_path,
-            raise_on_error=False
-        )
+        fetch_gtfs_files([(self.download_url, self.cache_path)])
         
         file_ok = self.is_gtfs_file_ok(self.cache_path)
         
@@ -82,7 +84,7 @@ class GTFSData(FileAsset):
 
     @classmethod
     def download_gtfs_files(cls, sources: list[dict]) -> list[list]:
-        """Download selected GTFS sources in parallel and validate each file."""
+        """Fetch selected GTFS sources in parallel and validate each file."""
         gtfs_files = [
             cls(
                 provider=source["provider"],
@@ -101,7 +103,13 @@ class GTFSData(FileAsset):
             for gtfs_file in gtfs_files
             if gtfs_file.is_update_needed()
         ]
-        download_files(files_to_download, raise_on_error=False)
+        fetch_gtfs_files(files_to_download)
+
+        # Read the feeds that are not indexed yet concurrently, the checks
+        # below then only read the cached indexes
+        index_gtfs_files(
+            [gtfs_file.cache_path for gtfs_file in gtfs_files if gtfs_file.cache_path.exists()]
+        )
 
         return [
             [gtfs_file.cache_path, gtfs_file.is_gtfs_file_ok(gtfs_file.cache_path)]
@@ -126,33 +134,20 @@ class GTFSData(FileAsset):
             logging.info("Manual exception for old Vitré GTFS, GTFS not used from path", path)
             return False
         
-        try:
-            with zipfile.ZipFile(path, 'r') as zip_ref:
-                zip_contents = zip_ref.namelist()
-            has_an_agency = "agency.txt" in zip_contents
-            if has_an_agency:
-                logging.info("Downloaded file is a proper GTFS zip which contains an agency file.")
-            else:
-                logging.info("Downloaded file is a proper GTFS zip but does not contain an agency file, it will not be used by Mobility.")
-            return has_an_agency
-        except:
-            logging.info("Downloaded file is not a regular GTFS zip file, it will not be used by Mobility.")
-            return False
-    
-    
-    @staticmethod
-    def get_agencies_names(path):
-                
-        with zipfile.ZipFile(path, 'r') as gtfs_folder:
-            with gtfs_folder.open("agency.txt") as agency:
-                agencies = agency.read().decode('utf-8')
-                logging.info(agencies)
-                return agencies
+        index = index_gtfs_file(path)
 
+        if index.is_valid:
+            logging.info("Downloaded file is a proper GTFS zip with all the required tables.")
+        else:
+            logging.info(f"Downloaded file is not a usable GTFS zip file ({index.error}), it will not be used by Mobility.")
 
-        
+        return index.is_valid
     
     
+    @staticmethod
+    def get_agencies_names(path):
         
+        agencies = index_gtfs_file(path).agencies_names
+        logging.info(agencies)
         
-        
+        return agencies
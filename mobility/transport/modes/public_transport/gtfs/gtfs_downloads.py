@@ -0,0 +1,310 @@
+import os
+import json
+import base64
+import shutil
+import pathlib
+import hashlib
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from tenacity import (
+    Retrying,
+    before_sleep_log,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from mobility.runtime.io.http import request_url
+from mobility.runtime.parallelism import get_worker_count
+from mobility.transport.modes.public_transport.gtfs.gtfs_feed_tables import gtfs_file_hash
+
+# Bytes read from the response at once : an interrupted download can be
+# resumed from the last complete chunk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def gtfs_downloads_folder() -> pathlib.Path:
+    """Folder of the downloaded GTFS files, shared by all the projects."""
+    return pathlib.Path(os.environ["MOBILITY_PACKAGE_DATA_FOLDER"]) / "gtfs" / "downloads"
+
+
+def gtfs_mirror_folder() -> pathlib.Path | None:
+    """Local GTFS mirror set with ``mobility.set_params(gtfs_mirror_folder_path=...)``, if any."""
+    mirror = os.environ.get("MOBILITY_GTFS_MIRROR_FOLDER")
+    return pathlib.Path(mirror) if mirror else None
+
+
+def fetch_gtfs_files(url_path_pairs, max_workers=4, max_retries=3, timeout=(10, 120)) -> list[pathlib.Path]:
+    """
+    Fetch several GTFS files in parallel and return paths in input order.
+
+    Each URL is fetched once, even when several paths use it.
+
+    Args:
+        url_path_pairs (list): list of ``(url, path)`` pairs.
+        max_workers (int): maximum number of parallel downloads.
+        max_retries (int): maximum retries for each download.
+        timeout (int or tuple): the timeout setting for requests.
+
+    Returns:
+        list[pathlib.Path]: the paths, in input order. Paths of the files
+        that could not be fetched do not exist.
+    """
+    url_path_pairs = list(url_path_pairs)
+    if len(url_path_pairs) == 0:
+        return []
+
+    urls = list(dict.fromkeys(url for url, _path in url_path_pairs))
+
+    def fetch(url):
+        return fetch_gtfs_content(url, max_retries=max_retries, timeout=timeout)
+
+    worker_count = get_worker_count(len(urls), max_workers=max_workers)
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        contents = dict(zip(urls, executor.map(fetch, urls)))
+
+    paths = []
+    for url, path in url_path_pairs:
+        path = pathlib.Path(path)
+        if contents[url] is not None and not path.exists():
+            link_or_copy(contents[url], path)
+            logging.info("GTFS file ready at " + str(path))
+        paths.append(path)
+
+    return paths
+
+
+def fetch_gtfs_content(url: str, max_retries: int = 3, timeout=(10, 120)) -> pathlib.Path | None:
+    """
+    Return the local copy of the content of a GTFS URL, downloading it if needed.
+
+    Contents are stored once in the ``content`` folder of the downloads
+    folder, named after their MD5 hash, so identical feeds published under
+    several URLs are only stored once. Each URL has a JSON record with the
+    hash of its content and its ETag / Last-Modified validators :
+
+    - a known URL is requested again with If-None-Match / If-Modified-Since
+      headers, and the stored content is reused when the server answers 304,
+    - an interrupted download is resumed with a range request, as long as
+      the content did not change on the server (If-Range),
+    - the downloaded content is checked against the Content-Length and
+      Content-MD5 headers, and stored contents against their hash before
+      they are reused.
+
+    When a local mirror folder is set, the content is only looked up there
+    and the network is never used. A mirror is a copy of the downloads
+    folder of a machine with network access.
+
+    Args:
+        url (str): the URL of the GTFS file.
+        max_retries (int): the maximum number of retries for failed requests.
+        timeout (int or tuple): the timeout setting for requests.
+
+    Returns:
+        pathlib.Path | None: the content file, None if it could not be fetched.
+    """
+    mirror = gtfs_mirror_folder()
+    if mirror is not None:
+        content = stored_content(mirror, url)
+        if content is None:
+            logging.error(f"GTFS file {url} is not available in the local mirror {mirror}.")
+        return content
+
+    folder = gtfs_downloads_folder()
+    (folder / "content").mkdir(parents=True, exist_ok=True)
+    (folder / "partial").mkdir(parents=True, exist_ok=True)
+
+    retryer = Retrying(
+        stop=stop_after_attempt(max_retries + 1),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_exception_type(requests.exceptions.RequestException),
+        before_sleep=before_sleep_log(logging.root, logging.WARNING),
+        reraise=True,
+    )
+
+    try:
+        return retryer(_download_content, folder, url, timeout)
+    except requests.exceptions.RequestException as req_err:
+        logging.warning("Error during requests to %s after %s attempts: %s", url, max_retries + 1, req_err)
+        # The stored content is better than nothing if the server is down
+        return stored_content(folder, url)
+
+
+def stored_content(folder: pathlib.Path, url: str) -> pathlib.Path | None:
+    """Return the content stored for a URL in a downloads folder, if it is intact."""
+    record = read_record(folder, url)
+    if record is None:
+        return None
+
+    content = folder / "content" / (record["md5"] + ".zip")
+    if not content.exists():
+        return None
+
+    if gtfs_file_hash(content) != record["md5"]:
+        logging.warning(f"Stored GTFS file {content} does not match its hash, it will not be used.")
+        return None
+
+    return content
+
+
+def _download_content(folder: pathlib.Path, url: str, timeout) -> pathlib.Path | None:
+
+    record = read_record(folder, url)
+    content = stored_content(folder, url)
+
+    partial_path = folder / "partial" / (url_key(url) + ".part")
+    partial_validators_path = partial_path.with_name(partial_path.name + ".json")
+
+    headers = {}
+
+    if content is not None:
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+
+    elif partial_path.exists() and partial_validators_path.exists():
+        validator = json.loads(partial_validators_path.read_text())
+        validator = validator.get("etag") or validator.get("last_modified")
+        if validator and partial_path.stat().st_size > 0:
+            headers["Range"] = f"bytes={partial_path.stat().st_size}-"
+            headers["If-Range"] = validator
+
+    response = request_url(
+        url,
+        max_retries=0,
+        timeout=timeout,
+        stream=True,
+        allowed_status_codes={304, 401, 404, 416},
+        headers=headers,
+    )
+
+    try:
+
+        if response.status_code == 304:
+            logging.info(f"GTFS file {url} did not change, reusing the stored file.")
+            return content
+
+        if response.status_code in (401, 404):
+            logging.error(f"Error {response.status_code}: the GTFS file at {url} could not be downloaded.")
+            return None
+
+        if response.status_code == 416:
+            # The partial file does not match the file on the server anymore
+            _remove_partial(partial_path)
+            raise requests.exceptions.RetryError(f"Range not satisfiable for {url}, restarting the download.")
+
+        resumed = response.status_code == 206
+
+        if not resumed:
+            logging.info("Downloading " + url)
+            _remove_partial(partial_path)
+            partial_validators_path.write_text(
+                json.dumps(
+                    {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                )
+            )
+        else:
+            logging.info(f"Resuming the download of {url} from byte {partial_path.stat().st_size}")
+
+        with open(partial_path, "ab" if resumed else "wb") as file:
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                file.write(data)
+
+        expected_size = _expected_size(response, resumed)
+        if expected_size is not None and partial_path.stat().st_size != expected_size:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Incomplete download of {url} ({partial_path.stat().st_size} bytes out of {expected_size})."
+            )
+
+        file_hash = _md5(partial_path)
+
+        expected_md5 = response.headers.get("Content-MD5")
+        if expected_md5 is not None and not resumed and base64.b64decode(expected_md5).hex() != file_hash:
+            _remove_partial(partial_path)
+            raise requests.exceptions.ContentDecodingError(f"Downloaded GTFS file {url} does not match its Content-MD5 header.")
+
+        # Identical contents published under other URLs are stored once
+        content = folder / "content" / (file_hash + ".zip")
+        if content.exists() and gtfs_file_hash(content) == file_hash:
+            logging.info(f"GTFS file {url} has the same content as an already stored file.")
+            _remove_partial(partial_path)
+        else:
+            os.replace(partial_path, content)
+            _remove_partial(partial_path)
+
+        write_record(
+            folder,
+            url,
+            {
+                "url": url,
+                "md5": file_hash,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        )
+
+        return content
+
+    finally:
+        response.close()
+
+
+def _expected_size(response, resumed: bool) -> int | None:
+    if resumed:
+        # Content-Range: bytes 100-199/200
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    if length is None or response.headers.get("Content-Encoding"):
+        return None
+    return int(length)
+
+
+def _remove_partial(partial_path: pathlib.Path) -> None:
+    for path in (partial_path, partial_path.with_name(partial_path.name + ".json")):
+        if path.exists():
+            path.unlink()
+
+
+def url_key(url: str) -> str:
+    return hashlib.md5(url.encode("utf-8")).hexdigest()
+
+
+def read_record(folder: pathlib.Path, url: str) -> dict | None:
+    record_path = folder / (url_key(url) + ".json")
+    if not record_path.exists():
+        return None
+    return json.loads(record_path.read_text())
+
+
+def write_record(folder: pathlib.Path, url: str, record: dict) -> None:
+    record_path = folder / (url_key(url) + ".json")
+    tmp_path = record_path.with_name(record_path.name + "." + str(os.getpid()) + ".tmp")
+    tmp_path.write_text(json.dumps(record))
+    os.replace(tmp_path, record_path)
+
+
+def link_or_copy(source: pathlib.Path, path: pathlib.Path) -> None:
+    """Hard link a stored content to a path, or copy it when linking is not possible (other disk for example)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, path)
+    except OSError:
+        tmp_path = path.with_name(path.name + ".part")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _md5(path: pathlib.Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,267 @@
+import os
+import io
+import csv
+import json
+import pathlib
+import logging
+import zipfile
+import threading
+import dataclasses
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mobility.runtime.parallelism import get_worker_count
+from mobility.transport.modes.public_transport.gtfs.gtfs_feed_tables import gtfs_file_hash
+
+GTFS_FEED_INDEX_VERSION = 1
+
+# Tables without which a feed cannot be routed (calendars are optional,
+# prepare_gtfs_router.R adds a dummy service to feeds without one)
+REQUIRED_GTFS_TABLES = ["agency.txt", "stops.txt", "routes.txt", "trips.txt", "stop_times.txt"]
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+@dataclasses.dataclass
+class GTFSFeedIndex:
+    """
+    Summary of a GTFS zip, built in one pass over the file and cached.
+
+    Indexes are stored as JSON files named after the hash of the feed content
+    in the ``gtfs/index`` folder of the package data folder, so a feed is
+    only read once whatever its path or the project using it.
+
+    Attributes:
+        file_hash (str): MD5 hash of the feed content.
+        is_valid (bool): whether the feed is a zip with all the required tables.
+        error (str | None): why the feed is not valid.
+        agencies (list[dict]): agency_id and agency_name of each agency.
+        n_services_by_date (dict[str, int]): number of services running on
+            each date (YYYYMMDD) of the calendars.
+        stops_bbox (list[float] | None): min lon, min lat, max lon, max lat
+            of the stops.
+        n_stops (int): number of stops.
+    """
+
+    file_hash: str
+    is_valid: bool
+    error: str | None = None
+    agencies: list[dict] = dataclasses.field(default_factory=list)
+    n_services_by_date: dict[str, int] = dataclasses.field(default_factory=dict)
+    stops_bbox: list[float] | None = None
+    n_stops: int = 0
+
+    @property
+    def agencies_names(self) -> str:
+        """Names of the agencies, one per line."""
+        return "\n".join(str(agency["agency_name"]) for agency in self.agencies)
+
+    @property
+    def agencies_ids_and_names(self) -> str:
+        """Ids and names of the agencies, one agency per line."""
+        return "\n".join(f"{agency['agency_id']},{agency['agency_name']}" for agency in self.agencies)
+
+    @property
+    def busiest_date(self) -> str | None:
+        """Date with the most services running, the first one in case of ties."""
+        if not self.n_services_by_date:
+            return None
+        return max(sorted(self.n_services_by_date), key=self.n_services_by_date.get)
+
+    @classmethod
+    def read(cls, path: pathlib.Path) -> "GTFSFeedIndex | None":
+        """Read a cached index, None if it is missing or has an older version."""
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        if content.pop("version", None) != GTFS_FEED_INDEX_VERSION:
+            return None
+        return cls(**content)
+
+    def write(self, path: pathlib.Path) -> None:
+        """Write the index, through a temporary file so that readers never see a partial one."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Feeds with the same content share their index file and can be
+        # indexed by several threads at once, each one needs its own file
+        tmp_path = path.with_name(path.name + "." + str(os.getpid()) + "-" + str(threading.get_ident()) + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": GTFS_FEED_INDEX_VERSION, **dataclasses.asdict(self)}, f)
+        os.replace(tmp_path, path)
+
+
+def gtfs_feed_index_path(file_hash: str) -> pathlib.Path:
+    return pathlib.Path(os.environ["MOBILITY_PACKAGE_DATA_FOLDER"]) / "gtfs" / "index" / (file_hash + ".json")
+
+
+def index_gtfs_file(path: str | pathlib.Path) -> GTFSFeedIndex:
+    """
+    Return the index of a GTFS zip, reading the file only if it is not cached yet.
+
+    Args:
+        path (str | pathlib.Path): path of the GTFS zip file.
+
+    Returns:
+        GTFSFeedIndex: the index of the feed.
+    """
+    file_hash = gtfs_file_hash(pathlib.Path(path))
+    index_path = gtfs_feed_index_path(file_hash)
+
+    index = GTFSFeedIndex.read(index_path)
+
+    if index is None:
+        index = build_gtfs_feed_index(pathlib.Path(path), file_hash)
+        index.write(index_path)
+
+    return index
+
+
+def index_gtfs_files(paths: list[str | pathlib.Path], max_workers: int = 8) -> list[GTFSFeedIndex]:
+    """
+    Index several GTFS zip files concurrently.
+
+    Decompression and CSV parsing of different feeds are independent, so
+    feeds are read by a pool of threads.
+
+    Returns:
+        list[GTFSFeedIndex]: the indexes, in the order of the paths.
+    """
+    paths = [pathlib.Path(path) for path in paths]
+    if len(paths) == 0:
+        return []
+
+    unique_paths = list(dict.fromkeys(paths))
+
+    worker_count = get_worker_count(len(unique_paths), max_workers=max_workers)
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        indexes = dict(zip(unique_paths, executor.map(index_gtfs_file, unique_paths)))
+
+    return [indexes[path] for path in paths]
+
+
+def build_gtfs_feed_index(path: pathlib.Path, file_hash: str) -> GTFSFeedIndex:
+    """
+    Read a GTFS zip once and summarise it.
+
+    The agency, stops and calendar tables are streamed row by row, the large
+    tables (trips, stop_times) are only checked for presence.
+    """
+    try:
+        with zipfile.ZipFile(path, "r") as archive:
+
+            names = {pathlib.PurePosixPath(name).name: name for name in archive.namelist()}
+
+            missing_tables = [table for table in REQUIRED_GTFS_TABLES if table not in names]
+            if missing_tables:
+                return GTFSFeedIndex(file_hash, False, error="Missing tables : " + ", ".join(missing_tables))
+
+            def rows(table):
+                with archive.open(names[table]) as file:
+                    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+                    for row in csv.DictReader(text):
+                        yield {key.strip(): (value or "").strip() for key, value in row.items() if key is not None}
+
+            agencies = [
+                {"agency_id": row.get("agency_id", ""), "agency_name": row.get("agency_name", "")}
+                for row in rows("agency.txt")
+            ]
+
+            stops_bbox, n_stops = _stops_bbox(rows("stops.txt"))
+
+            n_services_by_date = _count_services_by_date(
+                rows("calendar.txt") if "calendar.txt" in names else [],
+                rows("calendar_dates.txt") if "calendar_dates.txt" in names else []
+            )
+
+    except (zipfile.BadZipFile, OSError, csv.Error, ValueError, KeyError) as e:
+        logging.info(f"GTFS file {path} could not be read : {e}")
+        return GTFSFeedIndex(file_hash, False, error=f"{type(e).__name__} : {e}")
+
+    return GTFSFeedIndex(
+        file_hash,
+        True,
+        agencies=agencies,
+        n_services_by_date=n_services_by_date,
+        stops_bbox=stops_bbox,
+        n_stops=n_stops
+    )
+
+
+def _stops_bbox(stops) -> tuple[list[float] | None, int]:
+    """Return the bounding box of the stops with valid coordinates and the number of stops."""
+
+    min_lon, min_lat, max_lon, max_lat = np.inf, np.inf, -np.inf, -np.inf
+    n_stops = 0
+
+    for stop in stops:
+        n_stops += 1
+        try:
+            lon, lat = float(stop["stop_lon"]), float(stop["stop_lat"])
+        except (KeyError, ValueError):
+            continue
+        if -180.0 <= lon <= 180.0 and -90.0 <= lat <= 90.0 and (lon, lat) != (0.0, 0.0):
+            min_lon, min_lat = min(min_lon, lon), min(min_lat, lat)
+            max_lon, max_lat = max(max_lon, lon), max(max_lat, lat)
+
+    if not np.isfinite(min_lon):
+        return None, n_stops
+
+    return [min_lon, min_lat, max_lon, max_lat], n_stops
+
+
+def _count_services_by_date(calendar, calendar_dates) -> dict[str, int]:
+    """
+    Count the services running on each date.
+
+    A service runs on a date when the calendar says so and no calendar date
+    removes it (exception_type 2), or when a calendar date adds it
+    (exception_type 1). (service, day) pairs are handled as int64 keys.
+    """
+    service_index = {}
+
+    def key(service_id, days):
+        service = service_index.setdefault(service_id, len(service_index))
+        return service * 1_000_000 + days
+
+    regular = []
+    for row in calendar:
+        try:
+            start = np.datetime64(_iso_date(row["start_date"]), "D")
+            end = np.datetime64(_iso_date(row["end_date"]), "D")
+        except (KeyError, ValueError):
+            continue
+        runs = np.array([row.get(day, "0") == "1" for day in WEEKDAYS])
+        if not runs.any() or end < start:
+            continue
+        days = np.arange(start, end + np.timedelta64(1, "D")).astype(np.int64)
+        # 1970-01-01 was a Thursday
+        days = days[runs[(days + 3) % 7]]
+        regular.append(key(row["service_id"], days))
+
+    added, removed = [], []
+    for row in calendar_dates:
+        try:
+            day = np.datetime64(_iso_date(row["date"]), "D").astype(np.int64)
+        except (KeyError, ValueError):
+            continue
+        if row.get("exception_type") == "1":
+            added.append(key(row["service_id"], day))
+        elif row.get("exception_type") == "2":
+            removed.append(key(row["service_id"], day))
+
+    keys = np.concatenate(regular + [np.array(added, dtype=np.int64)]) if regular or added else np.array([], dtype=np.int64)
+    keys = np.setdiff1d(np.unique(keys), np.array(removed, dtype=np.int64))
+
+    days, counts = np.unique(keys % 1_000_000, return_counts=True)
+    dates = np.datetime_as_string(days.astype("datetime64[D]"))
+
+    return {date.replace("-", ""): int(count) for date, count in zip(dates, counts)}
+
+
+def _iso_date(gtfs_date: str) -> str:
+    """Convert a GTFS YYYYMMDD date to ISO format."""
+    if len(gtfs_date) != 8 or not gtfs_date.isdigit():
+        raise ValueError(f"Invalid GTFS date : {gtfs_date}")
+    return f"{gtfs_date[:4]}-{gtfs_date[4:6]}-{gtfs_date[6:]}"
@@ -0,0 +1,130 @@
+import os
+import pathlib
+import logging
+import hashlib
+
+from importlib import resources
+
+from mobility.runtime.assets.file_asset import FileAsset
+from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+from mobility.spatial.transport_zones import TransportZones
+
+
+class GTFSFeedTables(FileAsset):
+    """
+    One GTFS feed prepared for the GTFS router, cached on its own.
+
+    The R script prepare_gtfs_feeds.R reads the feed, keeps the stops within
+    10 km of the transport zones and the trips, routes, agencies, services
+    and transfers using them, and writes the resulting tables as parquet
+    files in the ``<hash>-gtfs-feed-tables`` folder. The cache key is the
+    hash of the feed file content and the transport zones, so adding,
+    removing or updating one feed of a region only prepares this feed again :
+    the router then merges the cached tables of all the feeds.
+
+    Feeds without any stop time in the region have no tables folder.
+
+    Args:
+        transport_zones (TransportZones): the transport zones used to filter
+            the stops.
+        gtfs_file (str | pathlib.Path): path of the GTFS zip file.
+    """
+
+    def __init__(self, transport_zones: TransportZones, gtfs_file: str | pathlib.Path):
+
+        # The path itself is not an input : the same file moved or downloaded
+        # again under another name is not prepared twice.
+        self.gtfs_file = pathlib.Path(gtfs_file)
+
+        inputs = {
+            "version": "1",
+            "transport_zones": transport_zones,
+            "gtfs_file_hash": gtfs_file_hash(self.gtfs_file),
+        }
+
+        cache_path = pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"]) / "gtfs_feeds" / "gtfs-feed"
+
+        super().__init__(inputs, cache_path)
+
+    @property
+    def tables_path(self) -> pathlib.Path:
+        """Folder of the prepared tables."""
+        return self.cache_path.with_name(self.cache_path.name + "-tables")
+
+    def get_cached_asset(self) -> pathlib.Path | None:
+        logging.debug("GTFS feed already prepared. Reusing the files in : " + str(self.tables_path))
+        return self.tables_path if self.tables_path.exists() else None
+
+    def create_and_get_asset(self) -> pathlib.Path | None:
+        self.prepare_feeds(self.inputs["transport_zones"], [self])
+        return self.get_cached_asset()
+
+    @staticmethod
+    def prepare_feeds(transport_zones: TransportZones, feeds: list["GTFSFeedTables"]) -> None:
+        """
+        Prepare several feeds with one run of prepare_gtfs_feeds.R.
+
+        Starting R and loading the transport zones once for all the feeds
+        that are missing from the cache is much faster than one run per feed.
+        """
+        if not feeds:
+            return None
+
+        logging.info("Preparing %s GTFS feed(s) for the transport zones...", len(feeds))
+
+        script = RScriptRunner(resources.files('mobility.transport.modes.public_transport.gtfs').joinpath('prepare_gtfs_feeds.R'))
+
+        script.run(
+            args=[
+                str(transport_zones.cache_path),
+                ",".join(str(feed.gtfs_file) for feed in feeds),
+                str(resources.files('mobility.runtime.resources').joinpath('gtfs/gtfs_route_types.csv')),
+                ",".join(str(feed.cache_path) for feed in feeds)
+            ]
+        )
+
+        for feed in feeds:
+            feed.update_hash(feed.inputs_hash)
+
+        return None
+
+    def remove(self):
+        super().remove()
+        if self.tables_path.exists():
+            for table_path in self.tables_path.iterdir():
+                table_path.unlink()
+            self.tables_path.rmdir()
+
+
+def gtfs_file_hash(path: pathlib.Path) -> str:
+    """
+    Return the MD5 hash of the content of a GTFS file.
+
+    The hash is stored next to the file (``<file>.md5``) with the size and
+    modification time it was computed for, so that unchanged files are not
+    read again.
+    """
+    path = pathlib.Path(path)
+    stat = path.stat()
+    stamp = f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    hash_path = path.with_name(path.name + ".md5")
+    if hash_path.exists():
+        cached_stamp, _, cached_hash = hash_path.read_text().partition(" ")
+        if cached_stamp == stamp:
+            return cached_hash
+
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    file_hash = digest.hexdigest()
+
+    try:
+        hash_path.write_text(stamp + " " + file_hash)
+    except OSError:
+        # Read only folders (shared GTFS files for example) : no cache
+        pass
+
+    return file_hash
@@ -12,6 +12,9 @@ from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.transport.modes.public_transport.gtfs.gtfs_sources import GTFSSources
 
 from .gtfs_data import GTFSData
+from .gtfs_feed_index import index_gtfs_files
+from .gtfs_feed_tables import GTFSFeedTables
+from .gtfs_timetable import GTFSTimetable, TIMETABLE_TABLES
 
 class GTFSRouter(FileAsset):
     """
@@ -26,9 +29,13 @@ class GTFSRouter(FileAsset):
     For each GTFS source, this script will only keep stops with the region, add missing route types (by default bus),
     make IDs unique and remove erroneous calendar dates. 
     It will then align all GTFS sources on a common start date and merge all GTFS into one.
+    Each GTFS file is prepared once and cached on its own (see GTFSFeedTables), so
+    changing one feed of a region does not prepare the other feeds again.
     It adds missing transfers between stops using a crow-fly formula, ans with a limit of 200m.
     It finds the Tuesday with the most services running within the montth with the most services on average.
-    Finally, this global Tuesday-only GTFS is saved.
+    Finally, this global Tuesday-only GTFS is saved, along with a columnar copy of its
+    timetable (parquet files in the ``<hash>-gtfs_router-timetable`` folder) that
+    can be routed in Python (see RaptorRouter).
     """
     
     def __init__(
@@ -51,6 +58,36 @@ class GTFSRouter(FileAsset):
         
     def get_cached_asset(self):
         return self.cache_path
+
+    @property
+    def timetable_path(self) -> pathlib.Path:
+        """Folder of the columnar timetable written next to the router .rds file."""
+        return self.cache_path.with_name(self.cache_path.stem + "-timetable")
+
+    def prepare_timetable(self) -> pathlib.Path:
+        """
+        Prepare the router if needed and return the folder of its columnar timetable.
+
+        Routers prepared before the timetable existed do not have one : it is
+        then written from the saved router, without preparing it again.
+        """
+        self.get()
+
+        if all((self.timetable_path / f"{table}.parquet").exists() for table in TIMETABLE_TABLES) is False:
+            logging.info("Saving the columnar timetable of the GTFS router...")
+            script = RScriptRunner(resources.files('mobility.transport.modes.public_transport.gtfs').joinpath('prepare_gtfs_timetable.R'))
+            script.run(
+                args=[
+                    str(self.cache_path),
+                    str(self.timetable_path)
+                ]
+            )
+
+        return self.timetable_path
+
+    def get_timetable(self) -> GTFSTimetable:
+        """Prepare the router and its timetable if needed and return the timetable."""
+        return GTFSTimetable.read(self.prepare_timetable())
     
     def create_and_get_asset(self):
         
@@ -72,37 +109,39 @@ class GTFSRouter(FileAsset):
         return self.cache_path
     
     def check_expected_agencies(self, gtfs_files, expected_agencies):
-        logging.debug(gtfs_files)
-        for gtfs_file in gtfs_files:
-            logging.debug("GTFS")
-            agencies = GTFSData.get_agencies_names(gtfs_file)
-            logging.debug(agencies)
-            logging.debug(type(agencies))
-            for expected_agency in expected_agencies:
-                logging.debug(f'Looking for {expected_agency} in {gtfs_file}')
-                if expected_agency.lower() in agencies.lower():
-                    logging.debug(f"{expected_agency} found in {gtfs_file}")
-                    expected_agencies.remove(expected_agency)
-        logging.debug(expected_agencies)
-        if expected_agencies == []:
+        
+        # The agencies come from the cached indexes of the feeds, the feeds
+        # that are not indexed yet are read concurrently. Expected agencies
+        # can be given by id or by name.
+        agencies = [index.agencies_ids_and_names.lower() for index in index_gtfs_files(gtfs_files)]
+        
+        missing_agencies = [
+            expected_agency for expected_agency in expected_agencies
+            if not any(expected_agency.lower() in feed_agencies for feed_agencies in agencies)
+        ]
+        
+        if missing_agencies == []:
             logging.debug("All expected agencies were found")
             return True
         else:
             logging.debug("Some agencies were not found in GTFS files.")
-            logging.debug(expected_agencies)
+            logging.debug(missing_agencies)
             raise IndexError('Missing agencies')
             
     def prepare_gtfs_router(self, transport_zones, gtfs_files):
         
-        gtfs_files = ",".join(gtfs_files)
+        # Each feed is filtered on the region and cached on its own, only the
+        # feeds that are not in the cache yet are prepared before the merge.
+        feeds = list({feed.inputs_hash: feed for feed in (GTFSFeedTables(transport_zones, path) for path in gtfs_files)}.values())
+        GTFSFeedTables.prepare_feeds(transport_zones, [feed for feed in feeds if feed.is_update_needed()])
+        
+        feed_tables = ",".join(str(feed.tables_path) for feed in feeds if feed.tables_path.exists())
         
         script = RScriptRunner(resources.files('mobility.transport.modes.public_transport.gtfs').joinpath('prepare_gtfs_router.R'))
         
         script.run(
             args=[
-                str(transport_zones.cache_path),
-                gtfs_files,
-                str(resources.files('mobility.runtime.resources').joinpath('gtfs/gtfs_route_types.csv')),
+                feed_tables,
                 str(self.cache_path)
             ]
         )
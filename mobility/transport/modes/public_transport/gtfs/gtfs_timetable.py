@@ -0,0 +1,205 @@
+import io
+import pathlib
+import zipfile
+
+import numpy as np
+import polars as pl
+
+from pyproj import Transformer
+from scipy.spatial import cKDTree
+
+TIMETABLE_TABLES = ["stops", "stop_times", "trips", "routes", "transfers"]
+
+# Crow-fly transfers between close stops, same rule as prepare_gtfs_router.R
+TRANSFER_MAX_DISTANCE = 200.0
+TRANSFER_TIME_INTERCEPT = 31.0
+TRANSFER_TIME_SLOPE = 1.125
+
+
+class GTFSTimetable:
+    """
+    Columnar timetable of the GTFS router.
+
+    Holds the tables kept by ``prepare_gtfs_router.R`` (stops, stop_times,
+    trips, routes and transfers) as polars data frames, with stop times in
+    seconds after midnight. The R script writes them as parquet files in the
+    ``<hash>-gtfs_router-timetable`` folder next to the router .rds file, so
+    that routing can be done in Python without reading the R object.
+
+    Args:
+        stops (pl.DataFrame): stop_id, stop_lon, stop_lat.
+        stop_times (pl.DataFrame): trip_id, stop_id, arrival_time,
+            departure_time (in seconds), stop_sequence.
+        trips (pl.DataFrame): trip_id, route_id, service_id.
+        routes (pl.DataFrame): route_id and route attributes.
+        transfers (pl.DataFrame): from_stop_id, to_stop_id, min_transfer_time
+            (in seconds).
+    """
+
+    def __init__(
+            self,
+            stops: pl.DataFrame,
+            stop_times: pl.DataFrame,
+            trips: pl.DataFrame,
+            routes: pl.DataFrame,
+            transfers: pl.DataFrame
+        ):
+        self.stops = stops
+        self.stop_times = stop_times.with_columns(
+            pl.col("arrival_time").cast(pl.Float64),
+            pl.col("departure_time").cast(pl.Float64),
+            pl.col("stop_sequence").cast(pl.Int64)
+        )
+        self.trips = trips
+        self.routes = routes
+        self.transfers = transfers.with_columns(pl.col("min_transfer_time").cast(pl.Float64).fill_null(0.0))
+
+    @classmethod
+    def read(cls, path: pathlib.Path) -> "GTFSTimetable":
+        """Read a timetable folder written by ``prepare_gtfs_router.R`` or ``write``."""
+        path = pathlib.Path(path)
+        return cls(**{table: pl.read_parquet(path / f"{table}.parquet") for table in TIMETABLE_TABLES})
+
+    def write(self, path: pathlib.Path) -> None:
+        """Write the tables as parquet files in a folder."""
+        path = pathlib.Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for table in TIMETABLE_TABLES:
+            getattr(self, table).write_parquet(path / f"{table}.parquet")
+
+    @classmethod
+    def from_gtfs_zips(cls, gtfs_files: list[pathlib.Path]) -> "GTFSTimetable":
+        """
+        Build a timetable directly from GTFS zip files.
+
+        Ids are prefixed with the rank of their file (from 1) and crow-fly
+        transfers are added between stops less than 200 m apart, like in
+        ``prepare_gtfs_router.R``. Calendars are not filtered : all trips of
+        the files are kept, which is what synthetic feeds need (for example
+        the ones written by ``GTFSBuilder``).
+
+        Args:
+            gtfs_files (list[pathlib.Path]): paths of the GTFS zip files.
+
+        Returns:
+            GTFSTimetable: the merged timetable.
+        """
+        feeds = [_read_gtfs_zip(path, prefix=f"{i}-") for i, path in enumerate(gtfs_files, start=1)]
+
+        stops = pl.concat([feed["stops"] for feed in feeds], how="diagonal_relaxed").unique("stop_id", maintain_order=True)
+        stop_times = pl.concat([feed["stop_times"] for feed in feeds], how="diagonal_relaxed")
+        trips = pl.concat([feed["trips"] for feed in feeds], how="diagonal_relaxed")
+        routes = pl.concat([feed["routes"] for feed in feeds], how="diagonal_relaxed")
+
+        transfers = pl.concat(
+            [feed["transfers"] for feed in feeds] + [crow_fly_transfers(stops)],
+            how="diagonal_relaxed"
+        )
+        transfers = (
+            transfers
+            .filter(pl.col("from_stop_id") != pl.col("to_stop_id"))
+            .group_by(["from_stop_id", "to_stop_id"], maintain_order=True)
+            .agg(pl.col("min_transfer_time").min())
+        )
+
+        return cls(stops, stop_times, trips, routes, transfers)
+
+
+def crow_fly_transfers(stops: pl.DataFrame, max_distance: float = TRANSFER_MAX_DISTANCE) -> pl.DataFrame:
+    """
+    Return the transfers between stops closer than max_distance.
+
+    Distances are computed in EPSG:2154 and transfer times follow the linear
+    model used by ``prepare_gtfs_router.R`` (31 s + 1.125 s/m).
+
+    Args:
+        stops (pl.DataFrame): stop_id, stop_lon, stop_lat.
+        max_distance (float): maximum transfer distance, in meters.
+
+    Returns:
+        pl.DataFrame: from_stop_id, to_stop_id, min_transfer_time (in seconds).
+    """
+    if stops.height == 0:
+        return pl.DataFrame(schema={"from_stop_id": pl.String, "to_stop_id": pl.String, "min_transfer_time": pl.Float64})
+
+    transformer = Transformer.from_crs(4326, 2154, always_xy=True)
+    x, y = transformer.transform(stops["stop_lon"].to_numpy(), stops["stop_lat"].to_numpy())
+    xy = np.column_stack([x, y])
+
+    pairs = cKDTree(xy).query_pairs(max_distance, output_type="ndarray")
+    pairs = np.concatenate([pairs, pairs[:, ::-1]])
+    distance = np.linalg.norm(xy[pairs[:, 0]] - xy[pairs[:, 1]], axis=1)
+
+    stop_ids = stops["stop_id"].to_numpy()
+
+    return pl.DataFrame(
+        {
+            "from_stop_id": stop_ids[pairs[:, 0]],
+            "to_stop_id": stop_ids[pairs[:, 1]],
+            "min_transfer_time": TRANSFER_TIME_INTERCEPT + TRANSFER_TIME_SLOPE * distance,
+        },
+        schema={"from_stop_id": pl.String, "to_stop_id": pl.String, "min_transfer_time": pl.Float64}
+    )
+
+
+def gtfs_time_to_seconds(times: pl.Expr) -> pl.Expr:
+    """Convert GTFS HH:MM:SS times (hours can go past 24) to seconds after midnight."""
+    parts = times.str.strip_chars().str.split(":")
+    return (
+        parts.list.get(0).cast(pl.Float64) * 3600.0
+        + parts.list.get(1).cast(pl.Float64) * 60.0
+        + parts.list.get(2).cast(pl.Float64)
+    )
+
+
+def _read_gtfs_zip(path: pathlib.Path, prefix: str) -> dict[str, pl.DataFrame]:
+    """Read the tables of one GTFS zip, with ids prefixed like in prepare_gtfs_router.R."""
+
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+
+        def read_table(name):
+            with archive.open(name) as file:
+                return pl.read_csv(io.BytesIO(file.read()), infer_schema=False)
+
+        stops = read_table("stops.txt").select(
+            (prefix + pl.col("stop_id")).alias("stop_id"),
+            pl.col("stop_lon").cast(pl.Float64),
+            pl.col("stop_lat").cast(pl.Float64)
+        )
+
+        stop_times = (
+            read_table("stop_times.txt")
+            .select(
+                (prefix + pl.col("trip_id")).alias("trip_id"),
+                (prefix + pl.col("stop_id")).alias("stop_id"),
+                gtfs_time_to_seconds(pl.col("arrival_time")).alias("arrival_time"),
+                gtfs_time_to_seconds(pl.col("departure_time")).alias("departure_time"),
+                pl.col("stop_sequence").cast(pl.Int64)
+            )
+        )
+
+        trips = read_table("trips.txt").select(
+            (prefix + pl.col("trip_id")).alias("trip_id"),
+            (prefix + pl.col("route_id")).alias("route_id"),
+            (prefix + pl.col("service_id")).alias("service_id")
+        )
+
+        routes = read_table("routes.txt").with_columns((prefix + pl.col("route_id")).alias("route_id"))
+
+        if "transfers.txt" in names:
+            transfers = read_table("transfers.txt").select(
+                (prefix + pl.col("from_stop_id")).alias("from_stop_id"),
+                (prefix + pl.col("to_stop_id")).alias("to_stop_id"),
+                pl.col("min_transfer_time").cast(pl.Float64).fill_null(0.0)
+            )
+        else:
+            transfers = pl.DataFrame(schema={"from_stop_id": pl.String, "to_stop_id": pl.String, "min_transfer_time": pl.Float64})
+
+    return {
+        "stops": stops,
+        "stop_times": stop_times,
+        "trips": trips,
+        "routes": routes,
+        "transfers": transfers,
+    }
@@ -0,0 +1,704 @@
+import logging
+import pathlib
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from scipy.spatial import cKDTree
+
+from mobility.transport.graphs.core.cpprouting_graph_files import graph_file_hash
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph, prepare_contracted_csr_graph, read_contracted_csr_graph
+from mobility.transport.graphs.core.shortest_path_trees import shortest_path_edges
+from mobility.transport.modes.core.modal_transfer import IntermodalTransfer
+
+# Number of origin vertices combined with the core matrix at once
+ORIGINS_PER_BATCH = 500
+
+# Park and ride rules of prepare_intermodal_public_transport_graph.R
+PARKING_MIN_AREA = 25.0 * 30.0
+PARKING_MAX_DISTANCE = 400.0
+PARKING_EXCLUDED_TAGS = [
+    ("access", "no"),
+    ("access", "employees"),
+    ("access", "private"),
+    ("access", "customers"),
+    ("access", "destination"),
+    ("access", "military"),
+    ("access", "designated"),
+    ("access", "delivery"),
+    ("access", "hgv"),
+    ("hgv", "designated"),
+    ("park_ride", "no"),
+]
+
+TRAVEL_COSTS_COLUMNS = [
+    "from", "to",
+    "start_distance", "mid_distance", "last_distance",
+    "start_real_time", "mid_real_time", "last_real_time",
+    "start_perceived_time", "mid_perceived_time", "last_perceived_time",
+]
+
+
+def compose_intermodal_travel_costs(
+        transport_zones_path: pathlib.Path,
+        core_matrix: pl.DataFrame,
+        stops: pl.DataFrame,
+        first_leg_graph_path: pathlib.Path,
+        last_leg_graph_path: pathlib.Path,
+        first_modal_transfer: IntermodalTransfer,
+        last_modal_transfer: IntermodalTransfer,
+        parameters,
+        osm_parkings_path: pathlib.Path | None = None,
+        baseline_core_matrix: pl.DataFrame | None = None,
+        baseline_travel_costs: pd.DataFrame | None = None
+    ) -> pd.DataFrame:
+    """
+    Compute intermodal public transport travel costs from a shared core matrix.
+
+    Python counterpart of the three layer graph of
+    ``prepare_intermodal_public_transport_graph.R`` and
+    ``compute_intermodal_public_transport_travel_costs.R`` : the access legs
+    (representative buildings to stops) and egress legs (stops to buildings)
+    are routed on the contracted leg graphs, then combined with the stop to
+    stop matrix by min-plus products, keeping the stops that minimise the
+    total perceived time.
+
+    Args:
+        transport_zones_path (pathlib.Path): the transport zones gpkg file.
+        core_matrix (pl.DataFrame): the stop to stop matrix of
+            ``PublicTransportCoreMatrix``.
+        stops (pl.DataFrame): stop_id, x, y (EPSG:3035) of the matrix stops.
+        first_leg_graph_path (pathlib.Path): marker file of the contracted
+            access leg graph.
+        last_leg_graph_path (pathlib.Path): marker file of the contracted
+            egress leg graph.
+        first_modal_transfer (IntermodalTransfer): access leg limits.
+        last_modal_transfer (IntermodalTransfer): egress leg limits.
+        parameters (PublicTransportRoutingParameters): routing parameters.
+        osm_parkings_path (pathlib.Path | None): OSM parkings gpkg file, when
+            the access leg is a car leg (park and ride).
+        baseline_core_matrix (pl.DataFrame | None): core matrix of a
+            baseline timetable, when the core matrix is the one of the
+            baseline plus scenario lines.
+        baseline_travel_costs (pd.DataFrame | None): travel costs computed
+            with baseline_core_matrix. Only the zone pairs that can use a
+            stop pair of the core matrix that differs from the baseline are
+            routed again (see changed_zone_pairs), the costs of the other
+            zone pairs are copied from the baseline.
+
+    Returns:
+        pd.DataFrame: the travel costs, same columns as the R backend
+        (distances in km, times in hours).
+    """
+    buildings = read_buildings(transport_zones_path)
+    building_pairs = zone_pair_buildings(transport_zones_path, buildings, parameters.max_beeline_distance)
+
+    prepare_contracted_csr_graph(first_leg_graph_path)
+    prepare_contracted_csr_graph(last_leg_graph_path)
+    first_csr = read_contracted_csr_graph(first_leg_graph_path)
+    last_csr = read_contracted_csr_graph(last_leg_graph_path)
+
+    first_vertices = graph_vertices(first_csr, first_leg_graph_path)
+    last_vertices = graph_vertices(last_csr, last_leg_graph_path)
+
+    access_stops = stops
+    if osm_parkings_path is not None:
+        access_stops = park_and_ride_stops(stops, osm_parkings_path)
+
+    access_stops = snap_stops(access_stops, first_vertices)
+    egress_stops = snap_stops(stops, last_vertices)
+
+    # Buildings without any stop within reach of the access (or egress) leg
+    # cannot use public transport : the zone pairs left without building
+    # pairs are unreachable and are not routed.
+    origins = stop_catchment_buildings(buildings, first_vertices, access_stops, first_modal_transfer)
+    destinations = stop_catchment_buildings(buildings, last_vertices, egress_stops, last_modal_transfer)
+
+    od_pairs = catchment_od_pairs(building_pairs, origins, destinations)
+
+    n_zone_pairs = building_pairs.select("from", "to").n_unique()
+    n_unreachable = n_zone_pairs - od_pairs.select("from", "to").n_unique()
+    logging.info(
+        "%s zone pairs out of %s have no stop within the access or egress leg limits, they are not routed.",
+        n_unreachable,
+        n_zone_pairs
+    )
+
+    if baseline_core_matrix is not None:
+
+        changed_core = changed_core_entries(baseline_core_matrix, core_matrix)
+
+        logging.info("Finding the zone pairs that can use the %s stop pairs changed by the scenario...", changed_core.height)
+        changed = changed_zone_pairs(
+            od_pairs,
+            changed_core,
+            access_legs(first_csr, first_vertices, od_pairs, access_stops.join(changed_core.select(pl.col("from_stop_id").alias("stop_id")).unique(), on="stop_id", how="semi"), first_modal_transfer),
+            egress_legs(last_csr, last_vertices, od_pairs, egress_stops.join(changed_core.select(pl.col("to_stop_id").alias("stop_id")).unique(), on="stop_id", how="semi"), last_modal_transfer)
+        )
+
+        logging.info("Routing %s zone pairs again, reusing the baseline costs of the other ones.", changed.height)
+        od_pairs = od_pairs.join(changed, on=["from", "to"], how="semi")
+
+    logging.info("Computing the first leg travel times and distances...")
+    access = access_legs(first_csr, first_vertices, od_pairs, access_stops, first_modal_transfer)
+
+    logging.info("Computing the last leg travel times and distances...")
+    egress = egress_legs(last_csr, last_vertices, od_pairs, egress_stops, last_modal_transfer)
+
+    logging.info("Combining the access legs, the public transport core matrix and the egress legs...")
+    paths = min_plus_paths(access, core_matrix, egress, od_pairs.select("origin", "destination").unique())
+
+    modal_transfer_time = 60.0 * (first_modal_transfer.transfer_time + last_modal_transfer.transfer_time)
+    paths = paths.filter(
+        (pl.col("perceived_time") < 3600.0 * parameters.max_traveltime)
+        & (pl.col("perceived_time") + modal_transfer_time < 3600.0 * parameters.max_perceived_time)
+    )
+
+    logging.info("Aggregating results at transport zone level...")
+    costs = aggregate_zone_pairs(od_pairs, paths)
+
+    if baseline_travel_costs is not None:
+        unchanged_costs = (
+            pl.from_pandas(baseline_travel_costs[TRAVEL_COSTS_COLUMNS])
+            .cast({"from": pl.Int64, "to": pl.Int64})
+            .join(changed, on=["from", "to"], how="anti")
+        )
+        costs = (
+            pl.concat([unchanged_costs, pl.from_pandas(costs)], how="vertical_relaxed")
+            .sort(["from", "to"])
+            .to_pandas()
+        )
+
+    return costs
+
+
+def read_buildings(transport_zones_path: pathlib.Path) -> pl.DataFrame:
+    """
+    Return the representative buildings of the transport zones.
+
+    Returns:
+        pl.DataFrame: building_id (from 1, in the order of the buildings
+        file), transport_zone_id, n_clusters, weight, x, y.
+    """
+    buildings_path = transport_zones_path.parent / (
+        transport_zones_path.name.replace("-transport_zones.gpkg", "-transport_zones_buildings.parquet")
+    )
+    return (
+        pl.read_parquet(buildings_path)
+        .with_row_index("building_id", offset=1)
+        .select(
+            pl.col("building_id").cast(pl.Int64),
+            pl.col("transport_zone_id").cast(pl.Int64),
+            pl.col("n_clusters").cast(pl.Int64),
+            pl.col("weight").cast(pl.Float64),
+            pl.col("x").cast(pl.Float64),
+            pl.col("y").cast(pl.Float64)
+        )
+    )
+
+
+def zone_pair_buildings(
+        transport_zones_path: pathlib.Path,
+        buildings: pl.DataFrame,
+        max_beeline_distance: float
+    ) -> pl.DataFrame:
+    """
+    Return the pairs of representative buildings of the transport zone pairs.
+
+    Same rule as the R backend : zone pairs less than max_beeline_distance
+    (km) apart, round(1 + 4 exp(-d / 2 km)) buildings per zone, and no pair
+    within a zone. The number of buildings is capped by the finest level
+    available in each zone.
+
+    Returns:
+        pl.DataFrame: from, to, building_id_from, building_id_to,
+        weight_from, weight_to.
+    """
+    transport_zones = gpd.read_file(transport_zones_path)
+    zones = pl.DataFrame(
+        {
+            "transport_zone_id": transport_zones["transport_zone_id"].to_numpy().astype(np.int64),
+            "x": transport_zones["x"].to_numpy().astype(np.float64),
+            "y": transport_zones["y"].to_numpy().astype(np.float64),
+        }
+    )
+
+    buildings = buildings.with_columns(n_clusters_max=pl.col("n_clusters").max().over("transport_zone_id"))
+
+    zone_pairs = (
+        zones.join(zones, how="cross", suffix="_to")
+        .with_columns(distance=((pl.col("x") - pl.col("x_to")) ** 2 + (pl.col("y") - pl.col("y_to")) ** 2).sqrt())
+        .filter((pl.col("distance") > 0.0) & (pl.col("distance") < max_beeline_distance * 1000.0))
+        .select(
+            pl.col("transport_zone_id").alias("from"),
+            pl.col("transport_zone_id_to").alias("to"),
+            (1.0 + 4.0 * (-pl.col("distance") / 1000.0 / 2.0).exp()).round().cast(pl.Int64).alias("n_clusters")
+        )
+    )
+
+    def level_buildings(zone_column, suffix):
+        return (
+            zone_pairs
+            .join(buildings, left_on=zone_column, right_on="transport_zone_id")
+            .filter(pl.col("n_clusters_right") == pl.min_horizontal("n_clusters", "n_clusters_max"))
+            .select("from", "to", pl.col("building_id").alias("building_id" + suffix), pl.col("weight").alias("weight" + suffix))
+        )
+
+    return (
+        level_buildings("from", "_from")
+        .join(level_buildings("to", "_to"), on=["from", "to"])
+        .filter(pl.col("building_id_from") != pl.col("building_id_to"))
+    )
+
+
+def graph_vertices(csr_graph: CSRGraph, graph_path: pathlib.Path) -> pl.DataFrame:
+    """
+    Return the well connected vertices of a leg graph, with their coordinates.
+
+    Buildings and stops are only snapped to vertices with more than two
+    incoming and outgoing edges and a two-way edge, like in the R backend,
+    to avoid one way dead ends.
+
+    Returns:
+        pl.DataFrame: vertex (cppRouting id), ref, x, y.
+    """
+    from_ids = csr_graph.column("from").astype(np.int64)
+    to_ids = csr_graph.column("to").astype(np.int64)
+    n = csr_graph.n_vertices
+
+    keys = from_ids * n + to_ids
+    two_way = np.isin(keys, to_ids * n + from_ids)
+    n_out = np.bincount(from_ids, minlength=n)
+    n_in = np.bincount(to_ids, minlength=n)
+
+    well_connected_edges = two_way & (n_out[from_ids] > 2) & (n_in[to_ids] > 2)
+    is_from = np.zeros(n, dtype=bool)
+    is_to = np.zeros(n, dtype=bool)
+    is_from[from_ids[well_connected_edges]] = True
+    is_to[to_ids[well_connected_edges]] = True
+
+    graph_dict = pl.from_arrow(csr_graph.vertices).select(
+        pl.col("ref").cast(pl.String),
+        pl.col("id").cast(pl.Int64).alias("vertex")
+    )
+
+    vertices = pl.read_parquet(
+        graph_path.parent.parent / (graph_file_hash(graph_path) + "-vertices.parquet"),
+        columns=["vertex_id", "x", "y"]
+    )
+
+    return (
+        graph_dict
+        .filter(pl.col("vertex").is_in(np.flatnonzero(is_from & is_to)))
+        .join(vertices.select(pl.col("vertex_id").cast(pl.String).alias("ref"), "x", "y"), on="ref")
+        .select("vertex", "ref", "x", "y")
+    )
+
+
+def snap_buildings(buildings: pl.DataFrame, vertices: pl.DataFrame, modal_transfer: IntermodalTransfer) -> pl.DataFrame:
+    """
+    Return the nearest graph vertex of each building.
+
+    Buildings farther from their vertex than max_travel_time at the
+    average_speed of the leg are left out, like in the R backend.
+    """
+    distance, nearest = cKDTree(vertices.select("x", "y").to_numpy()).query(buildings.select("x", "y").to_numpy())
+    max_distance = 1000.0 * modal_transfer.average_speed * modal_transfer.max_travel_time
+
+    return (
+        pl.DataFrame({"building_id": buildings["building_id"], "vertex": vertices["vertex"].to_numpy()[nearest]})
+        .filter(pl.Series(distance < max_distance))
+    )
+
+
+def stop_catchment_buildings(
+        buildings: pl.DataFrame,
+        vertices: pl.DataFrame,
+        stops: pl.DataFrame,
+        modal_transfer: IntermodalTransfer
+    ) -> pl.DataFrame:
+    """
+    Return the buildings that can reach a stop with an access or egress leg.
+
+    Buildings are snapped to the graph with snap_buildings, then only the
+    ones whose vertex has a stop within the candidate radius of
+    leg_travel_costs (1.1 x average_speed x max_travel_time, crow-fly) are
+    kept : the other ones would not get any leg, so dropping them before
+    building the OD pairs does not change the travel costs.
+
+    Args:
+        buildings (pl.DataFrame): building_id, x, y.
+        vertices (pl.DataFrame): vertex, x, y of the leg graph.
+        stops (pl.DataFrame): stop_id, vertex, x, y of the snapped stops.
+        modal_transfer (IntermodalTransfer): leg limits.
+
+    Returns:
+        pl.DataFrame: building_id, vertex.
+    """
+    snapped = snap_buildings(buildings, vertices, modal_transfer).join(vertices.select("vertex", "x", "y"), on="vertex")
+
+    if stops.height == 0 or snapped.height == 0:
+        return snapped.select("building_id", "vertex").clear()
+
+    # query returns an infinite distance when no stop is closer than the
+    # bound, nextafter keeps the stops at exactly the radius like query_ball_tree
+    radius = 1.1 * 1000.0 * modal_transfer.average_speed * modal_transfer.max_travel_time
+    distance, _ = cKDTree(stops.select("x", "y").to_numpy()).query(
+        snapped.select("x", "y").to_numpy(),
+        distance_upper_bound=np.nextafter(radius, np.inf)
+    )
+
+    return snapped.filter(pl.Series(np.isfinite(distance))).select("building_id", "vertex")
+
+
+def catchment_od_pairs(
+        building_pairs: pl.DataFrame,
+        origins: pl.DataFrame,
+        destinations: pl.DataFrame
+    ) -> pl.DataFrame:
+    """
+    Return the building pairs that can use public transport, with their vertices.
+
+    The origin building of a pair only needs an access leg and the
+    destination building only an egress leg : a building in the access
+    catchment but not in the egress one is still an origin.
+
+    Args:
+        building_pairs (pl.DataFrame): output of zone_pair_buildings.
+        origins (pl.DataFrame): building_id, vertex of the buildings with an
+            access leg (see stop_catchment_buildings).
+        destinations (pl.DataFrame): building_id, vertex of the buildings
+            with an egress leg.
+
+    Returns:
+        pl.DataFrame: the columns of building_pairs, origin and destination
+        (vertices of the access and egress leg graphs).
+    """
+    return (
+        building_pairs
+        .join(origins, left_on="building_id_from", right_on="building_id")
+        .join(destinations, left_on="building_id_to", right_on="building_id", suffix="_to")
+        .rename({"vertex": "origin", "vertex_to": "destination"})
+        .filter(pl.col("origin") != pl.col("destination"))
+    )
+
+
+def snap_stops(stops: pl.DataFrame, vertices: pl.DataFrame) -> pl.DataFrame:
+    """Return stop_id, vertex, x, y of the nearest graph vertex of each stop."""
+    _, nearest = cKDTree(vertices.select("x", "y").to_numpy()).query(stops.select("x", "y").to_numpy())
+    return pl.DataFrame(
+        {
+            "stop_id": stops["stop_id"],
+            "vertex": vertices["vertex"].to_numpy()[nearest],
+            "x": vertices["x"].to_numpy()[nearest],
+            "y": vertices["y"].to_numpy()[nearest],
+        }
+    )
+
+
+def park_and_ride_stops(stops: pl.DataFrame, osm_parkings_path: pathlib.Path) -> pl.DataFrame:
+    """Return the stops with a public parking of more than 30 spots less than 400 m away."""
+
+    parkings = gpd.read_file(osm_parkings_path, layer="multipolygons").to_crs(3035)
+    parkings = parkings[parkings.area > PARKING_MIN_AREA]
+
+    excluded_tags = "|".join(f'"{key}"=>"{value}"' for key, value in PARKING_EXCLUDED_TAGS)
+    parkings = parkings[~parkings["other_tags"].fillna("").str.contains(excluded_tags)]
+
+    if len(parkings) == 0:
+        return stops.clear()
+
+    centroids = parkings.centroid
+    parkings_tree = cKDTree(np.column_stack([centroids.x, centroids.y]))
+    distance, _ = parkings_tree.query(stops.select("x", "y").to_numpy(), distance_upper_bound=PARKING_MAX_DISTANCE)
+
+    return stops.filter(pl.Series(np.isfinite(distance)))
+
+
+def leg_travel_costs(
+        csr_graph: CSRGraph,
+        sources: pl.DataFrame,
+        targets: pl.DataFrame,
+        modal_transfer: IntermodalTransfer
+    ) -> pl.DataFrame:
+    """
+    Route an access or egress leg between vertices.
+
+    Candidate pairs are the targets within 1.1 x average_speed x
+    max_travel_time of each source (crow-fly), then paths are searched on
+    the graph up to max_travel_time.
+
+    Args:
+        csr_graph (CSRGraph): the leg graph, travel times in its dist column
+            and distances in its aux column.
+        sources (pl.DataFrame): vertex, x, y of the leg starts.
+        targets (pl.DataFrame): vertex, x, y of the leg ends.
+        modal_transfer (IntermodalTransfer): leg limits.
+
+    Returns:
+        pl.DataFrame: source, target (cppRouting ids), time (s), distance (m).
+    """
+    schema = {"source": pl.Int64, "target": pl.Int64, "time": pl.Float64, "distance": pl.Float64}
+
+    sources = sources.select("vertex", "x", "y").unique("vertex")
+    targets = targets.select("vertex", "x", "y").unique("vertex")
+
+    if sources.height == 0 or targets.height == 0:
+        return pl.DataFrame(schema=schema)
+
+    radius = 1.1 * 1000.0 * modal_transfer.average_speed * modal_transfer.max_travel_time
+    max_time = 3600.0 * modal_transfer.max_travel_time
+
+    neighbours = cKDTree(sources.select("x", "y").to_numpy()).query_ball_tree(
+        cKDTree(targets.select("x", "y").to_numpy()),
+        radius
+    )
+    source_index = np.repeat(np.arange(len(neighbours)), [len(n) for n in neighbours])
+    target_index = np.concatenate([np.asarray(n, dtype=np.int64) for n in neighbours])
+
+    pairs = pl.DataFrame(
+        {
+            "source": sources["vertex"].to_numpy()[source_index],
+            "target": targets["vertex"].to_numpy()[target_index],
+        },
+        schema={"source": pl.Int64, "target": pl.Int64}
+    ).with_row_index("pair_index")
+
+    paths = shortest_path_edges(csr_graph, pairs["source"].to_numpy(), pairs["target"].to_numpy(), limit=max_time)
+
+    edges = pl.DataFrame({"time": csr_graph.column("dist"), "distance": csr_graph.column("aux")}).with_row_index("edge_id")
+
+    costs = (
+        paths
+        .join(edges.with_columns(pl.col("edge_id").cast(pl.Int64)), on="edge_id")
+        .group_by("pair_index")
+        .agg(pl.col("time").sum(), pl.col("distance").sum())
+    )
+
+    return (
+        pairs
+        .join(costs.with_columns(pl.col("pair_index").cast(pl.UInt32)), on="pair_index", how="left")
+        .filter((pl.col("source") == pl.col("target")) | pl.col("time").is_not_null())
+        .with_columns(pl.col("time").fill_null(0.0), pl.col("distance").fill_null(0.0))
+        .filter(pl.col("time") < max_time)
+        .select(list(schema))
+    )
+
+
+def access_legs(
+        csr_graph: CSRGraph,
+        vertices: pl.DataFrame,
+        od_pairs: pl.DataFrame,
+        stops: pl.DataFrame,
+        modal_transfer: IntermodalTransfer
+    ) -> pl.DataFrame:
+    """Return the access legs (origin, stop_id, time, distance) from the origins of the OD pairs to the stops."""
+    legs = leg_travel_costs(
+        csr_graph,
+        vertices.join(od_pairs.select(pl.col("origin").alias("vertex")).unique(), on="vertex", how="semi"),
+        stops,
+        modal_transfer
+    )
+    return (
+        legs
+        .join(stops.select("stop_id", pl.col("vertex").alias("target")), on="target")
+        .select(pl.col("source").alias("origin"), "stop_id", "time", "distance")
+    )
+
+
+def egress_legs(
+        csr_graph: CSRGraph,
+        vertices: pl.DataFrame,
+        od_pairs: pl.DataFrame,
+        stops: pl.DataFrame,
+        modal_transfer: IntermodalTransfer
+    ) -> pl.DataFrame:
+    """Return the egress legs (stop_id, destination, time, distance) from the stops to the destinations of the OD pairs."""
+    legs = leg_travel_costs(
+        csr_graph,
+        stops,
+        vertices.join(od_pairs.select(pl.col("destination").alias("vertex")).unique(), on="vertex", how="semi"),
+        modal_transfer
+    )
+    return (
+        legs
+        .join(stops.select("stop_id", pl.col("vertex").alias("source")), on="source")
+        .select("stop_id", pl.col("target").alias("destination"), "time", "distance")
+    )
+
+
+def changed_core_entries(baseline_core_matrix: pl.DataFrame, core_matrix: pl.DataFrame) -> pl.DataFrame:
+    """
+    Return the stop pairs whose entry differs between two core matrices.
+
+    Entries added, removed or with other times or distances are returned
+    (removed entries with their baseline values) : the summaries are not
+    monotonous, an added trip that lowers min_time more than time raises
+    perceived_time when wait_time_coeff > 1, so any change may change the
+    best journeys.
+    """
+    columns = ["from_stop_id", "to_stop_id", "time", "perceived_time", "distance"]
+    baseline_core_matrix = baseline_core_matrix.select(columns)
+    core_matrix = core_matrix.select(columns)
+
+    return pl.concat(
+        [
+            core_matrix.join(baseline_core_matrix, on=columns, how="anti"),
+            baseline_core_matrix.join(core_matrix, on=["from_stop_id", "to_stop_id"], how="anti")
+        ]
+    )
+
+
+def changed_zone_pairs(
+        od_pairs: pl.DataFrame,
+        changed_core: pl.DataFrame,
+        access: pl.DataFrame,
+        egress: pl.DataFrame
+    ) -> pl.DataFrame:
+    """
+    Return the zone pairs with a building pair that can use a changed stop pair.
+
+    The best journeys of the other building pairs only combine core matrix
+    entries that did not change with the same access and egress legs, so
+    their costs are the baseline costs. The candidates are bounded by the
+    access and egress leg limits : access only has the legs to the first
+    stops of the changed entries, egress the legs from their last stops.
+
+    Args:
+        od_pairs (pl.DataFrame): from, to, origin, destination.
+        changed_core (pl.DataFrame): output of changed_core_entries.
+        access (pl.DataFrame): access legs to the changed first stops.
+        egress (pl.DataFrame): egress legs from the changed last stops.
+
+    Returns:
+        pl.DataFrame: from, to.
+    """
+    paths = min_plus_paths(access, changed_core, egress, od_pairs.select("origin", "destination").unique())
+
+    return (
+        od_pairs
+        .join(paths.select("origin", "destination"), on=["origin", "destination"], how="semi")
+        .select("from", "to")
+        .unique()
+        .sort(["from", "to"])
+    )
+
+
+def min_plus_paths(
+        access: pl.DataFrame,
+        core_matrix: pl.DataFrame,
+        egress: pl.DataFrame,
+        od_pairs: pl.DataFrame
+    ) -> pl.DataFrame:
+    """
+    Combine access legs, stop to stop times and egress legs by min-plus products.
+
+    For each origin, the best first stop of every last stop is kept
+    ((access x core) product), then the best last stop of every destination
+    ((access x core) x egress product). Leg times count as perceived times.
+    Origins are processed in batches to bound the size of the products.
+
+    Args:
+        access (pl.DataFrame): origin, stop_id, time, distance.
+        core_matrix (pl.DataFrame): from_stop_id, to_stop_id, time,
+            perceived_time, distance.
+        egress (pl.DataFrame): stop_id, destination, time, distance.
+        od_pairs (pl.DataFrame): origin, destination pairs to return.
+
+    Returns:
+        pl.DataFrame: origin, destination, perceived_time and the distances,
+        real times and perceived times of each leg (start_, mid_, last_).
+    """
+    core = core_matrix.select(
+        pl.col("from_stop_id").alias("stop_id"),
+        "to_stop_id",
+        pl.col("time").alias("mid_real_time"),
+        pl.col("perceived_time").alias("mid_perceived_time"),
+        pl.col("distance").alias("mid_distance")
+    )
+    egress = egress.select(
+        pl.col("stop_id").alias("to_stop_id"),
+        "destination",
+        pl.col("time").alias("last_real_time"),
+        pl.col("distance").alias("last_distance")
+    )
+
+    origins = od_pairs["origin"].unique().sort().to_numpy()
+    paths = []
+
+    for start in range(0, len(origins), ORIGINS_PER_BATCH):
+
+        batch_origins = pl.Series("origin", origins[start:start + ORIGINS_PER_BATCH])
+
+        first_stops = (
+            access
+            .filter(pl.col("origin").is_in(batch_origins.implode()))
+            .select(
+                "origin",
+                "stop_id",
+                pl.col("time").alias("start_real_time"),
+                pl.col("distance").alias("start_distance")
+            )
+            .join(core, on="stop_id")
+            .with_columns(perceived_time=pl.col("start_real_time") + pl.col("mid_perceived_time"))
+            .sort("perceived_time")
+            .unique(["origin", "to_stop_id"], keep="first")
+        )
+
+        batch_paths = (
+            first_stops
+            .join(egress, on="to_stop_id")
+            .join(od_pairs, on=["origin", "destination"], how="semi")
+            .with_columns(perceived_time=pl.col("perceived_time") + pl.col("last_real_time"))
+            .sort("perceived_time")
+            .unique(["origin", "destination"], keep="first")
+        )
+
+        paths.append(batch_paths)
+
+    schema = {
+        "origin": pl.Int64, "destination": pl.Int64, "perceived_time": pl.Float64,
+        "start_distance": pl.Float64, "mid_distance": pl.Float64, "last_distance": pl.Float64,
+        "start_real_time": pl.Float64, "mid_real_time": pl.Float64, "last_real_time": pl.Float64,
+        "start_perceived_time": pl.Float64, "mid_perceived_time": pl.Float64, "last_perceived_time": pl.Float64,
+    }
+
+    if not paths:
+        return pl.DataFrame(schema=schema)
+
+    return (
+        pl.concat(paths)
+        .with_columns(
+            start_perceived_time=pl.col("start_real_time"),
+            last_perceived_time=pl.col("last_real_time")
+        )
+        .select([pl.col(name).cast(dtype) for name, dtype in schema.items()])
+    )
+
+
+def aggregate_zone_pairs(od_pairs: pl.DataFrame, paths: pl.DataFrame) -> pd.DataFrame:
+    """Average the building pair costs per zone pair, weighted by the building weights."""
+
+    costs = (
+        od_pairs
+        .join(paths, on=["origin", "destination"])
+        .with_columns(prob=pl.col("weight_from") * pl.col("weight_to"))
+        .with_columns(prob=pl.col("prob") / pl.col("prob").sum().over(["from", "to"]))
+        .group_by(["from", "to"])
+        .agg(
+            *[
+                ((pl.col(name) * pl.col("prob")).sum() / 1000.0).alias(name)
+                for name in ["start_distance", "mid_distance", "last_distance"]
+            ],
+            *[
+                ((pl.col(name) * pl.col("prob")).sum() / 3600.0).alias(name)
+                for name in TRAVEL_COSTS_COLUMNS[5:]
+            ]
+        )
+        .sort(["from", "to"])
+        .select(TRAVEL_COSTS_COLUMNS)
+    )
+
+    return costs.to_pandas()
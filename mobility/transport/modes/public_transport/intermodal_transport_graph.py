@@ -77,13 +77,7 @@ class IntermodalTransportGraph(FileAsset):
 
         # Parking supply is only relevant when access to PT starts by car.
         if first_leg_mode_name == "car":
-            inputs["osm_parkings"] = OSMData(
-                transport_zones.study_area,
-                object_type="a",
-                key="parking",
-                boundary_buffer=0.0,
-                geofabrik_extract_date=parkings_geofabrik_extract_date
-            )
+            inputs["osm_parkings"] = self.get_osm_parkings(transport_zones, parkings_geofabrik_extract_date)
         
         file_name = (
             first_leg_mode_name
@@ -140,6 +134,17 @@ class IntermodalTransportGraph(FileAsset):
         return None
     
 
+    @staticmethod
+    def get_osm_parkings(transport_zones: TransportZones, geofabrik_extract_date: str = "260101") -> OSMData:
+        """Return the OSM parkings of the study area, used for park and ride access."""
+        return OSMData(
+            transport_zones.study_area,
+            object_type="a",
+            key="parking",
+            boundary_buffer=0.0,
+            geofabrik_extract_date=geofabrik_extract_date
+        )
+
     def update(self):
         """Refresh the persisted intermodal graph."""
         
@@ -0,0 +1,537 @@
+import itertools
+import os
+import pathlib
+import logging
+
+import numpy as np
+import polars as pl
+
+from pyproj import Transformer
+
+from mobility.runtime.assets.file_asset import FileAsset
+from mobility.transport.modes.public_transport.gtfs.gtfs_router import GTFSRouter
+from mobility.transport.modes.public_transport.gtfs.gtfs_timetable import GTFSTimetable
+from mobility.transport.modes.public_transport.raptor_router import DEFAULT_MAX_ROUNDS, PROFILES_SCHEMA, RaptorRouter
+
+# Departure times of the time window are taken every minute, like the
+# minute-rounded times of the time-expanded graph
+CORE_DEPARTURE_STEP = 60.0
+
+# Percentiles of the travel time over the departure minutes of a window
+TRAVEL_TIME_PERCENTILES = (10, 50, 90)
+
+# The matrix is computed for every pair of stops served by the timetable, so
+# time grows with the square of the number of stops : on one core and for a
+# two hour window, about 6 minutes and 1.7 GB for 1000 stops served by 125
+# lines, about 4 times more time for 2000 stops. Profiles are summarised by
+# batches of origin stops, so memory mostly grows with the size of the matrix.
+MAX_CORE_MATRIX_STOPS = 2_000
+
+
+class PublicTransportCoreMatrix(FileAsset):
+    """
+    Stop to stop public transport travel times of a departure time window.
+
+    The matrix only depends on the GTFS router and on the time window, so it
+    is computed once and shared by all the intermodal variants (walk, bicycle
+    or car access and egress) of a project : each variant then only routes
+    its access and egress legs and combines them with the matrix (see
+    ``intermodal_core_composition.py``).
+
+    Earliest arrival profiles are computed with the RAPTOR router for every
+    minute of the window, then summarised per stop pair over the departure
+    minutes from which the destination stop can be reached within
+    max_traveltime :
+
+    - time : mean travel time, waiting at the first stop included,
+    - min_time : travel time of the fastest journey,
+    - time_p10, time_p50, time_p90 : percentiles of the travel time,
+    - wait_time : mean waiting time (time - min_time),
+    - origin_wait_time, max_origin_wait_time : mean and max time between
+      the departure minute and the latest departure minute reaching the
+      destination as early,
+    - perceived_time : min_time + wait_time_coeff * wait_time,
+    - reachable_share : share of the departure minutes with a journey,
+    - distance : crow-fly distance between the stops.
+
+    Times are in seconds and distances in meters.
+
+    This backend is experimental : every pair of stops of the timetable is
+    routed, so it is limited to timetables serving at most
+    MAX_CORE_MATRIX_STOPS stops. Larger regions should use the
+    intermodal_graph routing backend.
+
+    Other named time windows (off peak hours for example) can be summarised
+    from the same profiles : the RAPTOR pass scans the departure minutes of
+    all the windows at once, and each window gets its own matrix file
+    (see ``get_time_window``).
+
+    When the timetable is a baseline timetable plus scenario lines, the
+    matrix of the baseline can be given : only the origin stops that can
+    reach a stop changed by the scenario are profiled again (see
+    ``scenario_origin_stops``), the rows of the other origins are copied from
+    the baseline matrix.
+
+    Args:
+        gtfs_router (GTFSRouter): the router providing the timetable.
+        start_time_min (float): start of the departure window, in hours.
+        start_time_max (float): end of the departure window, in hours.
+        max_traveltime (float): maximum travel time, in hours.
+        wait_time_coeff (float): perceived cost of one second of waiting.
+        time_windows (dict[str, tuple[float, float]] | None): other
+            departure windows (start and end, in hours) by name.
+        baseline_core_matrix (PublicTransportCoreMatrix | None): matrix of
+            the same windows for the timetable without the scenario lines.
+    """
+
+    def __init__(
+            self,
+            gtfs_router: GTFSRouter,
+            start_time_min: float,
+            start_time_max: float,
+            max_traveltime: float,
+            wait_time_coeff: float,
+            time_windows: dict[str, tuple[float, float]] | None = None,
+            baseline_core_matrix: "PublicTransportCoreMatrix | None" = None
+    ):
+        inputs = {
+            "version": "2",
+            "gtfs_router": gtfs_router,
+            "start_time_min": start_time_min,
+            "start_time_max": start_time_max,
+            "max_traveltime": max_traveltime,
+            "wait_time_coeff": wait_time_coeff,
+            "time_windows": time_windows,
+        }
+
+        if baseline_core_matrix is not None:
+            inputs["baseline_core_matrix"] = baseline_core_matrix
+
+        file_name = "public_transport_core_matrix/public-transport-core-matrix.parquet"
+        cache_path = pathlib.Path(os.environ["MOBILITY_PROJECT_DATA_FOLDER"]) / file_name
+
+        super().__init__(inputs, cache_path)
+
+    def get_cached_asset(self) -> pl.DataFrame:
+        logging.debug("Public transport core matrix already prepared. Reusing the file : " + str(self.cache_path))
+        return pl.read_parquet(self.cache_path)
+
+    def create_and_get_asset(self) -> pl.DataFrame:
+
+        logging.info("Computing the public transport stop to stop travel times...")
+
+        timetable = self.inputs["gtfs_router"].get_timetable()
+        check_core_matrix_size(timetable)
+
+        max_travel_time = self.inputs["max_traveltime"] * 3600.0
+
+        # Window bounds are rounded to the minute so that the departure
+        # minutes of overlapping windows are the same
+        windows = {
+            name: (
+                CORE_DEPARTURE_STEP * round(start * 3600.0 / CORE_DEPARTURE_STEP),
+                CORE_DEPARTURE_STEP * round(end * 3600.0 / CORE_DEPARTURE_STEP)
+            )
+            for name, (start, end) in self.departure_windows().items()
+        }
+
+        start_time = min(start for start, _end in windows.values())
+        end_time = max(end for _start, end in windows.values())
+        departure_times = np.concatenate(
+            [np.arange(start, end + 1e-9, CORE_DEPARTURE_STEP) for start, end in windows.values()]
+        )
+
+        router = RaptorRouter(timetable, start_time=start_time, end_time=end_time + max_travel_time)
+
+        origin_stop_ids = None
+        baseline_matrices = None
+
+        if "baseline_core_matrix" in self.inputs:
+            baseline = self.inputs["baseline_core_matrix"]
+            baseline_matrices = {
+                name: baseline.get() if name is None else baseline.get_time_window(name)
+                for name in windows
+            }
+            scenario_origins = scenario_origin_stops(
+                baseline.inputs["gtfs_router"].get_timetable(),
+                timetable,
+                list(baseline_matrices.values())
+            )
+            boarding_stop_ids = router.boarding_stop_ids()
+            origin_stop_ids = [stop_id for stop_id in boarding_stop_ids if stop_id in scenario_origins]
+            logging.info(
+                "Profiling again the %s stops that can reach a stop changed by the scenario, "
+                "reusing the baseline matrix for the %s other ones.",
+                len(origin_stop_ids),
+                len(boarding_stop_ids) - len(origin_stop_ids)
+            )
+
+        # Profiles are summarised one batch of origin stops at a time, so that
+        # only the matrices are kept in memory (the empty batch gives the
+        # columns of the matrices when no stop can be reached)
+        matrices = {name: [] for name in windows}
+        batches = router.profile_batches(
+            start_time,
+            end_time,
+            origin_stop_ids=origin_stop_ids,
+            departure_step=CORE_DEPARTURE_STEP,
+            max_rounds=DEFAULT_MAX_ROUNDS,
+            max_travel_time=max_travel_time,
+            departure_times=departure_times
+        )
+
+        for profiles in itertools.chain([pl.DataFrame(schema=PROFILES_SCHEMA)], batches):
+            for name, (window_start, window_end) in windows.items():
+                matrices[name].append(
+                    summarise_profiles(
+                        profiles,
+                        window_start,
+                        window_end,
+                        CORE_DEPARTURE_STEP,
+                        max_travel_time,
+                        self.inputs["wait_time_coeff"]
+                    )
+                )
+
+        stops = projected_stops(timetable.stops)
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        for name in windows:
+
+            matrix = (
+                pl.concat(matrices[name])
+                .join(stops.rename({"stop_id": "from_stop_id"}), on="from_stop_id")
+                .join(stops.rename({"stop_id": "to_stop_id"}), on="to_stop_id", suffix="_to")
+                .with_columns(
+                    distance=((pl.col("x") - pl.col("x_to")) ** 2 + (pl.col("y") - pl.col("y_to")) ** 2).sqrt()
+                )
+                .drop(["x", "y", "x_to", "y_to"])
+            )
+
+            if baseline_matrices is not None:
+                matrix = pl.concat(
+                    [
+                        baseline_matrices[name].filter(~pl.col("from_stop_id").is_in(origin_stop_ids)),
+                        matrix
+                    ],
+                    how="vertical_relaxed"
+                )
+
+            matrix = matrix.sort(["from_stop_id", "to_stop_id"])
+
+            if name is None:
+                main_matrix = matrix
+                matrix.write_parquet(self.cache_path)
+            else:
+                matrix.write_parquet(self.time_window_path(name))
+
+        return main_matrix
+
+    def departure_windows(self) -> dict[str | None, tuple[float, float]]:
+        """Return the departure windows, in hours, the main one under the None key."""
+        return {
+            None: (self.inputs["start_time_min"], self.inputs["start_time_max"]),
+            **(self.inputs["time_windows"] or {})
+        }
+
+    def remove(self):
+        super().remove()
+        for time_window in self.inputs["time_windows"] or {}:
+            self.time_window_path(time_window).unlink(missing_ok=True)
+
+    def time_window_path(self, time_window: str) -> pathlib.Path:
+        return self.cache_path.with_name(self.cache_path.stem + "-" + time_window + ".parquet")
+
+    def get_time_window(self, time_window: str) -> pl.DataFrame:
+        """
+        Return the matrix of one of the other time windows.
+
+        Args:
+            time_window (str): name of the window in time_windows.
+
+        Returns:
+            pl.DataFrame: the matrix of the window, with the same columns as
+            the main one.
+        """
+        if time_window not in (self.inputs["time_windows"] or {}):
+            raise ValueError(
+                f"Unknown public transport time window '{time_window}', "
+                f"available windows : {list(self.inputs['time_windows'] or {})}."
+            )
+        self.get()
+        return pl.read_parquet(self.time_window_path(time_window))
+
+    def get_stops(self) -> pl.DataFrame:
+        """Return the stops of the timetable (stop_id, x, y in EPSG:3035)."""
+        timetable_path = self.inputs["gtfs_router"].prepare_timetable()
+        return projected_stops(pl.read_parquet(timetable_path / "stops.parquet"))
+
+
+def scenario_origin_stops(
+        baseline_timetable: GTFSTimetable,
+        timetable: GTFSTimetable,
+        baseline_matrices: list[pl.DataFrame]
+    ) -> set[str]:
+    """
+    Return the origin stops whose profiles may change with scenario lines.
+
+    The changed stops are the stops of the stop times and the origins of the
+    transfers that are not in both timetables, and the stops with a transfer
+    to them. A journey that uses a scenario trip or transfer first reaches
+    one of these stops with the baseline trips only, within the max travel
+    time, so its origin is a changed stop or has an entry to a changed stop
+    in one of the baseline matrices. The profiles of the other origins only
+    use baseline trips and transfers.
+
+    Args:
+        baseline_timetable (GTFSTimetable): timetable without the scenario lines.
+        timetable (GTFSTimetable): timetable with the scenario lines.
+        baseline_matrices (list[pl.DataFrame]): baseline core matrices of all
+            the departure windows.
+
+    Returns:
+        set[str]: the origin stop ids to profile again.
+    """
+    stop_time_columns = ["trip_id", "stop_id", "arrival_time", "departure_time"]
+    transfer_columns = ["from_stop_id", "to_stop_id", "min_transfer_time"]
+
+    baseline_stop_times = baseline_timetable.stop_times.select(stop_time_columns)
+    stop_times = timetable.stop_times.select(stop_time_columns)
+    baseline_transfers = baseline_timetable.transfers.select(transfer_columns)
+    transfers = timetable.transfers.select(transfer_columns)
+
+    changed_stops = pl.concat(
+        [
+            stop_times.join(baseline_stop_times, on=stop_time_columns, how="anti").select("stop_id"),
+            baseline_stop_times.join(stop_times, on=stop_time_columns, how="anti").select("stop_id"),
+            transfers.join(baseline_transfers, on=transfer_columns, how="anti").select(pl.col("from_stop_id").alias("stop_id")),
+            baseline_transfers.join(transfers, on=transfer_columns, how="anti").select(pl.col("from_stop_id").alias("stop_id")),
+        ]
+    ).unique()
+
+    changed_stops = pl.concat(
+        [
+            changed_stops,
+            transfers
+            .join(changed_stops, left_on="to_stop_id", right_on="stop_id", how="semi")
+            .select(pl.col("from_stop_id").alias("stop_id"))
+        ]
+    ).unique()
+
+    reaching_stops = [
+        matrix.join(changed_stops, left_on="to_stop_id", right_on="stop_id", how="semi").select(pl.col("from_stop_id").alias("stop_id"))
+        for matrix in baseline_matrices
+    ]
+
+    return set(pl.concat([changed_stops, *reaching_stops])["stop_id"].to_list())
+
+
+def check_core_matrix_size(timetable: GTFSTimetable, max_stops: int = MAX_CORE_MATRIX_STOPS) -> None:
+    """
+    Raise an error if the timetable serves too many stops for the core matrix.
+
+    Args:
+        timetable (GTFSTimetable): the timetable of the GTFS router.
+        max_stops (int): maximum number of stops with stop times.
+
+    Raises:
+        ValueError: if more than max_stops stops have stop times.
+    """
+    n_stops = timetable.stop_times["stop_id"].n_unique()
+    if n_stops > max_stops:
+        raise ValueError(
+            f"The public transport timetable serves {n_stops} stops, the experimental "
+            f"core_matrix routing backend is limited to {max_stops} stops. "
+            "Use the intermodal_graph routing backend for this region."
+        )
+
+
+def summarise_profiles(
+        profiles: pl.DataFrame,
+        start_time: float,
+        end_time: float,
+        departure_step: float,
+        max_travel_time: float,
+        wait_time_coeff: float
+    ) -> pl.DataFrame:
+    """
+    Summarise earliest arrival profiles over the departure times of a window.
+
+    Profile entries are Pareto optimal and their departure times are on the
+    departure time grid, so the entry of departure k_i gives the earliest
+    arrival of all the grid departures after the one of the previous entry
+    (k_{i-1} < k <= k_i). Travel times are summed per entry in closed form,
+    leaving out the departures for which the arrival is more than
+    max_travel_time later. The profiles can cover a wider window than the
+    summarised one.
+
+    Args:
+        profiles (pl.DataFrame): output of ``RaptorRouter.profiles``.
+        start_time (float): start of the departure window, in seconds.
+        end_time (float): end of the departure window, in seconds.
+        departure_step (float): time between departure times, in seconds.
+        max_travel_time (float): maximum travel time, in seconds.
+        wait_time_coeff (float): perceived cost of one second of waiting.
+
+    Returns:
+        pl.DataFrame: from_stop_id, to_stop_id, time, min_time, the time
+        percentiles, wait_time, origin_wait_time, max_origin_wait_time,
+        perceived_time and reachable_share, for the pairs that can be reached
+        from at least one departure time.
+    """
+    n_departures = int(round((end_time - start_time) / departure_step)) + 1
+
+    entries = (
+        profiles
+        .sort(["from_stop_id", "to_stop_id", "departure_time"])
+        .with_columns(
+            k_departure=((pl.col("departure_time") - start_time) / departure_step).round().cast(pl.Int64)
+        )
+        .with_columns(
+            k_lo=pl.max_horizontal(
+                pl.col("k_departure").shift(1).over(["from_stop_id", "to_stop_id"]).fill_null(-1) + 1,
+                ((pl.col("arrival_time") - max_travel_time - start_time) / departure_step).ceil().cast(pl.Int64),
+                pl.lit(0, pl.Int64)
+            ),
+            k_hi=pl.min_horizontal(pl.col("k_departure"), pl.lit(n_departures - 1, pl.Int64))
+        )
+        .with_columns(n=(pl.col("k_hi") - pl.col("k_lo") + 1).clip(lower_bound=0))
+        .filter(pl.col("n") > 0)
+        .with_columns(
+            total_time=(
+                pl.col("n") * (pl.col("arrival_time") - start_time)
+                - departure_step * (pl.col("k_lo") + pl.col("k_hi")) * pl.col("n") / 2.0
+            ),
+            min_time=pl.col("arrival_time") - start_time - departure_step * pl.col("k_hi"),
+            total_origin_wait_time=(
+                departure_step * pl.col("n") * (pl.col("k_departure") - (pl.col("k_lo") + pl.col("k_hi")) / 2.0)
+            ),
+            max_origin_wait_time=departure_step * (pl.col("k_departure") - pl.col("k_lo"))
+        )
+    )
+
+    matrix = (
+        entries
+        .group_by(["from_stop_id", "to_stop_id"])
+        .agg(
+            time=pl.col("total_time").sum() / pl.col("n").sum(),
+            min_time=pl.col("min_time").min(),
+            origin_wait_time=pl.col("total_origin_wait_time").sum() / pl.col("n").sum(),
+            max_origin_wait_time=pl.col("max_origin_wait_time").max(),
+            reachable_share=pl.col("n").sum() / n_departures
+        )
+        .sort(["from_stop_id", "to_stop_id"])
+    )
+
+    # Entries are sorted like the matrix, so pair indices follow its rows
+    pair_index = (
+        entries
+        .select(
+            ((pl.col("from_stop_id") != pl.col("from_stop_id").shift(1))
+             | (pl.col("to_stop_id") != pl.col("to_stop_id").shift(1)))
+            .fill_null(True)
+            .cum_sum()
+            .cast(pl.Int64)
+            - 1
+        )
+        .to_series()
+        .to_numpy()
+    )
+
+    percentiles = travel_time_percentiles(
+        pair_index,
+        entries["arrival_time"].to_numpy() - start_time,
+        entries["k_lo"].to_numpy(),
+        entries["k_hi"].to_numpy(),
+        departure_step,
+        matrix.height
+    )
+
+    return (
+        matrix
+        .with_columns(
+            [pl.Series(f"time_p{q}", percentiles[:, i]) for i, q in enumerate(TRAVEL_TIME_PERCENTILES)]
+        )
+        .with_columns(wait_time=pl.col("time") - pl.col("min_time"))
+        .with_columns(perceived_time=pl.col("min_time") + wait_time_coeff * pl.col("wait_time"))
+        .select(
+            [
+                "from_stop_id", "to_stop_id", "time", "min_time",
+                *[f"time_p{q}" for q in TRAVEL_TIME_PERCENTILES],
+                "wait_time", "origin_wait_time", "max_origin_wait_time",
+                "perceived_time", "reachable_share"
+            ]
+        )
+    )
+
+
+def travel_time_percentiles(
+        pair_index: np.ndarray,
+        arrival_time: np.ndarray,
+        k_lo: np.ndarray,
+        k_hi: np.ndarray,
+        departure_step: float,
+        n_pairs: int,
+        n_iterations: int = 40
+    ) -> np.ndarray:
+    """
+    Return the TRAVEL_TIME_PERCENTILES of the travel times of profile entries.
+
+    The travel time of departure k of an entry is arrival_time - step * k,
+    so the number of departures of a pair with a travel time below t is a
+    sum of closed form counts over its entries. Percentiles (nearest rank)
+    are found by bisection on t for all the pairs at once, without
+    expanding the entries into one row per departure.
+
+    Args:
+        pair_index (np.ndarray): index of the stop pair of each entry.
+        arrival_time (np.ndarray): arrival time of each entry, relative to
+            the start of the window, in seconds.
+        k_lo (np.ndarray): first departure index of each entry.
+        k_hi (np.ndarray): last departure index of each entry.
+        departure_step (float): time between departure times, in seconds.
+        n_pairs (int): number of stop pairs.
+        n_iterations (int): number of bisection steps.
+
+    Returns:
+        np.ndarray: array of shape (n_pairs, len(TRAVEL_TIME_PERCENTILES)).
+    """
+    n_entry_departures = (k_hi - k_lo + 1).astype(float)
+    n_pair_departures = np.bincount(pair_index, weights=n_entry_departures, minlength=n_pairs)
+
+    lower = np.full(n_pairs, np.inf)
+    upper = np.full(n_pairs, -np.inf)
+    np.minimum.at(lower, pair_index, arrival_time - departure_step * k_hi)
+    np.maximum.at(upper, pair_index, arrival_time - departure_step * k_lo)
+
+    percentiles = np.empty((n_pairs, len(TRAVEL_TIME_PERCENTILES)))
+
+    for i, q in enumerate(TRAVEL_TIME_PERCENTILES):
+
+        rank = np.maximum(np.ceil(q / 100.0 * n_pair_departures - 1e-9), 1.0)
+        lo, hi = lower - 1.0, upper.copy()
+
+        for _ in range(n_iterations):
+            mid = (lo + hi) / 2.0
+            first_k = np.maximum(k_lo, np.ceil((arrival_time - mid[pair_index]) / departure_step))
+            counts = np.bincount(pair_index, weights=np.clip(k_hi - first_k + 1, 0, None), minlength=n_pairs)
+            reached = counts >= rank
+            hi = np.where(reached, mid, hi)
+            lo = np.where(reached, lo, mid)
+
+        # The percentile is the largest travel time not above the bound
+        k = np.clip(np.ceil((arrival_time - hi[pair_index] - 1e-6) / departure_step), k_lo, k_hi)
+        candidates = arrival_time - departure_step * k
+        candidates = np.where(candidates <= hi[pair_index] + 1e-6, candidates, -np.inf)
+        percentiles[:, i] = -np.inf
+        np.maximum.at(percentiles[:, i], pair_index, candidates)
+
+    return percentiles
+
+
+def projected_stops(stops: pl.DataFrame) -> pl.DataFrame:
+    """Return stop_id, x, y of GTFS stops, in EPSG:3035 like the graph vertices."""
+    transformer = Transformer.from_crs(4326, 3035, always_xy=True)
+    x, y = transformer.transform(stops["stop_lon"].to_numpy(), stops["stop_lat"].to_numpy())
+    return pl.DataFrame({"stop_id": stops["stop_id"], "x": np.asarray(x), "y": np.asarray(y)})
@@ -5,7 +5,7 @@ import json
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-from typing import Annotated
+from typing import Annotated, Literal
 
 from importlib import resources
 from pydantic import BaseModel, ConfigDict, Field, model_validator
@@ -19,6 +19,7 @@ from mobility.transport.modes.core.defaults import (
 )
 from .gtfs.gtfs_router import GTFSRouter
 from .gtfs.gtfs_sources import GTFSSources
+from .public_transport_core_matrix import MAX_CORE_MATRIX_STOPS
 from mobility.transport.costs.path.path_travel_costs import PathTravelCosts
 from mobility.transport.modes.core.transport_mode import TransportMode
 from mobility.transport.modes.core.modal_transfer import IntermodalTransfer
@@ -207,11 +208,46 @@ class PublicTransportRoutingParameters(BaseModel):
             ),
         ),
     ]
+    routing_backend: Annotated[
+        Literal["intermodal_graph", "core_matrix"],
+        Field(
+            default="intermodal_graph",
+            description=(
+                "How intermodal travel costs are computed : on one three layer "
+                "graph per access and egress mode combination "
+                "(intermodal_graph), or by combining the access and egress "
+                "legs with a stop to stop matrix shared by all the "
+                "combinations (core_matrix). The core_matrix backend is "
+                "experimental and limited to timetables serving at most "
+                f"{MAX_CORE_MATRIX_STOPS} stops."
+            ),
+        ),
+    ]
+    profile_time_windows: Annotated[
+        dict[str, tuple[float, float]] | None,
+        Field(
+            default=None,
+            description=(
+                "Other departure windows (start and end hours) by name, for "
+                "example {\"off_peak\": (10.0, 16.0)}. Their travel costs "
+                "come from the same RAPTOR pass as the main window "
+                "(core_matrix backend only)."
+            ),
+        ),
+    ]
 
     @model_validator(mode="after")
     def validate_time_window(self) -> "PublicTransportRoutingParameters":
         if self.start_time_max < self.start_time_min:
             raise ValueError("start_time_max should be greater than or equal to start_time_min.")
+        if self.profile_time_windows is not None:
+            if self.routing_backend != "core_matrix":
+                raise ValueError("profile_time_windows requires the core_matrix routing backend.")
+            for name, (start, end) in self.profile_time_windows.items():
+                if not 0.0 <= start <= end <= 24.0:
+                    raise ValueError(
+                        f"Time window '{name}' should start before it ends, between 0 and 24 hours."
+                    )
         if self.additional_gtfs_files == []:
             self.additional_gtfs_files = None
         if self.gtfs_reference_date is None:
@@ -10,10 +10,15 @@ from importlib import resources
 
 from mobility.transport.costs.travel_costs_asset import TravelCostsBase
 from mobility.runtime.assets.file_asset import FileAsset
+from mobility.runtime.r_integration.arrow_exchange import RExchangeFolder, read_exchange_table
 from mobility.runtime.r_integration.r_script_runner import RScriptRunner
 from mobility.spatial.transport_zones import TransportZones
-from mobility.transport.modes.public_transport.public_transport_graph import PublicTransportRoutingParameters
+from mobility.spatial.osm import OSMData
+from mobility.transport.graphs.contracted.contracted_path_graph import ContractedPathGraph
+from mobility.transport.modes.public_transport.public_transport_graph import PublicTransportGraph, PublicTransportRoutingParameters
 from mobility.transport.modes.public_transport.intermodal_transport_graph import IntermodalTransportGraph
+from mobility.transport.modes.public_transport.public_transport_core_matrix import PublicTransportCoreMatrix
+from mobility.transport.modes.public_transport.intermodal_core_composition import compose_intermodal_travel_costs
 from mobility.transport.modes.core.modal_transfer import IntermodalTransfer
 
 class PublicTransportTravelCosts(TravelCostsBase, FileAsset):
@@ -67,25 +72,78 @@ class PublicTransportTravelCosts(TravelCostsBase, FileAsset):
         self.first_leg_mode_name = first_leg_mode_name
         self.last_leg_mode_name = last_leg_mode_name
 
-        intermodal_graph = IntermodalTransportGraph(
-            transport_zones,
-            parameters,
-            first_leg_travel_costs,
-            last_leg_travel_costs,
-            first_leg_mode_name,
-            last_leg_mode_name,
-            first_modal_transfer,
-            last_modal_transfer
-        )
+        if parameters.routing_backend == "core_matrix":
+
+            # Scenario lines (additional GTFS files) only change the costs of
+            # the zone pairs that can use them : the costs without them are
+            # computed once and only these zone pairs are routed again, so
+            # comparing several candidate lines costs one baseline and one
+            # small update per line. The stop to stop matrix is updated the
+            # same way, from the baseline matrix.
+            baseline_travel_costs = None
+            if isinstance(parameters.additional_gtfs_files, list):
+                baseline_travel_costs = PublicTransportTravelCosts(
+                    transport_zones,
+                    parameters.model_copy(update={"additional_gtfs_files": None}),
+                    first_leg_travel_costs,
+                    last_leg_travel_costs,
+                    first_leg_mode_name,
+                    last_leg_mode_name,
+                    first_modal_transfer,
+                    last_modal_transfer
+                )
+
+            # The stop to stop matrix only depends on the GTFS router and on
+            # the time window, so all the access and egress combinations of a
+            # project share the same cached file.
+            gtfs_router = PublicTransportGraph(transport_zones, parameters).inputs["gtfs_router"]
+
+            inputs = {
+                "version": "1",
+                "core_matrix": PublicTransportCoreMatrix(
+                    gtfs_router,
+                    parameters.start_time_min,
+                    parameters.start_time_max,
+                    parameters.max_traveltime,
+                    parameters.wait_time_coeff,
+                    parameters.profile_time_windows,
+                    None if baseline_travel_costs is None else baseline_travel_costs.inputs["core_matrix"]
+                ),
+                "first_leg_graph": first_leg_travel_costs.contracted_path_graph,
+                "last_leg_graph": last_leg_travel_costs.contracted_path_graph,
+                "transport_zones": transport_zones,
+                "first_modal_transfer": first_modal_transfer,
+                "last_modal_transfer": last_modal_transfer,
+                "parameters": parameters
+            }
 
-        inputs = {
-            "version": "1",
-            "intermodal_graph": intermodal_graph,
-            "transport_zones": transport_zones,
-            "first_modal_transfer": first_modal_transfer,
-            "last_modal_transfer": last_modal_transfer,
-            "parameters": parameters
-        }
+            if first_leg_mode_name == "car":
+                inputs["osm_parkings"] = IntermodalTransportGraph.get_osm_parkings(transport_zones)
+
+            if baseline_travel_costs is not None:
+                inputs["baseline_travel_costs"] = baseline_travel_costs
+
+        else:
+
+            intermodal_graph = IntermodalTransportGraph(
+                transport_zones,
+                parameters,
+                first_leg_travel_costs,
+                last_leg_travel_costs,
+                first_leg_mode_name,
+                last_leg_mode_name,
+                first_modal_transfer,
+                last_modal_transfer
+            )
+
+            inputs = {
+                "version": "1",
+                "intermodal_graph": intermodal_graph,
+                "transport_zones": transport_zones,
+                "first_modal_transfer": first_modal_transfer,
+                "last_modal_transfer": last_modal_transfer,
+                "parameters": parameters
+            }
 
         file_name = (
             first_leg_mode_name
@@ -108,18 +166,45 @@ class PublicTransportTravelCosts(TravelCostsBase, FileAsset):
     def create_and_get_asset(self, congestion: bool = False) -> pd.DataFrame:
         """Compute and persist the PT OD costs."""
         
-        costs = self.compute_travel_costs(
-            self.inputs["transport_zones"],
-            self.inputs["intermodal_graph"],
-            self.inputs["first_modal_transfer"],
-            self.inputs["last_modal_transfer"],
-            self.inputs["parameters"]
-        )
-        
+        if "core_matrix" in self.inputs:
+            costs = self.compose_travel_costs(
+                self.inputs["transport_zones"],
+                self.inputs["core_matrix"],
+                self.inputs["first_leg_graph"],
+                self.inputs["last_leg_graph"],
+                self.inputs["first_modal_transfer"],
+                self.inputs["last_modal_transfer"],
+                self.inputs["parameters"],
+                self.inputs.get("osm_parkings"),
+                self.inputs.get("baseline_travel_costs")
+            )
+        else:
+            costs = self.compute_travel_costs(
+                self.inputs["transport_zones"],
+                self.inputs["intermodal_graph"],
+                self.inputs["first_modal_transfer"],
+                self.inputs["last_modal_transfer"],
+                self.inputs["parameters"]
+            )
+
+        # The time window costs were composed with the previous legs
+        self.remove_time_window_costs()
         costs.to_parquet(self.cache_path)
 
         return costs
 
+    def remove(self):
+        super().remove()
+        self.remove_time_window_costs()
+
+    def time_window_path(self, time_window: str) -> pathlib.Path:
+        return self.cache_path.with_name(self.cache_path.stem + "-" + time_window + ".parquet")
+
+    def remove_time_window_costs(self) -> None:
+        """Remove the cached costs of the profile_time_windows (see get_time_window_costs)."""
+        for time_window in self.inputs["parameters"].profile_time_windows or {}:
+            self.time_window_path(time_window).unlink(missing_ok=True)
+
     
     def compute_travel_costs(
             self,
@@ -135,26 +220,116 @@ class PublicTransportTravelCosts(TravelCostsBase, FileAsset):
         
         script = RScriptRunner(resources.files('mobility.transport.modes.public_transport').joinpath('compute_intermodal_public_transport_travel_costs.R'))
         
-        script.run(
-            args=[
-                str(transport_zones.cache_path),
-                str(intermodal_graph.get()),
-                json.dumps(first_modal_transfer.model_dump(mode="json")),
-                json.dumps(last_modal_transfer.model_dump(mode="json")),
-                json.dumps(parameters.model_dump(mode="json")),
-                str(self.cache_path)
-            ]
-        )
-
-        costs = pd.read_parquet(self.cache_path)
+        # The R output is only read back here, the persisted parquet is written
+        # once by create_and_get_asset.
+        with RExchangeFolder("public-transport-travel-costs") as exchange:
+            output_path = exchange.path("travel_costs")
+            script.run(
+                args=[
+                    str(transport_zones.cache_path),
+                    str(intermodal_graph.get()),
+                    json.dumps(first_modal_transfer.model_dump(mode="json")),
+                    json.dumps(last_modal_transfer.model_dump(mode="json")),
+                    json.dumps(parameters.model_dump(mode="json")),
+                    str(output_path)
+                ]
+            )
+            costs = read_exchange_table(output_path).to_pandas()
 
         return costs
     
     
+    def compose_travel_costs(
+            self,
+            transport_zones: TransportZones,
+            core_matrix: PublicTransportCoreMatrix,
+            first_leg_graph: ContractedPathGraph,
+            last_leg_graph: ContractedPathGraph,
+            first_modal_transfer: IntermodalTransfer,
+            last_modal_transfer: IntermodalTransfer,
+            parameters: PublicTransportRoutingParameters,
+            osm_parkings: OSMData = None,
+            baseline_travel_costs: "PublicTransportTravelCosts" = None,
+            time_window: str = None
+        ) -> pd.DataFrame:
+        """
+        Combine the leg travel costs with the shared stop to stop matrix (core_matrix backend).
+
+        When baseline_travel_costs is given (costs without the scenario GTFS
+        files), only the zone pairs that can use a stop pair changed by the
+        scenario are routed again. When time_window is given, the matrix of
+        this window of profile_time_windows is used instead of the main one.
+        """
+
+        logging.info("Computing public transport travel costs from the core matrix...")
+
+        baseline_core_matrix = None
+        baseline_costs = None
+        if baseline_travel_costs is not None:
+            baseline_core_matrix = baseline_travel_costs.inputs["core_matrix"].get()
+            baseline_costs = baseline_travel_costs.get()
+
+        return compose_intermodal_travel_costs(
+            transport_zones.cache_path,
+            core_matrix.get() if time_window is None else core_matrix.get_time_window(time_window),
+            core_matrix.get_stops(),
+            first_leg_graph.get(),
+            last_leg_graph.get(),
+            first_modal_transfer,
+            last_modal_transfer,
+            parameters,
+            None if osm_parkings is None else osm_parkings.get(),
+            baseline_core_matrix,
+            baseline_costs
+        )
+    
+    
+    def get_time_window_costs(self, time_window: str) -> pd.DataFrame:
+        """
+        Return the PT OD costs of one of the profile_time_windows of the parameters.
+
+        The stop to stop times of all the windows come from the single RAPTOR
+        pass of the core matrix, so only the access and egress legs are
+        combined again for each window. The costs are cached next to the
+        main costs, and removed with them or when they are computed again.
+
+        Args:
+            time_window (str): name of the window in profile_time_windows.
+
+        Returns:
+            pd.DataFrame: the OD costs of the window, with the same columns
+            as the main costs.
+        """
+        if "core_matrix" not in self.inputs:
+            raise ValueError("Time window travel costs require the core_matrix routing backend.")
+
+        cache_path = self.time_window_path(time_window)
+
+        if cache_path.exists():
+            logging.debug("Travel costs already prepared. Reusing the file : " + str(cache_path))
+            return pd.read_parquet(cache_path)
+
+        costs = self.compose_travel_costs(
+            self.inputs["transport_zones"],
+            self.inputs["core_matrix"],
+            self.inputs["first_leg_graph"],
+            self.inputs["last_leg_graph"],
+            self.inputs["first_modal_transfer"],
+            self.inputs["last_modal_transfer"],
+            self.inputs["parameters"],
+            self.inputs.get("osm_parkings"),
+            time_window=time_window
+        )
+
+        costs.to_parquet(cache_path)
+
+        return costs
+
     def update(self, od_flows):
         """Refresh the PT asset after one of its dependencies changed."""
         
-        self.inputs["intermodal_graph"].update()
+        if "intermodal_graph" in self.inputs:
+            self.inputs["intermodal_graph"].update()
         self.create_and_get_asset()
 
     def asset_for_road_flows(self, road_flow_asset):
@@ -194,10 +369,13 @@ class PublicTransportTravelCosts(TravelCostsBase, FileAsset):
             return
 
         variant.remove()
-        variant.inputs["intermodal_graph"].remove()
+        if "intermodal_graph" in variant.inputs:
+            variant.inputs["intermodal_graph"].remove()
         
     def audit_gtfs(self):
         """Expose GTFS audit information from the intermodal graph."""
+        if "core_matrix" in self.inputs:
+            return self.inputs["core_matrix"].inputs["gtfs_router"].audit_gtfs()
         return self.inputs["intermodal_graph"].audit_gtfs()
 
     @staticmethod
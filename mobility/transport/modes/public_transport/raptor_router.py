@@ -0,0 +1,690 @@
+import logging
+
+import numpy as np
+import polars as pl
+
+from dataclasses import dataclass
+from typing import Iterator
+from scipy import sparse
+
+from mobility.transport.modes.public_transport.gtfs.gtfs_timetable import GTFSTimetable
+
+# Maximum number of arrival labels ((rounds + 2) x origins x stops) kept in
+# memory for one batch of origins.
+MAX_LABELS_PER_BATCH = 20_000_000
+
+# Maximum number of profile entries (origins x stops x departure times) of one
+# batch of origins, a bound on the size of the profiles of the batch.
+MAX_PROFILE_ENTRIES_PER_BATCH = 10_000_000
+
+# Maximum number of vehicles used in a journey.
+DEFAULT_MAX_ROUNDS = 6
+
+# Columns of the earliest arrival profiles.
+PROFILES_SCHEMA = {
+    "from_stop_id": pl.String,
+    "to_stop_id": pl.String,
+    "departure_time": pl.Float64,
+    "arrival_time": pl.Float64,
+}
+
+# Maximum number of pattern stops x origins scanned at once in a round.
+MAX_SCANNED_SLOTS = 5_000_000
+
+# Offset between the slots of the flattened departure times of the patterns,
+# larger than any time of the day in seconds (timetables can go past 24:00).
+_SLOT_OFFSET = 1.0e6
+
+
+@dataclass
+class RoutePattern:
+    """
+    Trips serving the same sequence of stops, without overtaking.
+
+    Args:
+        stops (np.ndarray): stop indices, in order.
+        departures (np.ndarray): (n_trips, n_stops) departure times, trips
+            sorted by departure.
+        arrivals (np.ndarray): (n_trips, n_stops) arrival times.
+    """
+
+    stops: np.ndarray
+    departures: np.ndarray
+    arrivals: np.ndarray
+
+    @property
+    def n_trips(self) -> int:
+        return self.departures.shape[0]
+
+
+@dataclass
+class _PatternSlots:
+    """
+    Stops of all the route patterns, flattened in one array of slots.
+
+    Slot c is one stop of one pattern, the slots of a pattern follow each
+    other. The departure times of the trips are flattened slot by slot with a
+    growing offset (departure_keys), so that the first trip leaving each slot
+    after a given time is found with a single binary search for all the
+    scanned slots and origins. The arrival times are flattened the same way,
+    with one more inf arrival per slot for "no trip".
+    """
+
+    start: np.ndarray
+    length: np.ndarray
+    stop: np.ndarray
+    n_trips: np.ndarray
+    departure_keys: np.ndarray
+    key_start: np.ndarray
+    arrivals: np.ndarray
+    arrival_start: np.ndarray
+
+    @classmethod
+    def from_patterns(cls, patterns: list[RoutePattern]) -> "_PatternSlots":
+        length = np.array([len(p.stops) for p in patterns], dtype=np.int64)
+        n_trips = np.repeat(np.array([p.n_trips for p in patterns], dtype=np.int64), length)
+        n_slots = int(length.sum())
+
+        departures = [p.departures.T.ravel() for p in patterns]
+        arrivals = [np.hstack([p.arrivals.T, np.full((len(p.stops), 1), np.inf)]).ravel() for p in patterns]
+
+        return cls(
+            start=np.cumsum(length) - length,
+            length=length,
+            stop=np.concatenate([p.stops for p in patterns]).astype(np.int64) if patterns else np.array([], dtype=np.int64),
+            n_trips=n_trips,
+            departure_keys=(
+                np.concatenate(departures) + np.repeat(np.arange(n_slots), n_trips) * _SLOT_OFFSET
+                if patterns else np.array([])
+            ),
+            key_start=np.cumsum(n_trips) - n_trips,
+            arrivals=np.concatenate(arrivals) if patterns else np.array([]),
+            arrival_start=np.cumsum(n_trips + 1) - (n_trips + 1),
+        )
+
+    def scan(
+            self,
+            patterns: np.ndarray,
+            rows: np.ndarray,
+            boarding_times: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the earliest arrivals along some patterns, for some origins.
+
+        Args:
+            patterns (np.ndarray): pattern of each scan.
+            rows (np.ndarray): origin (row of the labels) of each scan.
+            boarding_times (np.ndarray): (n_origins, n_stops) times at which
+                the stops can be left.
+
+        Returns:
+            tuple: the rows, stops and arrival times of the stops reached
+            after the first stop of the scanned patterns.
+        """
+        length = self.length[patterns]
+        scan_of_slot = np.repeat(np.arange(len(patterns)), length)
+        position = np.arange(int(length.sum())) - np.repeat(np.cumsum(length) - length, length)
+        slot = np.repeat(self.start[patterns], length) + position
+        row = rows[scan_of_slot]
+        n_trips = self.n_trips[slot]
+
+        # First trip leaving each stop after the boarding time, none at the
+        # last stop of the pattern
+        boarding = boarding_times[row, self.stop[slot]]
+        trips = np.searchsorted(self.departure_keys, boarding + slot * _SLOT_OFFSET, side="left") - self.key_start[slot]
+        trips = np.minimum(trips, n_trips)
+        trips[position == length[scan_of_slot] - 1] = n_trips[position == length[scan_of_slot] - 1]
+
+        # Trips do not overtake each other : the best trip at a stop is the
+        # earliest one caught at this stop or before. The cumulative minimum
+        # restarts at each scan thanks to an offset decreasing from one scan
+        # to the next.
+        scan_offset = (len(patterns) - scan_of_slot) * (int(self.n_trips.max()) + 1)
+        trips = np.minimum.accumulate(trips + scan_offset) - scan_offset
+
+        alighting = np.flatnonzero(position > 0)
+        arrivals = self.arrivals[self.arrival_start[slot[alighting]] + trips[alighting - 1]]
+
+        return row[alighting], self.stop[slot[alighting]], arrivals
+
+
+class RaptorRouter:
+    """
+    Round-based public transport router working on the columnar GTFS timetable.
+
+    Each round k computes the earliest arrival at every stop with k vehicles
+    (RAPTOR, Delling et al., 2012) : the route patterns serving a stop
+    improved at round k - 1 are scanned once, then transfers between close
+    stops are relaxed. Profiles over a departure window are computed with
+    rRAPTOR : departure times are processed from the latest to the earliest
+    while keeping the labels of the previous run, so that each run only
+    rescans what improved. Origins are routed in batches, one row of labels
+    per origin.
+
+    Journeys follow the same rules as the time-expanded public transport
+    graph : any vehicle leaving a stop after the arrival at this stop can be
+    boarded, and one transfer (as listed in the timetable transfers) can be
+    walked after each vehicle and before the first one.
+
+    Args:
+        timetable (GTFSTimetable): the timetable.
+        start_time (float | None): if given, trips ending before this time
+            (in seconds) are ignored.
+        end_time (float | None): if given, trips starting after this time
+            (in seconds) are ignored.
+    """
+
+    def __init__(
+            self,
+            timetable: GTFSTimetable,
+            start_time: float | None = None,
+            end_time: float | None = None
+        ):
+
+        stop_times = timetable.stop_times
+
+        trips_bounds = stop_times.group_by("trip_id").agg(
+            pl.col("departure_time").min().alias("trip_start"),
+            pl.col("arrival_time").max().alias("trip_end")
+        )
+        if start_time is not None:
+            trips_bounds = trips_bounds.filter(pl.col("trip_end") >= start_time)
+        if end_time is not None:
+            trips_bounds = trips_bounds.filter(pl.col("trip_start") <= end_time)
+
+        stop_times = stop_times.join(trips_bounds.select("trip_id"), on="trip_id", how="semi")
+
+        self.stop_ids = (
+            pl.concat([timetable.stops["stop_id"], stop_times["stop_id"]])
+            .unique(maintain_order=True)
+            .to_numpy()
+        )
+        self.stop_index = {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+
+        self.patterns = self._build_patterns(stop_times)
+        self._slots = _PatternSlots.from_patterns(self.patterns)
+        self._stop_pattern_incidence = self._build_stop_pattern_incidence()
+        self._build_transfers(timetable.transfers)
+
+        logging.info(
+            "RAPTOR router ready : %s stops, %s route patterns, %s trips.",
+            len(self.stop_ids),
+            len(self.patterns),
+            sum(pattern.n_trips for pattern in self.patterns)
+        )
+
+    @property
+    def n_stops(self) -> int:
+        return len(self.stop_ids)
+
+    def _build_patterns(self, stop_times: pl.DataFrame) -> list[RoutePattern]:
+        """Group trips by stop sequence and split patterns where trips overtake each other."""
+
+        stop_times = (
+            stop_times
+            .with_columns(
+                stop=pl.col("stop_id").replace_strict(self.stop_index, return_dtype=pl.Int64)
+            )
+            .sort(["trip_id", "stop_sequence"])
+        )
+
+        trips = (
+            stop_times
+            .group_by("trip_id", maintain_order=True)
+            .agg(
+                pattern_key=pl.col("stop").cast(pl.String).str.join("-"),
+                trip_start=pl.col("departure_time").first(),
+                n_stops=pl.len()
+            )
+            .filter(pl.col("n_stops") >= 2)
+            .sort(["pattern_key", "trip_start", "trip_id"])
+            .with_columns(pattern=pl.col("pattern_key").rank("dense").cast(pl.Int64))
+        )
+
+        stop_times = (
+            stop_times
+            .join(trips.select(["trip_id", "pattern", "trip_start"]), on="trip_id")
+            .sort(["pattern", "trip_start", "trip_id", "stop_sequence"])
+        )
+
+        stop = stop_times["stop"].to_numpy()
+        departures = stop_times["departure_time"].to_numpy()
+        arrivals = stop_times["arrival_time"].to_numpy()
+
+        patterns = []
+        start = 0
+        n_dominated_trips = 0
+
+        for n_trips, n_stops in trips.group_by("pattern", maintain_order=True).agg(pl.len(), pl.col("n_stops").first()).select(["len", "n_stops"]).iter_rows():
+
+            end = start + n_trips * n_stops
+            pattern_stops = stop[start:start + n_stops]
+            pattern_departures = departures[start:end].reshape(n_trips, n_stops)
+            pattern_arrivals = arrivals[start:end].reshape(n_trips, n_stops)
+            start = end
+
+            kept = self._undominated_trips(pattern_departures, pattern_arrivals)
+            n_dominated_trips += n_trips - len(kept)
+            pattern_departures = pattern_departures[kept]
+            pattern_arrivals = pattern_arrivals[kept]
+
+            for trip_rows in self._split_overtaking_trips(pattern_departures, pattern_arrivals):
+                patterns.append(
+                    RoutePattern(pattern_stops, pattern_departures[trip_rows], pattern_arrivals[trip_rows])
+                )
+
+        if n_dominated_trips > 0:
+            logging.info("Dropped %s duplicate or dominated trips from the timetable.", n_dominated_trips)
+
+        return patterns
+
+    @staticmethod
+    def _undominated_trips(departures: np.ndarray, arrivals: np.ndarray) -> np.ndarray:
+        """
+        Return the rows of the trips of a pattern that are not dominated by another trip.
+
+        A trip is dominated when another trip of the pattern leaves every
+        stop at the same time or later and reaches every stop at the same
+        time or earlier : any journey boarding the first one can board the
+        second one instead, so dropping it does not change any earliest
+        arrival. Among identical trips (duplicated by overlapping feeds for
+        example) the last one is kept. Dominated trips are also the ones that
+        would otherwise split the pattern because they are overtaken.
+
+        Args:
+            departures (np.ndarray): (n_trips, n_stops) departure times,
+                trips sorted by departure.
+            arrivals (np.ndarray): (n_trips, n_stops) arrival times.
+
+        Returns:
+            np.ndarray: the rows of the kept trips, in order.
+        """
+        n_trips = departures.shape[0]
+        boardings = departures[:, :-1]
+        alightings = arrivals[:, 1:]
+
+        if np.all(np.diff(boardings, axis=0) >= 0) and np.all(np.diff(alightings, axis=0) >= 0):
+            # Without overtaking, a trip can only be dominated by the next
+            # one, when both reach every stop at the same time
+            dominated = np.append(np.all(alightings[1:] == alightings[:-1], axis=1), False)
+            return np.flatnonzero(~dominated)
+
+        dominated = np.zeros(n_trips, dtype=bool)
+        later = np.arange(n_trips)
+
+        for trip in range(n_trips):
+            as_good = np.all(boardings >= boardings[trip], axis=1) & np.all(alightings <= alightings[trip], axis=1)
+            better = np.any(boardings > boardings[trip], axis=1) | np.any(alightings < alightings[trip], axis=1)
+            dominated[trip] = np.any(as_good & (better | (later > trip)))
+
+        return np.flatnonzero(~dominated)
+
+    @staticmethod
+    def _split_overtaking_trips(departures: np.ndarray, arrivals: np.ndarray) -> list[np.ndarray]:
+        """Split trips in groups where no trip overtakes another one."""
+
+        if np.all(np.diff(departures, axis=0) >= 0) and np.all(np.diff(arrivals, axis=0) >= 0):
+            return [np.arange(departures.shape[0])]
+
+        groups = []
+        for trip in range(departures.shape[0]):
+            for group in groups:
+                last = group[-1]
+                if np.all(departures[last] <= departures[trip]) and np.all(arrivals[last] <= arrivals[trip]):
+                    group.append(trip)
+                    break
+            else:
+                groups.append([trip])
+
+        return [np.array(group) for group in groups]
+
+    def _build_stop_pattern_incidence(self) -> sparse.csr_matrix:
+        """Return the (n_patterns, n_stops) matrix of the stops where each pattern can be boarded."""
+        rows = np.concatenate([np.full(len(p.stops) - 1, i) for i, p in enumerate(self.patterns)]) if self.patterns else np.array([], dtype=np.int64)
+        cols = np.concatenate([p.stops[:-1] for p in self.patterns]) if self.patterns else np.array([], dtype=np.int64)
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.patterns), self.n_stops)
+        )
+
+    def _build_transfers(self, transfers: pl.DataFrame) -> None:
+        """Index the transfers between known stops, grouped by destination stop."""
+
+        transfers = (
+            transfers
+            .filter(
+                pl.col("from_stop_id").is_in(list(self.stop_index))
+                & pl.col("to_stop_id").is_in(list(self.stop_index))
+                & (pl.col("from_stop_id") != pl.col("to_stop_id"))
+            )
+            .with_columns(
+                transfer_from=pl.col("from_stop_id").replace_strict(self.stop_index, return_dtype=pl.Int64),
+                transfer_to=pl.col("to_stop_id").replace_strict(self.stop_index, return_dtype=pl.Int64)
+            )
+            .sort("transfer_to")
+        )
+
+        self._transfer_from = transfers["transfer_from"].to_numpy()
+        self._transfer_time = transfers["min_transfer_time"].to_numpy()
+        transfer_to = transfers["transfer_to"].to_numpy()
+        self._transfer_targets, self._transfer_starts = np.unique(transfer_to, return_index=True)
+
+    def earliest_arrivals(
+            self,
+            origin_stop_ids: list[str],
+            departure_time: float,
+            max_rounds: int = DEFAULT_MAX_ROUNDS
+        ) -> np.ndarray:
+        """
+        Return the earliest arrival time at every stop for one departure time.
+
+        Args:
+            origin_stop_ids (list[str]): the origin stops.
+            departure_time (float): departure time from the origins, in seconds.
+            max_rounds (int): maximum number of vehicles per journey.
+
+        Returns:
+            np.ndarray: (n_origins, n_stops) arrival times in seconds, in the
+            order of ``stop_ids``, inf for unreachable stops.
+        """
+        origins = self._origin_indices(origin_stop_ids)
+        labels = _RaptorLabels(len(origins), self.n_stops, max_rounds)
+        self._run(labels, origins, departure_time, max_rounds, np.inf)
+        return labels.best
+
+    def profiles(
+            self,
+            start_time: float,
+            end_time: float,
+            origin_stop_ids: list[str] | None = None,
+            departure_step: float = 60.0,
+            max_rounds: int = DEFAULT_MAX_ROUNDS,
+            max_travel_time: float = np.inf,
+            departure_times: np.ndarray | None = None
+        ) -> pl.DataFrame:
+        """
+        Return the stop to stop earliest arrival profiles of a departure window.
+
+        Departure times are taken every departure_step seconds between
+        start_time and end_time. Only Pareto optimal entries are returned :
+        an entry (departure_time, arrival_time) is dropped when leaving at the
+        next departure time arrives at the same time. The earliest arrival
+        when leaving at time t is the smallest arrival_time of the entries
+        with departure_time >= t.
+
+        Args:
+            start_time (float): start of the departure window, in seconds.
+            end_time (float): end of the departure window, in seconds.
+            origin_stop_ids (list[str] | None): the origin stops, all stops
+                with departures if None.
+            departure_step (float): time between departure times, in seconds.
+            max_rounds (int): maximum number of vehicles per journey.
+            max_travel_time (float): journeys longer than this (in seconds)
+                are not returned.
+            departure_times (np.ndarray | None): departure times to use
+                instead of the regular grid of the window, for example the
+                grids of several disjoint windows. Departures are still
+                scanned from the latest to the earliest, so the windows share
+                one pass.
+
+        Returns:
+            pl.DataFrame: from_stop_id, to_stop_id, departure_time, arrival_time.
+        """
+        profiles = list(
+            self.profile_batches(
+                start_time,
+                end_time,
+                origin_stop_ids,
+                departure_step,
+                max_rounds,
+                max_travel_time,
+                departure_times
+            )
+        )
+
+        return pl.concat([pl.DataFrame(schema=PROFILES_SCHEMA), *profiles]).sort(["from_stop_id", "to_stop_id", "departure_time"])
+
+    def profile_batches(
+            self,
+            start_time: float,
+            end_time: float,
+            origin_stop_ids: list[str] | None = None,
+            departure_step: float = 60.0,
+            max_rounds: int = DEFAULT_MAX_ROUNDS,
+            max_travel_time: float = np.inf,
+            departure_times: np.ndarray | None = None
+        ) -> Iterator[pl.DataFrame]:
+        """
+        Yield the profiles of ``profiles`` one batch of origin stops at a time.
+
+        Each origin stop is in a single batch, so the profiles of large
+        timetables can be summarised batch by batch without keeping all of
+        them in memory. Arguments are the ones of ``profiles``.
+
+        Yields:
+            pl.DataFrame: from_stop_id, to_stop_id, departure_time,
+            arrival_time, for the origins of one batch, unsorted.
+        """
+        if origin_stop_ids is None:
+            origin_stop_ids = self.boarding_stop_ids()
+
+        origins = self._origin_indices(origin_stop_ids)
+        if departure_times is None:
+            departure_times = np.arange(start_time, end_time + 1e-9, departure_step)
+        departure_times = np.unique(np.asarray(departure_times, dtype=float))[::-1]
+
+        batch_size = max(
+            1,
+            min(
+                MAX_LABELS_PER_BATCH // ((max_rounds + 2) * max(self.n_stops, 1)),
+                MAX_PROFILE_ENTRIES_PER_BATCH // max(self.n_stops * len(departure_times), 1)
+            )
+        )
+        stop_ids = pl.Series(self.stop_ids, dtype=pl.String)
+
+        logging.info(
+            "Computing earliest arrival profiles from %s stops for %s departure times...",
+            len(origins),
+            len(departure_times)
+        )
+
+        for start in range(0, len(origins), batch_size):
+
+            profiles = []
+            batch_origins = origins[start:start + batch_size]
+            labels = _RaptorLabels(len(batch_origins), self.n_stops, max_rounds)
+
+            for departure_time in departure_times:
+
+                previous_best = labels.best.copy()
+                self._run(labels, batch_origins, departure_time, max_rounds, departure_time + max_travel_time)
+
+                improved = labels.best < previous_best
+                improved[np.arange(len(batch_origins)), batch_origins] = False
+                rows, stops = np.nonzero(improved)
+
+                if len(rows) > 0:
+                    profiles.append(
+                        pl.DataFrame(
+                            {
+                                "from_stop": batch_origins[rows].astype(np.int32),
+                                "to_stop": stops.astype(np.int32),
+                                "departure_time": np.full(len(rows), departure_time),
+                                "arrival_time": labels.best[rows, stops],
+                            }
+                        )
+                    )
+
+            if profiles:
+                profiles = pl.concat(profiles)
+                yield pl.DataFrame(
+                    {
+                        "from_stop_id": stop_ids.gather(profiles["from_stop"]),
+                        "to_stop_id": stop_ids.gather(profiles["to_stop"]),
+                        "departure_time": profiles["departure_time"],
+                        "arrival_time": profiles["arrival_time"],
+                    }
+                )
+
+    def boarding_stop_ids(self) -> list[str]:
+        """Return the stops served by at least one route pattern, the default profile origins."""
+        boarding_stops = np.flatnonzero(np.asarray(self._stop_pattern_incidence.sum(axis=0)).ravel() > 0)
+        return self.stop_ids[boarding_stops].tolist()
+
+    def _origin_indices(self, origin_stop_ids: list[str]) -> np.ndarray:
+        unknown = [stop_id for stop_id in origin_stop_ids if stop_id not in self.stop_index]
+        if unknown:
+            raise ValueError(f"Unknown origin stops : {unknown[:10]}")
+        return np.array([self.stop_index[stop_id] for stop_id in origin_stop_ids], dtype=np.int64)
+
+    def _run(
+            self,
+            labels: "_RaptorLabels",
+            origins: np.ndarray,
+            departure_time: float,
+            max_rounds: int,
+            max_arrival_time: float
+        ) -> None:
+        """Run the RAPTOR rounds for one departure time, on top of the current labels."""
+
+        rows = np.arange(len(origins))
+        marked = np.zeros(labels.best.shape, dtype=bool)
+        ride_marked = np.zeros(labels.best.shape, dtype=bool)
+
+        # The origins are handled like vehicle arrivals : a transfer can be
+        # walked before the first vehicle.
+        improved = departure_time < labels.best_ride[rows, origins]
+        labels.best_ride[rows[improved], origins[improved]] = departure_time
+        ride_marked[rows[improved], origins[improved]] = True
+        ride_arrivals = np.full(labels.best.shape, np.inf)
+        ride_arrivals[rows, origins] = departure_time
+
+        improved = departure_time < labels.best[rows, origins]
+        labels.rounds[0][rows[improved], origins[improved]] = departure_time
+        labels.best[rows[improved], origins[improved]] = departure_time
+        marked[rows[improved], origins[improved]] = True
+
+        self._relax_transfers(labels, 0, ride_arrivals, ride_marked, marked, max_arrival_time)
+
+        for k in range(1, max_rounds + 1):
+
+            if not marked.any():
+                break
+
+            new_marked = np.zeros_like(marked)
+            ride_marked = np.zeros_like(marked)
+            ride_arrivals = np.full(labels.best.shape, np.inf)
+
+            # Each pattern is only scanned for the origins with a stop of the
+            # pattern marked at the previous round : with the labels kept
+            # between departure times, the other origins cannot improve.
+            scans = (self._stop_pattern_incidence @ sparse.csr_matrix(marked.T, dtype=np.float64)).tocoo()
+            if scans.nnz == 0:
+                break
+            scan_patterns = scans.row.astype(np.int64)
+            scan_rows = scans.col.astype(np.int64)
+
+            # All the patterns are scanned at once, by chunks to bound memory
+            scanned_slots = np.cumsum(self._slots.length[scan_patterns])
+            chunk_bounds = np.searchsorted(scanned_slots, np.arange(MAX_SCANNED_SLOTS, scanned_slots[-1], MAX_SCANNED_SLOTS))
+            chunk_bounds = np.unique(np.concatenate([[0], chunk_bounds, [len(scan_patterns)]]))
+
+            for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:]):
+                rows, stops, arrivals = self._slots.scan(
+                    scan_patterns[start:end],
+                    scan_rows[start:end],
+                    labels.rounds[k - 1]
+                )
+                reached = arrivals <= max_arrival_time
+                rows, stops, arrivals = rows[reached], stops[reached], arrivals[reached]
+
+                labels.update_rides(rows, stops, arrivals, ride_arrivals, ride_marked)
+                labels.update(k, rows, stops, arrivals, new_marked)
+
+            self._relax_transfers(labels, k, ride_arrivals, ride_marked, new_marked, max_arrival_time)
+            marked = new_marked
+
+    def _relax_transfers(
+            self,
+            labels: "_RaptorLabels",
+            k: int,
+            ride_arrivals: np.ndarray,
+            ride_marked: np.ndarray,
+            marked: np.ndarray,
+            max_arrival_time: float
+        ) -> None:
+        """Walk one transfer from the stops where a vehicle arrival improved at round k."""
+
+        if len(self._transfer_from) == 0:
+            return
+
+        rows = np.flatnonzero(ride_marked.any(axis=1))
+        if len(rows) == 0:
+            return
+
+        from_marked = ride_marked[np.ix_(rows, self._transfer_from)]
+        if not from_marked.any():
+            return
+
+        arrivals = np.where(
+            from_marked,
+            ride_arrivals[np.ix_(rows, self._transfer_from)] + self._transfer_time,
+            np.inf
+        )
+        arrivals = np.minimum.reduceat(arrivals, self._transfer_starts, axis=1)
+
+        improved_rows, improved_targets = np.nonzero(arrivals <= max_arrival_time)
+        labels.update(
+            k,
+            rows[improved_rows],
+            self._transfer_targets[improved_targets],
+            arrivals[improved_rows, improved_targets],
+            marked
+        )
+
+
+class _RaptorLabels:
+    """
+    Arrival labels of a batch of origins.
+
+    Transfers are not chained, so the best arrival by vehicle at each stop
+    (best_ride) is kept apart from the best arrival by any mean (best, per
+    round in rounds) : a transfer can start from a vehicle arrival that is
+    later than a walked arrival at the same stop.
+    """
+
+    def __init__(self, n_origins: int, n_stops: int, max_rounds: int):
+        self.rounds = [np.full((n_origins, n_stops), np.inf) for _ in range(max_rounds + 1)]
+        self.best = np.full((n_origins, n_stops), np.inf)
+        self.best_ride = np.full((n_origins, n_stops), np.inf)
+
+    def update(self, k: int, rows: np.ndarray, stops: np.ndarray, arrivals: np.ndarray, marked: np.ndarray) -> None:
+        """Keep the arrivals at round k that improve the best arrival at their stop."""
+        rows, stops, arrivals = _best_improvements(self.best, rows, stops, arrivals)
+        self.rounds[k][rows, stops] = arrivals
+        self.best[rows, stops] = arrivals
+        marked[rows, stops] = True
+
+    def update_rides(self, rows: np.ndarray, stops: np.ndarray, arrivals: np.ndarray, ride_arrivals: np.ndarray, ride_marked: np.ndarray) -> None:
+        """Keep the vehicle arrivals that improve the best vehicle arrival at their stop."""
+        rows, stops, arrivals = _best_improvements(self.best_ride, rows, stops, arrivals)
+        self.best_ride[rows, stops] = arrivals
+        ride_arrivals[rows, stops] = arrivals
+        ride_marked[rows, stops] = True
+
+
+def _best_improvements(
+        best: np.ndarray,
+        rows: np.ndarray,
+        stops: np.ndarray,
+        arrivals: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the earliest of the arrivals at each (row, stop) that improve the best ones."""
+    improved = arrivals < best[rows, stops]
+    rows, stops, arrivals = rows[improved], stops[improved], arrivals[improved]
+
+    order = np.argsort(arrivals, kind="stable")
+    _, first = np.unique(rows[order] * best.shape[1] + stops[order], return_index=True)
+    kept = order[first]
+
+    return rows[kept], stops[kept], arrivals[kept]
@@ -128,7 +128,10 @@ class PopulationGroupDayTrips:
                 activities=self.activities,
                 modes=self.modes,
             )
-            transport_costs = TransportCosts(self.modes)
+            if parameters.destination_sequences.lazy_od_costs:
+                transport_costs = TransportCosts(self.modes, od_support=TransportCosts.project_od_support())
+            else:
+                transport_costs = TransportCosts(self.modes)
             is_weekday = day_type is DayType.WEEKDAY
             self._runs[key] = Run(
                 population=self.population,
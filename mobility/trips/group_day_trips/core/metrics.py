@@ -4665,6 +4665,9 @@ class RunMetrics:
     def car_traffic(self, *args, **kwargs):
         return CarTrafficEvaluation(self.results).get(*args, **kwargs)
 
+    def car_traffic_counts(self, *args, **kwargs):
+        return CarTrafficEvaluation(self.results).compare_to_counts(*args, **kwargs)
+
     def travel_costs(self, *args, **kwargs):
         return TravelCostsEvaluation(self.results).get(*args, **kwargs)
 
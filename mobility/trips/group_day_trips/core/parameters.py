@@ -325,6 +325,18 @@ class GroupDayTripsDestinationSequenceParameters(BaseModel):
             description="Standard deviation used to spread destination opportunities around OD point costs.",
         ),
     ]
+    lazy_od_costs: Annotated[
+        bool,
+        Field(
+            default=False,
+            title="Lazy OD costs",
+            description=(
+                "Whether to compute transport costs only for the OD pairs destination sampling "
+                "asks for (from the origins it meets to the zones with opportunities, and the "
+                "onward legs of the sampled sequences), instead of all the pairs of the study area."
+            ),
+        ),
+    ]
 
 
 class GroupDayTripsModeSequenceParameters(BaseModel):
@@ -1,10 +1,15 @@
 import logging
 
+import numpy as np
 import polars as pl
 import geopandas as gpd
 
 from shapely import linestrings
 
+from mobility.transport.graphs.core.cpprouting_graph_files import read_cppr_graph_tables
+from mobility.transport.graphs.core.csr_graph_store import prepare_csr_graph, read_csr_graph
+from mobility.transport.graphs.core.od_link_incidence import ODLinkIncidence
+
 class CarTrafficEvaluation:
     
     def __init__(self, results):
@@ -18,24 +23,8 @@ class CarTrafficEvaluation:
         if iteration is None:
             iteration = int(self.results.parameters.run.n_iterations)
 
-        car_mode = [m for m in self.results.modes if m.inputs["parameters"].name == "car"]
-        
-        if len(car_mode) == 0:
-            raise ValueError("No car mode in the model.")
-            
-        car_mode = car_mode[0]
-        travel_costs = car_mode.inputs["travel_costs"]
-
-        iteration_transport_costs = self.results.run.iteration_transport_cost_assets[
-            iteration - 1
-        ]
-        road_flow_asset = iteration_transport_costs.congestion_flows.get()
-        if road_flow_asset is None:
-            congested_graph_asset = travel_costs.inputs["congested_path_graph"]
-        else:
-            congested_graph_asset = travel_costs.asset_for_road_flows(
-                road_flow_asset
-            ).inputs["congested_path_graph"]
+        travel_costs = self.get_car_travel_costs()
+        congested_graph_asset = self.get_congested_graph_asset(iteration)
 
         freeflow_graph = self.build_graph_lines_dataframe(travel_costs.modified_path_graph)
         congested_graph = self.build_graph_lines_dataframe(congested_graph_asset)
@@ -76,21 +65,177 @@ class CarTrafficEvaluation:
         return None
     
     
+    def get_car_travel_costs(self):
+        
+        car_mode = [m for m in self.results.modes if m.inputs["parameters"].name == "car"]
+        
+        if len(car_mode) == 0:
+            raise ValueError("No car mode in the model.")
+            
+        return car_mode[0].inputs["travel_costs"]
+    
+    
+    def get_road_flow_asset(self, iteration: int):
+        
+        iteration_transport_costs = self.results.run.iteration_transport_cost_assets[
+            iteration - 1
+        ]
+        return iteration_transport_costs.congestion_flows.get()
+    
+    
+    def get_congested_graph_asset(self, iteration: int):
+        
+        travel_costs = self.get_car_travel_costs()
+        road_flow_asset = self.get_road_flow_asset(iteration)
+        
+        if road_flow_asset is None:
+            return travel_costs.inputs["congested_path_graph"]
+        
+        return travel_costs.asset_for_road_flows(
+            road_flow_asset
+        ).inputs["congested_path_graph"]
+    
+    
+    def get_link_flows(
+            self,
+            iterations: list[int] | None = None,
+            graph_iteration: int | None = None
+        ) -> pl.DataFrame:
+        """
+        Load the road vehicle OD flows of iterations on the links of a graph.
+        
+        The flows are loaded all-or-nothing on the shortest paths of the
+        congested graph of ``graph_iteration``, through a sparse OD-to-link
+        incidence matrix (see ``ODLinkIncidence``). The matrix is cached next
+        to the graph, so other flow tables are loaded without routing again.
+        
+        Args:
+            iterations: Iterations whose vehicle flows are loaded (the flows
+                that were assigned at the start of each iteration). All the
+                iterations with flows are loaded if None.
+            graph_iteration: Iteration of the congested graph used to route
+                the flows, the last iteration if None.
+        
+        Returns:
+            pl.DataFrame: one row per edge, with the edge_id and one
+            flow_iter_<i> column per iteration.
+        """
+        n_iterations = int(self.results.parameters.run.n_iterations)
+        if graph_iteration is None:
+            graph_iteration = n_iterations
+        if iterations is None:
+            iterations = list(range(1, n_iterations + 1))
+        
+        flows = {}
+        for iteration in iterations:
+            road_flow_asset = self.get_road_flow_asset(iteration)
+            if road_flow_asset is not None:
+                flows[iteration] = pl.DataFrame(road_flow_asset.get())
+        
+        if not flows:
+            raise ValueError("No road vehicle flows for the requested iterations.")
+        
+        od_pairs = pl.concat([f.select(["from", "to"]) for f in flows.values()]).unique()
+        incidence = self.get_od_link_incidence(self.get_congested_graph_asset(graph_iteration), od_pairs)
+        
+        link_flows = pl.DataFrame({"edge_id": np.arange(incidence.matrix.shape[0], dtype=np.uint32)})
+        for iteration, iteration_flows in flows.items():
+            link_flows = link_flows.with_columns(
+                pl.Series(f"flow_iter_{iteration}", incidence.load(iteration_flows))
+            )
+        
+        return link_flows
+    
+    
+    def compare_to_counts(
+            self,
+            counts: pl.DataFrame,
+            iterations: list[int] | None = None,
+            graph_iteration: int | None = None
+        ) -> pl.DataFrame:
+        """
+        Compare modelled link flows to traffic counts.
+        
+        Args:
+            counts: Counted vehicle volumes, with edge_id (cppRouting edge
+                order of the car graph) and count columns.
+            iterations: Iterations to evaluate, see ``get_link_flows``.
+            graph_iteration: Iteration of the graph used to route the flows.
+        
+        Returns:
+            pl.DataFrame: the counts with, for each iteration, the modelled
+            flow (flow_iter_<i>) and its GEH statistic (geh_iter_<i>).
+        """
+        link_flows = self.get_link_flows(iterations, graph_iteration)
+        
+        comparison = counts.with_columns(pl.col("edge_id").cast(pl.UInt32)).join(link_flows, on="edge_id", how="left")
+        
+        for col in [c for c in link_flows.columns if c.startswith("flow_iter_")]:
+            geh_col = col.replace("flow_", "geh_")
+            comparison = comparison.with_columns(
+                (
+                    2.0 * (pl.col(col) - pl.col("count")).pow(2)
+                    / (pl.col(col) + pl.col("count")).clip(lower_bound=1e-9)
+                ).sqrt().alias(geh_col)
+            )
+        
+        return comparison
+    
+    
+    def get_od_link_incidence(self, path_graph, od_pairs: pl.DataFrame) -> ODLinkIncidence:
+        
+        graph_file_token = path_graph.cache_path
+        graph_file_hash = graph_file_token.stem.split("-")[0]
+        incidence_path = graph_file_token.parent / (graph_file_hash + "-od-link-incidence")
+        
+        od_pairs = od_pairs.select(pl.col("from").cast(pl.Int64), pl.col("to").cast(pl.Int64))
+        
+        if incidence_path.exists():
+            incidence = ODLinkIncidence.read(incidence_path)
+            missing = od_pairs.join(
+                incidence.od_pairs,
+                on=["from", "to"],
+                how="anti"
+            )
+            if missing.height == 0:
+                return incidence
+            od_pairs = pl.concat([incidence.od_pairs, od_pairs]).unique()
+        
+        transport_zones = self.results.transport_zones
+        transport_zones_hash = transport_zones.cache_path.stem.split("-")[0]
+        buildings = pl.read_parquet(
+            transport_zones.cache_path.parent / (transport_zones_hash + "-transport_zones_buildings.parquet")
+        )
+        od_vertex_map = pl.read_parquet(
+            graph_file_token.parent.parent / (graph_file_hash + "-od-vertex-map.parquet")
+        )
+        
+        prepare_csr_graph(graph_file_token)
+        incidence = ODLinkIncidence.build(
+            read_csr_graph(graph_file_token),
+            od_pairs,
+            buildings,
+            od_vertex_map
+        )
+        incidence.save(incidence_path)
+        
+        return incidence
+    
+    
     def build_graph_lines_dataframe(self, path_graph):
         
         graph_file_token = path_graph.cache_path
         graph_file_folder = graph_file_token.parent
         graph_file_hash = graph_file_token.stem.split("-")[0]
         
-        graph_data_path = graph_file_folder / (graph_file_hash + "data.parquet")
-        graph_dict_path = graph_file_folder / (graph_file_hash + "dict.parquet")
+        graph_data, graph_dict, _ = read_cppr_graph_tables(graph_file_token)
         
         graph_data = ( 
-            pl.read_parquet(graph_data_path)
+            pl.from_pandas(graph_data)
             .with_row_index("edge_id")
         )
             
-        graph_dict = pl.read_parquet(graph_dict_path)
+        graph_dict = pl.from_pandas(graph_dict)
         
         vertices_path = graph_file_folder.parent / (graph_file_hash + "-vertices.parquet")
         vertices = pl.read_parquet(vertices_path)
@@ -1,4 +1,3 @@
-import json
 import logging
 
 import polars as pl
@@ -6,16 +5,16 @@ import geopandas as gpd
 
 from typing import List
 from shapely import linestrings
-from importlib import resources
 from sklearn.neighbors import NearestNeighbors
-from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+from mobility.transport.graphs.core.csr_graph_store import prepare_csr_graph_by_hash, read_csr_graph_by_hash
+from mobility.transport.graphs.core.shortest_path_trees import shortest_path_edges
 
 class RoutingEvaluation:
     """
     Evaluate routing results by generating and analyzing route geometries based on graph data.
     
     This class handles route conversion, snapping to transport graphs, computing shortest paths
-    using cpprouting, and exporting routes as GeoPackage layers for visualization or analysis.
+    on the CSR copy of the graph, and exporting routes as GeoPackage layers for visualization or analysis.
     """
     
     def __init__(self, results):
@@ -64,9 +63,11 @@ class RoutingEvaluation:
             transport_zones
         )
         
-        cpprouting_paths = self.run_cpprouting_get_path_pair(routes, graph)
+        prepare_csr_graph_by_hash(graph_folder, graph_hash)
+        csr_graph = read_csr_graph_by_hash(graph_folder, graph_hash)
+        paths = self.get_shortest_paths(routes, csr_graph)
         graph_data, graph_dict = self.get_graph_data(graph_folder, graph_hash)
-        gpd_paths = self.create_geopandas_paths(cpprouting_paths, graph_data, graph_dict, vertices, routes)
+        gpd_paths = self.create_geopandas_paths(paths, graph_data, graph_dict, vertices, routes)
 
         self.save_gpkg(
             gpd_paths,
@@ -376,45 +377,69 @@ class RoutingEvaluation:
         return buildings
         
 
-    def run_cpprouting_get_path_pair(self, routes, graph):
+    def get_shortest_paths(self, routes, csr_graph):
         """
-        Compute shortest paths between all origin-destination pairs using cpprouting (via R).
+        Compute the shortest paths between the snapped vertices of the routes.
+        
+        All the paths are answered by one shortest path tree per distinct
+        origin vertex, see ``shortest_path_edges``.
         
         Parameters
         ----------
         routes : pl.DataFrame
             Routes with vertex_id pairs.
-        graph : object
-            Routing graph object.
+        csr_graph : CSRGraph
+            Memory-mapped copy of the routing graph.
         
         Returns
         -------
         pl.DataFrame
-            Paths with vertex sequences and path metadata.
+            One row per path edge, with the origin and destination vertex ids,
+            the rank of the edge in the path and its cppRouting edge id.
         """
         
-        unique_ods = routes.select(["vertex_id", "vertex_id_to"]).unique()
+        graph_dict = (
+            pl.from_arrow(csr_graph.vertices)
+            .select(["ref", "id"])
+        )
         
-        script = RScriptRunner(resources.files('mobility.transport.graphs.core').joinpath('get_path_pair.R'))
-        output_path = graph.cache_path.parent / "path_pairs.parquet"
-
-        script.run(
-            args=[
-                str(graph.cache_path),
-                json.dumps(unique_ods["vertex_id"].to_list()),
-                json.dumps(unique_ods["vertex_id_to"].to_list()),
-                str(output_path)
-            ]
+        unique_ods = (
+            routes
+            .select(
+                origin_vertex_id=pl.col("vertex_id"),
+                destination_vertex_id=pl.col("vertex_id_to")
+            )
+            .unique()
+            .with_columns(
+                ref=pl.col("origin_vertex_id").cast(pl.String),
+                ref_to=pl.col("destination_vertex_id").cast(pl.String)
+            )
+            .join(graph_dict, on="ref")
+            .join(graph_dict, left_on="ref_to", right_on="ref", suffix="_to")
+            .select(["origin_vertex_id", "destination_vertex_id", "id", "id_to"])
         )
         
-        paths = pl.read_parquet(output_path)
+        paths = shortest_path_edges(
+            csr_graph,
+            unique_ods["id"].to_numpy(),
+            unique_ods["id_to"].to_numpy()
+        )
+        
+        paths = (
+            paths
+            .join(
+                unique_ods.select(["origin_vertex_id", "destination_vertex_id"]).with_row_index("pair_index"),
+                on="pair_index"
+            )
+            .select(["origin_vertex_id", "destination_vertex_id", "path_section_id", "edge_id"])
+        )
         
         return paths
     
     
     def get_graph_data(self, graph_folder, graph_hash):
         """
-        Load graph edges and attributes (time, distance, speed) from cached parquet files.
+        Load graph edges and attributes (time, distance, speed) from the memory-mapped CSR copy of the graph.
         
         Parameters
         ----------
@@ -429,20 +454,14 @@ class RoutingEvaluation:
             (graph_data : pl.DataFrame, graph_dict : pl.DataFrame)
         """
         
-        graph_data_path = graph_folder / (graph_hash + "data.parquet")
-        graph_dict_path = graph_folder / (graph_hash + "dict.parquet")
-        graph_attr_path = graph_folder / (graph_hash + "attrib.parquet")
+        csr_graph = read_csr_graph_by_hash(graph_folder, graph_hash)
         
-        graph_dict = pl.read_parquet(graph_dict_path)
-        graph_attr = pl.read_parquet(graph_attr_path)
+        graph_dict = pl.from_arrow(csr_graph.vertices)
         
         graph_data = ( 
-            pl.read_parquet(graph_data_path)
+            pl.from_arrow(csr_graph.edges.select(["from", "to", "dist", "aux"]))
             .with_row_index("edge_id")
-            .rename({"dist": "time"})
-            .with_columns(
-                distance=graph_attr["aux"]
-            )
+            .rename({"dist": "time", "aux": "distance"})
             .with_columns(
                 speed_kph=pl.col("distance")/pl.col("time")*3.6
             )
@@ -452,14 +471,14 @@ class RoutingEvaluation:
         return graph_data, graph_dict
     
     
-    def create_geopandas_paths(self, cpprouting_paths, graph_data, graph_dict, vertices, routes):
+    def create_geopandas_paths(self, paths, graph_data, graph_dict, vertices, routes):
         """
-        Convert cpprouting path results into GeoDataFrame with travel attributes.
+        Convert path edges into GeoDataFrame with travel attributes.
         
         Parameters
         ----------
-        cpprouting_paths : pl.DataFrame
-            Computed paths with vertex sequences.
+        paths : pl.DataFrame
+            Path edges, as returned by get_shortest_paths.
         graph_data : pl.DataFrame
             Graph edge attributes.
         graph_dict : pl.DataFrame
@@ -472,36 +491,36 @@ class RoutingEvaluation:
         Returns
         -------
         gpd.GeoDataFrame
-            Path geometries with travel times, distances, and speeds.
+            One line per path section, with travel times, distances, and speeds.
         """
         
-        paths = ( 
-            
-            # Format cppRouting result
-            cpprouting_paths
-            .rename({
-                "from": "origin_vertex_id",
-                "to": "destination_vertex_id",
-                "node": "vertex_id"
-            })
-            .with_columns(
-                prev_vertex_id=pl.col("vertex_id").shift(1).over(["origin_vertex_id", "destination_vertex_id"])
+        vertex_coordinates = (
+            graph_dict
+            .join(
+                vertices.select([pl.col("vertex_id").cast(pl.String), "x", "y"]),
+                left_on="ref",
+                right_on="vertex_id"
             )
+            .select(["id", "ref", "x", "y"])
+        )
+        
+        paths = ( 
             
             # Add travel time / distance information
-            .join(graph_dict, left_on="prev_vertex_id", right_on="ref", how="left")
-            .join(graph_dict, left_on="vertex_id", right_on="ref", how="left", suffix="_to")
-            .join(graph_data.select(["from", "to", "time", "distance", "speed_kph"]), left_on=["id", "id_to"], right_on=["from", "to"])
+            paths
+            .join(graph_data.select(["edge_id", "from", "to", "time", "distance", "speed_kph"]), on="edge_id")
             
-            .select(["origin_vertex_id", "destination_vertex_id", "prev_vertex_id", "vertex_id", "time", "distance", "speed_kph"])
-            .with_columns(
-                path_section_id=pl.col("vertex_id").cum_count().over(["origin_vertex_id", "destination_vertex_id"])
-            )
-            
-            .unpivot(index=["origin_vertex_id", "destination_vertex_id", "path_section_id", "time", "distance", "speed_kph"], value_name="vertex_id")
-            
-            # Get the coordinates of the points
-            .join(vertices.select(["vertex_id", "x", "y"]), on="vertex_id")
+            # Get the coordinates of the section ends
+            .join(vertex_coordinates, left_on="from", right_on="id")
+            .join(vertex_coordinates, left_on="to", right_on="id", suffix="_to")
+            .rename({
+                "ref": "prev_vertex_id",
+                "ref_to": "vertex_id",
+                "x": "x_from",
+                "y": "y_from",
+                "x_to": "x",
+                "y_to": "y",
+            })
             
             # Add route informations
             .join(
@@ -513,12 +532,16 @@ class RoutingEvaluation:
                         "vertex_id", "vertex_id_to"
                     ])
                     .rename({
+                        "from": "from_zone",
+                        "to": "to_zone",
                         "vertex_id": "origin_vertex_id",
                         "vertex_id_to": "destination_vertex_id",
                     })
                 ),
                 on=["origin_vertex_id", "destination_vertex_id"]
             )
+            .drop(["from", "to", "edge_id"])
+            .rename({"from_zone": "from", "to_zone": "to"})
             .with_columns(
                 route_unique_id=(
                     pl.concat_str(
@@ -536,14 +559,13 @@ class RoutingEvaluation:
             .sort(["origin_vertex_id", "destination_vertex_id", "path_section_id"])
             
         )
-         
+        
         geoms = linestrings(
-            paths.select(["x", "y"]),
-            indices=paths["path_id"]
+            paths.select(["x_from", "y_from", "x", "y"]).to_numpy().reshape(-1, 2, 2)
         )
         
         gdf = gpd.GeoDataFrame(
-            paths.filter(pl.col("variable") == "vertex_id").to_pandas(),
+            paths.drop(["x_from", "y_from"]).to_pandas(),
             geometry=geoms,
             crs="EPSG:3035"
         )
@@ -600,8 +600,30 @@ class IterationTransportCostsAsset(FileAsset):
 
     def get_cached_asset(self) -> pl.DataFrame:
         """Return the full OD-by-mode transport-cost table for this iteration."""
+        if self.transport_costs.od_support is not None:
+            # Lazy costs : pairs may have been requested since the table was written
+            return self._write_costs(self._effective_transport_costs().get())
         return pl.read_parquet(self.cache_path)
 
+    def request_od_pairs(self, od_pairs) -> None:
+        """Compute the costs of more OD pairs for this iteration, with lazy transport costs.
+
+        Args:
+            od_pairs: Frame with ``from`` and ``to`` columns.
+        """
+        if self.transport_costs.od_support is None:
+            return
+        self._effective_transport_costs().request_od_pairs(od_pairs)
+
+    def _effective_transport_costs(self) -> Any:
+        """Return the transport costs of this iteration, with its road flows applied."""
+        return self.transport_costs.asset_for_road_flows(self.congestion_flows.get())
+
+    def _write_costs(self, costs: pl.DataFrame) -> pl.DataFrame:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        costs.write_parquet(self.cache_path)
+        return costs
+
     def create_and_get_asset(self) -> pl.DataFrame:
         """Build and cache transport costs for this iteration."""
         logging.debug(
@@ -609,13 +631,7 @@ class IterationTransportCostsAsset(FileAsset):
             str(self.iteration),
         )
         get_group_day_trips_progress().iteration_step(self.iteration, "preparing transport costs")
-        road_flow_asset = self.congestion_flows.get()
-        effective_transport_costs = self.transport_costs.asset_for_road_flows(
-            road_flow_asset
-        )
-        costs = effective_transport_costs.get()
-        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        costs.write_parquet(self.cache_path)
+        costs = self._write_costs(self._effective_transport_costs().get())
         logging.debug(
             "Transport costs for group-day-trips iteration %s are ready.",
             str(self.iteration),
@@ -0,0 +1,143 @@
+from typing import Any, Callable
+
+import polars as pl
+
+
+class DestinationSamplingCosts:
+    """Costs and destination probabilities read while sampling destinations.
+
+    With precomputed transport costs, the costs, destination probabilities and
+    cost views are built once, for all origins.
+
+    With lazy OD costs, destination sampling asks for the pairs it is going to
+    read before each sampling step: the pairs from the origins it meets to the
+    zones with opportunities, then the onward legs of the candidates (to the
+    next anchor or back home). Only the pairs that were never requested are
+    costed, and the destination probabilities are computed for the new origins
+    only (the radiation model of one origin does not depend on the others).
+
+    Args:
+        costs: OD costs already available, with ``from``, ``to`` and ``cost`` columns.
+        destination_probability: Function computing the destination probabilities
+            of the origins of a cost table.
+        cost_views: Function building the spatialization cost views of a cost table.
+        transport_costs: Iteration transport-cost asset to request pairs from, or
+            None when the costs are precomputed.
+        destination_zones: Zones with opportunities, in a ``to`` column. Only used
+            with lazy OD costs.
+    """
+
+    def __init__(
+        self,
+        *,
+        costs: pl.DataFrame,
+        destination_probability: Callable[[pl.DataFrame], pl.DataFrame],
+        cost_views: Callable[[pl.DataFrame], dict[str, pl.LazyFrame]],
+        transport_costs: Any = None,
+        destination_zones: pl.DataFrame | None = None,
+    ) -> None:
+        self.compute_destination_probability = destination_probability
+        self.compute_cost_views = cost_views
+        self.transport_costs = transport_costs
+        self.costs = costs
+
+        if transport_costs is None:
+            self.destination_zones = None
+            self.origins = None
+            self.requested_pairs = None
+            self.destination_probability = destination_probability(costs)
+        else:
+            self.destination_zones = destination_zones.select(pl.col("to").cast(pl.Int32)).unique()
+            self.origins = pl.DataFrame(schema={"from": pl.Int32})
+            self.requested_pairs = self._od_pairs(costs)
+            self.destination_probability = destination_probability(costs.head(0))
+        self.cost_views = cost_views(costs)
+
+    @property
+    def is_lazy(self) -> bool:
+        """Return True when costs are requested on demand."""
+        return self.transport_costs is not None
+
+    def prepare_origins(self, origins: pl.Series) -> None:
+        """Make sure the destination probabilities of some origins are available.
+
+        Args:
+            origins: Zone ids sampling starts from.
+        """
+        if not self.is_lazy:
+            return
+
+        new_origins = (
+            origins.cast(pl.Int32).unique().to_frame("from")
+            .join(self.origins, on="from", how="anti")
+        )
+        if new_origins.height == 0:
+            return
+
+        self._request(new_origins.join(self.destination_zones, how="cross"))
+        new_origin_costs = self.costs.filter(
+            pl.col("from").cast(pl.Int32).is_in(new_origins["from"].implode())
+        )
+        self.destination_probability = pl.concat(
+            [self.destination_probability, self.compute_destination_probability(new_origin_costs)],
+            how="vertical_relaxed",
+        )
+        self.origins = pl.concat([self.origins, new_origins])
+
+    def prepare_onward_legs(
+        self,
+        steps: pl.DataFrame,
+        onward_to: str,
+    ) -> None:
+        """Make sure the costs from the candidate destinations of some steps are available.
+
+        Args:
+            steps: Steps to sample, with ``from`` and ``activity`` columns.
+            onward_to: Column of the zone the person travels to after the candidate.
+        """
+        if not self.is_lazy:
+            return
+        candidates = (
+            steps.lazy()
+            .select(pl.col("from").cast(pl.Int32), "activity", pl.col(onward_to).cast(pl.Int32))
+            .unique()
+            .join(
+                self.destination_probability.lazy().with_columns(pl.col("from").cast(pl.Int32)),
+                on=["from", "activity"],
+            )
+            .select(pl.col("to").cast(pl.Int32).alias("from"), pl.col(onward_to).alias("to"))
+            .unique()
+            .collect()
+        )
+        self._request(candidates)
+
+    def prepare_legs(self, od_pairs: pl.DataFrame) -> None:
+        """Make sure the costs of some legs are available.
+
+        Args:
+            od_pairs: Frame with ``from`` and ``to`` columns.
+        """
+        if not self.is_lazy:
+            return
+        self._request(od_pairs)
+
+    def _request(self, od_pairs: pl.DataFrame) -> None:
+        """Request new OD pairs from the transport costs and refresh the cost views."""
+        new_pairs = self._od_pairs(od_pairs).join(self.requested_pairs, on=["from", "to"], how="anti")
+        if new_pairs.height == 0:
+            return
+        self.transport_costs.request_od_pairs(new_pairs)
+        # Pairs without any available mode have no cost row, keep them here
+        # so they are not requested again
+        self.requested_pairs = pl.concat([self.requested_pairs, new_pairs])
+        self.costs = self.transport_costs.get_costs_by_od(["cost", "distance"])
+        self.cost_views = self.compute_cost_views(self.costs)
+
+    @staticmethod
+    def _od_pairs(od_pairs: pl.DataFrame) -> pl.DataFrame:
+        return (
+            od_pairs
+            .select(pl.col("from").cast(pl.Int32), pl.col("to").cast(pl.Int32))
+            .drop_nulls()
+            .unique()
+        )
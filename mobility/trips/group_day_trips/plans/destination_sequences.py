@@ -7,6 +7,7 @@ from scipy.stats import norm
 
 from mobility.runtime.assets.cache_schema import read_cached_parquet
 from mobility.trips.group_day_trips.core.parameters import BehaviorChangeScope
+from .destination_sampling_costs import DestinationSamplingCosts
 from .debug_logs import (
     log_destination_sequence_diagnostics,
     log_destination_spatialization_step,
@@ -346,18 +347,12 @@ class DestinationSequences(FileAsset):
         seed: int,
     ) -> pl.DataFrame:
         """Compute destination sequences for one iteration."""
-        utility_inputs = self._get_destination_probability_inputs(
+        sampling_costs = self._get_destination_sampling_costs(
+            activities,
             destination_saturation,
             costs,
-            parameters.destination_sequences.cost_uncertainty_sd,
-        )
-        destination_probability = self._get_destination_probability(
-            utility_inputs,
-            activities,
-            self.resolved_activity_parameters,
-            parameters.destination_sequences.dest_prob_cutoff,
+            parameters,
         )
-        cost_views = self._spatialization_cost_views(costs)
         activity_sequences = (
             activity_sequences
             .filter(pl.col("activity_seq_id") != 0)
@@ -385,18 +380,20 @@ class DestinationSequences(FileAsset):
         source_activity_sequences = activity_sequences
         anchor_spatialized_sequences = self._spatialize_anchor_activities(
             source_activity_sequences,
-            destination_probability,
+            sampling_costs.destination_probability,
             parameters.destination_sequences.alpha,
             seed,
-            cost_views,
+            sampling_costs.cost_views,
+            sampling_costs=sampling_costs,
         )
         spatialized_activity_sequences = self._spatialize_other_activities(
             anchor_spatialized_sequences,
-            destination_probability,
-            costs,
+            sampling_costs.destination_probability,
+            sampling_costs.costs,
             parameters.destination_sequences.alpha,
             seed,
-            cost_views,
+            sampling_costs.cost_views,
+            sampling_costs=sampling_costs,
         )
         complete_activity_sequences = self._drop_incomplete_destination_draws(
             activity_sequences=spatialized_activity_sequences,
@@ -449,6 +446,47 @@ class DestinationSequences(FileAsset):
         )
         return destination_sequences.select(self.OUTPUT_COLUMNS)
 
+    def _get_destination_sampling_costs(
+        self,
+        activities: list[Any],
+        destination_saturation: pl.DataFrame,
+        costs: pl.DataFrame,
+        parameters: Any,
+    ) -> DestinationSamplingCosts:
+        """Return the costs and destination probabilities read by sampling.
+
+        With lazy OD costs, sampling requests the OD pairs it reads from the
+        iteration transport costs, instead of reading a precomputed table.
+        """
+        lazy_od_costs = (
+            getattr(parameters.destination_sequences, "lazy_od_costs", False)
+            and self.transport_costs is not None
+        )
+
+        def destination_probability(origin_costs: pl.DataFrame) -> pl.DataFrame:
+            return self._get_destination_probability(
+                self._get_destination_probability_inputs(
+                    destination_saturation,
+                    origin_costs,
+                    parameters.destination_sequences.cost_uncertainty_sd,
+                ),
+                activities,
+                self.resolved_activity_parameters,
+                parameters.destination_sequences.dest_prob_cutoff,
+            )
+
+        return DestinationSamplingCosts(
+            costs=costs,
+            destination_probability=destination_probability,
+            cost_views=self._spatialization_cost_views,
+            transport_costs=self.transport_costs if lazy_od_costs else None,
+            destination_zones=(
+                destination_saturation.filter(pl.col("opportunity_capacity") > 0.0).select("to")
+                if lazy_od_costs
+                else None
+            ),
+        )
+
     def _get_destination_probability_inputs(
         self,
         opportunities: pl.DataFrame,
@@ -689,6 +727,7 @@ class DestinationSequences(FileAsset):
         alpha: float,
         seed: int,
         cost_views: dict[str, pl.LazyFrame],
+        sampling_costs: DestinationSamplingCosts | None = None,
     ) -> pl.DataFrame:
         """Choose the anchor destinations of each daily tour.
 
@@ -801,6 +840,11 @@ class DestinationSequences(FileAsset):
             if non_home_anchor_steps.height == 0:
                 sampled_anchor_steps = home_anchor_steps.head(0)
             else:
+                if sampling_costs is not None:
+                    sampling_costs.prepare_origins(non_home_anchor_steps["from"])
+                    sampling_costs.prepare_onward_legs(non_home_anchor_steps, "home_zone_id")
+                    destination_probability_lf = sampling_costs.destination_probability.lazy()
+                    cost_views = sampling_costs.cost_views
                 non_home_anchor_steps_lf = non_home_anchor_steps.lazy()
 
                 # Keep anchor candidates that can be reached from the previous
@@ -885,6 +929,7 @@ class DestinationSequences(FileAsset):
         alpha: float,
         seed: int,
         cost_views: dict[str, pl.LazyFrame],
+        sampling_costs: DestinationSamplingCosts | None = None,
     ) -> pl.DataFrame:
         """Sample destinations for non-anchor activities step by step."""
         logging.debug("Spatializing other activities...")
@@ -920,6 +965,7 @@ class DestinationSequences(FileAsset):
                     cost_views,
                     non_anchor_count,
                     anchor_count,
+                    sampling_costs=sampling_costs,
                 )
                 .with_columns(seq_step_index=pl.lit(seq_step_index).cast(pl.UInt8))
             )
@@ -950,8 +996,21 @@ class DestinationSequences(FileAsset):
         cost_views: dict[str, pl.LazyFrame],
         non_anchor_count: int,
         anchor_count: int,
+        sampling_costs: DestinationSamplingCosts | None = None,
     ) -> pl.DataFrame:
         """Sample destinations for one step between anchors."""
+        if sampling_costs is not None:
+            if non_anchor_count > 0:
+                non_anchor_steps = sequence_step.filter(pl.col("is_anchor").not_())
+                sampling_costs.prepare_origins(non_anchor_steps["from"])
+                sampling_costs.prepare_onward_legs(non_anchor_steps, "anchor_to")
+            if anchor_count > 0:
+                sampling_costs.prepare_legs(
+                    sequence_step.filter(pl.col("is_anchor")).select("from", to=pl.col("anchor_to"))
+                )
+            destination_probability = sampling_costs.destination_probability
+            costs = sampling_costs.costs
+            cost_views = sampling_costs.cost_views
         sequence_step_lf = sequence_step.lazy()
         destination_probability_lf = destination_probability.lazy()
         sequence_key_cols = [
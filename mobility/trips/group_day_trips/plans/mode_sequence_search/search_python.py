@@ -13,6 +13,7 @@ import polars as pl
 from rich.live import Live
 from rich.spinner import Spinner
 
+from mobility.runtime.parallelism import worker_process_env
 from mobility.trips.group_day_trips.core.memory_logging import log_memory_checkpoint
 from mobility.transport.modes.choice.compute_subtour_mode_probabilities import (
     compute_subtour_mode_probabilities_serial,
@@ -126,6 +127,9 @@ def run_python_mode_sequence_search_subprocess(
                 str(modes_path),
                 "--tmp_path",
                 str(tmp_folder),
-            ]
+            ],
+            # The script only reads the chains and starts the worker processes,
+            # which keep the polars pool sized when the script imports polars.
+            env=worker_process_env(threads_per_worker=1),
         )
         process.wait()
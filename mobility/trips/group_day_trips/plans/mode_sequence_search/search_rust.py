@@ -2,6 +2,8 @@ from typing import Any
 
 import polars as pl
 
+from mobility.runtime.parallelism import get_max_threads
+
 
 def run_rust_mode_sequence_search(
     *,
@@ -34,6 +36,7 @@ def run_rust_mode_sequence_search(
         leg_mode_costs=rust_cost_rows,
         mode_metadata=rust_mode_metadata,
         k_sequences=k_mode_sequences,
+        n_threads=get_max_threads(),
     )
 
 
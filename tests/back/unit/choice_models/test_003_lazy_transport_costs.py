@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import polars as pl
+
+from mobility.runtime.assets.in_memory_asset import InMemoryAsset
+from mobility.transport.costs.od_cost_store import ODCostStore, ODSupport
+from mobility.transport.costs.transport_costs import TransportCosts
+
+
+class _FakeModeParameters:
+    def __init__(self, name: str):
+        self.name = name
+        self.multimodal = False
+        self.ghg_intensity = 0.1
+
+
+class _FakeGeneralizedCost(InMemoryAsset):
+    def __init__(self, name: str, supports_od_pairs: bool):
+        super().__init__({"name": name})
+        self.name = name
+        self.supports_od_pairs = supports_od_pairs
+        self.requests = []
+
+    def get(self, metrics, congestion=False, detail_distances=False, road_flow_asset=None, od_pairs=None):
+        self.requests.append(None if od_pairs is None else od_pairs.sort(["from", "to"]).rows())
+        costs = pd.DataFrame(
+            [(i, j) for i in range(1, 4) for j in range(1, 4) if i != j],
+            columns=["from", "to"],
+        )
+        if od_pairs is not None:
+            costs = costs.merge(od_pairs.to_pandas(), on=["from", "to"])
+        costs["mode"] = self.name
+        costs["cost"] = 1.0
+        costs["distance"] = 1.0
+        costs["time"] = 1.0
+        costs[f"{self.name}_distance"] = 1.0
+        return costs
+
+
+def _make_mode(name: str, supports_od_pairs: bool):
+    return SimpleNamespace(
+        inputs={
+            "parameters": _FakeModeParameters(name),
+            "generalized_cost": _FakeGeneralizedCost(name, supports_od_pairs),
+        }
+    )
+
+
+def _pairs(rows):
+    return pl.DataFrame(rows, schema={"from": pl.Int32, "to": pl.Int32}, orient="row")
+
+
+def test_od_cost_store_only_reports_pairs_never_requested(tmp_path):
+    store = ODCostStore(tmp_path / "costs.parquet")
+
+    assert store.get(_pairs([(1, 2)])) is None
+    assert store.missing(_pairs([(1, 2), (2, 1)])).height == 2
+
+    # (2, 1) has no row, for example when it is beyond the routing distance.
+    store.add(pl.DataFrame({"from": [1], "to": [2], "time": [0.5]}), _pairs([(1, 2), (2, 1)]))
+
+    assert store.missing(_pairs([(1, 2), (2, 1), (3, 1)])).rows() == [(3, 1)]
+    assert store.get(_pairs([(1, 2), (2, 1)])).rows() == [(1, 2, 0.5)]
+
+
+def test_od_support_keeps_requested_pairs_on_disk(tmp_path):
+    support = ODSupport(tmp_path / "od-support.parquet")
+
+    assert support.get().height == 0
+    assert support.add(_pairs([(1, 2), (2, 1)])).height == 2
+    assert support.add(_pairs([(1, 2), (1, 3)])).rows() == [(1, 3)]
+
+    reloaded = ODSupport(tmp_path / "od-support.parquet")
+    assert sorted(reloaded.get().rows()) == [(1, 2), (1, 3), (2, 1)]
+
+
+def test_lazy_transport_costs_only_compute_requested_pairs(project_dir, tmp_path):
+    car = _make_mode("car", supports_od_pairs=True)
+    carpool = _make_mode("carpool", supports_od_pairs=False)
+    support = ODSupport(tmp_path / "od-support.parquet")
+    transport_costs = TransportCosts([car, carpool], od_support=support)
+
+    assert transport_costs.get().height == 0
+
+    transport_costs.request_od_pairs(_pairs([(1, 2), (2, 1)]))
+    costs = transport_costs.get()
+
+    assert sorted(costs.select(["from", "to", "mode"]).rows()) == [
+        (1, 2, "car"),
+        (1, 2, "carpool"),
+        (2, 1, "car"),
+        (2, 1, "carpool"),
+    ]
+    assert not transport_costs.cache_path.exists()
+
+    # Pairs already computed are not computed again
+    transport_costs.request_od_pairs(_pairs([(1, 2), (1, 3)]))
+
+    assert transport_costs.get().height == 6
+    assert car.inputs["generalized_cost"].requests == [[(1, 2), (2, 1)], [(1, 3)]]
+    assert carpool.inputs["generalized_cost"].requests == [None, None]
+
+
+def test_lazy_transport_costs_variants_cover_the_shared_support(project_dir, tmp_path):
+    car = _make_mode("car", supports_od_pairs=True)
+    support = ODSupport(tmp_path / "od-support.parquet")
+    transport_costs = TransportCosts([car], od_support=support)
+    transport_costs.request_od_pairs(_pairs([(1, 2)]))
+
+    variant = transport_costs.asset_for_congestion(True)
+
+    assert variant.od_support is support
+    assert variant.inputs_hash != TransportCosts([car]).inputs_hash
+    assert variant.get().select(["from", "to"]).rows() == [(1, 2)]
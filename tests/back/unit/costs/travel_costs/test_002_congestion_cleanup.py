@@ -1,3 +1,7 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow as pa
 import pytest
 
 from mobility.transport.costs.path.path_travel_costs import PathTravelCosts
@@ -413,13 +417,17 @@ def test_detailed_carpool_table_compute_uses_congested_graph(project_dir, monkey
         road_flow_asset=road_flow_asset,
     )
     monkeypatch.setattr(detailed_carpool_module, "RScriptRunner", _FakeScriptRunner)
+    computed_costs = pd.DataFrame({"from": [1], "to": [2], "time": [0.5]})
     monkeypatch.setattr(
-        detailed_carpool_module.pd,
-        "read_parquet",
-        lambda cache_path: "computed-carpool-costs",
+        detailed_carpool_module,
+        "read_exchange_table",
+        lambda output_path: pa.Table.from_pandas(computed_costs),
     )
 
-    assert table._compute_travel_costs() == "computed-carpool-costs"
+    costs = table._compute_travel_costs()
+
+    pd.testing.assert_frame_equal(costs, computed_costs)
+    pd.testing.assert_frame_equal(pd.read_parquet(table.cache_path), computed_costs)
     assert _FakeScriptRunner.instances[0].args[2] == str(project_dir / "congested.gpkg")
 
 
@@ -447,13 +455,17 @@ def test_detailed_carpool_table_compute_uses_modified_graph(project_dir, monkeyp
         congestion=False,
     )
     monkeypatch.setattr(detailed_carpool_module, "RScriptRunner", _FakeScriptRunner)
+    computed_costs = pd.DataFrame({"from": [1], "to": [2], "time": [0.5]})
     monkeypatch.setattr(
-        detailed_carpool_module.pd,
-        "read_parquet",
-        lambda cache_path: "computed-carpool-costs",
+        detailed_carpool_module,
+        "read_exchange_table",
+        lambda output_path: pa.Table.from_pandas(computed_costs),
     )
 
-    assert table._compute_travel_costs() == "computed-carpool-costs"
+    costs = table._compute_travel_costs()
+
+    pd.testing.assert_frame_equal(costs, computed_costs)
+    pd.testing.assert_frame_equal(pd.read_parquet(table.cache_path), computed_costs)
 
 
 def test_detailed_carpool_constructor_marks_road_flow_variant(project_dir, monkeypatch):
@@ -522,3 +534,19 @@ def test_path_remove_congestion_artifacts_removes_owned_graph_chain():
     assert contracted_graph.remove_calls == 1
     assert congested_graph.remove_calls == 1
 
+
+def test_public_transport_remove_deletes_the_time_window_costs(tmp_path):
+    asset = object.__new__(PublicTransportTravelCosts)
+    asset.cache_path = tmp_path / "hash-walk_public_transport_walk_travel_costs.parquet"
+    asset.inputs = {"parameters": SimpleNamespace(profile_time_windows={"off_peak": (10.0, 16.0)})}
+
+    asset.cache_path.touch()
+    asset.time_window_path("off_peak").touch()
+    other_file = tmp_path / "hash-walk_public_transport_car_travel_costs-off_peak.parquet"
+    other_file.touch()
+
+    asset.remove()
+
+    assert not asset.cache_path.exists()
+    assert not (tmp_path / "hash-walk_public_transport_walk_travel_costs-off_peak.parquet").exists()
+    assert other_file.exists()
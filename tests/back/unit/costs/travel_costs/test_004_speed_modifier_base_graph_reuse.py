@@ -0,0 +1,77 @@
+import pathlib
+
+import pandas as pd
+import pyarrow as pa
+
+from mobility.transport.costs.path import path_travel_costs as path_costs_module
+from mobility.transport.costs.path.path_travel_costs import PathTravelCostsTable
+
+
+class _ContractedGraph:
+    def __init__(self, folder: pathlib.Path, hash_: str):
+        self.cache_path = folder / f"{hash_}-car-contracted-path-graph"
+        self.vertex_pair_costs_path = folder / f"{hash_}-vertex-pair-costs.parquet"
+
+    def get(self):
+        return self.cache_path
+
+
+class _TransportZones:
+    def __init__(self, path):
+        self.cache_path = path
+
+
+class _RoutingParameters:
+    max_beeline_distance = 60.0
+
+
+def _make_table(tmp_path, base_routing_graph):
+    table = object.__new__(PathTravelCostsTable)
+    table.mode_name = "car"
+    table.transport_zones = _TransportZones(tmp_path / "transport_zones.gpkg")
+    table.routing_graph = _ContractedGraph(tmp_path, "modified")
+    table.routing_parameters = _RoutingParameters()
+    table.base_routing_graph = base_routing_graph
+    table.cache_path = tmp_path / "travel_costs_free_flow_car.parquet"
+    return table
+
+
+def _run_costs(monkeypatch, table):
+    seen = {}
+
+    class FakeRScriptRunner:
+        def __init__(self, script_path):
+            seen["script"] = str(script_path)
+
+        def run(self, args):
+            seen["args"] = args
+
+    monkeypatch.setattr(path_costs_module, "RScriptRunner", FakeRScriptRunner)
+    monkeypatch.setattr(
+        path_costs_module,
+        "read_exchange_table",
+        lambda path: pa.table({"from": [1], "to": [2], "distance": [1.0], "time": [0.1]}),
+    )
+
+    table._compute_costs_by_od()
+    return seen["args"]
+
+
+def test_base_graph_is_passed_when_its_vertex_pair_costs_are_cached(monkeypatch, tmp_path):
+    base_graph = _ContractedGraph(tmp_path, "base")
+    base_graph.cache_path.touch()
+    pd.DataFrame({"vertex_id_from": ["1"], "vertex_id_to": ["2"], "distance": [10.0], "time": [1.0]}).to_parquet(
+        base_graph.vertex_pair_costs_path
+    )
+
+    args = _run_costs(monkeypatch, _make_table(tmp_path, base_graph))
+
+    assert args[3] == str(base_graph.cache_path)
+
+
+def test_base_graph_is_skipped_when_it_was_never_routed(monkeypatch, tmp_path):
+    base_graph = _ContractedGraph(tmp_path, "base")
+    base_graph.cache_path.touch()
+
+    assert _run_costs(monkeypatch, _make_table(tmp_path, base_graph))[-2] == ""
+    assert _run_costs(monkeypatch, _make_table(tmp_path, None))[-2] == ""
@@ -23,8 +23,9 @@ class _DummyLive:
 
 
 class _DummyProcess:
-    def __init__(self, command):
+    def __init__(self, command, env=None):
         self.command = command
+        self.env = env
         self.wait_called = False
 
     def wait(self):
@@ -108,8 +109,8 @@ def test_run_python_mode_sequence_search_subprocess_serializes_inputs_for_worker
 
     created_processes = []
 
-    def fake_popen(command):
-        process = _DummyProcess(command)
+    def fake_popen(command, env=None):
+        process = _DummyProcess(command, env)
         created_processes.append(process)
         return process
 
@@ -147,6 +148,7 @@ def test_run_python_mode_sequence_search_subprocess_serializes_inputs_for_worker
 
     process = created_processes[0]
     assert process.wait_called is True
+    assert process.env["POLARS_MAX_THREADS"] == "1"
     assert len(created_processes) == 1
 
 
@@ -8,6 +8,7 @@ from mobility.trips.group_day_trips import (
     GroupDayTripsParameters,
     GroupDayTripsPlanUpdateParameters,
 )
+from mobility.trips.group_day_trips.plans.destination_sampling_costs import DestinationSamplingCosts
 from mobility.trips.group_day_trips.plans.destination_sequences import DestinationSequences
 from mobility.trips.group_day_trips.plans.demand_subgroups import demand_unit_hash
 
@@ -921,6 +922,138 @@ def test_spatialize_sequence_step_drops_anchor_without_leg_cost(tmp_path):
     assert result.is_empty()
 
 
+class _LazyTransportCosts:
+    """Serve OD costs only for the pairs that were requested."""
+
+    def __init__(self, costs):
+        self.costs = costs
+        self.requests = []
+        self.od_pairs = costs.select(["from", "to"]).head(0)
+
+    def request_od_pairs(self, od_pairs):
+        self.requests.append(sorted(od_pairs.rows()))
+        self.od_pairs = pl.concat(
+            [self.od_pairs, od_pairs.cast({"from": pl.UInt16, "to": pl.UInt16})]
+        )
+
+    def get_costs_by_od(self, metrics):
+        return self.costs.join(self.od_pairs, on=["from", "to"], how="semi")
+
+
+def test_destination_sampling_costs_only_request_new_origins():
+    costs = pl.DataFrame(
+        {"from": [1, 1, 2, 2], "to": [5, 6, 5, 6], "cost": [1.0, 2.0, 3.0, 4.0]},
+        schema={"from": pl.UInt16, "to": pl.UInt16, "cost": pl.Float64},
+    )
+    transport_costs = _LazyTransportCosts(costs)
+    probability_origins = []
+
+    def destination_probability(origin_costs):
+        probability_origins.append(sorted(origin_costs["from"].unique().to_list()))
+        return origin_costs.select(
+            pl.lit("work").alias("activity"), "from", "to", pl.lit(0.5).alias("p_ij")
+        )
+
+    sampling_costs = DestinationSamplingCosts(
+        costs=costs.head(0),
+        destination_probability=destination_probability,
+        cost_views=DestinationSequences._spatialization_cost_views,
+        transport_costs=transport_costs,
+        destination_zones=pl.DataFrame({"to": [5, 6]}),
+    )
+    sampling_costs.prepare_origins(pl.Series([1, 1]))
+    sampling_costs.prepare_origins(pl.Series([1, 2]))
+
+    assert transport_costs.requests == [[(1, 5), (1, 6)], [(2, 5), (2, 6)]]
+    assert probability_origins == [[], [1], [2]]
+    assert sampling_costs.destination_probability.height == 4
+    assert sampling_costs.costs.height == 4
+
+
+def test_spatialize_sequence_step_requests_anchor_leg_cost_with_lazy_costs(tmp_path):
+    destination_sequences = DestinationSequences(
+        is_weekday=True,
+        iteration=1,
+        base_folder=_make_local_tmp_path(tmp_path, "lazy_anchor_leg_cost"),
+        activities=[],
+        transport_zones=None,
+        destination_saturation=pl.DataFrame(),
+        demand_groups=pl.DataFrame(),
+        costs=pl.DataFrame(),
+        parameters=GroupDayTripsParameters(),
+        seed=123,
+        resolved_activity_parameters={},
+        current_plans=pl.DataFrame(),
+    )
+    sequence_step = pl.DataFrame(
+        {
+            "demand_group_id": [1],
+            "demand_subgroup_id": [0],
+            "home_zone_id": [1],
+            "activity_seq_id": [10],
+            "time_seq_id": [1],
+            "dest_draw_id": [1],
+            "activity": ["work"],
+            "is_anchor": [True],
+            "seq_step_index": [1],
+            "step_count": [1],
+            "anchor_to": [99],
+            "from": [1],
+            "departure_time": [8.0],
+            "arrival_time": [8.5],
+            "next_departure_time": [17.0],
+        },
+        schema={
+            "demand_group_id": pl.UInt32,
+            "demand_subgroup_id": pl.UInt32,
+            "home_zone_id": pl.UInt16,
+            "activity_seq_id": pl.UInt32,
+            "time_seq_id": pl.UInt32,
+            "dest_draw_id": pl.UInt32,
+            "activity": pl.Utf8,
+            "is_anchor": pl.Boolean,
+            "seq_step_index": pl.UInt8,
+            "step_count": pl.UInt8,
+            "anchor_to": pl.UInt16,
+            "from": pl.UInt16,
+            "departure_time": pl.Float64,
+            "arrival_time": pl.Float64,
+            "next_departure_time": pl.Float64,
+        },
+    )
+    destination_probability = pl.DataFrame(
+        schema={"activity": pl.Utf8, "from": pl.UInt16, "to": pl.UInt16, "p_ij": pl.Float64},
+    )
+    costs = pl.DataFrame(
+        {"from": [1, 1], "to": [88, 99], "cost": [1.0, 1.0]},
+        schema={"from": pl.UInt16, "to": pl.UInt16, "cost": pl.Float64},
+    )
+    transport_costs = _LazyTransportCosts(costs)
+    sampling_costs = DestinationSamplingCosts(
+        costs=costs.head(0),
+        destination_probability=lambda origin_costs: destination_probability,
+        cost_views=DestinationSequences._spatialization_cost_views,
+        transport_costs=transport_costs,
+        destination_zones=pl.DataFrame({"to": [99]}),
+    )
+
+    result = destination_sequences._spatialize_sequence_step(
+        seq_step_index=1,
+        sequence_step=sequence_step,
+        destination_probability=sampling_costs.destination_probability,
+        costs=sampling_costs.costs,
+        alpha=0.0,
+        seed=123,
+        cost_views=sampling_costs.cost_views,
+        non_anchor_count=0,
+        anchor_count=1,
+        sampling_costs=sampling_costs,
+    )
+
+    assert transport_costs.requests == [[(1, 99)]]
+    assert result.select(["from", "to"]).rows() == [(1, 99)]
+
+
 def test_drop_incomplete_destination_draws_removes_partial_draws():
     activity_sequences = pl.DataFrame(
         {
@@ -1,12 +1,10 @@
 import sys
 import types
 import pathlib
-import itertools
 import logging
 
 import pytest
 import pandas as pd
-import numpy as np
 
 
 # --------------------------------------------------------------------------------------
@@ -167,49 +165,6 @@ def parquet_stubs(monkeypatch):
     return ParquetController()
 
 
-@pytest.fixture
-def deterministic_shortuuid(monkeypatch):
-    """shortuuid.uuid() -> id-0001, id-0002, ..."""
-    import shortuuid as shortuuid_module
-    counter = itertools.count(1)
-    def fixed_uuid():
-        return f"id-{next(counter):04d}"
-    monkeypatch.setattr(shortuuid_module, "uuid", fixed_uuid, raising=True)
-    return fixed_uuid
-
-
-@pytest.fixture
-def deterministic_sampling(monkeypatch):
-    """Make DataFrame/Series.sample deterministic: take first N (or first floor(frac*N))."""
-    original_dataframe_sample = pd.DataFrame.sample
-    original_series_sample = pd.Series.sample
-
-    def dataframe_sample(self, n=None, frac=None, replace=False, weights=None, random_state=None, axis=None, ignore_index=False):
-        if n is not None:
-            sampled = self.head(n)
-            return sampled if not ignore_index else sampled.reset_index(drop=True)
-        if frac is not None:
-            count = int(np.floor(len(self) * frac))
-            sampled = self.head(count)
-            return sampled if not ignore_index else sampled.reset_index(drop=True)
-        return original_dataframe_sample(self, n=n, frac=frac, replace=replace, weights=weights,
-                                        random_state=random_state, axis=axis, ignore_index=ignore_index)
-
-    def series_sample(self, n=None, frac=None, replace=False, weights=None, random_state=None, axis=None, ignore_index=False):
-        if n is not None:
-            sampled = self.head(n)
-            return sampled if not ignore_index else sampled.reset_index(drop=True)
-        if frac is not None:
-            count = int(np.floor(len(self) * frac))
-            sampled = self.head(count)
-            return sampled if not ignore_index else sampled.reset_index(drop=True)
-        return original_series_sample(self, n=n, frac=frac, replace=replace, weights=weights,
-                                      random_state=random_state, axis=axis, ignore_index=ignore_index)
-
-    monkeypatch.setattr(pd.DataFrame, "sample", dataframe_sample, raising=True)
-    monkeypatch.setattr(pd.Series, "sample", series_sample, raising=True)
-
-
 # --------------------------------------------------------------------------------------
 # Domain helpers / fakes
 # --------------------------------------------------------------------------------------
@@ -6,8 +6,6 @@ import mobility.population.population as population_module
 def test_create_and_get_asset_french_path_writes_parquet_and_uses_hash(
     fake_transport_zones,
     parquet_stubs,
-    deterministic_sampling,
-    deterministic_shortuuid,
     fake_inputs_hash,
 ):
     """
@@ -1,49 +1,50 @@
+import numpy as np
 import pandas as pandas
-import pytest
 
 
-def test_create_and_get_asset_generates_deterministic_individual_ids(
-    fake_transport_zones,
-    deterministic_sampling,
-    deterministic_shortuuid,
-    monkeypatch,
-):
-    """
-    Ensure create_and_get_asset generates sequential shortuuid-based individual_id values
-    using our deterministic shortuuid fixture. We capture the DataFrame passed to to_parquet
-    for the 'individuals' output to assert IDs and row count.
-    """
+def _create_individuals(transport_zones, monkeypatch, sample_size=5):
+    """Run create_and_get_asset and return the DataFrame written for 'individuals'."""
     # Local capture for the 'individuals' DataFrame that is written to parquet
     captured_individuals_data_frame = {"value": None}
 
-    # Wrap the already-installed parquet stub to also capture the DataFrame content for 'individuals'
     import pandas as pandas_module
 
     original_to_parquet = pandas_module.DataFrame.to_parquet
 
     def capturing_to_parquet(self, path, *args, **kwargs):
-        # Call the existing (stubbed) to_parquet so other tests/fixtures still see the write path
+        # Call the existing to_parquet so other tests/fixtures still see the write path
         original_to_parquet(self, path, *args, **kwargs)
         # If this write is for the individuals parquet, capture the DataFrame content
-        path_str = str(path)
-        if path_str.endswith("individuals.parquet") or "individuals.parquet" in path_str:
+        if "individuals.parquet" in str(path):
             captured_individuals_data_frame["value"] = self.copy()
 
     monkeypatch.setattr(pandas_module.DataFrame, "to_parquet", capturing_to_parquet, raising=True)
 
     import mobility.population.population as population_module
     population = population_module.Population(
-        transport_zones=fake_transport_zones,
-        sample_size=5,  # any small positive sample size
+        transport_zones=transport_zones,
+        sample_size=sample_size,
         switzerland_census=None,
     )
 
     # Execute creation, which should write individuals and population_groups parquet files
     population.create_and_get_asset()
 
-    # Verify we captured the individuals DataFrame
+    monkeypatch.setattr(pandas_module.DataFrame, "to_parquet", original_to_parquet, raising=True)
+
     assert captured_individuals_data_frame["value"] is not None
-    individuals_data_frame = captured_individuals_data_frame["value"]
+    return captured_individuals_data_frame["value"]
+
+
+def test_create_and_get_asset_generates_deterministic_individual_ids(
+    fake_transport_zones,
+    monkeypatch,
+):
+    """
+    Ensure create_and_get_asset generates sequential integer individual_id values
+    and samples the same individuals on every run.
+    """
+    individuals_data_frame = _create_individuals(fake_transport_zones, monkeypatch)
 
     # Basic sanity: required columns present
     required_columns = {
@@ -58,7 +59,41 @@ def test_create_and_get_asset_generates_deterministic_individual_ids(
     }
     assert required_columns.issubset(individuals_data_frame.columns)
 
-    # Deterministic shortuuid fixture yields id-0001, id-0002, ... up to row count
-    expected_count = len(individuals_data_frame)
-    expected_individual_ids = [f"id-{i:04d}" for i in range(1, expected_count + 1)]
-    assert individuals_data_frame["individual_id"].tolist() == expected_individual_ids
+    # Integer ids 0, 1, 2, ... up to row count
+    assert individuals_data_frame["individual_id"].dtype == np.int64
+    assert individuals_data_frame["individual_id"].tolist() == list(range(len(individuals_data_frame)))
+
+    # Same seed, same individuals
+    second_individuals_data_frame = _create_individuals(fake_transport_zones, monkeypatch)
+    pandas.testing.assert_frame_equal(individuals_data_frame, second_individuals_data_frame)
+
+
+def test_sample_individuals_is_weighted_and_independent_of_other_zones():
+    import mobility.population.population as population_module
+
+    pop_groups = pandas.DataFrame({
+        "transport_zone_id": ["tz-1"] * 4 + ["tz-2"] * 3,
+        "group": ["a", "b", "c", "d", "e", "f", "g"],
+        "weight": [1.0, 1.0, 0.0, 1000.0, 1.0, 2.0, 3.0],
+    })
+    sample_sizes = pandas.Series({"tz-1": 2, "tz-2": 3})
+
+    sampled = population_module.Population.sample_individuals(pop_groups, sample_sizes, seed=3)
+
+    assert sampled["transport_zone_id"].tolist() == ["tz-1", "tz-1", "tz-2", "tz-2", "tz-2"]
+    # The group without weight is never sampled, the heaviest one almost always first
+    assert "c" not in sampled["group"].tolist()
+    assert sampled["group"].iloc[0] == "d"
+    assert sorted(sampled["group"].iloc[2:]) == ["e", "f", "g"]
+
+    only_first_zone = population_module.Population.sample_individuals(
+        pop_groups[pop_groups["transport_zone_id"] == "tz-1"],
+        sample_sizes[["tz-1"]],
+        seed=3,
+    )
+    assert only_first_zone["group"].tolist() == sampled["group"].iloc[:2].tolist()
+
+    # Zones cannot give more individuals than groups with a positive weight
+    capped = population_module.Population.sample_individuals(pop_groups, pandas.Series({"tz-1": 5, "tz-2": 1}))
+    assert sorted(capped["group"].iloc[:3]) == ["a", "b", "d"]
+    assert len(capped) == 4
@@ -6,7 +6,7 @@ import pandas as pd
 import mobility.population.population as population_module
 
 
-def test_population_can_use_a_third_country_population_class(project_dir, deterministic_sampling, deterministic_shortuuid, monkeypatch):
+def test_population_can_use_a_third_country_population_class(project_dir, monkeypatch):
     written_tables = {}
 
     def fake_to_parquet(self, path, *args, **kwargs):
@@ -28,6 +28,17 @@ def clean_env(monkeypatch):
         "MOBILITY_R_IDLE_CPU_PERCENT",
         "MOBILITY_R_IDLE_MEMORY_CHANGE_MB",
         "MOBILITY_R_CPU_CHECK_INTERVAL_SECONDS",
+        "MOBILITY_R_EXCHANGE_FOLDER",
+        "MOBILITY_R_MAX_CORES",
+        "MOBILITY_R_MAX_MEMORY_MB",
+        "MOBILITY_R_MAX_CONCURRENT_SCRIPTS",
+        "MOBILITY_MAX_THREADS",
+        "POLARS_MAX_THREADS",
+        "OMP_NUM_THREADS",
+        "OPENBLAS_NUM_THREADS",
+        "MKL_NUM_THREADS",
+        "VECLIB_MAXIMUM_THREADS",
+        "NUMEXPR_NUM_THREADS",
         "MOBILITY_PACKAGE_DATA_FOLDER",
         "MOBILITY_PROJECT_DATA_FOLDER",
         "MIMALLOC_PURGE_DELAY",
@@ -0,0 +1,102 @@
+import json
+from importlib import import_module
+
+import pytest
+
+
+r_packages_module = import_module("mobility.runtime.r_integration.r_packages")
+
+PACKAGES = [
+    {"source": "CRAN", "name": "dodgr"},
+    {"source": "CRAN", "name": "sf"},
+]
+
+
+def _write_description(lib_path, package_name, version):
+    package_path = lib_path / package_name
+    package_path.mkdir(parents=True, exist_ok=True)
+    (package_path / "DESCRIPTION").write_text(
+        f"Package: {package_name}\nVersion: {version}\nBuilt: R 4.4.1; ; 2024-07-01; unix\n",
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture
+def r_library(tmp_path):
+    lib_path = tmp_path / "R" / "library"
+    for package_name in ["pak", "log4r", "jsonlite", "dodgr", "sf"]:
+        _write_description(lib_path, package_name, "1.0.0")
+    return lib_path
+
+
+@pytest.fixture
+def fake_installer(monkeypatch, r_library):
+    class _FakeInstaller:
+        runs = []
+
+        def __init__(self, script_path):
+            self.script_path = script_path
+
+        @staticmethod
+        def get_rscript_executable():
+            return "/usr/bin/Rscript"
+
+        def run(self, args):
+            _FakeInstaller.runs.append(list(args))
+            with open(args[3], "w", encoding="utf-8") as handle:
+                json.dump([str(r_library)], handle)
+
+    monkeypatch.setattr(r_packages_module, "RScriptRunner", _FakeInstaller)
+    monkeypatch.setattr(r_packages_module, "_pending_request", None)
+    return _FakeInstaller
+
+
+def test_first_session_defers_install_until_first_r_script(tmp_home, fake_installer):
+    needs_install = r_packages_module.request_r_packages(PACKAGES)
+
+    assert needs_install is True
+    assert fake_installer.runs == []
+
+    r_packages_module.ensure_r_packages()
+    r_packages_module.ensure_r_packages()
+
+    assert len(fake_installer.runs) == 1
+    assert r_packages_module.get_r_packages_fingerprint_path().exists()
+
+
+def test_matching_fingerprint_skips_install_script(tmp_home, fake_installer):
+    r_packages_module.request_r_packages(PACKAGES)
+    r_packages_module.ensure_r_packages()
+
+    needs_install = r_packages_module.request_r_packages(PACKAGES)
+    r_packages_module.ensure_r_packages()
+
+    assert needs_install is False
+    assert len(fake_installer.runs) == 1
+
+
+@pytest.mark.parametrize("change", ["version", "removed", "new_package"])
+def test_changed_package_set_invalidates_fingerprint(tmp_home, fake_installer, r_library, change):
+    r_packages_module.request_r_packages(PACKAGES)
+    r_packages_module.ensure_r_packages()
+
+    packages = list(PACKAGES)
+    if change == "version":
+        _write_description(r_library, "sf", "1.1.0")
+    elif change == "removed":
+        (r_library / "dodgr" / "DESCRIPTION").unlink()
+    else:
+        packages.append({"source": "CRAN", "name": "arrow"})
+
+    assert r_packages_module.request_r_packages(packages) is True
+
+
+def test_force_reinstall_runs_immediately(tmp_home, fake_installer):
+    r_packages_module.request_r_packages(PACKAGES)
+    r_packages_module.ensure_r_packages()
+
+    r_packages_module.request_r_packages(PACKAGES, force_reinstall=True)
+
+    assert len(fake_installer.runs) == 2
+    assert fake_installer.runs[-1][1] == "True"
+
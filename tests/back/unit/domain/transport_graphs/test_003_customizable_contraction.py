@@ -0,0 +1,208 @@
+import heapq
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from mobility.transport.graphs.contracted.contracted_path_graph import ContractedPathGraph
+from mobility.transport.graphs.contracted.contraction_structure import ContractionStructureAsset
+from mobility.transport.graphs.contracted.customizable_contraction import (
+    build_contraction_structure,
+    contracted_graph_tables,
+    customize_contraction,
+)
+
+
+def _random_road_graph(n_vertices=400, seed=0):
+    """Connect each vertex to its nearest neighbours, with some one-way edges."""
+    rng = np.random.default_rng(seed)
+    x = rng.random(n_vertices)
+    y = rng.random(n_vertices)
+
+    edge_from = []
+    edge_to = []
+    for i in range(n_vertices):
+        distances = (x - x[i]) ** 2 + (y - y[i]) ** 2
+        for j in np.argsort(distances)[1:4]:
+            edge_from.append(i)
+            edge_to.append(j)
+            if rng.random() < 0.7:
+                edge_from.append(j)
+                edge_to.append(i)
+
+    return np.array(edge_from), np.array(edge_to), x, y
+
+
+def _dijkstra_distances(n_vertices, edge_from, edge_to, weights, origins, destinations):
+    edges = pd.DataFrame({"from": edge_from, "to": edge_to, "w": weights}).groupby(["from", "to"], as_index=False)["w"].min()
+    matrix = csr_matrix((edges["w"], (edges["from"], edges["to"])), shape=(n_vertices, n_vertices))
+    return dijkstra(matrix, indices=origins)[np.arange(len(origins)), destinations]
+
+
+def _upward_search(start, adjacency):
+    distances = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        distance, vertex = heapq.heappop(queue)
+        if distance > distances[vertex]:
+            continue
+        for neighbour, weight in adjacency.get(vertex, []):
+            if distance + weight < distances.get(neighbour, np.inf):
+                distances[neighbour] = distance + weight
+                heapq.heappush(queue, (distance + weight, neighbour))
+    return distances
+
+
+def _contraction_hierarchy_distances(data, rank, origins, destinations):
+    """Bidirectional upward search, as done by cppRouting on contracted graphs."""
+    forward = {}
+    backward = {}
+    for a, b, weight in data[["from", "to", "dist"]].itertuples(index=False):
+        if rank[b] > rank[a]:
+            forward.setdefault(a, []).append((b, weight))
+        else:
+            backward.setdefault(b, []).append((a, weight))
+
+    distances = []
+    for origin, destination in zip(origins, destinations):
+        forward_distances = _upward_search(origin, forward)
+        backward_distances = _upward_search(destination, backward)
+        meeting = [d + backward_distances[v] for v, d in forward_distances.items() if v in backward_distances]
+        distances.append(min(meeting, default=np.inf))
+
+    return np.array(distances)
+
+
+def test_customized_contraction_matches_dijkstra_for_several_weights():
+    """One structure gives exact shortest paths for each set of edge weights."""
+    edge_from, edge_to, x, y = _random_road_graph()
+    n_vertices = len(x)
+    structure = build_contraction_structure(n_vertices, edge_from, edge_to, x, y, leaf_size=16)
+
+    rng = np.random.default_rng(1)
+    origins = rng.integers(0, n_vertices, 100)
+    destinations = rng.integers(0, n_vertices, 100)
+
+    for seed in [2, 3]:
+        weights = np.random.default_rng(seed).random(len(edge_from)) + 0.1
+        customized = customize_contraction(structure, edge_from, edge_to, weights)
+        data, rank, _ = contracted_graph_tables(structure, customized)
+
+        expected = _dijkstra_distances(n_vertices, edge_from, edge_to, weights, origins, destinations)
+        result = _contraction_hierarchy_distances(data, rank, origins, destinations)
+
+        np.testing.assert_allclose(result, expected)
+
+
+def test_shortcuts_unpack_into_original_edges_with_the_same_weight():
+    edge_from, edge_to, x, y = _random_road_graph(n_vertices=200, seed=4)
+    weights = np.random.default_rng(5).random(len(edge_from)) + 0.1
+    structure = build_contraction_structure(len(x), edge_from, edge_to, x, y, leaf_size=8)
+    data, _, shortcuts = contracted_graph_tables(
+        structure,
+        customize_contraction(structure, edge_from, edge_to, weights),
+    )
+
+    original = pd.DataFrame({"from": edge_from, "to": edge_to, "w": weights}).groupby(["from", "to"])["w"].min()
+    contracted = data.set_index(["from", "to"])["dist"]
+    middle = shortcuts.set_index(["shortf", "shortt"])["shortc"]
+
+    def unpacked_weight(a, b):
+        if (a, b) in middle.index:
+            c = middle[(a, b)]
+            return unpacked_weight(a, c) + unpacked_weight(c, b)
+        return original[(a, b)]
+
+    assert len(shortcuts) > 0
+    for a, b in zip(shortcuts["shortf"], shortcuts["shortt"]):
+        assert unpacked_weight(a, b) == pytest.approx(contracted[(a, b)])
+
+
+def test_congested_contracted_graph_writes_cpprouting_files(tmp_path):
+    """Customized graphs are written with the same files as cpp_contract outputs."""
+    edge_from, edge_to, x, y = _random_road_graph(n_vertices=50, seed=6)
+    weights = np.random.default_rng(7).random(len(edge_from)) + 0.1
+    structure = build_contraction_structure(len(x), edge_from, edge_to, x, y)
+
+    congested_folder = tmp_path / "path_graph_car" / "congested"
+    congested_folder.mkdir(parents=True)
+    pd.DataFrame({"from": edge_from, "to": edge_to, "dist": weights}).to_parquet(congested_folder / "abcdata.parquet")
+    pd.DataFrame({"ref": [str(i) for i in range(len(x))], "id": np.arange(len(x))}).to_parquet(congested_folder / "abcdict.parquet")
+    pd.DataFrame({"i": np.arange(len(edge_from)) + 1, "aux": weights}).to_parquet(congested_folder / "abcattrib.parquet")
+    pd.DataFrame({"vertex_id": np.arange(len(x)), "x": x, "y": y}).to_parquet(congested_folder.parent / "abc-vertices.parquet")
+
+    output_path = tmp_path / "path_graph_car" / "contracted" / "def-car-contracted-path-graph"
+    ContractedPathGraph.customize_graph(congested_folder / "abc-car-congested-path-graph", structure, output_path)
+
+    for name in ["data", "rank", "shortcuts", "dict", "original_data", "original_data_attrib_aux"]:
+        assert (output_path.parent / f"def{name}.parquet").exists()
+    assert (output_path.parent.parent / "def-vertices.parquet").exists()
+    assert output_path.exists()
+
+    rank = pd.read_parquet(output_path.parent / "defrank.parquet").iloc[:, 0]
+    assert sorted(rank) == list(range(len(x)))
+
+
+def test_contracted_graph_removes_its_vertex_pair_cost_cache(tmp_path):
+    graph = object.__new__(ContractedPathGraph)
+    graph.cache_path = tmp_path / "def-car-contracted-path-graph"
+    graph.vertex_pair_costs_path = tmp_path / "def-vertex-pair-costs.parquet"
+    graph.cache_path.touch()
+    graph.vertex_pair_costs_path.touch()
+
+    graph.remove()
+
+    assert not graph.cache_path.exists()
+    assert not graph.vertex_pair_costs_path.exists()
+
+
+def test_contraction_structure_of_a_graph_without_edges():
+    structure = build_contraction_structure(3, [], [], np.zeros(3), np.zeros(3))
+
+    assert len(structure.arc_low) == 0
+    assert len(structure.triangle_first) == 0
+
+    data, rank, shortcuts = contracted_graph_tables(structure, customize_contraction(structure, [], [], []))
+    assert data.empty and shortcuts.empty
+    assert sorted(rank) == [0, 1, 2]
+
+
+def test_contraction_structure_is_not_computed_for_large_graphs(tmp_path, monkeypatch):
+    from mobility.transport.graphs.contracted import contraction_structure as structure_module
+
+    simplified_folder = tmp_path / "path_graph_car" / "simplified"
+    simplified_folder.mkdir(parents=True)
+    pd.DataFrame({"ref": ["a", "b", "c"], "id": [0, 1, 2]}).to_parquet(simplified_folder / "basedict.parquet")
+    modified_folder = tmp_path / "path_graph_car" / "modified"
+    modified_folder.mkdir(parents=True)
+    (modified_folder / "abcdelta.json").write_text('{"base_folder": "../simplified", "base_hash": "base", "n_edges": 0}')
+    modified_graph_path = modified_folder / "abc-car-modified-path-graph"
+
+    asset = object.__new__(ContractionStructureAsset)
+    asset.inputs = {"modified_graph": SimpleNamespace(get=lambda: modified_graph_path)}
+    asset.cache_path = {
+        name: tmp_path / f"car-contraction-{name}.parquet" for name in ["rank", "arcs", "triangles"]
+    }
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The structure of a large graph should not be computed.")
+
+    monkeypatch.setattr(structure_module, "MAX_CUSTOMIZABLE_CONTRACTION_VERTICES", 2)
+    monkeypatch.setattr(structure_module, "build_contraction_structure", fail)
+
+    assert asset.create_and_get_asset() is None
+    assert asset.get_cached_asset() is None
+
+    graph = object.__new__(ContractedPathGraph)
+    graph.inputs = {"congested_graph": None, "contraction_structure": SimpleNamespace(get=asset.get_cached_asset)}
+    assert graph.get_contraction_structure() is None
+
+
+def test_customizable_contraction_is_opt_in():
+    graph = object.__new__(ContractedPathGraph)
+    graph.inputs = {"congested_graph": None}
+
+    assert graph.get_contraction_structure() is None
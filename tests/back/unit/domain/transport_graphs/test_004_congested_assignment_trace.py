@@ -0,0 +1,91 @@
+import pandas as pd
+
+from mobility.transport.graphs.congested import congested_path_graph as congested_module
+from mobility.transport.graphs.congested.congested_path_graph import CongestedPathGraph
+
+
+def _make_graph(tmp_path, algorithm="bfw"):
+    graph = object.__new__(CongestedPathGraph)
+    graph.inputs = {"congestion_assignment_algorithm": algorithm}
+    graph.cache_path = tmp_path / "abc-car-congested-path-graph"
+    graph.assignment_trace_path = tmp_path / "abc-assignment-trace.parquet"
+    return graph
+
+
+def test_load_graph_passes_the_assignment_algorithm_to_r(monkeypatch, tmp_path):
+    seen = {}
+
+    class FakeRScriptRunner:
+        def __init__(self, script_path):
+            seen["script"] = str(script_path)
+
+        def run(self, args):
+            seen["args"] = args
+
+    monkeypatch.setattr(congested_module, "RScriptRunner", FakeRScriptRunner)
+
+    graph = _make_graph(tmp_path)
+    graph.load_graph(
+        tmp_path / "modified-graph",
+        tmp_path / "transport_zones.gpkg",
+        True,
+        tmp_path / "flows.arrow",
+        0.1,
+        1000.0,
+        10,
+        0.05,
+        0.95,
+        "bfw",
+        False,
+    )
+
+    assert seen["script"].endswith("load_path_graph.R")
+    assert seen["args"][-3:] == ["bfw", "False", str(graph.cache_path)]
+
+
+def test_assignment_trace_is_read_from_the_congested_graph_folder(tmp_path, caplog):
+    graph = _make_graph(tmp_path)
+    assert graph.get_assignment_trace() is None
+
+    pd.DataFrame(
+        {
+            "iteration": [1, 2, 3],
+            "relative_gap": [0.2, 0.05, 0.01],
+            "objective": [300.0, 250.0, 240.0],
+            "step_size": [0.5, 0.3, None],
+            "direction": ["aon", "conjugate", None],
+            "aon_seconds": [1.0, 1.0, 1.0],
+            "iteration_seconds": [1.2, 1.2, 1.1],
+            "elapsed_seconds": [2.2, 3.4, 4.5],
+        }
+    ).to_parquet(graph.assignment_trace_path)
+
+    trace = graph.get_assignment_trace()
+    assert trace["relative_gap"].tolist() == [0.2, 0.05, 0.01]
+
+    with caplog.at_level("INFO"):
+        graph.log_assignment_trace()
+    assert "bfw" in caplog.text
+    assert "3 iterations" in caplog.text
+
+
+def test_cpprouting_assignment_summary_is_logged_without_aon_timings(tmp_path, caplog):
+    graph = _make_graph(tmp_path, algorithm="cfw")
+
+    pd.DataFrame(
+        {
+            "iteration": [12],
+            "relative_gap": [0.04],
+            "objective": [240.0],
+            "step_size": [None],
+            "direction": [None],
+            "aon_seconds": [None],
+            "iteration_seconds": [None],
+            "elapsed_seconds": [8.5],
+        }
+    ).to_parquet(graph.assignment_trace_path)
+
+    with caplog.at_level("INFO"):
+        graph.log_assignment_trace()
+    assert "12 iterations" in caplog.text
+    assert "AON" not in caplog.text
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from mobility.transport.graphs.core.cpprouting_graph_files import read_cppr_graph_tables
+
+
+def _write_full_graph(folder, hash_):
+    folder.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"from": [0, 1, 2], "to": [1, 2, 0], "dist": [10.0, 20.0, 30.0]}).to_parquet(folder / f"{hash_}data.parquet")
+    pd.DataFrame({"ref": ["a", "b", "c"], "id": [0, 1, 2]}).to_parquet(folder / f"{hash_}dict.parquet")
+    pd.DataFrame(
+        {
+            "i": [1, 2, 3],
+            "aux": [100.0, 200.0, 300.0],
+            "cap": [1000.0, 1000.0, 4000.0],
+            "alpha": [None, None, None],
+            "beta": [None, None, None],
+        }
+    ).to_parquet(folder / f"{hash_}attrib.parquet")
+    return folder / f"{hash_}-car-simplified-path-graph"
+
+
+def _write_delta(folder, hash_, base_path, delta, n_edges):
+    folder.mkdir(parents=True, exist_ok=True)
+    delta.to_parquet(folder / f"{hash_}delta-edges.parquet")
+    with open(folder / f"{hash_}delta.json", "w") as f:
+        json.dump(
+            {"base_folder": os.path.relpath(base_path.parent, folder), "base_hash": base_path.name.split("-")[0], "n_edges": n_edges},
+            f,
+        )
+    return folder / f"{hash_}-car-modified-path-graph"
+
+
+def _delta(rows):
+    return pd.DataFrame(
+        rows,
+        columns=["edge_index", "removed", "from", "to", "dist", "aux", "cap", "alpha", "beta"],
+    ).astype({"edge_index": "Int64"})
+
+
+def test_edge_delta_updates_removes_and_adds_edges(tmp_path):
+    base_path = _write_full_graph(tmp_path / "simplified", "base")
+    graph_path = _write_delta(
+        tmp_path / "modified",
+        "mod",
+        base_path,
+        _delta(
+            [
+                [0, False, 0, 1, 15.0, 100.0, 500.0, 0.15, 4.0],
+                [1, True, 1, 2, 20.0, 200.0, 1000.0, None, None],
+                [None, False, 2, 1, 5.0, 50.0, 2000.0, None, None],
+            ]
+        ),
+        n_edges=3,
+    )
+
+    data, graph_dict, attrib = read_cppr_graph_tables(graph_path)
+
+    assert data.to_dict("list") == {"from": [0, 2, 2], "to": [1, 0, 1], "dist": [15.0, 30.0, 5.0]}
+    assert graph_dict["ref"].tolist() == ["a", "b", "c"]
+    assert attrib["cap"].tolist() == [500.0, 4000.0, 2000.0]
+    assert attrib["alpha"].iloc[0] == 0.15
+    assert "i" not in attrib.columns
+
+
+def test_edge_deltas_can_be_chained(tmp_path):
+    base_path = _write_full_graph(tmp_path / "simplified", "base")
+    modified_path = _write_delta(
+        tmp_path / "modified",
+        "mod",
+        base_path,
+        _delta([[2, False, 2, 0, 60.0, 300.0, 2000.0, None, None]]),
+        n_edges=3,
+    )
+    congested_path = _write_delta(
+        tmp_path / "congested",
+        "cong",
+        modified_path,
+        _delta([[1, False, 1, 2, 25.0, 200.0, 1000.0, None, None]]),
+        n_edges=3,
+    )
+
+    data, _, attrib = read_cppr_graph_tables(congested_path)
+
+    assert data["dist"].tolist() == [10.0, 25.0, 60.0]
+    assert attrib["cap"].tolist() == [1000.0, 1000.0, 2000.0]
+
+
+def test_edge_delta_checks_the_number_of_edges(tmp_path):
+    base_path = _write_full_graph(tmp_path / "simplified", "base")
+    graph_path = _write_delta(tmp_path / "modified", "mod", base_path, _delta([]), n_edges=4)
+
+    with pytest.raises(ValueError, match="unexpected number of edges"):
+        read_cppr_graph_tables(graph_path)
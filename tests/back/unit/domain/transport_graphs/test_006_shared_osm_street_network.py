@@ -0,0 +1,29 @@
+from mobility.transport.graphs.simplified.osm_street_network import (
+    STREET_NETWORK_HIGHWAY_TAGS,
+    street_network_highway_tags,
+)
+from mobility.transport.modes.core.osm_capacity_parameters import OSMCapacityParameters
+
+
+def test_default_path_modes_share_the_same_street_network_extract():
+    tags = [
+        street_network_highway_tags(OSMCapacityParameters(mode))
+        for mode in ["car", "walk", "bicycle"]
+    ]
+
+    assert tags[0] == tags[1] == tags[2] == STREET_NETWORK_HIGHWAY_TAGS
+    assert {"motorway", "footway", "cycleway", "traffic_signals", "crossing"} <= set(STREET_NETWORK_HIGHWAY_TAGS)
+
+
+def test_custom_highway_classes_extend_the_street_network_extract():
+    parameters = OSMCapacityParameters("car")
+    parameters.__class__ = type(
+        "CustomCarOSMCapacityParameters",
+        (parameters.__class__,),
+        {"get_highway_tags": lambda self: ["motorway", "service"]},
+    )
+
+    tags = street_network_highway_tags(parameters)
+
+    assert "service" in tags
+    assert set(STREET_NETWORK_HIGHWAY_TAGS) < set(tags)
@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mobility.transport.graphs.core.cpprouting_graph_files import read_cppr_graph_tables
+from mobility.transport.graphs.core.csr_graph_store import (
+    csr_graph_exists,
+    csr_graph_path,
+    prepare_csr_graph,
+    read_csr_graph,
+    remove_csr_graph,
+)
+
+
+def _write_full_graph(folder, hash_):
+    folder.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"from": [2, 0, 1, 0], "to": [0, 1, 2, 2], "dist": [30.0, 10.0, 20.0, 40.0]}).to_parquet(
+        folder / f"{hash_}data.parquet"
+    )
+    pd.DataFrame({"ref": ["a", "b", "c"], "id": [0, 1, 2]}).to_parquet(folder / f"{hash_}dict.parquet")
+    pd.DataFrame(
+        {
+            "i": [1, 2, 3, 4],
+            "aux": [300.0, 100.0, 200.0, 400.0],
+            "alpha": [None, None, None, None],
+        }
+    ).to_parquet(folder / f"{hash_}attrib.parquet")
+    return folder / f"{hash_}-car-simplified-path-graph"
+
+
+def test_csr_graph_indexes_the_outgoing_edges_in_cpprouting_order(tmp_path):
+    graph_path = _write_full_graph(tmp_path / "simplified", "base")
+
+    csr_path = prepare_csr_graph(graph_path)
+    csr_graph = read_csr_graph(graph_path)
+
+    # The copy is cached outside the variant folder
+    assert csr_path == tmp_path / "csr" / "basecsr"
+    assert csr_graph_exists(tmp_path / "simplified", "base")
+    assert csr_graph.n_vertices == 3
+    assert csr_graph.n_edges == 4
+    assert csr_graph.offsets.tolist() == [0, 2, 3, 4]
+    assert csr_graph.out_edges(0).tolist() == [1, 3]
+    assert csr_graph.out_edges(2).tolist() == [0]
+    assert csr_graph.column("dist").tolist() == [30.0, 10.0, 20.0, 40.0]
+    assert csr_graph.attribute_names == ["aux", "alpha"]
+    assert np.isnan(csr_graph.column("alpha")).all()
+
+
+def test_csr_graph_is_only_written_by_the_prepare_step(tmp_path):
+    folder = tmp_path / "simplified"
+    graph_path = _write_full_graph(folder, "base")
+
+    with pytest.raises(FileNotFoundError):
+        read_csr_graph(graph_path)
+    assert not csr_graph_path(folder, "base").exists()
+
+    prepare_csr_graph(graph_path)
+    remove_csr_graph(folder, "base")
+
+    assert not csr_graph_exists(folder, "base")
+
+
+def test_graph_tables_are_read_from_the_csr_copy(tmp_path):
+    folder = tmp_path / "simplified"
+    graph_path = _write_full_graph(folder, "base")
+    expected_data, expected_dict, _ = read_cppr_graph_tables(graph_path)
+    prepare_csr_graph(graph_path)
+
+    # The CSR copy is complete : the graph tables are not needed anymore.
+    for file_name in ["data", "dict", "attrib"]:
+        (folder / f"base{file_name}.parquet").unlink()
+
+    data, graph_dict, attrib = read_cppr_graph_tables(graph_path)
+
+    pd.testing.assert_frame_equal(data, expected_data, check_dtype=False)
+    pd.testing.assert_frame_equal(graph_dict, expected_dict, check_dtype=False)
+    assert attrib["aux"].tolist() == [300.0, 100.0, 200.0, 400.0]
+
+
+def test_edge_delta_graphs_get_a_full_csr_copy(tmp_path):
+    base_path = _write_full_graph(tmp_path / "simplified", "base")
+    folder = tmp_path / "modified"
+    folder.mkdir()
+    pd.DataFrame(
+        {
+            "edge_index": pd.array([1, None], dtype="Int64"),
+            "removed": [False, False],
+            "from": [0, 1],
+            "to": [1, 0],
+            "dist": [15.0, 5.0],
+            "aux": [100.0, 50.0],
+            "alpha": [0.15, None],
+        }
+    ).to_parquet(folder / "moddelta-edges.parquet")
+    with open(folder / "moddelta.json", "w") as f:
+        json.dump({"base_folder": str(base_path.parent), "base_hash": "base", "n_edges": 5}, f)
+
+    graph_path = folder / "mod-car-modified-path-graph"
+    prepare_csr_graph(graph_path)
+    csr_graph = read_csr_graph(graph_path)
+
+    # Delta graphs are not copied in their own folder
+    assert not (folder / "modcsr").exists()
+
+    assert csr_graph.column("dist").tolist() == [30.0, 15.0, 20.0, 40.0, 5.0]
+    assert csr_graph.out_edges(1).tolist() == [2, 4]
+    assert csr_graph.column("alpha")[1] == 0.15
@@ -0,0 +1,86 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph, write_csr_graph
+from mobility.transport.graphs.core.shortest_path_trees import shortest_path_edges
+
+
+def _csr_graph(tmp_path, data):
+    n_vertices = int(max(data["from"].max(), data["to"].max())) + 1
+    graph_dict = pd.DataFrame({"ref": [str(i) for i in range(n_vertices)], "id": range(n_vertices)})
+    attrib = pd.DataFrame({"aux": data["dist"] * 10.0})
+    return CSRGraph(write_csr_graph(tmp_path / "gcsr", data, graph_dict, attrib))
+
+
+def test_shortest_path_edges_use_the_lightest_parallel_edge(tmp_path):
+    data = pd.DataFrame(
+        {
+            "from": [0, 0, 1, 0, 2, 3],
+            "to": [1, 1, 2, 2, 3, 0],
+            "dist": [5.0, 1.0, 0.0, 4.0, 1.0, 1.0],
+        }
+    )
+    csr_graph = _csr_graph(tmp_path, data)
+
+    paths = shortest_path_edges(csr_graph, np.array([0, 0, 2, 1]), np.array([3, 0, 0, 0]))
+
+    assert paths.filter(paths["pair_index"] == 0)["edge_id"].to_list() == [1, 2, 4]
+    assert paths.filter(paths["pair_index"] == 2)["edge_id"].to_list() == [4, 5]
+    assert paths["path_section_id"].to_list()[:3] == [1, 2, 3]
+    # Same origin and destination : no edge
+    assert paths.filter(paths["pair_index"] == 1).height == 0
+
+
+def test_shortest_path_edges_skip_unreachable_pairs(tmp_path):
+    data = pd.DataFrame({"from": [0, 2], "to": [1, 1], "dist": [1.0, 1.0]})
+    csr_graph = _csr_graph(tmp_path, data)
+
+    paths = shortest_path_edges(csr_graph, np.array([0, 1]), np.array([2, 0]))
+
+    assert paths.height == 0
+
+
+def test_batched_shortest_paths_match_networkx(tmp_path):
+    rng = np.random.default_rng(0)
+    n_vertices, n_edges = 60, 300
+    data = pd.DataFrame(
+        {
+            "from": rng.integers(0, n_vertices, n_edges),
+            "to": rng.integers(0, n_vertices, n_edges),
+            "dist": rng.uniform(1.0, 10.0, n_edges),
+        }
+    )
+    data = data[data["from"] != data["to"]].reset_index(drop=True)
+    csr_graph = _csr_graph(tmp_path, data)
+
+    origins = rng.integers(0, n_vertices, 200)
+    destinations = rng.integers(0, n_vertices, 200)
+
+    # Small batches : several shortest path tree computations
+    paths = shortest_path_edges(csr_graph, origins, destinations, max_predecessors_per_batch=5 * n_vertices)
+    costs = (
+        paths
+        .with_columns(dist=data["dist"].to_numpy()[paths["edge_id"].to_numpy()])
+        .group_by("pair_index")
+        .agg(pl.col("dist").sum())
+    )
+    costs = dict(zip(costs["pair_index"].to_list(), costs["dist"].to_list()))
+
+    # The lightest parallel edge is added last and kept
+    graph = nx.DiGraph()
+    lightest_last = data.sort_values("dist", ascending=False)
+    for from_id, to_id, dist in zip(lightest_last["from"], lightest_last["to"], lightest_last["dist"]):
+        graph.add_edge(from_id, to_id, weight=dist)
+
+    for pair_index, (origin, destination) in enumerate(zip(origins, destinations)):
+        try:
+            expected = nx.dijkstra_path_length(graph, origin, destination)
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            assert pair_index not in costs
+            continue
+        if origin == destination:
+            assert pair_index not in costs
+        else:
+            assert np.isclose(costs[pair_index], expected)
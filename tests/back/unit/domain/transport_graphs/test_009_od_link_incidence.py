@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph, write_csr_graph
+from mobility.transport.graphs.core.od_link_incidence import ODLinkIncidence
+
+
+def _line_graph(tmp_path):
+    # 0 <-> 1 <-> 2 <-> 3, vertex refs 10, 11, 12, 13
+    data = pd.DataFrame(
+        {
+            "from": [0, 1, 1, 2, 2, 3],
+            "to": [1, 0, 2, 1, 3, 2],
+            "dist": [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+        }
+    )
+    graph_dict = pd.DataFrame({"ref": ["10", "11", "12", "13"], "id": [0, 1, 2, 3]})
+    attrib = pd.DataFrame({"aux": np.ones(len(data))})
+    return CSRGraph(write_csr_graph(tmp_path / "gcsr", data, graph_dict, attrib))
+
+
+def _buildings():
+    # Zone 1 has one building at level 1, and two at level 2
+    buildings = pl.DataFrame(
+        {
+            "transport_zone_id": [1, 1, 1, 2],
+            "n_clusters": [1, 2, 2, 1],
+            "weight": [1.0, 0.5, 0.5, 1.0],
+        }
+    )
+    od_vertex_map = pl.DataFrame({"building_id": [1, 2, 3, 4], "vertex_id": [10, 10, 11, 13]})
+    return buildings, od_vertex_map
+
+
+def test_od_flows_are_loaded_on_the_links_of_their_paths(tmp_path):
+    csr_graph = _line_graph(tmp_path)
+    buildings, od_vertex_map = _buildings()
+    od_pairs = pl.DataFrame({"from": [1, 2], "to": [2, 1]})
+
+    incidence = ODLinkIncidence.build(csr_graph, od_pairs, buildings, od_vertex_map, n_clusters=1)
+    flows = incidence.load(pl.DataFrame({"from": [1, 2, 1], "to": [2, 1, 2], "vehicle_volume": [10.0, 4.0, 2.0]}))
+
+    assert flows.tolist() == [12.0, 4.0, 12.0, 4.0, 12.0, 4.0]
+
+
+def test_zone_flows_are_split_between_the_buildings_of_the_zone(tmp_path):
+    csr_graph = _line_graph(tmp_path)
+    buildings, od_vertex_map = _buildings()
+    od_pairs = pl.DataFrame({"from": [1], "to": [2]})
+
+    incidence = ODLinkIncidence.build(csr_graph, od_pairs, buildings, od_vertex_map)
+    flows = incidence.load(pl.DataFrame({"from": [1, 3], "to": [2, 1], "vehicle_volume": [10.0, 100.0]}))
+
+    # Half of the flow starts from vertex 10, half from vertex 11
+    assert flows.tolist() == [5.0, 0.0, 10.0, 0.0, 10.0, 0.0]
+
+
+def test_od_link_incidence_can_be_saved_and_read(tmp_path):
+    csr_graph = _line_graph(tmp_path)
+    buildings, od_vertex_map = _buildings()
+    incidence = ODLinkIncidence.build(csr_graph, pl.DataFrame({"from": [2], "to": [1]}), buildings, od_vertex_map)
+
+    incidence.save(tmp_path / "incidence")
+    incidence = ODLinkIncidence.read(tmp_path / "incidence")
+
+    assert incidence.load(pl.DataFrame({"from": [2], "to": [1], "vehicle_volume": [3.0]})).tolist() == [0.0, 1.5, 0.0, 3.0, 0.0, 3.0]
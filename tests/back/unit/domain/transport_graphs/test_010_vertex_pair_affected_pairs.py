@@ -0,0 +1,112 @@
+import pathlib
+import subprocess
+
+
+def _run_r_code(r_code: str) -> None:
+    subprocess.run(["Rscript", "-e", r_code], check=True, capture_output=True, text=True)
+
+
+def _helper_path() -> pathlib.Path:
+    repo_root = pathlib.Path(__file__).resolve().parents[5]
+    return repo_root / "mobility" / "transport" / "graphs" / "core" / "vertex_pair_costs.R"
+
+
+# Base graph : 1 -> 4 has two shortest paths of time 2 (through 2 and through
+# 3). The modified graph makes 2 -> 4 slower (1 -> 3), 2 -> 3 faster (5 -> 1)
+# and 1 -> 5 faster (6 -> 4, as fast as the base time of 1 -> 5).
+_GRAPHS = """
+edges_with_times <- function(dist) {
+  data.frame(
+    from = c("1", "2", "1", "3", "2", "4", "1"),
+    to = c("2", "4", "3", "4", "3", "5", "5"),
+    dist = dist,
+    stringsAsFactors = FALSE
+  )
+}
+
+base_graph <- cpp_contract(makegraph(edges_with_times(c(1, 1, 1, 1, 5, 2, 6))), silent = TRUE)
+graph <- cpp_contract(makegraph(edges_with_times(c(1, 3, 1, 1, 1, 2, 4))), silent = TRUE)
+
+pairs <- data.table(
+  vertex_id_from = c("1", "1", "1", "1", "2", "2", "2", "3"),
+  vertex_id_to = c("2", "3", "4", "5", "3", "4", "5", "5"),
+  time = c(1, 1, 2, 4, 5, 1, 3, 3)
+)
+
+edges <- changed_graph_edges(graph, base_graph)
+setorder(edges, from, to)
+"""
+
+
+def test_changed_edges_are_split_between_slower_and_faster_edges():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPHS}
+stopifnot(identical(edges$from, c("1", "2", "2")))
+stopifnot(identical(edges$to, c("5", "3", "4")))
+stopifnot(identical(edges$base_dist, c(6, 5, 1)))
+stopifnot(identical(edges$dist, c(4, 1, 3)))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_pairs_through_slower_edges_include_equal_time_ties():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPHS}
+slower <- edges[dist > base_dist]
+flagged <- pairs_through_edges(base_graph, pairs, pairs$time, slower, slower$base_dist, or_equal = TRUE)
+
+# 1 -> 4 can also go through 3 at the same time, but one of its shortest
+# paths uses the slower edge
+stopifnot(identical(flagged, c(FALSE, FALSE, TRUE, TRUE, FALSE, TRUE, TRUE, FALSE)))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_pairs_through_faster_edges_exclude_equal_time_ties():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPHS}
+faster <- edges[dist < base_dist]
+flagged <- pairs_through_edges(graph, pairs, pairs$time, faster, faster$dist, or_equal = FALSE)
+
+# 1 -> 5 through the faster edge 1 -> 5 takes its base time : not affected
+stopifnot(identical(flagged, c(FALSE, FALSE, FALSE, FALSE, TRUE, FALSE, FALSE, FALSE)))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_pairs_that_are_not_affected_keep_their_base_time():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPHS}
+pairs <- rbind(pairs, data.table(vertex_id_from = "3", vertex_id_to = "4", time = NA_real_))
+affected <- affected_vertex_pairs(pairs, edges, graph, base_graph)
+
+stopifnot(identical(affected, c(FALSE, FALSE, TRUE, TRUE, TRUE, TRUE, TRUE, FALSE, TRUE)))
+
+reused <- pairs[!affected]
+times <- get_distance_pair(graph, from = reused$vertex_id_from, to = reused$vertex_id_to)
+stopifnot(isTRUE(all.equal(times, reused$time)))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_reuse_is_skipped_above_the_edge_and_matrix_size_limits():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPHS}
+stopifnot(vertex_pair_reuse_is_bounded(pairs, edges))
+stopifnot(!vertex_pair_reuse_is_bounded(pairs, edges, max_changed_edges = 2))
+
+# 3 origins x 2 edge tails + 3 edge heads x 4 destinations
+stopifnot(vertex_pair_reuse_is_bounded(pairs, edges, max_matrix_cells = 18))
+stopifnot(!vertex_pair_reuse_is_bounded(pairs, edges, max_matrix_cells = 17))
+"""
+
+    _run_r_code(r_code)
@@ -0,0 +1,123 @@
+import pathlib
+import subprocess
+
+
+def _run_r_code(r_code: str) -> None:
+    subprocess.run(["Rscript", "-e", r_code], check=True, capture_output=True, text=True)
+
+
+def _helper_path() -> pathlib.Path:
+    repo_root = pathlib.Path(__file__).resolve().parents[5]
+    return repo_root / "mobility" / "transport" / "graphs" / "congested" / "assign_traffic.R"
+
+
+# Two routes from 1 to 2 (direct, or through 3) that both get congested, and a
+# long uncongested bypass from 1 to 4.
+_GRAPH = """
+edges <- data.frame(
+  from = c("1", "1", "3", "2", "1"),
+  to = c("2", "3", "2", "4", "4"),
+  dist = c(10, 5, 5, 1, 30),
+  stringsAsFactors = FALSE
+)
+graph <- makegraph(edges, capacity = c(100, 50, 50, 1000, 100), alpha = rep(0.15, 5), beta = rep(4, 5))
+
+from <- c("1", "1")
+to <- c("4", "2")
+demand <- c(300, 50)
+
+reference <- assign_traffic(
+  graph, from = from, to = to, demand = demand,
+  algorithm = "bfw", aon_method = "bi", max_gap = 1e-6, max_it = 1000, verbose = FALSE
+)
+"""
+
+
+def test_traced_assignment_reaches_the_cpprouting_equilibrium():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPH}
+for (algorithm in c("fw", "cfw", "bfw")) {{
+  for (aon_method in c("bi", "cbi")) {{
+    traffic <- assign_traffic_with_trace(
+      graph, from = from, to = to, demand = demand,
+      algorithm = algorithm, max_gap = 1e-6, max_it = 1000, aon_method = aon_method
+    )
+    stopifnot(max(abs(traffic$data$cost - reference$data$cost) / reference$data$cost) < 1e-2)
+    stopifnot(abs(sum(traffic$data$flow) - sum(reference$data$flow)) / sum(reference$data$flow) < 1e-2)
+  }}
+}}
+"""
+
+    _run_r_code(r_code)
+
+
+def test_traced_assignment_records_one_row_per_iteration():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPH}
+traffic <- assign_traffic_with_trace(
+  graph, from = from, to = to, demand = demand,
+  algorithm = "bfw", max_gap = 1e-4, max_it = 200, aon_method = "cbi"
+)
+trace <- traffic$trace
+
+stopifnot(identical(trace$iteration, seq_len(nrow(trace))))
+stopifnot(trace$relative_gap[nrow(trace)] <= 1e-4)
+stopifnot(trace$direction[1] == "aon")
+stopifnot(is.na(trace$step_size[nrow(trace)]))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_cpprouting_assignment_trace_ends_with_the_final_gap():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPH}
+traffic <- assign_traffic_with_cpprouting(
+  graph, from = from, to = to, demand = demand,
+  algorithm = "bfw", max_gap = 1e-6, max_it = 1000, aon_method = "bi"
+)
+
+stopifnot(isTRUE(all.equal(traffic$data$cost, reference$data$cost)))
+stopifnot(nrow(traffic$trace) >= 1)
+stopifnot(!is.unsorted(traffic$trace$iteration, strictly = TRUE))
+stopifnot(traffic$trace$relative_gap[nrow(traffic$trace)] <= 1e-6)
+stopifnot(traffic$trace$elapsed_seconds[nrow(traffic$trace)] >= 0)
+"""
+
+    _run_r_code(r_code)
+
+
+def test_cpprouting_verbose_output_gives_the_gap_of_each_iteration():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+lines <- c(
+  "Contracting graph...",
+  "iteration 1 : gap 0.5",
+  "Iteration: 2, relative gap = 1.2e-03",
+  "iteration 2 : gap 0.001",
+  "Total time : 3.2 s"
+)
+iterations <- parse_cpprouting_iterations(lines)
+
+stopifnot(identical(iterations$iteration, c(1L, 2L)))
+stopifnot(isTRUE(all.equal(iterations$relative_gap, c(0.5, 0.001))))
+"""
+
+    _run_r_code(r_code)
+
+
+def test_unknown_aon_method_is_rejected():
+    r_code = f"""
+source("{_helper_path().as_posix()}")
+{_GRAPH}
+result <- tryCatch(
+  assign_traffic_with_trace(graph, from = from, to = to, demand = demand, aon_method = "dijkstra"),
+  error = function(e) conditionMessage(e)
+)
+stopifnot(grepl("Unknown AON method", result))
+"""
+
+    _run_r_code(r_code)
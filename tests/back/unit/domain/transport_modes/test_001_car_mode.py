@@ -21,6 +21,9 @@ def test_car_mode_forwards_congestion_assignment_parameters(monkeypatch):
             congestion_assignment_max_iterations,
             congestion_assignment_max_gap,
             congestion_assignment_retained_volume_share,
+            congestion_assignment_algorithm,
+            congestion_assignment_trace,
+            customizable_contraction,
             speed_modifiers,
         ):
             seen.update(
@@ -37,6 +40,9 @@ def test_car_mode_forwards_congestion_assignment_parameters(monkeypatch):
                     "congestion_assignment_retained_volume_share": (
                         congestion_assignment_retained_volume_share
                     ),
+                    "congestion_assignment_algorithm": congestion_assignment_algorithm,
+                    "congestion_assignment_trace": congestion_assignment_trace,
+                    "customizable_contraction": customizable_contraction,
                     "speed_modifiers": speed_modifiers,
                 }
             )
@@ -62,6 +68,9 @@ def test_car_mode_forwards_congestion_assignment_parameters(monkeypatch):
         congestion_assignment_max_iterations=7,
         congestion_assignment_max_gap=0.03,
         congestion_assignment_retained_volume_share=0.8,
+        congestion_assignment_algorithm="bfw",
+        congestion_assignment_trace=True,
+        customizable_contraction=True,
         speed_modifiers=["speed-modifier"],
     )
 
@@ -72,5 +81,8 @@ def test_car_mode_forwards_congestion_assignment_parameters(monkeypatch):
         "congestion_assignment_max_iterations": 7,
         "congestion_assignment_max_gap": 0.03,
         "congestion_assignment_retained_volume_share": 0.8,
+        "congestion_assignment_algorithm": "bfw",
+        "congestion_assignment_trace": True,
+        "customizable_contraction": True,
         "speed_modifiers": ["speed-modifier"],
     }
@@ -587,11 +587,11 @@ def test_003_gtfs_data_downloads_selected_sources_in_parallel(monkeypatch):
     }
     downloaded_pairs = []
 
-    def fake_download_files(url_path_pairs, **kwargs):
+    def fake_fetch_gtfs_files(url_path_pairs, **kwargs):
         downloaded_pairs.extend(url_path_pairs)
         return [path for _url, path in url_path_pairs]
 
-    monkeypatch.setattr(gtfs_data_module, "download_files", fake_download_files)
+    monkeypatch.setattr(gtfs_data_module, "fetch_gtfs_files", fake_fetch_gtfs_files)
     monkeypatch.setattr(GTFSData, "is_update_needed", lambda self: True)
     monkeypatch.setattr(GTFSData, "is_gtfs_file_ok", lambda self, path: True)
 
@@ -0,0 +1,264 @@
+import numpy as np
+import polars as pl
+
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+
+import mobility
+from mobility.transport.modes.public_transport.gtfs.gtfs_timetable import GTFSTimetable
+from mobility.transport.modes.public_transport import raptor_router
+from mobility.transport.modes.public_transport.raptor_router import RaptorRouter
+
+
+def _builder(route_id):
+    return mobility.GTFSBuilder(
+        agency_id="agency",
+        agency_name="Agency",
+        route_id=route_id,
+        route_short_name=route_id,
+        route_type="bus",
+        service_id="service",
+    )
+
+
+def _random_timetable(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    stops = {f"S{i}": [2.0 + rng.uniform(0.0, 0.01), 48.0 + rng.uniform(0.0, 0.01)] for i in range(12)}
+
+    gtfs_files = []
+    for line in range(5):
+        builder = _builder(f"L{line}")
+        builder.add_stops(stops)
+        stop_ids = rng.choice(list(stops), size=rng.integers(3, 7), replace=False)
+        builder.add_line(
+            [(a, b, float(rng.integers(60, 400))) for a, b in zip(stop_ids[:-1], stop_ids[1:])],
+            start_time=6.0 * 3600.0 + float(rng.integers(0, 900)),
+            end_time=8.0 * 3600.0,
+            period=float(rng.integers(300, 900)),
+        )
+        gtfs_files.append(builder.write_zip(tmp_path / f"line_{seed}_{line}.zip"))
+
+    return GTFSTimetable.from_gtfs_zips(gtfs_files)
+
+
+def _time_expanded_earliest_arrivals(timetable, origin_stop_ids, departure_time):
+    """Earliest arrivals on a time-expanded graph : one node per stop time event."""
+
+    stop_times = timetable.stop_times.sort(["trip_id", "stop_sequence"]).to_dicts()
+    n_events = len(stop_times)
+
+    transfers = {}
+    for row in timetable.transfers.to_dicts():
+        transfers.setdefault(row["from_stop_id"], []).append((row["to_stop_id"], row["min_transfer_time"]))
+
+    # Arrival nodes 0..n-1, departure nodes n..2n-1, then one waiting node
+    # per departure time at each stop, then one source node per origin.
+    wait_times = {}
+    for row in stop_times:
+        wait_times.setdefault(row["stop_id"], set()).add(row["departure_time"])
+    wait_nodes = {}
+    next_node = 2 * n_events
+    for stop_id, times in wait_times.items():
+        times = np.array(sorted(times))
+        wait_nodes[stop_id] = (times, np.arange(next_node, next_node + len(times)))
+        next_node += len(times)
+
+    def first_wait(stop_id, time):
+        if stop_id not in wait_nodes:
+            return None
+        times, nodes = wait_nodes[stop_id]
+        i = np.searchsorted(times, time)
+        return None if i == len(times) else nodes[i]
+
+    edges = []
+    for i, row in enumerate(stop_times):
+        # Stay in the vehicle, then ride to the next stop of the trip
+        edges.append((i, n_events + i))
+        if i + 1 < n_events and stop_times[i + 1]["trip_id"] == row["trip_id"]:
+            edges.append((n_events + i, i + 1))
+        # Board from the waiting chain
+        edges.append((first_wait(row["stop_id"], row["departure_time"]), n_events + i))
+        # Alight and wait at the stop, or walk one transfer
+        for stop_id, time in [(row["stop_id"], 0.0)] + transfers.get(row["stop_id"], []):
+            wait = first_wait(stop_id, row["arrival_time"] + time)
+            if wait is not None:
+                edges.append((i, wait))
+
+    for times, nodes in wait_nodes.values():
+        edges.extend(zip(nodes[:-1], nodes[1:]))
+
+    sources = np.arange(next_node, next_node + len(origin_stop_ids))
+    walked = []
+    for source, origin in zip(sources, origin_stop_ids):
+        origin_walks = [(origin, 0.0)] + transfers.get(origin, [])
+        walked.append({stop_id: departure_time + time for stop_id, time in origin_walks})
+        for stop_id, time in origin_walks:
+            wait = first_wait(stop_id, departure_time + time)
+            if wait is not None:
+                edges.append((source, wait))
+
+    edges = np.array(edges)
+    n_nodes = sources[-1] + 1
+    graph = sparse.csr_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(n_nodes, n_nodes))
+    reached = np.isfinite(dijkstra(graph, indices=sources, unweighted=True)[:, :n_events])
+
+    earliest = []
+    for row_reached, origin_walked in zip(reached, walked):
+        arrivals = dict(origin_walked)
+        for i in np.flatnonzero(row_reached):
+            row = stop_times[i]
+            for stop_id, time in [(row["stop_id"], 0.0)] + transfers.get(row["stop_id"], []):
+                arrivals[stop_id] = min(arrivals.get(stop_id, np.inf), row["arrival_time"] + time)
+        earliest.append(arrivals)
+
+    return earliest
+
+
+def test_raptor_waits_for_the_next_trip_and_uses_the_fastest_one(tmp_path):
+    builder = _builder("R")
+    builder.add_stops({"A": [2.0, 48.0], "B": [2.1, 48.0], "C": [2.2, 48.0]})
+    builder.add_line([("A", "B", 600.0), ("B", "C", 300.0)], start_time=6.0 * 3600.0, end_time=7.0 * 3600.0, period=900.0)
+    # Express trip on the same stops, overtaking the 06:15 trip
+    builder.add_line([("A", "B", 120.0), ("B", "C", 60.0)], start_time=6.0 * 3600.0 + 1000.0, end_time=6.0 * 3600.0 + 1000.0, period=900.0, bidirectional=False)
+
+    timetable = GTFSTimetable.from_gtfs_zips([builder.write_zip(tmp_path / "feed.zip")])
+    timetable.write(tmp_path / "timetable")
+    router = RaptorRouter(GTFSTimetable.read(tmp_path / "timetable"))
+
+    arrivals = router.earliest_arrivals(["1-A"], 6.0 * 3600.0 + 60.0)[0]
+    arrivals = dict(zip(router.stop_ids, arrivals))
+
+    # The 06:15 trip reaches C at 06:30, the 06:16:40 express at 06:19:40
+    assert arrivals["1-B"] == 6.0 * 3600.0 + 1000.0 + 120.0
+    assert arrivals["1-C"] == 6.0 * 3600.0 + 1000.0 + 180.0
+
+
+def test_raptor_matches_the_time_expanded_graph_on_synthetic_feeds(tmp_path):
+    for seed in range(3):
+        timetable = _random_timetable(tmp_path, seed)
+        router = RaptorRouter(timetable)
+        origins = router.stop_ids.tolist()
+
+        for departure_time in [6.0 * 3600.0, 6.5 * 3600.0 + 17.0]:
+            arrivals = router.earliest_arrivals(origins, departure_time, max_rounds=20)
+
+            expected = _time_expanded_earliest_arrivals(timetable, origins, departure_time)
+
+            for row, origin in enumerate(origins):
+                for stop_id, arrival in zip(router.stop_ids, arrivals[row]):
+                    assert arrival == expected[row].get(stop_id, np.inf), (seed, origin, stop_id)
+
+
+def test_raptor_profiles_give_the_earliest_arrival_of_every_departure_time(tmp_path):
+    timetable = _random_timetable(tmp_path, 7)
+    router = RaptorRouter(timetable, start_time=6.5 * 3600.0, end_time=8.5 * 3600.0)
+    start_time, end_time, max_travel_time = 6.5 * 3600.0, 7.0 * 3600.0, 1800.0
+
+    profiles = router.profiles(start_time, end_time, departure_step=120.0, max_rounds=4, max_travel_time=max_travel_time)
+
+    # Pareto optimal entries only : arrivals strictly increase with departures
+    increasing = profiles.group_by(["from_stop_id", "to_stop_id"]).agg(
+        (pl.col("arrival_time").diff().drop_nulls() > 0).all().alias("ok")
+    )
+    assert increasing["ok"].all()
+
+    origins = profiles["from_stop_id"].unique().sort().to_list()
+    for departure_time in np.arange(start_time, end_time + 1.0, 120.0):
+        arrivals = router.earliest_arrivals(origins, departure_time, max_rounds=4)
+        expected = {
+            (origin, stop_id): arrival
+            for row, origin in enumerate(origins)
+            for stop_id, arrival in zip(router.stop_ids, arrivals[row])
+            if stop_id != origin and arrival - departure_time <= max_travel_time
+        }
+        from_profiles = (
+            profiles
+            .filter(pl.col("departure_time") >= departure_time)
+            .group_by(["from_stop_id", "to_stop_id"])
+            .agg(pl.col("arrival_time").min())
+            .filter(pl.col("arrival_time") - departure_time <= max_travel_time)
+        )
+        from_profiles = {(a, b): t for a, b, t in from_profiles.iter_rows()}
+        assert from_profiles == expected
+
+
+def test_profiles_do_not_depend_on_the_origin_batches_and_scan_chunks(tmp_path, monkeypatch):
+    timetable = _random_timetable(tmp_path, 11)
+    router = RaptorRouter(timetable, start_time=6.5 * 3600.0, end_time=8.5 * 3600.0)
+    start_time, end_time, max_travel_time = 6.5 * 3600.0, 7.0 * 3600.0, 1800.0
+
+    profiles = router.profiles(start_time, end_time, departure_step=120.0, max_rounds=4, max_travel_time=max_travel_time)
+
+    # Three origins per batch and a few patterns scanned at a time
+    monkeypatch.setattr(raptor_router, "MAX_LABELS_PER_BATCH", 3 * 6 * router.n_stops)
+    monkeypatch.setattr(raptor_router, "MAX_SCANNED_SLOTS", 10)
+    batches = list(
+        router.profile_batches(start_time, end_time, departure_step=120.0, max_rounds=4, max_travel_time=max_travel_time)
+    )
+
+    assert len(batches) > 1
+    for batch in batches:
+        assert batch["from_stop_id"].n_unique() <= 3
+    assert pl.concat(batches).sort(["from_stop_id", "to_stop_id", "departure_time"]).equals(profiles)
+
+
+def test_duplicate_and_dominated_trips_are_dropped_without_changing_arrivals(tmp_path):
+    timetable = _random_timetable(tmp_path, 11)
+    n_trips = sum(pattern.n_trips for pattern in RaptorRouter(timetable).patterns)
+
+    stop_times = timetable.stop_times.sort(["trip_id", "stop_sequence"])
+    trip_ids = stop_times["trip_id"].unique(maintain_order=True).to_list()
+    first_stop = pl.col("stop_sequence") == pl.col("stop_sequence").min().over("trip_id")
+
+    # Same trips published twice, trips leaving the first stop earlier but
+    # then running like the original one, and trips overtaken by a faster
+    # one (these ones are not dominated and are kept)
+    duplicates = stop_times.filter(pl.col("trip_id").is_in(trip_ids[::3])).with_columns(pl.col("trip_id") + "-copy")
+    early = (
+        stop_times
+        .filter(pl.col("trip_id").is_in(trip_ids[1::3]))
+        .with_columns(
+            pl.col("trip_id") + "-early",
+            pl.when(first_stop).then(pl.col("departure_time") - 120.0).otherwise(pl.col("departure_time")).alias("departure_time"),
+            pl.when(first_stop).then(pl.col("arrival_time") - 120.0).otherwise(pl.col("arrival_time")).alias("arrival_time")
+        )
+    )
+    slow = (
+        stop_times
+        .filter(pl.col("trip_id").is_in(trip_ids[2::7]))
+        .with_columns(
+            pl.col("trip_id") + "-slow",
+            (pl.col("departure_time") - 60.0 + 90.0 * pl.col("stop_sequence").rank("dense").over("trip_id")).alias("departure_time"),
+            (pl.col("arrival_time") - 60.0 + 90.0 * pl.col("stop_sequence").rank("dense").over("trip_id")).alias("arrival_time")
+        )
+    )
+    n_slow = slow["trip_id"].n_unique()
+
+    timetable = GTFSTimetable(
+        timetable.stops,
+        pl.concat([stop_times, duplicates, early, slow]),
+        timetable.trips,
+        timetable.routes,
+        timetable.transfers
+    )
+    router = RaptorRouter(timetable)
+    origins = router.stop_ids.tolist()
+
+    assert sum(pattern.n_trips for pattern in router.patterns) == n_trips + n_slow
+
+    for departure_time in [6.0 * 3600.0, 6.5 * 3600.0 + 17.0]:
+        arrivals = router.earliest_arrivals(origins, departure_time, max_rounds=20)
+        expected = _time_expanded_earliest_arrivals(timetable, origins, departure_time)
+
+        for row, origin in enumerate(origins):
+            for stop_id, arrival in zip(router.stop_ids, arrivals[row]):
+                assert arrival == expected[row].get(stop_id, np.inf), (origin, stop_id)
+
+
+def test_dominated_trips_are_found_in_patterns_with_overtaking():
+    departures = np.array([[0.0, 100.0, 200.0], [10.0, 300.0, 600.0], [20.0, 100.0, 190.0], [20.0, 100.0, 190.0]])
+    arrivals = np.array([[0.0, 90.0, 190.0], [10.0, 290.0, 590.0], [20.0, 80.0, 180.0], [20.0, 80.0, 180.0]])
+
+    # Trip 0 is dominated by trips 2 and 3 (identical, the last one is kept),
+    # trip 1 is overtaken but the only one leaving the second stop at 300
+    assert RaptorRouter._undominated_trips(departures, arrivals).tolist() == [1, 3]
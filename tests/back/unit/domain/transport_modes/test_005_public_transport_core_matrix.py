@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+import mobility
+from mobility.transport.graphs.core.csr_graph_store import CSRGraph, write_csr_graph
+from mobility.transport.modes.core.modal_transfer import IntermodalTransfer
+from mobility.transport.modes.public_transport.gtfs.gtfs_timetable import GTFSTimetable
+from mobility.transport.modes.public_transport.intermodal_core_composition import (
+    catchment_od_pairs,
+    changed_core_entries,
+    changed_zone_pairs,
+    leg_travel_costs,
+    min_plus_paths,
+    stop_catchment_buildings,
+)
+from mobility.transport.modes.public_transport.public_transport_core_matrix import (
+    check_core_matrix_size,
+    scenario_origin_stops,
+    summarise_profiles,
+)
+from mobility.transport.modes.public_transport.raptor_router import RaptorRouter
+
+
+def _random_timetable(tmp_path):
+    return GTFSTimetable.from_gtfs_zips(_random_gtfs_files(tmp_path)[0])
+
+
+def _random_gtfs_files(tmp_path):
+    rng = np.random.default_rng(3)
+    stops = {f"S{i}": [2.0 + rng.uniform(0.0, 0.01), 48.0 + rng.uniform(0.0, 0.01)] for i in range(8)}
+
+    gtfs_files = []
+    for line in range(3):
+        builder = mobility.GTFSBuilder(
+            agency_id="agency",
+            agency_name="Agency",
+            route_id=f"L{line}",
+            route_short_name=f"L{line}",
+            route_type="bus",
+            service_id="service",
+        )
+        builder.add_stops(stops)
+        stop_ids = rng.choice(list(stops), size=4, replace=False)
+        builder.add_line(
+            [(a, b, float(rng.integers(60, 400))) for a, b in zip(stop_ids[:-1], stop_ids[1:])],
+            start_time=6.0 * 3600.0 + float(rng.integers(0, 900)),
+            end_time=7.5 * 3600.0,
+            period=float(rng.integers(300, 1200)),
+        )
+        gtfs_files.append(builder.write_zip(tmp_path / f"line_{line}.zip"))
+
+    return gtfs_files, stops
+
+
+def test_core_matrix_summarises_the_travel_times_of_every_departure_minute(tmp_path):
+    router = RaptorRouter(_random_timetable(tmp_path))
+    start_time, end_time, step, max_travel_time = 6.5 * 3600.0, 7.0 * 3600.0, 60.0, 1200.0
+
+    profiles = router.profiles(start_time, end_time, departure_step=step, max_rounds=4, max_travel_time=max_travel_time)
+    matrix = summarise_profiles(profiles, start_time, end_time, step, max_travel_time, wait_time_coeff=2.0)
+
+    origins = sorted(matrix["from_stop_id"].unique().to_list())
+    departure_times = np.arange(start_time, end_time + 1.0, step)
+    travel_times = {}
+    for departure_time in departure_times:
+        arrivals = router.earliest_arrivals(origins, departure_time, max_rounds=4)
+        for row, origin in enumerate(origins):
+            for stop_id, arrival in zip(router.stop_ids, arrivals[row]):
+                if stop_id != origin and arrival - departure_time <= max_travel_time:
+                    travel_times.setdefault((origin, stop_id), []).append(arrival - departure_time)
+
+    assert matrix.height == len(travel_times)
+    for row in matrix.iter_rows(named=True):
+        times = travel_times[(row["from_stop_id"], row["to_stop_id"])]
+        assert row["time"] == pytest.approx(np.mean(times))
+        assert row["min_time"] == pytest.approx(np.min(times))
+        for q in (10, 50, 90):
+            assert row[f"time_p{q}"] == pytest.approx(np.percentile(times, q, method="inverted_cdf"))
+        assert row["reachable_share"] == pytest.approx(len(times) / len(departure_times))
+        assert row["perceived_time"] == pytest.approx(np.min(times) + 2.0 * (np.mean(times) - np.min(times)))
+
+
+def test_time_windows_are_summarised_from_a_single_profiles_pass(tmp_path):
+    router = RaptorRouter(_random_timetable(tmp_path))
+    step, max_travel_time = 60.0, 1200.0
+    windows = [(6.25 * 3600.0, 6.5 * 3600.0), (6.75 * 3600.0, 7.25 * 3600.0)]
+
+    departure_times = np.concatenate([np.arange(start, end + 1.0, step) for start, end in windows])
+    profiles = router.profiles(
+        windows[0][0], windows[1][1], departure_step=step, max_rounds=4,
+        max_travel_time=max_travel_time, departure_times=departure_times
+    )
+
+    for start, end in windows:
+        window_profiles = router.profiles(start, end, departure_step=step, max_rounds=4, max_travel_time=max_travel_time)
+        expected = summarise_profiles(window_profiles, start, end, step, max_travel_time, wait_time_coeff=2.0)
+        matrix = summarise_profiles(profiles, start, end, step, max_travel_time, wait_time_coeff=2.0)
+
+        assert matrix.height > 0
+        assert matrix.drop(["origin_wait_time", "max_origin_wait_time"]).equals(
+            expected.drop(["origin_wait_time", "max_origin_wait_time"])
+        )
+        assert (matrix["origin_wait_time"] <= matrix["max_origin_wait_time"]).all()
+
+
+def test_scenario_matrix_only_profiles_again_the_stops_reaching_the_scenario_line(tmp_path):
+    gtfs_files, stops = _random_gtfs_files(tmp_path)
+    start_time, end_time, step, max_travel_time = 6.5 * 3600.0, 7.0 * 3600.0, 60.0, 300.0
+
+    builder = mobility.GTFSBuilder(
+        agency_id="agency",
+        agency_name="Agency",
+        route_id="new_line",
+        route_short_name="new_line",
+        route_type="bus",
+        service_id="service",
+    )
+    # A line from a stop far from the others to a new stop next to S5
+    builder.add_stops({"F0": [2.05, 48.05], "F1": stops["S5"]})
+    builder.add_line([("F0", "F1", 600.0)], start_time=6.0 * 3600.0, end_time=7.5 * 3600.0, period=600.0)
+
+    baseline_timetable = GTFSTimetable.from_gtfs_zips(gtfs_files)
+    timetable = GTFSTimetable.from_gtfs_zips(gtfs_files + [builder.write_zip(tmp_path / "new_line.zip")])
+
+    def matrix(router, origin_stop_ids=None):
+        profiles = router.profiles(
+            start_time, end_time, origin_stop_ids, departure_step=step, max_rounds=4, max_travel_time=max_travel_time
+        )
+        return summarise_profiles(profiles, start_time, end_time, step, max_travel_time, wait_time_coeff=2.0)
+
+    baseline_matrix = matrix(RaptorRouter(baseline_timetable))
+    router = RaptorRouter(timetable)
+    expected = matrix(router)
+
+    scenario_origins = scenario_origin_stops(baseline_timetable, timetable, [baseline_matrix])
+    origin_stop_ids = [stop_id for stop_id in router.boarding_stop_ids() if stop_id in scenario_origins]
+    updated = (
+        pl.concat(
+            [
+                baseline_matrix.filter(~pl.col("from_stop_id").is_in(origin_stop_ids)),
+                matrix(router, origin_stop_ids)
+            ]
+        )
+        .sort(["from_stop_id", "to_stop_id"])
+    )
+
+    assert 0 < len(origin_stop_ids) < len(router.boarding_stop_ids())
+    assert updated.equals(expected)
+
+
+def test_min_plus_composition_keeps_the_stops_with_the_lowest_perceived_time():
+    access = pl.DataFrame(
+        {
+            "origin": [1, 1],
+            "stop_id": ["A", "B"],
+            "time": [100.0, 300.0],
+            "distance": [100.0, 300.0],
+        }
+    )
+    core = pl.DataFrame(
+        {
+            "from_stop_id": ["A", "B", "A"],
+            "to_stop_id": ["C", "C", "D"],
+            "time": [900.0, 400.0, 500.0],
+            "perceived_time": [1000.0, 500.0, 600.0],
+            "distance": [5000.0, 3000.0, 4000.0],
+        }
+    )
+    egress = pl.DataFrame(
+        {
+            "stop_id": ["C", "D"],
+            "destination": [9, 9],
+            "time": [60.0, 400.0],
+            "distance": [60.0, 400.0],
+        }
+    )
+
+    paths = min_plus_paths(access, core, egress, pl.DataFrame({"origin": [1], "destination": [9]}))
+
+    # B -> C : 300 + 500 + 60 beats A -> C (1160) and A -> D (1100)
+    assert paths.height == 1
+    path = paths.row(0, named=True)
+    assert path["perceived_time"] == 860.0
+    assert (path["start_real_time"], path["mid_real_time"], path["last_real_time"]) == (300.0, 400.0, 60.0)
+    assert (path["start_distance"], path["mid_distance"], path["last_distance"]) == (300.0, 3000.0, 60.0)
+
+
+def test_leg_travel_costs_stop_at_the_max_travel_time(tmp_path):
+    # 0 -> 1 -> 2 -> 3, 60 s and 100 m per edge, vertices 100 m apart
+    data = pd.DataFrame({"from": [0, 1, 2], "to": [1, 2, 3], "dist": [60.0, 60.0, 60.0]})
+    graph_dict = pd.DataFrame({"ref": ["0", "1", "2", "3"], "id": [0, 1, 2, 3]})
+    attrib = pd.DataFrame({"aux": [100.0, 100.0, 100.0]})
+    csr_graph = CSRGraph(write_csr_graph(tmp_path / "gcsr", data, graph_dict, attrib))
+
+    vertices = pl.DataFrame({"vertex": [0, 1, 2, 3], "x": [0.0, 100.0, 200.0, 300.0], "y": [0.0, 0.0, 0.0, 0.0]})
+    modal_transfer = IntermodalTransfer(max_travel_time=150.0 / 3600.0, average_speed=20.0, transfer_time=1.0)
+
+    costs = leg_travel_costs(csr_graph, vertices.filter(pl.col("vertex") == 0), vertices, modal_transfer)
+
+    assert costs.sort("target").rows() == [(0, 0, 0.0, 0.0), (0, 1, 60.0, 100.0), (0, 2, 120.0, 200.0)]
+
+
+def test_buildings_without_a_stop_within_the_leg_limits_are_dropped():
+    vertices = pl.DataFrame({"vertex": [0, 1, 2], "x": [0.0, 1000.0, 5000.0], "y": [0.0, 0.0, 0.0]})
+    buildings = pl.DataFrame({"building_id": [1, 2, 3, 4], "x": [10.0, 990.0, 5000.0, 20000.0], "y": [0.0, 0.0, 10.0, 0.0]})
+    stops = pl.DataFrame({"stop_id": ["A"], "vertex": [0], "x": [0.0], "y": [0.0]})
+
+    # 1.1 x 5 km/h x 12 min : stops up to 1100 m from the building vertex
+    modal_transfer = IntermodalTransfer(max_travel_time=0.2, average_speed=5.0, transfer_time=1.0)
+
+    catchment = stop_catchment_buildings(buildings, vertices, stops, modal_transfer)
+
+    # Building 3 snaps to a vertex 5 km away from the stop, building 4 is
+    # too far from the graph
+    assert catchment.sort("building_id").rows() == [(1, 0), (2, 1)]
+
+
+def test_origins_only_need_an_access_leg_and_destinations_an_egress_leg():
+    building_pairs = pl.DataFrame(
+        {
+            "from": [1, 2, 1, 3],
+            "to": [2, 1, 3, 1],
+            "building_id_from": [10, 20, 10, 30],
+            "building_id_to": [20, 10, 30, 10],
+            "weight_from": [1.0, 1.0, 1.0, 1.0],
+            "weight_to": [1.0, 1.0, 1.0, 1.0],
+        }
+    )
+
+    # Building 10 only has an access leg, building 20 only an egress leg and
+    # building 30 both
+    origins = pl.DataFrame({"building_id": [10, 30], "vertex": [0, 2]})
+    destinations = pl.DataFrame({"building_id": [20, 30], "vertex": [1, 3]})
+
+    od_pairs = catchment_od_pairs(building_pairs, origins, destinations)
+
+    assert od_pairs.sort("from").select("from", "to", "origin", "destination").rows() == [(1, 2, 0, 1), (1, 3, 0, 3)]
+
+
+def test_only_the_zone_pairs_that_can_use_a_changed_stop_pair_are_routed_again():
+    baseline_core = pl.DataFrame(
+        {
+            "from_stop_id": ["A", "B"],
+            "to_stop_id": ["C", "D"],
+            "time": [600.0, 600.0],
+            "perceived_time": [700.0, 700.0],
+            "distance": [5000.0, 5000.0],
+        }
+    )
+    # A scenario line adds the new stop N, faster from B to D
+    core = pl.DataFrame(
+        {
+            "from_stop_id": ["A", "B", "N"],
+            "to_stop_id": ["C", "D", "D"],
+            "time": [600.0, 500.0, 300.0],
+            "perceived_time": [700.0, 550.0, 350.0],
+            "distance": [5000.0, 5000.0, 3000.0],
+        }
+    )
+
+    changed_core = changed_core_entries(baseline_core, core)
+    assert sorted(changed_core.select("from_stop_id", "to_stop_id").rows()) == [("B", "D"), ("N", "D")]
+
+    od_pairs = pl.DataFrame(
+        {"from": [1, 1, 2, 3], "to": [5, 5, 6, 7], "origin": [10, 11, 20, 30], "destination": [50, 51, 60, 70]}
+    )
+    # Access and egress legs to / from the first and last stops of the changed entries
+    access = pl.DataFrame({"origin": [11, 30], "stop_id": ["B", "N"], "time": [100.0, 100.0], "distance": [100.0, 100.0]})
+    egress = pl.DataFrame({"stop_id": ["D", "D"], "destination": [51, 60], "time": [100.0, 100.0], "distance": [100.0, 100.0]})
+
+    # Zone pair 1 -> 5 has one building pair using B -> D, 2 -> 6 has no access
+    # to the changed stops and 3 -> 7 no egress from them
+    assert changed_zone_pairs(od_pairs, changed_core, access, egress).rows() == [(1, 5)]
+
+
+def test_core_matrix_is_limited_to_small_timetables(tmp_path):
+    timetable = _random_timetable(tmp_path)
+    n_stops = timetable.stop_times["stop_id"].n_unique()
+
+    check_core_matrix_size(timetable, max_stops=n_stops)
+
+    with pytest.raises(ValueError, match="intermodal_graph"):
+        check_core_matrix_size(timetable, max_stops=n_stops - 1)
@@ -0,0 +1,101 @@
+import pathlib
+from importlib import import_module
+
+from mobility.spatial.transport_zones import TransportZones
+from mobility.transport.modes.public_transport.gtfs.gtfs_router import GTFSRouter
+from mobility.transport.modes.public_transport.gtfs.gtfs_sources import GTFSSources
+
+gtfs_feed_tables_module = import_module(
+    "mobility.transport.modes.public_transport.gtfs.gtfs_feed_tables"
+)
+gtfs_router_module = import_module(
+    "mobility.transport.modes.public_transport.gtfs.gtfs_router"
+)
+
+
+class _FakeRScriptRunner:
+    """Record the script runs and write their outputs like the R scripts would."""
+
+    runs = []
+
+    def __init__(self, script_path):
+        self.script = pathlib.Path(str(script_path)).name
+
+    def run(self, args):
+        _FakeRScriptRunner.runs.append((self.script, args))
+        if self.script == "prepare_gtfs_feeds.R":
+            for gtfs_file, output in zip(args[1].split(","), args[3].split(",")):
+                if "empty" not in gtfs_file:
+                    tables = pathlib.Path(output + "-tables")
+                    tables.mkdir(parents=True, exist_ok=True)
+                    (tables / "stops.parquet").write_bytes(b"")
+                pathlib.Path(output).touch()
+        if self.script == "prepare_gtfs_timetable.R":
+            timetable_path = pathlib.Path(args[1])
+            timetable_path.mkdir(parents=True, exist_ok=True)
+            for table in gtfs_router_module.TIMETABLE_TABLES:
+                (timetable_path / f"{table}.parquet").write_bytes(b"")
+
+
+def _prepared_files():
+    return [
+        pathlib.Path(gtfs_file).name
+        for script, args in _FakeRScriptRunner.runs
+        if script == "prepare_gtfs_feeds.R"
+        for gtfs_file in args[1].split(",")
+    ]
+
+
+def test_only_new_or_changed_gtfs_feeds_are_prepared_again(project_dir, monkeypatch):
+    monkeypatch.setattr(gtfs_feed_tables_module, "RScriptRunner", _FakeRScriptRunner)
+    monkeypatch.setattr(gtfs_router_module, "RScriptRunner", _FakeRScriptRunner)
+    _FakeRScriptRunner.runs = []
+
+    transport_zones = TransportZones(local_admin_unit_id="fr-87085", radius=10.0)
+    router = GTFSRouter(
+        transport_zones=transport_zones,
+        gtfs_sources=GTFSSources("2025-01-01", project_dir / "gtfs_sources", ["fr"])
+    )
+
+    feeds = {name: project_dir / f"{name}.zip" for name in ["a", "b", "c", "empty"]}
+    for name, path in feeds.items():
+        path.write_bytes(name.encode() * 100)
+
+    router.prepare_gtfs_router(transport_zones, [str(feeds["a"]), str(feeds["b"]), str(feeds["empty"])])
+    assert _prepared_files() == ["a.zip", "b.zip", "empty.zip"]
+
+    # Adding a feed only prepares this feed, feeds without stops in the
+    # region are not merged
+    _FakeRScriptRunner.runs = []
+    router.prepare_gtfs_router(transport_zones, [str(feeds["a"]), str(feeds["b"]), str(feeds["empty"]), str(feeds["c"])])
+    assert _prepared_files() == ["c.zip"]
+    merged = _FakeRScriptRunner.runs[-1][1][0].split(",")
+    assert len(merged) == 3
+    assert all(path.endswith("-gtfs-feed-tables") for path in merged)
+
+    # Updating a feed prepares it again, the same content under another name
+    # is reused
+    _FakeRScriptRunner.runs = []
+    feeds["a"].write_bytes(b"updated" * 100)
+    copy_of_b = project_dir / "copy_of_b.zip"
+    copy_of_b.write_bytes(feeds["b"].read_bytes())
+    router.prepare_gtfs_router(transport_zones, [str(feeds["a"]), str(copy_of_b)])
+    assert _prepared_files() == ["a.zip"]
+
+
+def test_missing_timetable_is_written_from_the_saved_router(project_dir, monkeypatch):
+    monkeypatch.setattr(gtfs_router_module, "RScriptRunner", _FakeRScriptRunner)
+    _FakeRScriptRunner.runs = []
+
+    router = GTFSRouter(
+        transport_zones=TransportZones(local_admin_unit_id="fr-87085", radius=10.0),
+        gtfs_sources=GTFSSources("2025-01-01", project_dir / "gtfs_sources", ["fr"])
+    )
+    monkeypatch.setattr(router, "get", lambda: router.cache_path)
+
+    assert router.prepare_timetable() == router.timetable_path
+    assert _FakeRScriptRunner.runs == [("prepare_gtfs_timetable.R", [str(router.cache_path), str(router.timetable_path)])]
+
+    # The timetable is only written once
+    router.prepare_timetable()
+    assert len(_FakeRScriptRunner.runs) == 1
@@ -0,0 +1,85 @@
+import shutil
+import zipfile
+
+import pytest
+
+from mobility.transport.modes.public_transport.gtfs.gtfs_feed_index import (
+    gtfs_feed_index_path,
+    index_gtfs_file,
+    index_gtfs_files,
+)
+from mobility.transport.modes.public_transport.gtfs.gtfs_router import GTFSRouter
+
+TABLES = {
+    "agency.txt": "agency_id,agency_name\nA1,Tram Company\nA2,Bus Company\n",
+    "stops.txt": "stop_id,stop_name,stop_lat,stop_lon\nS1,One,45.1,5.7\nS2,Two,45.3,5.9\nS3,Broken,,\n",
+    "routes.txt": "route_id,agency_id,route_type\nR1,A1,0\n",
+    "trips.txt": "route_id,service_id,trip_id\nR1,WEEK,T1\nR1,SAT,T2\n",
+    "stop_times.txt": "trip_id,arrival_time,departure_time,stop_id,stop_sequence\nT1,08:00:00,08:00:00,S1,1\nT1,08:10:00,08:10:00,S2,2\n",
+    # Week service from monday 2025-01-06 to sunday 2025-01-12
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "WEEK,1,1,1,1,1,0,0,20250106,20250112\n"
+    ),
+    # No service on tuesday, a saturday only service
+    "calendar_dates.txt": "service_id,date,exception_type\nWEEK,20250107,2\nSAT,20250111,1\n",
+}
+
+
+def _write_feed(path, tables):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in tables.items():
+            archive.writestr(name, content)
+    return path
+
+
+def test_feed_index_summarises_agencies_services_and_stops(project_dir):
+    index = index_gtfs_file(_write_feed(project_dir / "feed.zip", TABLES))
+
+    assert index.is_valid
+    assert index.agencies_names == "Tram Company\nBus Company"
+    assert index.n_services_by_date == {
+        "20250106": 1,
+        "20250108": 1,
+        "20250109": 1,
+        "20250110": 1,
+        "20250111": 1,
+    }
+    assert index.busiest_date == "20250106"
+    assert index.stops_bbox == pytest.approx([5.7, 45.1, 5.9, 45.3])
+    assert index.n_stops == 3
+    assert gtfs_feed_index_path(index.file_hash).exists()
+
+
+def test_feed_index_flags_invalid_feeds(project_dir):
+    missing_table = _write_feed(project_dir / "missing.zip", {k: v for k, v in TABLES.items() if k != "stop_times.txt"})
+    not_a_zip = project_dir / "not_a_zip.zip"
+    not_a_zip.write_bytes(b"<html>Not found</html>")
+
+    indexes = index_gtfs_files([missing_table, not_a_zip])
+
+    assert [index.is_valid for index in indexes] == [False, False]
+    assert "stop_times.txt" in indexes[0].error
+
+
+def test_expected_agencies_are_checked_against_all_feeds(project_dir):
+    first = _write_feed(project_dir / "first.zip", TABLES)
+    second = _write_feed(project_dir / "second.zip", {**TABLES, "agency.txt": "agency_name\nTrain Company\n"})
+
+    expected_agencies = ["tram company", "Train", "A2"]
+    assert GTFSRouter.check_expected_agencies(None, [first, second], expected_agencies)
+    assert expected_agencies == ["tram company", "Train", "A2"]
+
+    with pytest.raises(IndexError):
+        GTFSRouter.check_expected_agencies(None, [first, second], ["Ferry Company"])
+
+
+def test_identical_feeds_are_indexed_concurrently(project_dir):
+    feed = _write_feed(project_dir / "feed.zip", TABLES)
+    paths = [shutil.copy(feed, project_dir / f"copy_{i}.zip") for i in range(16)]
+
+    indexes = index_gtfs_files(paths + paths[:2])
+
+    assert len(indexes) == 18
+    assert all(index.is_valid for index in indexes)
+    assert len({index.file_hash for index in indexes}) == 1
@@ -0,0 +1,131 @@
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mobility.transport.modes.public_transport.gtfs.gtfs_downloads import (
+    fetch_gtfs_content,
+    fetch_gtfs_files,
+    gtfs_downloads_folder,
+)
+
+FEED = bytes(range(256)) * 4000
+
+
+class _GTFSHandler(BaseHTTPRequestHandler):
+    """Serve feeds with ETag, Last-Modified and range support, like GTFS providers do."""
+
+    files = {}
+    requests = []
+    interrupt_next = False
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        content = self.files.get(self.path)
+        etag = '"v1"'
+        _GTFSHandler.requests.append((self.path, dict(self.headers)))
+
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == etag:
+            start = int(self.headers["Range"].removeprefix("bytes=").rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+
+        body = content[start:]
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if _GTFSHandler.interrupt_next:
+            _GTFSHandler.interrupt_next = False
+            self.wfile.write(body[: len(body) // 3])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def gtfs_server(tmp_path, monkeypatch):
+    monkeypatch.setenv("MOBILITY_PACKAGE_DATA_FOLDER", str(tmp_path / "package"))
+    monkeypatch.delenv("MOBILITY_GTFS_MIRROR_FOLDER", raising=False)
+    _GTFSHandler.files = {"/a/gtfs.zip": FEED, "/b/same-gtfs.zip": FEED}
+    _GTFSHandler.requests = []
+    _GTFSHandler.interrupt_next = False
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GTFSHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_unchanged_feeds_are_not_downloaded_again(gtfs_server, tmp_path):
+    url = gtfs_server + "/a/gtfs.zip"
+
+    first, = fetch_gtfs_files([(url, tmp_path / "project_1" / "gtfs.zip")])
+    second, = fetch_gtfs_files([(url, tmp_path / "project_2" / "gtfs.zip")])
+
+    assert first.read_bytes() == FEED
+    assert second.read_bytes() == FEED
+    assert _GTFSHandler.requests[1][1]["If-None-Match"] == '"v1"'
+    assert len(list((gtfs_downloads_folder() / "content").glob("*.zip"))) == 1
+
+
+def test_identical_feeds_under_several_urls_are_stored_once(gtfs_server, tmp_path):
+    paths = fetch_gtfs_files(
+        [
+            (gtfs_server + "/a/gtfs.zip", tmp_path / "a.zip"),
+            (gtfs_server + "/b/same-gtfs.zip", tmp_path / "b.zip"),
+            (gtfs_server + "/a/gtfs.zip", tmp_path / "a_again.zip"),
+            (gtfs_server + "/missing.zip", tmp_path / "missing.zip"),
+        ]
+    )
+
+    assert [path.exists() for path in paths] == [True, True, True, False]
+    assert len([path for path, _headers in _GTFSHandler.requests if path == "/a/gtfs.zip"]) == 1
+    assert len(list((gtfs_downloads_folder() / "content").glob("*.zip"))) == 1
+
+
+def test_interrupted_downloads_are_resumed_with_range_requests(gtfs_server):
+    _GTFSHandler.interrupt_next = True
+
+    content = fetch_gtfs_content(gtfs_server + "/a/gtfs.zip", max_retries=1, timeout=5)
+
+    assert content.read_bytes() == FEED
+    resumed_from = int(_GTFSHandler.requests[1][1]["Range"].removeprefix("bytes=").rstrip("-"))
+    assert 0 < resumed_from <= len(FEED) // 3
+
+
+def test_feeds_come_from_the_local_mirror_without_network(gtfs_server, tmp_path, monkeypatch):
+    url = gtfs_server + "/a/gtfs.zip"
+    fetch_gtfs_content(url)
+
+    mirror = tmp_path / "mirror"
+    shutil.copytree(gtfs_downloads_folder(), mirror)
+    monkeypatch.setenv("MOBILITY_GTFS_MIRROR_FOLDER", str(mirror))
+    _GTFSHandler.requests = []
+
+    path, missing = fetch_gtfs_files([(url, tmp_path / "offline.zip"), (gtfs_server + "/b/same-gtfs.zip", tmp_path / "other.zip")])
+
+    assert path.read_bytes() == FEED
+    assert not missing.exists()
+    assert _GTFSHandler.requests == []
@@ -372,12 +372,18 @@ def test_sidecar_paths_use_transport_zone_output_stem(tmp_path):
     assert cluster_geometries_path == tmp_path / "transport_zones_buildings_geoms.gpkg"
 
 
-def test_resolve_max_workers_uses_task_count_as_upper_bound():
+def test_resolve_max_workers_uses_task_count_as_upper_bound(monkeypatch):
+    monkeypatch.setenv("MOBILITY_MAX_THREADS", "8")
     assert _resolve_max_workers(task_count=0, max_workers=None) == 0
     assert _resolve_max_workers(task_count=2, max_workers=8) == 2
     assert _resolve_max_workers(task_count=3, max_workers=None) == 3
 
 
+def test_resolve_max_workers_stays_within_thread_budget(monkeypatch):
+    monkeypatch.setenv("MOBILITY_MAX_THREADS", "2")
+    assert _resolve_max_workers(task_count=10, max_workers=None) == 2
+
+
 def test_python_backend_rejects_invalid_min_buildings_per_zone(tmp_path):
     with pytest.raises(ValueError, match="positive integer"):
         prepare_transport_zones(
@@ -1,3 +1,5 @@
+import threading
+
 from mobility.runtime.assets.file_asset import FileAsset
 from mobility.runtime.assets.resolver import asset_resolution_context
 
@@ -145,3 +147,35 @@ def test_resolver_passes_get_arguments_to_requested_root_asset(tmp_path):
     with asset_resolution_context():
         assert asset.get(token="bbox") == "created-bbox"
         assert asset.get(token="other") == "cached-other-bbox"
+
+
+class _BarrierAsset(_CountingFileAsset):
+    barrier = None
+
+    def create_and_get_asset(self):
+        # Both branches must be running at the same time to pass the barrier.
+        _BarrierAsset.barrier.wait()
+        return super().create_and_get_asset()
+
+
+class _ParentAsset(_CountingFileAsset):
+    def __init__(self, *, name, cache_folder, children):
+        self.name = name
+        inputs = {"name": name, "children": children}
+        FileAsset.__init__(self, inputs, cache_folder / f"{name}.txt")
+
+
+def test_resolver_rebuilds_independent_assets_concurrently(monkeypatch, tmp_path):
+    """Independent branches are rebuilt in parallel when several R scripts can run at once."""
+    _reset_counts()
+    monkeypatch.setenv("MOBILITY_R_MAX_CONCURRENT_SCRIPTS", "2")
+    _BarrierAsset.barrier = threading.Barrier(2, timeout=5)
+    walk = _BarrierAsset(name="walk", cache_folder=tmp_path / "walk")
+    car = _BarrierAsset(name="car", cache_folder=tmp_path / "car")
+    root = _ParentAsset(name="root", cache_folder=tmp_path / "root", children=[walk, car])
+
+    value = root.get()
+
+    assert value == "created-root"
+    assert sorted(_CountingFileAsset.create_calls[:2]) == ["car", "walk"]
+    assert _CountingFileAsset.create_calls[2] == "root"
@@ -0,0 +1,65 @@
+import pandas as pd
+import polars as pl
+import pyarrow.ipc as ipc
+import pytest
+
+from mobility.runtime.r_integration.arrow_exchange import (
+    RExchangeFolder,
+    get_r_exchange_root,
+    read_exchange_table,
+    write_exchange_table,
+)
+
+
+@pytest.fixture
+def exchange_root(monkeypatch, tmp_path):
+    root = tmp_path / "exchange"
+    monkeypatch.setenv("MOBILITY_R_EXCHANGE_FOLDER", str(root))
+    return root
+
+
+def test_exchange_root_can_be_set_with_an_environment_variable(exchange_root):
+    assert get_r_exchange_root() == exchange_root
+
+
+def test_pandas_table_round_trips_as_uncompressed_arrow_file(exchange_root):
+    costs = pd.DataFrame({"from": [1, 2], "to": [2, 1], "time": [0.25, 0.5]})
+
+    with RExchangeFolder("travel-costs") as exchange:
+        path = write_exchange_table(costs, exchange.path("travel_costs"))
+
+        assert path.suffix == ".arrow"
+        assert path.parent.parent == exchange_root
+
+        with ipc.open_file(path) as reader:
+            batch = reader.get_batch(0)
+            assert batch.num_rows == 2
+
+        result = read_exchange_table(path).to_pandas()
+
+    pd.testing.assert_frame_equal(result, costs)
+
+
+def test_polars_table_round_trips_without_string_views(exchange_root):
+    pairs = pl.DataFrame({"from": ["a", "b"], "to": ["c", "d"]})
+
+    with RExchangeFolder() as exchange:
+        path = write_exchange_table(pairs, exchange.path("od_pairs"))
+        table = read_exchange_table(path, memory_map=False)
+
+    assert str(table.schema.field("from").type) in ("string", "large_string")
+    assert pl.from_arrow(table).equals(pairs)
+
+
+def test_exchange_folder_is_removed_on_exit(exchange_root):
+    with RExchangeFolder() as exchange:
+        folder = exchange.folder
+        write_exchange_table(pd.DataFrame({"a": [1]}), exchange.path("table"))
+        assert folder.exists()
+
+    assert not folder.exists()
+
+
+def test_exchange_path_requires_an_open_folder(exchange_root):
+    with pytest.raises(RuntimeError):
+        RExchangeFolder().path("table")
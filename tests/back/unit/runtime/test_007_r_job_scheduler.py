@@ -0,0 +1,102 @@
+import threading
+from importlib import import_module
+
+import pytest
+
+from mobility.runtime.r_integration.r_job_scheduler import (
+    RJobScheduler,
+    get_r_job_scheduler,
+)
+from mobility.runtime.r_integration.r_script_runner import RScriptRunner
+
+
+r_script_runner_module = import_module("mobility.runtime.r_integration.r_script_runner")
+
+
+def _make_script(tmp_path, name="script.R"):
+    script_path = tmp_path / name
+    script_path.write_text("", encoding="utf-8")
+    return script_path
+
+
+def test_single_script_keeps_the_full_core_budget():
+    scheduler = RJobScheduler(max_cores=16, max_memory_mb=1000)
+
+    with scheduler.reserve() as reservation:
+        assert reservation.cores == 16
+        assert reservation.worker_env()["RCPP_PARALLEL_NUM_THREADS"] == "16"
+
+
+def test_cores_are_split_between_concurrent_scripts():
+    scheduler = RJobScheduler(max_cores=16, max_memory_mb=1000, max_concurrent_scripts=4)
+
+    with scheduler.reserve() as reservation:
+        assert reservation.cores == 4
+        assert reservation.memory_mb == 250
+
+
+def test_script_waits_until_the_budget_is_released():
+    scheduler = RJobScheduler(max_cores=4, max_memory_mb=1000, max_concurrent_scripts=2)
+    started = threading.Event()
+    events = []
+
+    def second_script():
+        with scheduler.reserve(cores=2):
+            events.append("second")
+        started.set()
+
+    with scheduler.reserve(cores=3):
+        thread = threading.Thread(target=second_script)
+        thread.start()
+        assert started.wait(timeout=0.2) is False
+        events.append("first")
+
+    thread.join(timeout=5)
+    assert events == ["first", "second"]
+
+
+def test_script_running_alone_can_exceed_the_memory_budget():
+    scheduler = RJobScheduler(max_cores=4, max_memory_mb=100, max_concurrent_scripts=2)
+
+    with scheduler.reserve(memory_mb=500) as reservation:
+        assert reservation.memory_mb == 100
+
+
+def test_scheduler_follows_the_environment(monkeypatch):
+    monkeypatch.setenv("MOBILITY_R_MAX_CORES", "8")
+    monkeypatch.setenv("MOBILITY_R_MAX_MEMORY_MB", "2048")
+    monkeypatch.setenv("MOBILITY_R_MAX_CONCURRENT_SCRIPTS", "2")
+
+    scheduler = get_r_job_scheduler()
+
+    assert (scheduler.max_cores, scheduler.max_memory_mb, scheduler.max_concurrent_scripts) == (8, 2048, 2)
+    assert get_r_job_scheduler() is scheduler
+
+    monkeypatch.setenv("MOBILITY_R_MAX_CONCURRENT_SCRIPTS", "4")
+    assert get_r_job_scheduler().max_concurrent_scripts == 4
+
+
+def test_runner_passes_the_worker_count_to_the_script(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOBILITY_R_MAX_CORES", "6")
+    monkeypatch.delenv("MOBILITY_R_MAX_CONCURRENT_SCRIPTS", raising=False)
+    runner = RScriptRunner(_make_script(tmp_path), max_retries=0)
+    popen_envs = []
+
+    monkeypatch.setattr(
+        import_module("mobility.runtime.r_integration.r_packages"),
+        "ensure_r_packages",
+        lambda: None,
+    )
+
+    def fake_popen(cmd, stdout, stderr, env):
+        popen_envs.append(env)
+        raise RuntimeError("stop before starting R")
+
+    monkeypatch.setattr(r_script_runner_module.subprocess, "Popen", fake_popen)
+
+    with pytest.raises(RuntimeError, match="stop before starting R"):
+        runner.run([], cores=3)
+
+    assert popen_envs[0]["RCPP_PARALLEL_NUM_THREADS"] == "3"
+    assert popen_envs[0]["OMP_NUM_THREADS"] == "3"
+
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from mobility.runtime.parallelism import (
+    THREAD_ENV_VARS,
+    apply_thread_budget,
+    get_max_threads,
+    get_worker_count,
+    init_worker_process,
+    worker_process_env,
+)
+from mobility.runtime.r_integration.r_job_scheduler import get_r_job_scheduler
+
+
+@pytest.fixture(autouse=True)
+def clean_thread_env(monkeypatch):
+    for name in ["MOBILITY_MAX_THREADS", "MOBILITY_R_MAX_CORES", *THREAD_ENV_VARS]:
+        monkeypatch.delenv(name, raising=False)
+
+
+def _read_thread_env():
+    return {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+
+
+def test_max_threads_defaults_to_cpu_count():
+    assert get_max_threads() == (os.cpu_count() or 1)
+
+
+def test_worker_count_stays_within_the_thread_budget(monkeypatch):
+    monkeypatch.setenv("MOBILITY_MAX_THREADS", "8")
+
+    assert get_worker_count() == 8
+    assert get_worker_count(task_count=3) == 3
+    assert get_worker_count(max_workers=4) == 4
+    assert get_worker_count(threads_per_worker=3) == 2
+    assert get_worker_count(task_count=0) == 1
+
+
+def test_thread_budget_sets_library_environment(monkeypatch):
+    monkeypatch.setattr("mobility.runtime.parallelism._limit_loaded_native_threads", lambda max_threads: None)
+
+    apply_thread_budget(3)
+
+    assert set(_read_thread_env().values()) == {"3"}
+
+
+def test_thread_budget_warns_when_polars_pool_is_already_sized(monkeypatch, caplog):
+    polars = pytest.importorskip("polars")
+    monkeypatch.setattr("mobility.runtime.parallelism._limit_loaded_native_threads", lambda max_threads: None)
+
+    apply_thread_budget(polars.thread_pool_size() + 1)
+
+    assert "Polars was imported before set_params" in caplog.text
+
+
+def test_r_cores_default_to_the_thread_budget(monkeypatch):
+    monkeypatch.setenv("MOBILITY_MAX_THREADS", "5")
+
+    assert get_r_job_scheduler().max_cores == 5
+
+
+def test_worker_processes_get_their_thread_share(monkeypatch):
+    monkeypatch.setenv("POLARS_MAX_THREADS", "64")
+
+    env = worker_process_env(threads_per_worker=2)
+    assert {env[name] for name in THREAD_ENV_VARS} == {"2"}
+
+    with ProcessPoolExecutor(max_workers=1, initializer=init_worker_process, initargs=(2,)) as executor:
+        worker_env = executor.submit(_read_thread_env).result()
+
+    assert set(worker_env.values()) == {"2"}
+    assert os.environ["POLARS_MAX_THREADS"] == "64"
+    assert os.environ.get("OMP_NUM_THREADS") is None
+
+
+def test_pool_workers_use_the_polars_threads_of_the_worker_env():
+    # Same layout as the mode sequence search : a script imports polars,
+    # then starts a process pool.
+    script = (
+        "from concurrent.futures import ProcessPoolExecutor\n"
+        "import polars as pl\n"
+        "from mobility.runtime.parallelism import init_worker_process\n"
+        "if __name__ == '__main__':\n"
+        "    with ProcessPoolExecutor(max_workers=1, initializer=init_worker_process, initargs=(1,)) as executor:\n"
+        "        print(executor.submit(pl.thread_pool_size).result())\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=worker_process_env(threads_per_worker=1),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "1"
@@ -245,6 +245,34 @@ def test_run_prepends_package_path_and_stringifies_arguments(monkeypatch, tmp_pa
     ]
 
 
+def test_run_checks_deferred_r_packages_before_first_attempt(monkeypatch, tmp_path):
+    script_path = _make_script(tmp_path)
+    runner = RScriptRunner(script_path, max_retries=0)
+    r_packages_module = import_module("mobility.runtime.r_integration.r_packages")
+    calls = []
+
+    monkeypatch.setattr(r_packages_module, "ensure_r_packages", lambda: calls.append("ensure"))
+    monkeypatch.setattr(runner, "_run_once", lambda *args: calls.append("run"))
+
+    runner.run([])
+
+    assert calls == ["ensure", "run"]
+
+
+def test_install_packages_script_does_not_wait_for_itself(monkeypatch, tmp_path):
+    script_path = tmp_path / "install_packages.R"
+    script_path.write_text("", encoding="utf-8")
+    runner = RScriptRunner(script_path, max_retries=0)
+    r_packages_module = import_module("mobility.runtime.r_integration.r_packages")
+    calls = []
+
+    monkeypatch.setattr(r_packages_module, "ensure_r_packages", lambda: calls.append("ensure"))
+    monkeypatch.setattr(runner, "_run_once", lambda *args: calls.append("run"))
+
+    runner.run([])
+
+    assert calls == ["run"]
+
 def test_run_retries_after_first_failed_attempt(monkeypatch, tmp_path):
     script_path = _make_script(tmp_path)
     runner = RScriptRunner(script_path, max_retries=1, retry_delay_seconds=7)
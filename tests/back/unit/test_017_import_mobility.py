@@ -0,0 +1,83 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+HEAVY_MODULES = [
+    "dash",
+    "geopandas",
+    "matplotlib",
+    "networkx",
+    "numpy",
+    "pandas",
+    "plotly",
+    "polars",
+    "shapely",
+    "sklearn",
+]
+
+# Cold import budgets. Eager imports used to take several seconds and around
+# 300 MiB; the lazy package stays far below these limits on CI machines.
+MAX_IMPORT_SECONDS = 1.5
+MAX_IMPORT_RSS_MIB = 120.0
+
+COLD_IMPORT_SCRIPT = """
+import json
+import sys
+import time
+
+import psutil
+
+rss_before = psutil.Process().memory_info().rss
+start = time.perf_counter()
+import mobility
+elapsed = time.perf_counter() - start
+rss_after = psutil.Process().memory_info().rss
+
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mib": rss_after / 1024 / 1024,
+    "rss_delta_mib": (rss_after - rss_before) / 1024 / 1024,
+    "loaded": sorted(name for name in sys.modules if "." not in name),
+}))
+"""
+
+
+def _measure_cold_import() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def cold_import():
+    return _measure_cold_import()
+
+
+def test_import_mobility_does_not_load_heavy_dependencies(cold_import):
+    loaded_heavy_modules = [name for name in HEAVY_MODULES if name in cold_import["loaded"]]
+
+    assert loaded_heavy_modules == []
+
+
+def test_import_mobility_stays_within_time_and_memory_budget(cold_import):
+    assert cold_import["seconds"] < MAX_IMPORT_SECONDS, cold_import
+    assert cold_import["rss_mib"] < MAX_IMPORT_RSS_MIB, cold_import
+
+
+def test_public_names_resolve_on_first_access():
+    import mobility
+
+    assert mobility.TransportZones.__name__ == "TransportZones"
+    assert mobility.carbon_computation.__name__ == "mobility.impacts.carbon_computation"
+    assert "PopulationGroupDayTrips" in dir(mobility)
+    assert set(mobility.__all__) >= {"set_params", "Population", "CarMode", "Scenarios"}
+
+    with pytest.raises(AttributeError, match="no attribute 'NotAMobilityName'"):
+        mobility.NotAMobilityName